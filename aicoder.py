@@ -6,13 +6,19 @@ This is a single-file version for easy distribution.
 
 # This single-file version imports from the modular package
 try:
-    from aicoder.app import main
+    from aicoder.startup_profiler import enable_from_argv, startup_phase
 except ImportError:
     # If the package isn't installed, try to run from the current directory
     import sys
     import os
 
     sys.path.insert(0, os.path.dirname(__file__))
+    from aicoder.startup_profiler import enable_from_argv, startup_phase
+
+# Start timing imports before the application modules are loaded
+enable_from_argv()
+
+with startup_phase("imports"):
     from aicoder.app import main
 
 if __name__ == "__main__":
@@ -2,7 +2,12 @@
 Entry point for AI Coder when run as a module or zipapp.
 """
 
-from .app import main
+from .startup_profiler import enable_from_argv, startup_phase
+
+enable_from_argv()
+
+with startup_phase("imports"):
+    from .app import main
 
 if __name__ == "__main__":
     main()
@@ -33,12 +33,16 @@ class Animator:
         self._cursor_visible = True
         self._is_streaming = False
         self._line_width = "\r" + " " * 60 + "\r"
+        self._output_lock = threading.Lock()
+        self._status_line = ""
         
         self._initialized = True
 
     def start_animation(self, message=""):
         """Start a non-blocking animation thread with elapsed time."""
         self.stop_animation()
+        if config.HEADLESS:
+            return
 
         self._stop_event = threading.Event()
         self._start_time = time.time()
@@ -56,10 +60,10 @@ class Animator:
                     else:
                         cursor_code = "\033[?25l"  # Hide cursor
 
-                    sys.stdout.write(
-                        f"\r{config.RESET}{config.BOLD}{message} {int(elapsed)}s (ESC cancel){config.RESET}{cursor_code}"
-                    )
-                    sys.stdout.flush()
+                    with self._output_lock:
+                        self._status_line = f"\r{config.RESET}{config.BOLD}{message} {int(elapsed)}s (ESC cancel){config.RESET}"
+                        sys.stdout.write(f"{self._status_line}{cursor_code}")
+                        sys.stdout.flush()
 
                     self._cursor_visible = not self._cursor_visible
 
@@ -85,11 +89,20 @@ class Animator:
         sys.stdout.write(self._line_width)
         self.ensure_cursor_visible()
         self._start_time = None
+        self._status_line = ""
+
+    def print_above(self, text):
+        """Print a line above the animated status line and redraw the status."""
+        with self._output_lock:
+            sys.stdout.write(f"\r\033[K{text}\n{self._status_line}")
+            sys.stdout.flush()
 
     def start_cursor_blinking(self):
         """Start blinking cursor during streaming (when no animation is shown)."""
         # Stop any existing cursor blinking
         self.stop_cursor_blinking()
+        if config.HEADLESS:
+            return
 
         self._is_streaming = True
         self._cursor_stop_event = threading.Event()
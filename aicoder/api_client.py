@@ -13,6 +13,7 @@ from typing import List, Dict, Any
 from . import config
 from . import retry_utils
 from .terminal_manager import is_esc_pressed
+from .tool_manager.tool_definitions import ToolDefinitions
 
 _tools_definitions_token_est_cache = {}
 _messages_token_est_cache = {}
@@ -93,6 +94,8 @@ class APIClient:
 
     def _validate_tool_definitions(self, api_data: Dict[str, Any]):
         """Validate that all tool calls have properly formatted arguments."""
+        if isinstance(api_data.get("tools"), ToolDefinitions):
+            return  # Validated by the registry when the definitions were built
         if "tools" in api_data:
             for tool_def in api_data["tools"]:
                 if "function" in tool_def and "parameters" in tool_def["function"]:
@@ -240,17 +243,28 @@ class APIClient:
         if "tools" not in api_data:
             return 0
 
-        from .utils import estimate_tokens, cache_tools_definitions_tokens_estimation
+        from .utils import (
+            estimate_tokens,
+            cache_tools_definitions_tokens_estimation,
+            count_cache_lookups,
+        )
 
         tools_definitions = api_data["tools"]
+        if isinstance(tools_definitions, ToolDefinitions):
+            tokens_estimation = tools_definitions.token_estimate
+            cache_tools_definitions_tokens_estimation(tokens_estimation)
+            return tokens_estimation
+
         tools_definitions_json = json.dumps(tools_definitions, separators=(",", ":"))
 
         hash_tdef = hash(tools_definitions_json)
         if hash_tdef in _tools_definitions_token_est_cache:
             tokens_estimation = _tools_definitions_token_est_cache[hash_tdef]
+            count_cache_lookups("tools_token_estimate", 1)
         else:
             tokens_estimation = estimate_tokens(tools_definitions_json)
             _tools_definitions_token_est_cache[hash_tdef] = tokens_estimation
+            count_cache_lookups("tools_token_estimate", 0, 1)
 
         cache_tools_definitions_tokens_estimation(tokens_estimation)
 
@@ -263,9 +277,10 @@ class APIClient:
         if "messages" not in api_data:
             return 0
 
-        from .utils import estimate_tokens
+        from .utils import estimate_tokens, count_cache_lookups
 
         stoken = 0
+        misses = 0
         for msg in api_data["messages"]:
             id_msg = id(msg)
             if id_msg in _messages_token_est_cache:
@@ -275,6 +290,8 @@ class APIClient:
                 msg_estimation = estimate_tokens(msg_json)
                 _messages_token_est_cache[id_msg] = msg_estimation
                 stoken += msg_estimation
+                misses += 1
+        count_cache_lookups("messages_token_estimate", len(api_data["messages"]) - misses, misses)
         return stoken
 
     def _prepare_and_cache_request(self, api_data: Dict[str, Any]) -> bytes:
@@ -292,7 +309,18 @@ class APIClient:
         estimated_tokens = messages_tokens + tokens_tools_defs
         cache_api_request_for_estimation(estimated_tokens)
 
-        request_string = json.dumps(api_data, separators=(",", ":"))
+        tools = api_data.get("tools")
+        if isinstance(tools, ToolDefinitions):
+            # Reuse the serialized definitions; only the rest is dumped per request
+            rest = {key: value for key, value in api_data.items() if key != "tools"}
+            request_string = json.dumps(rest, separators=(",", ":"))
+            tools_member = f'"tools":{tools.json}'
+            if rest:
+                request_string = f"{request_string[:-1]},{tools_member}}}"
+            else:
+                request_string = f"{{{tools_member}}}"
+        else:
+            request_string = json.dumps(api_data, separators=(",", ":"))
 
         return request_string.encode("utf-8")
 
@@ -302,6 +330,25 @@ class APIClient:
 
         return estimate_messages_tokens(messages)
 
+    def _finish_request_timing(self, timing, response=None, error=None):
+        """Complete a RequestTiming and hand it to stats."""
+        if timing is None:
+            return
+        completion_tokens = 0
+        if response:
+            completion_tokens = (response.get("usage") or {}).get("completion_tokens") or 0
+            if not completion_tokens and response.get("choices"):
+                content = response["choices"][0].get("message", {}).get("content")
+                if content:
+                    completion_tokens = self._estimate_tokens(content)
+        timing.finish(error is None and response is not None, completion_tokens, error)
+        record = getattr(self.stats, "record_request_timing", None)
+        if self.stats and callable(record):
+            record(timing)
+        from .tracing import get_tracer
+
+        get_tracer().record_request(timing)
+
     def _update_stats_on_failure(self, api_start_time: float):
         """Update statistics on failed API call."""
         if self.stats:
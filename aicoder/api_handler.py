@@ -12,7 +12,6 @@ from typing import List, Dict, Any
 
 from . import config
 from .utils import emsg
-from .streaming_adapter import StreamingAdapter
 from .api_client import APIClient
 from .retry_utils import handle_request_error, ShouldRetryException
 
@@ -20,6 +19,9 @@ from .retry_utils import handle_request_error, ShouldRetryException
 class APIHandlerMixin(APIClient):
     """Mixin class for API request handling."""
 
+    # Callable(text) given streamed content deltas instead of printing them (headless mode)
+    on_content_delta = None
+
     def __init__(self):
         super().__init__(getattr(self, "animator", None), getattr(self, "stats", None))
 
@@ -41,9 +43,12 @@ class APIHandlerMixin(APIClient):
         if config.ENABLE_STREAMING and not disable_streaming_mode:
             # Initialize streaming adapter if not already done
             if not hasattr(self, "_streaming_adapter"):
+                from .streaming_adapter import StreamingAdapter
+
                 self._streaming_adapter = StreamingAdapter(
                     self, getattr(self, "animator", None)
                 )
+                self._streaming_adapter.on_content_delta = self.on_content_delta
 
             return self._streaming_adapter.make_request(
                 messages, disable_streaming_mode, disable_tools
@@ -8,6 +8,7 @@ import json
 import time
 import traceback
 import signal
+import concurrent.futures
 
 from . import config
 from .stats import Stats
@@ -23,6 +24,7 @@ from .plugin_system.loader import load_plugins, notify_plugins_of_aicoder_init
 from .utils import parse_markdown, emsg, wmsg, imsg
 from .terminal_manager import cleanup_terminal_manager
 from .persistent_config import PersistentConfig
+from .startup_profiler import startup_phase, finish_startup_profile
 
 
 def global_exception_handler(exc_type, exc_value, exc_traceback):
@@ -79,7 +81,8 @@ class AICoder(
         # Initialize terminal manager first (before any terminal operations)
         from .terminal_manager import get_terminal_manager
 
-        get_terminal_manager()  # This initializes the global terminal manager
+        with startup_phase("terminal"):
+            get_terminal_manager()  # This initializes the global terminal manager
 
         # Set up global exception handler
         global save_crash_session
@@ -87,7 +90,8 @@ class AICoder(
         sys.excepthook = global_exception_handler
 
         # Initialize persistent config before plugins
-        self.persistent_config = PersistentConfig()
+        with startup_phase("persistent config"):
+            self.persistent_config = PersistentConfig()
 
         # Set this app instance as global for config access
         from . import config
@@ -95,7 +99,8 @@ class AICoder(
         config.set_app_instance(self)
 
         # Load plugins first, before anything else
-        self.loaded_plugins = load_plugins()
+        with startup_phase("plugins"):
+            self.loaded_plugins = load_plugins()
         loaded_plugins = self.loaded_plugins
 
         # Set up signal handler for SIGINT (Ctrl+C)
@@ -103,7 +108,8 @@ class AICoder(
 
         self.stats = Stats()
         self.stats._app_instance = self  # Store reference for plugin access
-        self.message_history = MessageHistory()
+        with startup_phase("prompt loading"):
+            self.message_history = MessageHistory()
         
         # Use singleton animator instance
         from .animator import get_animator
@@ -112,32 +118,48 @@ class AICoder(
         # Initialize parent classes properly
         super().__init__()
 
-        self.tool_manager = MCPToolManager(
-            self.stats, self.message_history, animator=self.animator
-        )
+        with startup_phase("tool manager"):
+            self.tool_manager = MCPToolManager(
+                self.stats, self.message_history, animator=self.animator
+            )
         
         # Register tool manager as global singleton
         from .tool_manager import set_tool_manager
         set_tool_manager(self.tool_manager)
-        self._initialize_mcp_servers()
+        with startup_phase("mcp servers"):
+            self._initialize_mcp_servers()
 
         
 
         # Load prompt history after readline is initialized
-        self._load_prompt_history()
+        with startup_phase("history"):
+            self._load_prompt_history()
 
         # Set up the API handler reference in message history
         self.message_history.api_handler = self
+
+        # Track the session's histories for /mem and the debug-mode growth warnings
+        from .memory_tracker import get_memory_tracker
+
+        get_memory_tracker().register_app(self)
+
+        # Export metrics if METRICS_FILE, METRICS_PORT or METRICS_SOCKET is set
+        from .metrics_export import start_metrics_export
+
+        start_metrics_export(self.stats)
         
         # Estimate context size now that api_handler is available (with tools info)
-        self.message_history.estimate_context()
+        with startup_phase("context estimate"):
+            self.message_history.estimate_context()
 
         # Initialize command registry
-        command_registry = CommandRegistry(self)
-        self.command_handlers = command_registry.get_all_commands()
+        with startup_phase("commands"):
+            command_registry = CommandRegistry(self)
+            self.command_handlers = command_registry.get_all_commands()
 
         # Notify plugins that AICoder is initialized
-        notify_plugins_of_aicoder_init(loaded_plugins, self)
+        with startup_phase("plugin init hooks"):
+            notify_plugins_of_aicoder_init(loaded_plugins, self)
 
         # Print streaming status at startup only if disabled (since it's enabled by default)
         if not config.ENABLE_STREAMING:
@@ -339,18 +361,38 @@ class AICoder(
                     self.message_history._compaction_performed = False
 
     def _initialize_mcp_servers(self):
-        """Initialize all MCP stdio servers at startup."""
-        init_printed = False
-        for name, tool_config in self.tool_manager.mcp_tools.items():
-            if tool_config.get("type") == "mcp-stdio":
-                try:
-                    if not init_printed:
-                        imsg("*** Initializing MCP servers...")
-                        init_printed = True
-                    tools = self.tool_manager.registry._discover_mcp_server_tools(name)
-                    imsg(f"*** Initialized MCP server '{name}' with {len(tools)} tools")
-                except Exception as e:
-                    emsg(f"*** Failed to initialize MCP server '{name}': {e}")
+        """Initialize all MCP stdio servers at startup, concurrently."""
+        registry = self.tool_manager.registry
+        try:
+            startups = registry.start_mcp_servers()
+        except Exception as e:
+            emsg(f"*** Failed to initialize MCP servers: {e}")
+            return
+        for name, tool_config in registry.mcp_tools.items():
+            if tool_config.get("type") == "mcp-stdio" and name not in startups:
+                tools = registry.advertised_mcp_server_tools(name)
+                if tools and name not in registry.mcp_servers:
+                    imsg(f"*** MCP server '{name}' ({len(tools)} tools) will start on first use")
+        if not startups:
+            return
+
+        imsg("*** Initializing MCP servers...")
+        # Servers with cached tools finish starting in the background
+        cached = {name: registry.advertised_mcp_server_tools(name) for name in startups}
+        pending = [f for name, f in startups.items() if not cached[name]]
+        # Wait for the servers together, but don't let a slow one hold up the prompt
+        concurrent.futures.wait(pending, timeout=config.MCP_STARTUP_WAIT)
+        for name, future in startups.items():
+            if cached[name] and not future.done():
+                imsg(
+                    f"*** Using {len(cached[name])} cached tools for MCP server '{name}' while it starts"
+                )
+            elif future.done():
+                imsg(f"*** Initialized MCP server '{name}' with {len(future.result())} tools")
+            else:
+                wmsg(
+                    f"*** MCP server '{name}' is still starting; its tools will be available once it is ready"
+                )
 
     def _save_crash_session(self):
         """Save the current session to a crash file."""
@@ -392,6 +434,12 @@ class AICoder(
                 self.tool_manager.registry.cleanup_mcp_servers()
             except Exception as e:
                 print(f"Error cleaning up MCP servers: {e}")
+        from .metrics_export import stop_metrics_export
+
+        stop_metrics_export()
+        from .tracing import get_tracer
+
+        get_tracer().close()
         self.stats.print_stats()
 
     def _print_startup_info(self):
@@ -407,6 +455,7 @@ class AICoder(
         """Main application loop."""
         try:
             self._print_startup_info()
+            finish_startup_profile()
             
             # Setup file-based prompting if enabled
             from .file_prompt import get_file_prompt_manager
@@ -490,6 +539,17 @@ class AICoder(
                     # Reset retry counter for new API requests
                     self.retry_handler.reset_retry_counter()
 
+                    # Start the one-shot cProfile armed by /profile once
+                    from .profiler import get_profile_session
+
+                    profile_session = get_profile_session()
+                    profile_session.begin_interaction()
+
+                    # Trace this turn when TRACE=1
+                    from .tracing import get_tracer
+
+                    get_tracer().begin_turn(prompt_chars=len(user_input))
+
                     while True:
                         response = self._make_api_request(self.message_history.messages)
                         if response is None:
@@ -615,6 +675,11 @@ class AICoder(
                     # Check for auto-compaction after each complete interaction cycle (before showing prompt to user)
                     self._check_auto_compaction()
 
+                    get_tracer().end_turn()
+                    profile_path = profile_session.end_interaction()
+                    if profile_path:
+                        imsg(f"*** Profile of this interaction saved to {profile_path}")
+
                 except (KeyboardInterrupt, EOFError):
                     emsg("\nReceived interrupt. Exiting...")
                     self._print_exit_stats()
@@ -628,7 +693,8 @@ def main():
     """Main entry point."""
 
     # Simple tab completion - always suggest /plan
-    import readline
+    with startup_phase("readline"):
+        import readline
 
     def tab_complete(text, state):
         return "/plan toggle" if state == 0 else None
@@ -0,0 +1,346 @@
+"""
+Non-interactive batch runner: many independent tasks, bounded concurrency.
+
+Reads a JSONL file of tasks and runs each one as an isolated AICoder
+session in its own Python process and working directory. At most --jobs
+sessions run at a time. One result line per task is appended to the
+output JSONL as soon as that task finishes:
+
+    python -m aicoder.batch tasks.jsonl -o results.jsonl -j 8
+
+A task is a JSON object:
+
+    {"id": "fix-1", "prompt": "Fix the failing test", "cwd": "checkouts/1",
+     "model": "gpt-5-mini", "base_url": "https://...", "env": {"TEMPERATURE": "0"},
+     "timeout": 900}
+
+Only "prompt" is required; it may also be a list of prompts sent one after
+another in the same session. Without "cwd" a fresh temporary directory is
+used. Sessions run with YOLO_MODE=1 since nobody is there to approve tools.
+
+A result has status "ok", "error" or "timeout". A session whose last prompt
+got no reply from the API (the app only prints the failure and carries on)
+is an error; "response" is the reply to the last prompt only.
+
+Each session runs in a fresh interpreter rather than a forked worker because
+config is read from the environment at import time, so per-task model and
+endpoint overrides need a clean process.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Task keys that map to environment variables of the session
+TASK_ENV_KEYS = {
+    "model": "OPENAI_MODEL",
+    "base_url": "OPENAI_BASE_URL",
+    "api_key": "OPENAI_API_KEY",
+}
+
+
+def load_tasks(path: str) -> List[Dict[str, Any]]:
+    """Tasks from a JSONL file; ids default to the line number."""
+    tasks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                task = json.loads(line)
+            except json.JSONDecodeError as e:
+                task = {"error": f"invalid JSON: {e}"}
+            if not isinstance(task, dict):
+                task = {"error": "task is not a JSON object"}
+            task.setdefault("id", str(line_number))
+            tasks.append(task)
+    return tasks
+
+
+def _task_prompts(task: Dict[str, Any]) -> List[str]:
+    prompt = task.get("prompt")
+    prompts = prompt if isinstance(prompt, list) else [prompt]
+    return [p for p in prompts if isinstance(p, str) and p.strip()]
+
+
+def task_env(task: Dict[str, Any]) -> Dict[str, str]:
+    """Environment of a task's session: ours plus the task's overrides."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["YOLO_MODE"] = "1"
+    # The prompts come from the task, never from a prompt file
+    env.pop("AICODER_PROMPT_FILE", None)
+    for key, env_name in TASK_ENV_KEYS.items():
+        if task.get(key):
+            env[env_name] = str(task[key])
+    env.update({key: str(value) for key, value in (task.get("env") or {}).items()})
+    return env
+
+
+# ----------------------------------------------------------------------------
+# Session side (child process)
+# ----------------------------------------------------------------------------
+
+
+def run_worker(task: Dict[str, Any], result_path: str):
+    """Run one task's session in this process; write its result as JSON."""
+    start = time.perf_counter()
+    from .app import AICoder
+
+    app = AICoder()
+    prompts = iter(_task_prompts(task))
+    turn: Dict[str, Any] = {}  # Reply and error of the current prompt
+
+    def next_prompt():
+        try:
+            prompt = next(prompts)
+        except StopIteration:
+            raise EOFError
+        turn.clear()
+        return prompt
+
+    make_api_request = app._make_api_request
+
+    def api_request(messages, *args, **kwargs):
+        response = make_api_request(messages, *args, **kwargs)
+        if any(args) or any(kwargs.values()):
+            return response  # Summaries and decisions
+        if response and response.get("choices"):
+            turn["error"] = None
+            content = (response["choices"][0].get("message") or {}).get("content")
+            if content:
+                turn["response"] = content
+        else:
+            # The app reports the failure and waits for the next prompt
+            turn["error"] = app.stats.last_request_error() or "API request failed"
+        return response
+
+    app._get_multiline_input = next_prompt
+    app._make_api_request = api_request
+    app.run()
+
+    stats = app.stats
+    summary = stats.latency_summary()
+    result = {
+        "status": "error" if turn.get("error") else "ok",
+        "response": turn.get("response"),
+        "messages": len(app.message_history.messages),
+        "usage": {
+            "prompt_tokens": stats.prompt_tokens,
+            "completion_tokens": stats.completion_tokens,
+        },
+        "api_requests": stats.api_requests,
+        "api_errors": stats.api_errors,
+        "tool_calls": stats.tool_calls,
+        "tool_errors": stats.tool_errors,
+        "timing": {
+            "session_s": round(time.perf_counter() - start, 3),
+            "api_s": round(stats.api_time_spent, 3),
+            "tools_s": round(stats.tool_time_spent, 3),
+        },
+    }
+    for field_name in ("ttft", "total"):
+        if field_name in summary["fields"]:
+            result["timing"][f"{field_name}_p50_s"] = summary["fields"][field_name][0]
+    if turn.get("error"):
+        result["error"] = turn["error"]
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ----------------------------------------------------------------------------
+# Driver side (parent process)
+# ----------------------------------------------------------------------------
+
+
+def _parent_pids() -> Dict[int, int]:
+    """pid -> parent pid of every process we can see."""
+    parents = {}
+    if os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    stat = f.read()
+                # The ppid is the second field after the parenthesized command name
+                parents[int(entry)] = int(stat[stat.rindex(b")") + 2 :].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+        return parents
+    try:
+        result = subprocess.run(["ps", "-A", "-o", "pid=,ppid="], capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            pid, ppid = line.split()
+            parents[int(pid)] = int(ppid)
+    except (OSError, ValueError):
+        pass
+    return parents
+
+
+def _kill_session(proc: subprocess.Popen):
+    """Kill a session process and every process group it started.
+
+    Tool commands run in their own process groups (setsid, or job control
+    in the persistent shell), so killing the session's group alone would
+    leave them running. Descendants are collected before anything is
+    killed, while they are still parented to the session.
+    """
+    parents = _parent_pids()
+    descendants = []
+    pending = [proc.pid]
+    while pending:
+        parent = pending.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent]
+        descendants.extend(children)
+        pending.extend(children)
+    groups = {proc.pid}  # The session leads its own group
+    for pid in descendants:
+        try:
+            groups.add(os.getpgid(pid))
+        except OSError:
+            continue
+    for pgid in groups:
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def run_task(
+    task: Dict[str, Any], timeout: float = 1800, log_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run one task in a child process and return its result line."""
+    result: Dict[str, Any] = {"id": task.get("id")}
+    if task.get("error"):
+        return {**result, "status": "error", "error": task["error"]}
+    if not _task_prompts(task):
+        return {**result, "status": "error", "error": "task has no prompt"}
+
+    cwd = task.get("cwd")
+    if cwd:
+        cwd = os.path.abspath(cwd)
+        if not os.path.isdir(cwd):
+            return {**result, "status": "error", "error": f"cwd does not exist: {cwd}"}
+
+    log_file = None
+    result_path = None
+    start = time.perf_counter()
+    try:
+        if not cwd:
+            cwd = tempfile.mkdtemp(prefix="aicoder-batch-")
+        result["cwd"] = cwd
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(task["id"]))
+            result["log"] = os.path.join(log_dir, f"{safe_id}.log")
+            log_file = open(result["log"], "w", encoding="utf-8")
+        handle, result_path = tempfile.mkstemp(prefix="aicoder-batch-", suffix=".json")
+        os.close(handle)
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "aicoder.batch", "--worker", result_path],
+            stdin=subprocess.PIPE,
+            cwd=cwd,
+            env=task_env(task),
+            stdout=log_file or subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,  # So a timeout can kill the whole session
+        )
+        try:
+            _, stderr = proc.communicate(json.dumps(task), timeout=float(task.get("timeout") or timeout))
+        except subprocess.TimeoutExpired:
+            _kill_session(proc)
+            proc.communicate()
+            result["status"] = "timeout"
+            return result
+        result["exit_code"] = proc.returncode
+        with open(result_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        if proc.returncode == 0 and content:
+            # The worker reports "error" when the last prompt got no reply
+            result.update(json.loads(content))
+        else:
+            result["status"] = "error"
+            result["error"] = stderr[-2000:] or f"session exited with {proc.returncode}"
+    except Exception as e:
+        # One broken task must not abort the batch
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["wall_s"] = round(time.perf_counter() - start, 3)
+        if log_file:
+            log_file.close()
+        if result_path:
+            try:
+                os.unlink(result_path)
+            except OSError:
+                pass
+    return result
+
+
+def run_batch(
+    tasks: Iterable[Dict[str, Any]],
+    output_path: str,
+    jobs: int = 0,
+    timeout: float = 1800,
+    log_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """Run tasks with at most jobs sessions at once; returns counts by status."""
+    tasks = list(tasks)
+    jobs = jobs or os.cpu_count() or 1
+    counts: Dict[str, int] = {}
+    lock = threading.Lock()
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(
+        max_workers=max(1, jobs)
+    ) as pool:
+        futures = [pool.submit(run_task, task, timeout, log_dir) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            with lock:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+            print(
+                f"[{sum(counts.values())}/{len(tasks)}] {result['id']}: {result['status']}"
+                f" ({result.get('wall_s', 0):.1f}s)",
+                file=sys.stderr,
+            )
+    return counts
+
+
+def main(argv=None):
+    import argparse
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "--worker":
+        run_worker(json.loads(sys.stdin.read()), argv[1])
+        return 0
+
+    parser = argparse.ArgumentParser(description="Run a JSONL file of AICoder tasks")
+    parser.add_argument("tasks", help="JSONL file of tasks")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="Results JSONL (appended to)")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="Concurrent sessions (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds per task (default: 1800)")
+    parser.add_argument("--log-dir", help="Keep each session's output in <log-dir>/<id>.log")
+    args = parser.parse_args(argv)
+
+    counts = run_batch(load_tasks(args.tasks), args.output, args.jobs, args.timeout, args.log_dir)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done: {summary or 'no tasks'} -> {args.output}", file=sys.stderr)
+    return 0 if set(counts) <= {"ok"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
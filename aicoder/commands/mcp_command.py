@@ -0,0 +1,61 @@
+"""
+MCP command for AI Coder.
+"""
+
+from typing import Tuple, List
+from .base import BaseCommand
+from .. import config
+from ..utils import imsg, wmsg
+
+
+class McpCommand(BaseCommand):
+    """Show MCP server health: /mcp [log <server> [lines]|restart <server>]."""
+
+    def __init__(self, app_instance=None):
+        super().__init__(app_instance)
+        self.aliases = ["/mcp"]
+
+    def execute(self, args: List[str]) -> Tuple[bool, bool]:
+        """Show MCP server health: /mcp [log <server> [lines]|restart <server>]."""
+        registry = self.app.tool_manager.registry
+        supervisor = registry.supervisor
+
+        if not args:
+            lines = supervisor.status_lines()
+            if not lines:
+                imsg("\n*** No MCP stdio servers configured")
+                return False, False
+            imsg("\n=== MCP Servers ===")
+            for line in lines:
+                print(f"  {line}")
+            return False, False
+
+        action = args[0].lower()
+        server_name = args[1] if len(args) > 1 else None
+        if server_name is None or server_name not in registry.mcp_tools:
+            print(
+                f"\n{config.RED}*** Usage: /mcp [log <server> [lines]|restart <server>]{config.RESET}"
+            )
+            return False, False
+
+        if action == "log":
+            count = int(args[2]) if len(args) > 2 and args[2].isdigit() else 20
+            lines = supervisor.stderr_tail(server_name, count)
+            if not lines:
+                imsg(f"\n*** No stderr output from MCP server '{server_name}'")
+            else:
+                imsg(f"\n=== stderr of MCP server '{server_name}' (last {len(lines)} lines) ===")
+                for line in lines:
+                    print(line)
+        elif action == "restart":
+            registry.stop_mcp_server(server_name)
+            tools = registry._discover_mcp_server_tools(server_name)
+            if server_name in registry.mcp_servers:
+                imsg(f"\n*** Restarted MCP server '{server_name}' with {len(tools)} tools")
+            else:
+                wmsg(f"\n*** MCP server '{server_name}' failed to start")
+        else:
+            print(
+                f"\n{config.RED}*** Usage: /mcp [log <server> [lines]|restart <server>]{config.RESET}"
+            )
+        return False, False
@@ -0,0 +1,66 @@
+"""
+Mem command for AI Coder.
+"""
+
+from typing import Tuple, List
+from .base import BaseCommand
+from .. import config
+from ..utils import imsg, wmsg
+
+USAGE = "/mem [snapshot|diff [n]|stop]"
+
+
+class MemCommand(BaseCommand):
+    """Show memory use: /mem [snapshot|diff [n]|stop] - RSS, cache sizes and tracemalloc diffs."""
+
+    def __init__(self, app_instance=None):
+        super().__init__(app_instance)
+        self.aliases = ["/mem"]
+
+    def execute(self, args: List[str]) -> Tuple[bool, bool]:
+        """Show memory use: /mem [snapshot|diff [n]|stop] - RSS, cache sizes and tracemalloc diffs."""
+        from ..memory_tracker import get_memory_tracker, rss_kb
+
+        tracker = get_memory_tracker()
+        action = args[0].lower() if args else "usage"
+
+        if action == "usage":
+            current = rss_kb()
+            imsg("\n=== Memory ===")
+            print(
+                f"  RSS: {current / 1024:.1f} MB "
+                f"({(current - tracker.start_rss_kb) / 1024:+.1f} MB since startup)"
+            )
+            peak = getattr(self.app.stats, "peak_rss_kb", 0)
+            if peak:
+                print(f"  Peak RSS after a request: {peak / 1024:.1f} MB")
+            print("  Caches and histories (entries, container size):")
+            for name, (entries, size) in sorted(
+                tracker.structure_sizes().items(), key=lambda item: -item[1][0]
+            ):
+                print(f"    {name}: {entries:,} ({size / 1024:.1f} KB)")
+            if tracker.tracing:
+                print("  tracemalloc: tracing (/mem diff to compare, /mem stop to end)")
+        elif action == "snapshot":
+            was_tracing = tracker.tracing
+            tracker.take_snapshot()
+            imsg("\n*** tracemalloc snapshot taken")
+            if not was_tracing:
+                print("    Tracing started now; only allocations made from here on are seen")
+            print("    Use /mem diff after the interaction you want to inspect")
+        elif action == "diff":
+            limit = int(args[1]) if len(args) > 1 and args[1].isdigit() else 15
+            lines = tracker.diff(limit)
+            if lines is None:
+                wmsg("\n*** No snapshot to compare against. Use /mem snapshot first")
+                return False, False
+            imsg(f"\n=== Allocation changes since the last snapshot (top {limit}) ===")
+            for line in lines:
+                print(f"  {line}")
+            print("  (The current state is now the new snapshot)")
+        elif action == "stop":
+            tracker.stop_tracing()
+            imsg("\n*** tracemalloc stopped")
+        else:
+            print(f"\n{config.RED}*** Usage: {USAGE}{config.RESET}")
+        return False, False
@@ -0,0 +1,50 @@
+"""
+Plugins command for AI Coder.
+"""
+
+from typing import Tuple, List
+from .base import BaseCommand
+from .. import config
+from ..utils import imsg
+
+
+class PluginsCommand(BaseCommand):
+    """List loaded plugins: /plugins [perf] - perf ranks them by the time they add."""
+
+    def __init__(self, app_instance=None):
+        super().__init__(app_instance)
+        self.aliases = ["/plugins"]
+
+    def execute(self, args: List[str]) -> Tuple[bool, bool]:
+        """List loaded plugins: /plugins [perf] - perf ranks them by the time they add."""
+        from ..plugin_system.perf import get_plugin_perf
+
+        loaded_plugins = getattr(self.app, "loaded_plugins", None) or []
+        perf = get_plugin_perf()
+
+        if not args:
+            if not loaded_plugins:
+                imsg("\n*** No plugins loaded")
+                return False, False
+            imsg(f"\n=== Plugins ({len(loaded_plugins)}) ===")
+            for plugin_name, _module in loaded_plugins:
+                stats = perf.plugins.get(plugin_name)
+                load_ms = stats.load_time * 1000 if stats else 0.0
+                patches = len(stats.patches) if stats else 0
+                suffix = f", patches {patches} hot path(s)" if patches else ""
+                print(f"  {plugin_name} (loaded in {load_ms:.1f} ms{suffix})")
+            return False, False
+
+        if args[0].lower() == "perf":
+            if not perf.plugins:
+                imsg("\n*** No plugin timings recorded")
+                return False, False
+            imsg("\n=== Plugin overhead (slowest first) ===")
+            for line in perf.report_lines():
+                print(f"  {line}")
+            if not config.PLUGIN_PERF:
+                print("  Hot-path patches are not measured (PLUGIN_PERF=0)")
+            return False, False
+
+        print(f"\n{config.RED}*** Usage: /plugins [perf]{config.RESET}")
+        return False, False
@@ -0,0 +1,83 @@
+"""
+Profile command for AI Coder.
+"""
+
+from typing import Tuple, List
+from .base import BaseCommand
+from .. import config
+from ..utils import imsg, wmsg
+
+USAGE = "/profile [start [hz]|stop|report [n]|once]"
+
+
+class ProfileCommand(BaseCommand):
+    """Profile CPU use: /profile [start [hz]|stop|report [n]|once] - Sample stacks or cProfile the next prompt."""
+
+    def __init__(self, app_instance=None):
+        super().__init__(app_instance)
+        self.aliases = ["/profile"]
+
+    def execute(self, args: List[str]) -> Tuple[bool, bool]:
+        """Profile CPU use: /profile [start [hz]|stop|report [n]|once] - Sample stacks or cProfile the next prompt."""
+        from ..profiler import get_profile_session
+
+        session = get_profile_session()
+        action = args[0].lower() if args else "status"
+
+        if action == "start":
+            hz = None
+            if len(args) > 1:
+                try:
+                    hz = float(args[1])
+                except ValueError:
+                    print(f"\n{config.RED}*** Invalid sample rate: {args[1]}{config.RESET}")
+                    return False, False
+            if session.sampler is not None and session.sampler.running:
+                wmsg("\n*** Sampling profiler is already running")
+                return False, False
+            sampler = session.start_sampling(hz)
+            imsg(f"\n*** Sampling profiler started ({1 / sampler.interval:.0f} samples/s)")
+            print("    Use /profile stop to save the samples, /profile report to see the hot spots")
+        elif action == "stop":
+            path = session.stop_sampling()
+            if path is None:
+                wmsg("\n*** Sampling profiler is not running")
+                return False, False
+            sampler = session.sampler
+            imsg(f"\n*** Saved {sampler.samples} samples ({sampler.duration:.1f}s) to {path}")
+            print("    Render with: flamegraph.pl FILE > flame.svg, or open it in speedscope.app")
+            self._print_report(sampler, 10)
+        elif action == "report":
+            if session.sampler is None:
+                wmsg("\n*** No samples yet. Use /profile start first")
+                return False, False
+            limit = int(args[1]) if len(args) > 1 and args[1].isdigit() else 15
+            self._print_report(session.sampler, limit)
+        elif action == "once":
+            session.arm_cprofile()
+            imsg("\n*** The next prompt will run under cProfile")
+        elif action == "status":
+            sampler = session.sampler
+            if sampler is not None and sampler.running:
+                imsg(f"\n*** Sampling profiler running: {sampler.samples} samples in {sampler.duration:.1f}s")
+            else:
+                imsg("\n*** Sampling profiler is not running")
+            if session.cprofile_armed:
+                print("    cProfile armed for the next prompt")
+            if session.last_output:
+                print(f"    Last profile: {session.last_output}")
+            print(f"    Usage: {USAGE}")
+        else:
+            print(f"\n{config.RED}*** Usage: {USAGE}{config.RESET}")
+        return False, False
+
+    def _print_report(self, sampler, limit: int):
+        if not sampler.samples:
+            wmsg("\n*** No samples collected")
+            return
+        imsg(f"\n=== Hot spots ({sampler.samples} samples, all threads, wall clock) ===")
+        print(f"  {'total':>6} {'self':>6}  function")
+        for frame, own, total in sampler.top_functions(limit):
+            print(
+                f"  {total * 100 / sampler.samples:5.1f}% {own * 100 / sampler.samples:5.1f}%  {frame}"
+            )
@@ -1,29 +1,66 @@
 """
 Command registry for AI Coder.
+
+Command modules are imported the first time one of their aliases is used
+(or /help asks for their description), not at startup. The alias table
+below must therefore list the same aliases as each command's __init__.
 """
 
-from typing import Dict, Callable
-from .help_command import HelpCommand
-from .edit_command import EditCommand
+import importlib
+from typing import Dict, Callable, List, Tuple
+
+# (module, class, aliases) for every built-in command, in /help order
+COMMAND_TABLE: List[Tuple[str, str, List[str]]] = [
+    ("help_command", "HelpCommand", ["/help"]),
+    ("edit_command", "EditCommand", ["/edit", "/e"]),
+    ("quit_command", "QuitCommand", ["/quit", "/q"]),
+    ("pprint_messages_command", "PprintMessagesCommand", ["/pprint_messages", "/pm"]),
+    ("compact_command", "CompactCommand", ["/compact", "/c"]),
+    ("model_command", "ModelCommand", ["/model"]),
+    ("new_session_command", "NewSessionCommand", ["/new"]),
+    ("save_session_command", "SaveSessionCommand", ["/save"]),
+    ("load_session_command", "LoadSessionCommand", ["/load"]),
+    ("breakpoint_command", "BreakpointCommand", ["/breakpoint", "/bp"]),
+    ("stats_command", "StatsCommand", ["/stats"]),
+    ("prompt_command", "PromptCommand", ["/prompt"]),
+    ("retry_command", "RetryCommand", ["/retry", "/r"]),
+    ("debug_command", "DebugCommand", ["/debug", "/d"]),
+    ("revoke_approvals_command", "RevokeApprovalsCommand", ["/revoke_approvals", "/ra"]),
+    ("yolo_command", "YoloCommand", ["/yolo"]),
+    ("plan_command", "PlanCommand", ["/plan", "/plan toggle", "/plan focus", "/plan help"]),
+    ("reset_command", "ResetCommand", ["/terminalreset", "/tr"]),
+    ("settings_command", "SettingsCommand", ["/settings", "/setting", "/config"]),
+    ("memory_command", "MemoryCommand", ["/memory", "/m"]),
+    ("mcp_command", "McpCommand", ["/mcp"]),
+    ("profile_command", "ProfileCommand", ["/profile"]),
+    ("plugins_command", "PluginsCommand", ["/plugins"]),
+    ("mem_command", "MemCommand", ["/mem"]),
+]
+
 
-from .quit_command import QuitCommand
-from .pprint_messages_command import PprintMessagesCommand
-from .compact_command import CompactCommand
-from .model_command import ModelCommand
-from .new_session_command import NewSessionCommand
-from .save_session_command import SaveSessionCommand
-from .load_session_command import LoadSessionCommand
-from .breakpoint_command import BreakpointCommand
-from .stats_command import StatsCommand
-from .prompt_command import PromptCommand
-from .retry_command import RetryCommand
-from .debug_command import DebugCommand
-from .revoke_approvals_command import RevokeApprovalsCommand
-from .yolo_command import YoloCommand
-from .plan_command import PlanCommand
-from .reset_command import ResetCommand
-from .settings_command import SettingsCommand
-from .memory_command import MemoryCommand
+class LazyCommand:
+    """Command handler that imports and instantiates its command on first use."""
+
+    def __init__(self, module_name: str, class_name: str, app_instance=None):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.app_instance = app_instance
+        self._command = None
+
+    @property
+    def command(self):
+        """The command instance, imported on first access."""
+        if self._command is None:
+            module = importlib.import_module(f".{self.module_name}", __package__)
+            self._command = getattr(module, self.class_name)(self.app_instance)
+        return self._command
+
+    @property
+    def __doc__(self):
+        return self.command.execute.__doc__
+
+    def __call__(self, args: List[str]) -> Tuple[bool, bool]:
+        return self.command.execute(args)
 
 
 class CommandRegistry:
@@ -38,32 +75,9 @@ class CommandRegistry:
 
     def _register_commands(self):
         """Register all available commands."""
-        command_classes = [
-            HelpCommand,
-            EditCommand,
-            QuitCommand,
-            PprintMessagesCommand,
-            CompactCommand,
-            ModelCommand,
-            NewSessionCommand,
-            SaveSessionCommand,
-            LoadSessionCommand,
-            BreakpointCommand,
-            StatsCommand,
-            PromptCommand,
-            RetryCommand,
-            DebugCommand,
-            RevokeApprovalsCommand,
-            YoloCommand,
-            PlanCommand,
-            ResetCommand,
-            SettingsCommand,
-            MemoryCommand,
-        ]
-
-        for cmd_class in command_classes:
-            cmd_instance = cmd_class(self.app_instance)
-            for alias, handler in cmd_instance.register().items():
+        for module_name, class_name, aliases in COMMAND_TABLE:
+            handler = LazyCommand(module_name, class_name, self.app_instance)
+            for alias in aliases:
                 self.commands[alias] = handler
 
     def get_all_commands(self) -> Dict[str, Callable]:
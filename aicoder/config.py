@@ -292,6 +292,106 @@ MAX_TOOL_RESULT_SIZE = int(
     os.environ.get("MAX_TOOL_RESULT_SIZE", "300000")
 )  # 300KB default
 
+# Shell command output capture limits
+# Bytes of run_shell_command output kept in memory per stream (first and last half)
+SHELL_OUTPUT_MAX_BYTES = int(os.environ.get("SHELL_OUTPUT_MAX_BYTES", "100000"))
+# Save the full output of truncated commands to a temp file the AI can read
+SHELL_OUTPUT_SPILL = os.environ.get("SHELL_OUTPUT_SPILL", "1") == "1"
+SHELL_OUTPUT_SPILL_MAX_BYTES = int(
+    os.environ.get("SHELL_OUTPUT_SPILL_MAX_BYTES", str(50 * 1024 * 1024))
+)  # 50MB default
+# Spill files kept at once; older ones are deleted, and all of them at exit
+SHELL_OUTPUT_SPILL_KEEP = int(os.environ.get("SHELL_OUTPUT_SPILL_KEEP", "20"))
+# Echo run_shell_command output live while it runs (interactive terminals only)
+SHELL_LIVE_OUTPUT = os.environ.get("SHELL_LIVE_OUTPUT", "1") == "1"
+# Maximum output lines per second echoed during live display (the rest are skipped)
+SHELL_LIVE_OUTPUT_MAX_LINES_PER_SEC = int(
+    os.environ.get("SHELL_LIVE_OUTPUT_MAX_LINES_PER_SEC", "20")
+)
+
+# Run shell commands in one long-lived bash session so cd/export/venv activation persist
+SHELL_PERSISTENT_SESSION = os.environ.get("SHELL_PERSISTENT_SESSION", "0") == "1"
+
+# Seconds the output of a tool's description/system prompt command is reused (per tool: "metadata_cache_ttl")
+TOOL_METADATA_CACHE_TTL = float(os.environ.get("TOOL_METADATA_CACHE_TTL", "300"))
+
+# Default seconds to wait for a JSON-RPC tool response (per tool: "timeout")
+JSONRPC_TIMEOUT = float(os.environ.get("JSONRPC_TIMEOUT", "60"))
+
+# MCP stdio servers
+# Seconds to wait for initialize/tools/list responses
+MCP_REQUEST_TIMEOUT = float(os.environ.get("MCP_REQUEST_TIMEOUT", "30"))
+# Seconds to wait for a tools/call response before giving up on it
+MCP_TOOL_CALL_TIMEOUT = float(os.environ.get("MCP_TOOL_CALL_TIMEOUT", "300"))
+# Seconds startup waits for MCP servers before showing the prompt (the rest keep starting)
+MCP_STARTUP_WAIT = float(os.environ.get("MCP_STARTUP_WAIT", "10"))
+# Cache servers' tool lists in ~/.config/aicoder so startup doesn't wait for them
+MCP_TOOLS_CACHE = os.environ.get("MCP_TOOLS_CACHE", "1") == "1"
+# Spawn MCP servers on first tool call instead of at startup (per server: "lazy")
+MCP_LAZY_START = os.environ.get("MCP_LAZY_START", "0") == "1"
+# Seconds before an unused lazy MCP server is stopped, 0 = never (per server: "idle_timeout")
+MCP_IDLE_TIMEOUT = float(os.environ.get("MCP_IDLE_TIMEOUT", "600"))
+# Seconds between MCP server health checks (process alive + ping)
+MCP_HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_HEALTH_CHECK_INTERVAL", "30"))
+# First delay before restarting a crashed MCP server; doubles on each failure up to the max
+MCP_RESTART_BACKOFF = float(os.environ.get("MCP_RESTART_BACKOFF", "1"))
+MCP_RESTART_BACKOFF_MAX = float(os.environ.get("MCP_RESTART_BACKOFF_MAX", "300"))
+# Lines of each MCP server's stderr kept for /mcp log
+MCP_STDERR_LINES = int(os.environ.get("MCP_STDERR_LINES", "200"))
+
+# Request latency breakdown
+# Finished API requests whose timings are kept for /stats
+REQUEST_TIMING_HISTORY = int(os.environ.get("REQUEST_TIMING_HISTORY", "200"))
+# File each request's timing is appended to as a JSON line (empty to disable)
+REQUEST_TIMING_LOG = os.environ.get("REQUEST_TIMING_LOG", "")
+
+# /profile sampling profiler
+# Stack samples per second taken by /profile start
+PROFILE_SAMPLE_HZ = float(os.environ.get("PROFILE_SAMPLE_HZ", "100"))
+# Directory profiles are written to
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(".aicoder", "profiles"))
+
+# Plugin overhead accounting (/plugins perf)
+# Wrap hot-path functions replaced by plugins with call counters (0 to leave them untouched)
+PLUGIN_PERF = os.environ.get("PLUGIN_PERF", "1") != "0"
+# Time one in every N calls of a patched hot-path function
+PLUGIN_PERF_SAMPLE_EVERY = int(os.environ.get("PLUGIN_PERF_SAMPLE_EVERY", "10"))
+
+# Memory tracking (/mem)
+# In debug mode, warn when a tracked cache or history reaches this many entries (0 disables)
+MEMORY_WARN_ENTRIES = int(os.environ.get("MEMORY_WARN_ENTRIES", "10000"))
+# In debug mode, warn when RSS has grown this many MB since startup (0 disables)
+MEMORY_WARN_RSS_MB = int(os.environ.get("MEMORY_WARN_RSS_MB", "200"))
+# Stack frames tracemalloc records per allocation for /mem snapshot
+MEMORY_TRACE_FRAMES = int(os.environ.get("MEMORY_TRACE_FRAMES", "1"))
+
+# Metrics export (OpenMetrics text or JSON)
+# File rewritten every METRICS_INTERVAL seconds; "{pid}" is replaced by the process id
+# and a .json extension selects JSON
+METRICS_FILE = os.environ.get("METRICS_FILE", "")
+METRICS_INTERVAL = float(os.environ.get("METRICS_INTERVAL", "15"))
+# Serve /metrics and /metrics.json over HTTP on this 127.0.0.1 port (0 disables)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+# Serve /metrics and /metrics.json over HTTP on this Unix socket path
+METRICS_SOCKET = os.environ.get("METRICS_SOCKET", "")
+
+# Structured trace log (one JSONL file of spans per session)
+# Record a trace of spans for every user turn
+TRACE = os.environ.get("TRACE", "0") == "1"
+# Directory trace logs are written to
+TRACE_DIR = os.environ.get("TRACE_DIR", os.path.join(".aicoder", "traces"))
+
+# Headless JSON-lines mode (python -m aicoder.headless): no animations or ESC monitoring
+HEADLESS = os.environ.get("AICODER_HEADLESS", "0") == "1"
+
+# Approval diff previews
+# Unchanged lines shown around each change
+DIFF_PREVIEW_CONTEXT = int(os.environ.get("DIFF_PREVIEW_CONTEXT", "3"))
+# Differing lines the preview diff may search before showing a summary instead
+DIFF_PREVIEW_MAX_CHANGES = int(os.environ.get("DIFF_PREVIEW_MAX_CHANGES", "1000"))
+# Diff lines printed in the approval prompt (0 for no limit)
+DIFF_PREVIEW_MAX_LINES = int(os.environ.get("DIFF_PREVIEW_MAX_LINES", "2000"))
+
 # Compaction summary message configuration
 # Some models fail with role="system" summaries, others work better with it
 # Set to "user" for models that don't support system messages well, "system" otherwise
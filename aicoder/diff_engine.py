@@ -0,0 +1,344 @@
+"""
+Diff generation for approval previews.
+
+difflib.unified_diff over whole files is slow on large or generated files,
+so previews are built here instead:
+
+- replacement_diff() diffs only the lines around known replaced spans, which
+  is what edit_file produces; the rest of the file is never compared.
+- unified_diff() compares whole contents (write_file). Lines are hashed to
+  integers, the common prefix and suffix are trimmed and the remainder is
+  diffed with Myers' O(ND) algorithm, giving up with a summary once more than
+  DIFF_PREVIEW_MAX_CHANGES lines differ.
+
+Both produce standard unified diff text, capped at DIFF_PREVIEW_MAX_LINES.
+"""
+
+from typing import List, Optional, Tuple
+
+from . import config
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into lines on newline only, keeping line endings."""
+    if not text:
+        return []
+    parts = text.split("\n")
+    lines = [part + "\n" for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def _hash_lines(a_lines: List[str], b_lines: List[str]) -> Tuple[List[int], List[int]]:
+    """Map equal lines to equal integers so comparisons are cheap."""
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in a_lines]
+    b = [ids.setdefault(line, len(ids)) for line in b_lines]
+    return a, b
+
+
+def _myers(a: List[int], b: List[int], max_changes: int) -> Optional[List[str]]:
+    """
+    Shortest edit script between a and b as a list of "=", "-" and "+" steps.
+
+    Returns None if more than max_changes lines differ.
+    """
+    n, m = len(a), len(b)
+    limit = min(n + m, max_changes)
+    offset = limit + 1
+    v = [0] * (2 * limit + 3)
+    trace = []
+
+    for d in range(limit + 1):
+        # Only diagonals -d-1..d+1 are read in this round, so keep just those
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace: List[List[int]], n: int, m: int) -> List[str]:
+    """Walk the Myers trace back from (n, m) to recover the edit script."""
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        # trace[d] holds diagonals -d-1..d+1
+        if k == -d or (k != d and v[k - 1 + d + 1] < v[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            steps.append("=")
+            x -= 1
+            y -= 1
+        if d > 0:
+            steps.append("+" if x == prev_x else "-")
+        x, y = prev_x, prev_y
+    steps.reverse()
+    return steps
+
+
+def _opcodes(a_lines: List[str], b_lines: List[str], max_changes: int):
+    """
+    Opcodes (tag, i1, i2, j1, j2) turning a_lines into b_lines, like
+    difflib.SequenceMatcher.get_opcodes(), or None over budget.
+    """
+    a, b = _hash_lines(a_lines, b_lines)
+    n, m = len(a), len(b)
+
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < n - prefix
+        and suffix < m - prefix
+        and a[n - 1 - suffix] == b[m - 1 - suffix]
+    ):
+        suffix += 1
+
+    middle_a = a[prefix : n - suffix]
+    middle_b = b[prefix : m - suffix]
+    if not middle_a or not middle_b:
+        # Pure insertion or deletion: nothing to search
+        steps = ["-"] * len(middle_a) + ["+"] * len(middle_b)
+    else:
+        steps = _myers(middle_a, middle_b, max_changes)
+        if steps is None:
+            return None
+    steps = ["="] * prefix + steps + ["="] * suffix
+
+    opcodes = []
+    i = j = index = 0
+    while index < len(steps):
+        if steps[index] == "=":
+            run_start = index
+            while index < len(steps) and steps[index] == "=":
+                index += 1
+            count = index - run_start
+            opcodes.append(("equal", i, i + count, j, j + count))
+            i += count
+            j += count
+            continue
+
+        i1, j1 = i, j
+        while index < len(steps) and steps[index] != "=":
+            if steps[index] == "-":
+                i += 1
+            else:
+                j += 1
+            index += 1
+        if i > i1 and j > j1:
+            tag = "replace"
+        else:
+            tag = "delete" if i > i1 else "insert"
+        opcodes.append((tag, i1, i, j1, j))
+    return opcodes
+
+
+def _grouped(opcodes, context: int):
+    """Split opcodes into hunks with up to `context` equal lines around changes."""
+    if not opcodes:
+        return []
+    if opcodes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = opcodes[0]
+        opcodes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if opcodes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = opcodes[-1]
+        opcodes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    groups = []
+    group = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff line range, same convention as difflib."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _format_hunks(
+    a_lines, b_lines, groups, a_first: int = 0, b_first: int = 0
+) -> List[str]:
+    """Render opcode groups as unified diff lines, offsetting line numbers."""
+    out = []
+    for group in groups:
+        first, last = group[0], group[-1]
+        old_range = _format_range(a_first + first[1], a_first + last[2])
+        new_range = _format_range(b_first + first[3], b_first + last[4])
+        out.append(f"@@ -{old_range} +{new_range} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in a_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend("-" + line for line in a_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend("+" + line for line in b_lines[j1:j2])
+    # Lines without a trailing newline would run into the next one
+    return [line if line.endswith("\n") else line + "\n" for line in out]
+
+
+def _header(path: str) -> List[str]:
+    return [f"--- {path} (old)\n", f"+++ {path} (new)\n"]
+
+
+def _limit(lines: List[str], max_lines: int) -> str:
+    """Join diff lines, cutting off beyond max_lines."""
+    if max_lines and len(lines) > max_lines:
+        hidden = len(lines) - max_lines
+        lines = lines[:max_lines] + [
+            f"... [{hidden:,} more diff lines not shown - choose 'diff' to view the full change]\n"
+        ]
+    return "".join(lines)
+
+
+def _too_large_summary(old_count: int, new_count: int, path: str) -> str:
+    return (
+        f"[Diff preview skipped for {path}: more than "
+        f"{config.DIFF_PREVIEW_MAX_CHANGES:,} lines differ "
+        f"({old_count:,} lines -> {new_count:,} lines). "
+        f"Choose 'diff' to view the full change.]\n"
+    )
+
+
+def unified_diff(
+    old_content: str, new_content: str, path: str, context: int = None
+) -> str:
+    """
+    Unified diff between two versions of a file.
+
+    Returns an empty string if the contents are equal, and a one-line summary
+    instead of a diff if too many lines differ to compute it quickly.
+    """
+    if old_content == new_content:
+        return ""
+    if context is None:
+        context = config.DIFF_PREVIEW_CONTEXT
+
+    a_lines = _split_lines(old_content)
+    b_lines = _split_lines(new_content)
+    opcodes = _opcodes(a_lines, b_lines, config.DIFF_PREVIEW_MAX_CHANGES)
+    if opcodes is None:
+        return _too_large_summary(len(a_lines), len(b_lines), path)
+
+    hunks = _format_hunks(a_lines, b_lines, _grouped(opcodes, context))
+    if not hunks:
+        return ""
+    return _limit(_header(path) + hunks, config.DIFF_PREVIEW_MAX_LINES)
+
+
+def _line_window(content: str, start: int, end: int, context: int) -> Tuple[int, int]:
+    """Character range covering the lines of [start, end) plus context lines."""
+    window_start = content.rfind("\n", 0, start) + 1
+    # Always include the line the span ends on: replacement text without a
+    # trailing newline joins onto it
+    newline = content.find("\n", end)
+    window_end = len(content) if newline == -1 else newline + 1
+
+    for _ in range(context):
+        if window_start == 0:
+            break
+        window_start = content.rfind("\n", 0, window_start - 1) + 1
+    for _ in range(context):
+        if window_end >= len(content):
+            break
+        newline = content.find("\n", window_end)
+        window_end = len(content) if newline == -1 else newline + 1
+    return window_start, window_end
+
+
+def replacement_diff(
+    content: str,
+    replacements: List[Tuple[int, int, str]],
+    path: str,
+    context: int = None,
+) -> str:
+    """
+    Unified diff for replacing spans of content, without diffing the whole file.
+
+    Args:
+        content: Current file content
+        replacements: Sorted, non-overlapping (start, end, new_text) spans
+        path: File path shown in the diff header
+    """
+    if context is None:
+        context = config.DIFF_PREVIEW_CONTEXT
+
+    # Merge spans whose context windows touch into one window
+    windows = []
+    for start, end, new_text in replacements:
+        window_start, window_end = _line_window(content, start, end, context)
+        if windows and window_start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], window_end)
+            windows[-1][2].append((start, end, new_text))
+        else:
+            windows.append([window_start, window_end, [(start, end, new_text)]])
+
+    out = []
+    line_number = 0
+    position = 0
+    delta = 0
+    for window_start, window_end, spans in windows:
+        line_number += content.count("\n", position, window_start)
+        position = window_start
+
+        old_window = content[window_start:window_end]
+        parts = []
+        cursor = window_start
+        for start, end, new_text in spans:
+            parts.append(content[cursor:start])
+            parts.append(new_text)
+            cursor = end
+        parts.append(content[cursor:window_end])
+        new_window = "".join(parts)
+
+        a_lines = _split_lines(old_window)
+        b_lines = _split_lines(new_window)
+        opcodes = _opcodes(a_lines, b_lines, config.DIFF_PREVIEW_MAX_CHANGES)
+        if opcodes is None:
+            return _too_large_summary(len(a_lines), len(b_lines), path)
+        out.extend(
+            _format_hunks(
+                a_lines,
+                b_lines,
+                _grouped(opcodes, context),
+                line_number,
+                line_number + delta,
+            )
+        )
+        delta += len(b_lines) - len(a_lines)
+
+    if not out:
+        return ""
+    return _limit(_header(path) + out, config.DIFF_PREVIEW_MAX_LINES)
@@ -0,0 +1,377 @@
+"""
+Headless JSON-lines protocol mode for editors and orchestrators.
+
+One long-lived process serves one session of one workspace, exchanging
+JSON objects, one per line, over stdin/stdout or a Unix socket:
+
+    python -m aicoder.headless                       # stdio
+    python -m aicoder.headless --socket /tmp/ws.sock # Unix socket
+
+Client -> aicoder:
+
+    {"type": "user_message", "id": "t1", "content": "Fix the failing test"}
+    {"type": "approval", "id": 3, "decision": "allow"}   # allow|session|deny|cancel|yolo
+    {"type": "shutdown"}
+
+aicoder -> client:
+
+    {"type": "ready", "pid": 123, "cwd": "...", "model": "..."}
+    {"type": "content_delta", "text": "..."}
+    {"type": "assistant_message", "content": "...", "tool_calls": [...]}
+    {"type": "tool_call", "id": "call_1", "name": "read_file", "arguments": "{...}"}
+    {"type": "approval_request", "id": 3, "tool": "write_file", "arguments": {...}, "prompt": "..."}
+    {"type": "tool_result", "id": "call_1", "name": "read_file", "content": "..."}
+    {"type": "usage", "prompt_tokens": 812, "completion_tokens": 40, "session": {...}}
+    {"type": "turn_end", "id": "t1", "status": "ok", "response": "..."}
+    {"type": "error", "message": "..."}
+
+Every user_message ends with a turn_end, commands ("/compact", "/stats")
+included. When an API request fails or is cancelled an error event is sent
+and the turn ends with "status": "error" and the same "error" message. The session is the normal AICoder loop fed from the protocol:
+there are no animations, no ESC monitoring and no readline. Anything the
+app prints goes to stderr (or --log), so stdout carries only the protocol.
+Over a socket, one client is served at a time and the session outlives
+disconnects; it ends on "shutdown" or, for stdio, at end of input.
+"""
+
+import itertools
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, TextIO
+
+# Answers understood by ApprovalSystem for each protocol decision
+DECISIONS = {
+    "allow": "a",
+    "session": "s",
+    "deny": "d",
+    "cancel": "c",
+    "yolo": "yolo",
+}
+
+_SHUTDOWN = {"type": "shutdown"}
+
+
+class StdioChannel:
+    """Protocol messages on a pair of text streams."""
+
+    def __init__(self, reader: TextIO, writer: TextIO):
+        self.reader = reader
+        self.writer = writer
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._read, name="aicoder-headless-reader", daemon=True).start()
+        return self
+
+    def _read(self):
+        for line in self.reader:
+            _parse_into(line, self.messages, self)
+        self.messages.put(_SHUTDOWN)
+
+    def send(self, event: Dict[str, Any]):
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            try:
+                self.writer.write(line)
+                self.writer.flush()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        pass
+
+
+class SocketChannel:
+    """Protocol messages on a Unix socket, one client connection at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._conn: Optional[socket.socket] = None
+        self.on_connect = None  # Called after a client connects
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen(1)
+
+    def start(self):
+        threading.Thread(target=self._serve, name="aicoder-headless-socket", daemon=True).start()
+        return self
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # Closed
+            with self._lock:
+                self._conn = conn
+            if self.on_connect:
+                self.on_connect()
+            with conn.makefile("r", encoding="utf-8") as reader:
+                try:
+                    for line in reader:
+                        _parse_into(line, self.messages, self)
+                except OSError:
+                    pass
+            with self._lock:
+                self._conn = None
+            conn.close()
+
+    def send(self, event: Dict[str, Any]):
+        data = (json.dumps(event, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._conn is None:
+                return  # Nobody is listening; events are not kept
+            try:
+                self._conn.sendall(data)
+            except OSError:
+                pass
+
+    def close(self):
+        self._server.close()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _parse_into(line: str, messages: "queue.Queue", channel):
+    line = line.strip()
+    if not line:
+        return
+    try:
+        message = json.loads(line)
+    except json.JSONDecodeError as e:
+        channel.send({"type": "error", "message": f"invalid JSON: {e}"})
+        return
+    if not isinstance(message, dict) or "type" not in message:
+        channel.send({"type": "error", "message": "messages must be objects with a type"})
+        return
+    messages.put(message)
+
+
+class HeadlessSession:
+    """Drives AICoder.run() from protocol messages and reports its events."""
+
+    def __init__(self, app, channel):
+        self.app = app
+        self.channel = channel
+        self._deferred = deque()
+        self._approval_ids = itertools.count(1)
+        self._turn_id = None
+        self._in_turn = False
+        self._turn_error = None
+
+        app._get_multiline_input = self._next_user_input
+        app.on_content_delta = self._content_delta
+        self._make_api_request = app._make_api_request
+        app._make_api_request = self._api_request
+        self._execute_tool_calls = app._execute_tool_calls
+        app._execute_tool_calls = self._tool_calls
+
+    def send(self, event_type: str, **fields):
+        self.channel.send({"type": event_type, **fields})
+
+    def send_ready(self):
+        from . import config
+
+        self.send("ready", pid=os.getpid(), cwd=os.getcwd(), model=config.get_api_model())
+
+    # -- input ----------------------------------------------------------------
+
+    def _next_message(self) -> Dict[str, Any]:
+        if self._deferred:
+            return self._deferred.popleft()
+        return self.channel.messages.get()
+
+    def _last_response(self) -> Optional[str]:
+        for message in reversed(self.app.message_history.messages):
+            if message.get("role") == "user":
+                return None
+            if message.get("role") == "assistant" and message.get("content"):
+                return message["content"]
+        return None
+
+    def _next_user_input(self) -> str:
+        """Stands in for the interactive prompt; ends the previous turn."""
+        if self._in_turn:
+            self._in_turn = False
+            if self._turn_error:
+                self.send(
+                    "turn_end",
+                    id=self._turn_id,
+                    status="error",
+                    error=self._turn_error,
+                    response=self._last_response(),
+                )
+            else:
+                self.send("turn_end", id=self._turn_id, status="ok", response=self._last_response())
+        while True:
+            message = self._next_message()
+            message_type = message.get("type")
+            if message_type == "shutdown":
+                raise EOFError
+            if message_type == "user_message":
+                content = message.get("content")
+                if not isinstance(content, str) or not content.strip():
+                    self.send("error", message="user_message needs a non-empty content")
+                    continue
+                self._turn_id = message.get("id")
+                self._in_turn = True
+                self._turn_error = None
+                return content
+            if message_type == "approval":
+                self.send("error", message="no approval is pending")
+            else:
+                self.send("error", message=f"unknown message type: {message_type}")
+
+    def ask_approval(self, tool_name: str, arguments: Dict[str, Any], prompt: str) -> str:
+        """ApprovalSystem.answer_source: ask the client and wait for its decision."""
+        request_id = next(self._approval_ids)
+        self.send("approval_request", id=request_id, tool=tool_name, arguments=arguments, prompt=prompt)
+        while True:
+            message = self.channel.messages.get()
+            message_type = message.get("type")
+            if message_type == "shutdown":
+                # Let the input loop see it once the tool calls are cancelled
+                self._deferred.append(message)
+                return DECISIONS["cancel"]
+            if message_type == "approval" and message.get("id") == request_id:
+                decision = DECISIONS.get(str(message.get("decision", "")).lower())
+                if decision is None:
+                    self.send("error", message=f"decision must be one of {', '.join(DECISIONS)}")
+                    continue
+                return decision
+            if message_type == "user_message":
+                self._deferred.append(message)
+            else:
+                self.send("error", message=f"waiting for approval {request_id}")
+
+    # -- events ---------------------------------------------------------------
+
+    def _content_delta(self, text: str):
+        self.send("content_delta", text=text)
+
+    def _api_request(self, messages, *args, **kwargs):
+        response = self._make_api_request(messages, *args, **kwargs)
+        internal = any(args) or any(kwargs.values())  # Summaries and decisions
+        if not internal:
+            if response and response.get("choices"):
+                self._turn_error = None
+            else:
+                # The app only prints this; it then waits for the next message
+                self._turn_error = self.app.stats.last_request_error() or "API request failed"
+                self.send("error", message=self._turn_error)
+        if response and response.get("choices") and not internal:
+            message = response["choices"][0].get("message") or {}
+            self.send(
+                "assistant_message",
+                content=message.get("content"),
+                tool_calls=message.get("tool_calls") or [],
+            )
+        if response and not internal:
+            stats = self.app.stats
+            usage = response.get("usage") or {}
+            self.send(
+                "usage",
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                session={
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "api_requests": stats.api_requests,
+                    "context_tokens": stats.current_prompt_size,
+                },
+            )
+        return response
+
+    def _tool_calls(self, message):
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function") or {}
+            self.send(
+                "tool_call",
+                id=tool_call.get("id"),
+                name=function.get("name"),
+                arguments=function.get("arguments"),
+            )
+        result = self._execute_tool_calls(message)
+        tool_results = result[0] if result else []
+        for tool_result in tool_results or []:
+            self.send(
+                "tool_result",
+                id=tool_result.get("tool_call_id"),
+                name=tool_result.get("name"),
+                content=tool_result.get("content"),
+            )
+        return result
+
+
+def serve(channel, log: Optional[TextIO] = None):
+    """Run one headless session on channel until shutdown."""
+    from .tool_manager.approval_system import ApprovalSystem
+
+    # Whatever the app prints stays off the protocol stream
+    sys.stdout = log or sys.stderr
+    from .app import AICoder
+
+    app = AICoder()
+    session = HeadlessSession(app, channel)
+    ApprovalSystem.answer_source = session.ask_approval
+    if isinstance(channel, SocketChannel):
+        channel.on_connect = session.send_ready
+    channel.start()
+    session.send_ready()
+    try:
+        app.run()
+    finally:
+        ApprovalSystem.answer_source = None
+        session.send("bye")
+        channel.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run AI Coder as a JSON-lines protocol server")
+    parser.add_argument("--socket", help="Serve on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--log", help="Write the app's own output here instead of stderr")
+    args = parser.parse_args(argv)
+
+    # Before the app is imported: no animator threads, ESC monitor or terminal modes
+    os.environ["AICODER_HEADLESS"] = "1"
+    from . import config
+
+    config.HEADLESS = True
+
+    log = open(args.log, "a", encoding="utf-8", buffering=1) if args.log else None
+    if args.socket:
+        channel = SocketChannel(args.socket)
+    else:
+        # Keep the real stdin/stdout for the protocol; fd 0 now reads /dev/null
+        # and fd 1 goes to stderr, so child processes can neither consume
+        # client messages nor corrupt the output
+        protocol_in = os.fdopen(os.dup(sys.stdin.fileno()), "r", encoding="utf-8")
+        protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, sys.stdin.fileno())
+        os.close(devnull)
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        channel = StdioChannel(protocol_in, protocol_out)
+    serve(channel, log)
+
+
+if __name__ == "__main__":
+    main()
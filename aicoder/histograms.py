@@ -0,0 +1,66 @@
+"""
+Histograms and per-endpoint counters that Stats records for metrics export.
+
+Kept apart from metrics_export so that recording them does not import the
+HTTP server modules at startup; metrics_export renders and serves them.
+"""
+
+from bisect import bisect_left
+from typing import List, Sequence, Tuple
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Upper bounds (seconds) of the tool duration histogram buckets
+TOOL_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120)
+
+
+class Histogram:
+    """Cumulative histogram with Prometheus "le" (less or equal) buckets."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count of observations <= le) including "+Inf"."""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            result.append((bound if bound == "+Inf" else format_value(bound), running))
+        return result
+
+
+class EndpointMetrics:
+    """Outcomes and latency of the requests sent to one model and endpoint."""
+
+    def __init__(self):
+        self.success = 0
+        self.errors = 0
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.ttft = Histogram(LATENCY_BUCKETS)
+
+    def observe(self, timing):
+        """Count a finished RequestTiming; latencies come from successful ones."""
+        if not timing.success:
+            self.errors += 1
+            return
+        self.success += 1
+        if timing.total is not None:
+            self.duration.observe(timing.total)
+        if timing.ttft is not None:
+            self.ttft.observe(timing.ttft)
+
+
+def format_value(value: float) -> str:
+    """A number as OpenMetrics text; whole floats lose their ".0"."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
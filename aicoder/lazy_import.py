@@ -0,0 +1,43 @@
+"""
+Deferred imports for rarely used subsystems.
+
+lazy_import() returns a module object whose code only runs the first time
+one of its attributes is used, so importing a module that references a
+heavy subsystem (diff rendering, image handling, compaction, ...) no longer
+pays for it at startup.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Optional
+
+
+def lazy_import(name: str, package: Optional[str] = None) -> ModuleType:
+    """Import a module on first attribute access.
+
+    Args:
+        name: Module name; may be relative (".diff_engine") when package is given.
+        package: Package to resolve a relative name against, usually __package__.
+
+    Returns:
+        The module if it is already imported, else a lazily loading module.
+    """
+    fullname = importlib.util.resolve_name(name, package) if name.startswith(".") else name
+    module = sys.modules.get(fullname)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(fullname)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named {fullname!r}", name=fullname)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[fullname] = module
+    loader.exec_module(module)
+    parent, _, child = fullname.rpartition(".")
+    if parent and parent in sys.modules:
+        setattr(sys.modules[parent], child, module)
+    return module
+
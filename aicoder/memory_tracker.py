@@ -0,0 +1,162 @@
+"""
+Memory instrumentation: RSS sampling, sizes of the long-lived caches and
+histories, and tracemalloc snapshots for /mem.
+
+Structures are registered by name with a getter so the tracker never keeps
+them alive or imports their modules itself; the built-in ones are looked
+up only in modules that are already loaded. In debug mode check_growth()
+warns when a structure reaches config.MEMORY_WARN_ENTRIES entries (and again
+each time it doubles) or when RSS has grown by config.MEMORY_WARN_RSS_MB
+since startup, which is what a slow leak in a long session looks like.
+"""
+
+import os
+import resource
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import config
+from .utils import wmsg
+
+# (module, attribute) of module-level caches that live for the whole session
+MODULE_STRUCTURES: List[Tuple[str, str]] = [
+    ("aicoder.utils", "_messages_token_est_cache"),
+    ("aicoder.utils", "_tools_definitions_token_est_cache"),
+    ("aicoder.utils", "_tool_availability_cache"),
+    ("aicoder.utils", "_background_cache"),
+    ("aicoder.api_client", "_messages_token_est_cache"),
+    ("aicoder.api_client", "_tools_definitions_token_est_cache"),
+    ("aicoder.tool_manager.file_tracker", "file_read_times"),
+    ("aicoder.tool_manager.metadata_commands", "_cache"),
+]
+
+
+def rss_kb() -> int:
+    """Current resident set size in KiB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, KiB elsewhere
+        return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+class MemoryTracker:
+    """Registered structures, growth warnings and tracemalloc snapshots."""
+
+    def __init__(self):
+        self.start_rss_kb = rss_kb()
+        self._getters: Dict[str, Callable[[], Any]] = {}
+        self._warned_entries: Dict[str, int] = {}
+        self._warned_rss_kb = 0
+        self._snapshot = None
+
+    def register(self, name: str, getter: Callable[[], Any]):
+        """Track len(getter()) under name; the getter may return None."""
+        self._getters[name] = getter
+
+    def register_app(self, app):
+        """Register the per-session structures of an AICoder instance."""
+        self.register("message_history.messages", lambda: app.message_history.messages)
+        self.register("stats.usage_infos", lambda: app.stats.usage_infos)
+        self.register("stats.request_timings", lambda: app.stats.request_timings)
+
+    def _structures(self) -> Dict[str, Any]:
+        structures = {}
+        for module_name, attr in MODULE_STRUCTURES:
+            module = sys.modules.get(module_name)
+            if module is not None and hasattr(module, attr):
+                short_name = module_name[len("aicoder."):] if module_name.startswith("aicoder.") else module_name
+                structures[f"{short_name}.{attr}"] = getattr(module, attr)
+        for name, getter in self._getters.items():
+            try:
+                structures[name] = getter()
+            except Exception:
+                continue
+        return structures
+
+    def structure_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """name -> (entries, shallow container size in bytes)."""
+        sizes = {}
+        for name, value in self._structures().items():
+            try:
+                sizes[name] = (len(value), sys.getsizeof(value))
+            except TypeError:
+                continue
+        return sizes
+
+    def check_growth(self, current_rss_kb: Optional[int] = None) -> List[str]:
+        """Warnings for structures or RSS past their thresholds (debug mode only)."""
+        if not config.DEBUG:
+            return []
+        warnings = []
+        threshold = config.MEMORY_WARN_ENTRIES
+        if threshold > 0:
+            for name, (entries, _) in self.structure_sizes().items():
+                limit = max(threshold, self._warned_entries.get(name, 0) * 2)
+                if entries >= limit:
+                    self._warned_entries[name] = entries
+                    warnings.append(f"{name} has grown to {entries:,} entries")
+        rss_limit_kb = config.MEMORY_WARN_RSS_MB * 1024
+        if rss_limit_kb > 0:
+            current = rss_kb() if current_rss_kb is None else current_rss_kb
+            growth = current - self.start_rss_kb
+            if growth >= max(rss_limit_kb, self._warned_rss_kb * 2):
+                self._warned_rss_kb = growth
+                warnings.append(f"RSS has grown by {growth / 1024:.0f} MB since startup")
+        for warning in warnings:
+            wmsg(f"*** Memory: {warning}")
+        return warnings
+
+    # -- tracemalloc ----------------------------------------------------------
+
+    @property
+    def tracing(self) -> bool:
+        import tracemalloc
+
+        return tracemalloc.is_tracing()
+
+    def take_snapshot(self):
+        """Start tracemalloc if needed and keep a snapshot to diff against."""
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.MEMORY_TRACE_FRAMES)
+        self._snapshot = tracemalloc.take_snapshot()
+        return self._snapshot
+
+    def diff(self, limit: int = 15) -> Optional[List[str]]:
+        """Top allocation changes since the last snapshot, or None without one."""
+        import tracemalloc
+
+        if self._snapshot is None or not tracemalloc.is_tracing():
+            return None
+        current = tracemalloc.take_snapshot()
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+        stats = current.filter_traces(filters).compare_to(
+            self._snapshot.filter_traces(filters), "lineno"
+        )
+        self._snapshot = current
+        return [str(stat) for stat in stats[:limit]]
+
+    def stop_tracing(self):
+        import tracemalloc
+
+        self._snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+_tracker: Optional[MemoryTracker] = None
+
+
+def get_memory_tracker() -> MemoryTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = MemoryTracker()
+    return _tracker
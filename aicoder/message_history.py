@@ -9,6 +9,7 @@ from typing import List, Dict, Any
 from .stats import Stats
 from . import config
 from .utils import emsg, wmsg, imsg
+from .tracing import get_tracer, traced
 
 # Global constants for message compaction to ensure single source of truth
 SUMMARY_MESSAGE_PREFIX = "Summary of earlier conversation:"
@@ -356,6 +357,7 @@ class MessageHistory:
         # Clear compaction flag since we added new messages
         self._compaction_performed = False
 
+    @traced("compaction")
     def compact_memory(self) -> List[Dict[str, Any]]:
         """Compact memory by pruning old tool results first, then summarizing if needed."""
         # Find the first non-system message to determine where chat messages start
@@ -902,7 +904,7 @@ Provide a detailed but concise summary of our conversation above. Focus on infor
         if self.autosave_filename:
             try:
                 # For now, save the entire JSON. In future, we could implement SSE format
-                with open(self.autosave_filename, "w") as f:
+                with get_tracer().span("autosave"), open(self.autosave_filename, "w") as f:
                     json.dump(self.messages, f, indent=4)
                 if config.DEBUG:
                     print(
@@ -981,6 +983,7 @@ Provide a detailed but concise summary of our conversation above. Focus on infor
         """Get the number of conversation rounds."""
         return len(self.identify_conversation_rounds())
 
+    @traced("compaction")
     def compact_messages(self, num_messages: int) -> List[Dict[str, Any]]:
         """
         Compact the specified number of oldest individual messages.
@@ -1134,6 +1137,7 @@ Provide a detailed but concise summary of our conversation above. Focus on infor
 
         return messages_to_compact
 
+    @traced("compaction")
     def compact_rounds(self, num_rounds: int = 1) -> List[Dict[str, Any]]:
         """
         Compact the specified number of oldest conversation rounds.
@@ -1232,6 +1236,12 @@ Please provide a concise summary of the following conversation messages, preserv
     def _load_aicoder_md(self) -> str:
         """Load AICODER.md content from various possible locations."""
         import sys
+        from .startup_snapshot import get_file as get_snapshot_file
+
+        # Snapshot embedded in the zipapp
+        content = get_snapshot_file("AICODER.md")
+        if content:
+            return content
 
         # List of possible locations for AICODER.md
         possible_paths = []
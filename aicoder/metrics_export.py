@@ -0,0 +1,329 @@
+"""
+Metrics export in OpenMetrics text and JSON.
+
+collect_metrics() turns the session Stats into metric families: API
+requests, errors and retries, tokens, request latency histograms labelled
+by model and endpoint, tool calls and durations by tool name, compactions
+and the hit counts of the token estimation caches. A MetricsExporter
+publishes them for an external collector:
+
+- METRICS_FILE is rewritten atomically every METRICS_INTERVAL seconds and
+  on exit ("{pid}" in the path keeps instances of a fleet apart)
+- METRICS_PORT serves them over HTTP on 127.0.0.1
+- METRICS_SOCKET serves them over HTTP on a Unix socket
+
+Over HTTP, GET /metrics returns OpenMetrics text and GET /metrics.json
+the JSON form.
+"""
+
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .histograms import EndpointMetrics, Histogram, format_value
+from .utils import wmsg
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class MetricFamily:
+    """A metric name, its type and help text, and its samples."""
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels):
+        self.samples.append((self.name + suffix, labels, value))
+        return self
+
+    def add_histogram(self, histogram: Histogram, **labels):
+        for le, count in histogram.cumulative():
+            self.add(count, "_bucket", **labels, le=le)
+        self.add(histogram.sum, "_sum", **labels)
+        self.add(histogram.count, "_count", **labels)
+        return self
+
+
+def _counter(name: str, help_text: str, value: Optional[float] = None) -> MetricFamily:
+    family = MetricFamily(name, "counter", help_text)
+    if value is not None:
+        family.add(value, "_total")
+    return family
+
+
+def collect_metrics(stats) -> List[MetricFamily]:
+    """Metric families for the current state of stats."""
+    from .memory_tracker import rss_kb
+    from .utils import cache_counters
+
+    families = [
+        _counter("aicoder_api_requests", "API requests sent, including retries.", stats.api_requests),
+        _counter("aicoder_api_errors", "API requests that failed.", stats.api_errors),
+        _counter("aicoder_api_retries", "API requests retried after an error.", stats.api_retries),
+    ]
+    families.append(
+        _counter("aicoder_tokens", "Tokens reported by the API.")
+        .add(stats.prompt_tokens, "_total", type="prompt")
+        .add(stats.completion_tokens, "_total", type="completion")
+    )
+
+    outcomes = _counter("aicoder_model_requests", "Finished API requests by model, endpoint and result.")
+    duration = MetricFamily(
+        "aicoder_request_duration_seconds", "histogram", "Duration of successful API requests."
+    )
+    ttft = MetricFamily(
+        "aicoder_time_to_first_token_seconds", "histogram", "Time from request start to the first token."
+    )
+    with stats.metrics_lock:
+        for (model, endpoint), endpoint_metrics in sorted(stats.endpoint_metrics.items()):
+            labels = {"model": model, "endpoint": endpoint}
+            outcomes.add(endpoint_metrics.success, "_total", **labels, result="success")
+            outcomes.add(endpoint_metrics.errors, "_total", **labels, result="error")
+            duration.add_histogram(endpoint_metrics.duration, **labels)
+            ttft.add_histogram(endpoint_metrics.ttft, **labels)
+    families.extend([outcomes, duration, ttft])
+
+    tool_calls = _counter("aicoder_tool_calls", "Tool calls by tool name.")
+    tool_duration = MetricFamily(
+        "aicoder_tool_duration_seconds", "histogram", "Tool execution time by tool name."
+    )
+    with stats.metrics_lock:
+        for tool_name, histogram in sorted(stats.tool_histograms.items()):
+            tool_calls.add(histogram.count, "_total", tool=tool_name)
+            tool_duration.add_histogram(histogram, tool=tool_name)
+    families.extend([
+        tool_calls,
+        tool_duration,
+        _counter("aicoder_tool_errors", "Tool calls that failed.", stats.tool_errors),
+        _counter("aicoder_compactions", "Conversation compactions.", stats.compactions),
+    ])
+
+    lookups = _counter("aicoder_cache_lookups", "Lookups of the token estimation caches.")
+    hit_ratio = MetricFamily("aicoder_cache_hit_ratio", "gauge", "Share of cache lookups that hit.")
+    for cache_name, (hits, misses) in sorted(dict(cache_counters).items()):
+        lookups.add(hits, "_total", cache=cache_name, result="hit")
+        lookups.add(misses, "_total", cache=cache_name, result="miss")
+        if hits + misses:
+            hit_ratio.add(hits / (hits + misses), cache=cache_name)
+    families.extend([lookups, hit_ratio])
+
+    families.append(
+        MetricFamily("aicoder_context_tokens", "gauge", "Current conversation size in tokens.")
+        .add(stats.current_prompt_size)
+    )
+    families.append(
+        MetricFamily("aicoder_resident_memory_bytes", "gauge", "Process resident set size.")
+        .add(rss_kb() * 1024)
+    )
+    families.append(
+        MetricFamily("aicoder_uptime_seconds", "gauge", "Seconds since the session started.")
+        .add(round(time.time() - stats.session_start_time, 3))
+    )
+    return families
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_openmetrics(families: List[MetricFamily]) -> str:
+    """OpenMetrics text exposition, terminated by "# EOF"."""
+    lines = []
+    for family in families:
+        lines.append(f"# TYPE {family.name} {family.type}")
+        lines.append(f"# HELP {family.name} {family.help}")
+        for name, labels, value in family.samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {format_value(value)}")
+            else:
+                lines.append(f"{name} {format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def render_json(families: List[MetricFamily]) -> str:
+    """The same metrics as a JSON document keyed by family name."""
+    document: Dict[str, Any] = {"time": time.time(), "pid": os.getpid(), "metrics": {}}
+    for family in families:
+        document["metrics"][family.name] = {
+            "type": family.type,
+            "help": family.help,
+            "samples": [
+                {"name": name, "labels": labels, "value": value}
+                for name, labels, value in family.samples
+            ],
+        }
+    return json.dumps(document, indent=2)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics (OpenMetrics) and /metrics.json for MetricsExporter."""
+
+    exporter: "MetricsExporter" = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/metrics"):
+            body = self.exporter.render("openmetrics")
+            content_type = OPENMETRICS_CONTENT_TYPE
+        elif path == "/metrics.json":
+            body = self.exporter.render("json")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """Publishes collect_metrics(stats) to a file, an HTTP port and/or a Unix socket."""
+
+    def __init__(
+        self,
+        stats,
+        file_path: str = "",
+        interval: float = 15.0,
+        port: int = 0,
+        socket_path: str = "",
+    ):
+        self.stats = stats
+        self.file_path = file_path.replace("{pid}", str(os.getpid())) if file_path else ""
+        self.interval = max(0.1, interval)
+        self.port = port
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._servers = []
+
+    def render(self, fmt: str = "openmetrics") -> str:
+        with self._lock:
+            families = collect_metrics(self.stats)
+        return render_json(families) if fmt == "json" else render_openmetrics(families)
+
+    def write_file(self):
+        """Atomically replace file_path with the current metrics."""
+        if not self.file_path:
+            return
+        fmt = "json" if self.file_path.endswith(".json") else "openmetrics"
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render(fmt))
+        os.replace(tmp_path, self.file_path)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write_file()
+            except Exception as e:
+                # Keep the writer alive; the next interval tries again
+                wmsg(f"*** Metrics: could not write {self.file_path}: {e}")
+
+    def _serve(self, server):
+        self._servers.append(server)
+        thread = threading.Thread(target=server.serve_forever, name="aicoder-metrics", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def start(self):
+        """Start the file writer and servers that are configured."""
+        if self.file_path:
+            thread = threading.Thread(target=self._write_loop, name="aicoder-metrics-file", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        handler = type("MetricsHandler", (_MetricsHandler,), {"exporter": self})
+        if self.port:
+            try:
+                self._serve(_ThreadingHTTPServer(("127.0.0.1", self.port), handler))
+            except OSError as e:
+                wmsg(f"*** Metrics: could not listen on port {self.port}: {e}")
+        if self.socket_path:
+            try:
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+                self._serve(_ThreadingUnixHTTPServer(self.socket_path, handler))
+            except OSError as e:
+                wmsg(f"*** Metrics: could not listen on {self.socket_path}: {e}")
+        return self
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """(host, port) of the HTTP server, useful when port 0 picked one."""
+        for server in self._servers:
+            if isinstance(server.server_address, tuple):
+                return server.server_address
+        return None
+
+    def stop(self):
+        """Stop serving and write the file one last time."""
+        self._stop.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        if self.socket_path and os.path.exists(self.socket_path):
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        try:
+            self.write_file()
+        except OSError as e:
+            wmsg(f"*** Metrics: could not write {self.file_path}: {e}")
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+def start_metrics_export(stats) -> Optional[MetricsExporter]:
+    """Start exporting per the METRICS_* settings; None when none is set."""
+    global _exporter
+    if _exporter is None and (config.METRICS_FILE or config.METRICS_PORT or config.METRICS_SOCKET):
+        _exporter = MetricsExporter(
+            stats,
+            file_path=config.METRICS_FILE,
+            interval=config.METRICS_INTERVAL,
+            port=config.METRICS_PORT,
+            socket_path=config.METRICS_SOCKET,
+        ).start()
+    return _exporter
+
+
+def stop_metrics_export():
+    """Write the final metrics and stop serving."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
@@ -127,6 +127,15 @@ class PlanningMode:
 
     def get_active_tools(self, all_tools: list) -> list:
         """Get list of active tools for API requests based on current mode."""
+        from .tool_manager.tool_definitions import ToolDefinitions
+
+        if isinstance(all_tools, ToolDefinitions):
+            # Definitions are rebuilt when tools change; reuse the filtered list
+            key = ("active_tools", self._plan_mode_active, tuple(self.get_writing_tools()))
+            return all_tools.memo(key, lambda: self._active_tools(list(all_tools)))
+        return self._active_tools(all_tools)
+
+    def _active_tools(self, all_tools: list) -> list:
         if not self._plan_mode_active:
             # When not in plan mode, all tools are active
             return [
@@ -11,6 +11,9 @@ import importlib.util
 from pathlib import Path
 import re
 
+from .perf import get_plugin_perf
+from ..tracing import get_tracer
+
 
 def load_plugins(plugin_dir=None):
     """Load and execute all Python files in the plugins directory.
@@ -64,12 +67,16 @@ def load_plugins(plugin_dir=None):
     if plugin_files:
         print(f"*** Loading plugins: {', '.join([Path(f).stem for f in plugin_files])}")
 
+    perf = get_plugin_perf()
+    perf.snapshot()
+
     # Execute each Python file
     for filename in plugin_files:
         plugin_path = os.path.join(plugin_dir, filename)
+        plugin_name = Path(filename).stem
         try:
             spec = importlib.util.spec_from_file_location(
-                f"plugin_{Path(filename).stem}", plugin_path
+                f"plugin_{plugin_name}", plugin_path
             )
             module = importlib.util.module_from_spec(spec)
 
@@ -78,12 +85,15 @@ def load_plugins(plugin_dir=None):
 
             module.aicoder = aicoder
 
-            spec.loader.exec_module(module)
-            loaded_plugins.append((Path(filename).stem, module))
+            with perf.time_load(plugin_name):
+                spec.loader.exec_module(module)
+            loaded_plugins.append((plugin_name, module))
             print(f"    - Loaded {filename}")
 
         except Exception as e:
             print(f"    - Warning: Failed to load plugin {filename}: {e}")
+        finally:
+            perf.detect_patches(plugin_name)
 
     if loaded_plugins:
         print(f"*** Plugin loading complete ({len(loaded_plugins)} plugins loaded)")
@@ -92,22 +102,46 @@ def load_plugins(plugin_dir=None):
     return loaded_plugins
 
 
+def _dispatch_hook(loaded_plugins, hook_name, *args):
+    """Call hook_name on every plugin that defines it, timing each call."""
+    perf = get_plugin_perf()
+    tracer = get_tracer()
+    for plugin_name, module in loaded_plugins:
+        hook = getattr(module, hook_name, None)
+        if hook is None:
+            continue
+        try:
+            with perf.time_hook(plugin_name, hook_name), tracer.span(
+                "plugin_hook", plugin=plugin_name, hook=hook_name
+            ):
+                hook(*args)
+        except Exception as e:
+            print(f"    - Warning: Plugin {plugin_name} failed in {hook_name}: {e}")
+
+
 def notify_plugins_of_aicoder_init(loaded_plugins, aicoder_instance):
     """Notify plugins that have the on_aicoder_init hook that AICoder is initialized.
 
+    Hot paths a plugin patches from its on_aicoder_init are detected here.
+
     Args:
         loaded_plugins (list): List of (name, module) tuples from load_plugins()
         aicoder_instance: The initialized AICoder instance
     """
+    perf = get_plugin_perf()
+    perf.snapshot(aicoder_instance)
     for plugin_name, module in loaded_plugins:
         # Check if the module has an on_aicoder_init function
         if hasattr(module, "on_aicoder_init"):
             try:
-                module.on_aicoder_init(aicoder_instance)
+                with perf.time_hook(plugin_name, "on_aicoder_init"):
+                    module.on_aicoder_init(aicoder_instance)
             except Exception as e:
                 print(
                     f"    - Warning: Plugin {plugin_name} failed in on_aicoder_init: {e}"
                 )
+            finally:
+                perf.detect_patches(plugin_name, aicoder_instance)
 
 
 def notify_plugins_before_user_prompt(loaded_plugins):
@@ -116,15 +150,7 @@ def notify_plugins_before_user_prompt(loaded_plugins):
     Args:
         loaded_plugins (list): List of (name, module) tuples from load_plugins()
     """
-    for plugin_name, module in loaded_plugins:
-        # Check if the module has an on_before_user_prompt function
-        if hasattr(module, "on_before_user_prompt"):
-            try:
-                module.on_before_user_prompt()
-            except Exception as e:
-                print(
-                    f"    - Warning: Plugin {plugin_name} failed in on_before_user_prompt: {e}"
-                )
+    _dispatch_hook(loaded_plugins, "on_before_user_prompt")
 
 
 def notify_plugins_before_ai_prompt(loaded_plugins):
@@ -133,15 +159,7 @@ def notify_plugins_before_ai_prompt(loaded_plugins):
     Args:
         loaded_plugins (list): List of (name, module) tuples from load_plugins()
     """
-    for plugin_name, module in loaded_plugins:
-        # Check if the module has an on_before_ai_prompt function
-        if hasattr(module, "on_before_ai_prompt"):
-            try:
-                module.on_before_ai_prompt()
-            except Exception as e:
-                print(
-                    f"    - Warning: Plugin {plugin_name} failed in on_before_ai_prompt: {e}"
-                )
+    _dispatch_hook(loaded_plugins, "on_before_ai_prompt")
 
 
 def notify_plugins_before_approval_prompt(loaded_plugins):
@@ -150,12 +168,4 @@ def notify_plugins_before_approval_prompt(loaded_plugins):
     Args:
         loaded_plugins (list): List of (name, module) tuples from load_plugins()
     """
-    for plugin_name, module in loaded_plugins:
-        # Check if the module has an on_before_approval_prompt function
-        if hasattr(module, "on_before_approval_prompt"):
-            try:
-                module.on_before_approval_prompt()
-            except Exception as e:
-                print(
-                    f"    - Warning: Plugin {plugin_name} failed in on_before_approval_prompt: {e}"
-                )
+    _dispatch_hook(loaded_plugins, "on_before_approval_prompt")
@@ -0,0 +1,251 @@
+"""
+Plugin overhead accounting for /plugins perf.
+
+The loader records how long each plugin took to load and times every hook
+it dispatches (on_aicoder_init, on_before_user_prompt, ...). Plugins also
+monkey patch hot paths directly, which no hook dispatch sees. So after each
+plugin loads and after its on_aicoder_init, the known hot-path attributes
+are checked. Any function that has been replaced is wrapped in a counter
+that times one call in config.PLUGIN_PERF_SAMPLE_EVERY. The wrapper
+measures the replacement inclusively: the original function it calls, and
+any patch applied on top of it by a later plugin, are counted in its time.
+"""
+
+import functools
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .. import config
+
+# Hot paths plugins are known to patch: (module, attribute path)
+HOT_PATHS: List[Tuple[str, str]] = [
+    ("builtins", "print"),
+    ("builtins", "input"),
+    ("aicoder.utils", "parse_markdown"),
+    ("aicoder.streaming_adapter", "StreamingAdapter._process_streaming_response"),
+    ("aicoder.message_history", "MessageHistory.add_user_message"),
+    ("aicoder.message_history", "MessageHistory.add_assistant_message"),
+    ("aicoder.message_history", "MessageHistory.add_tool_results"),
+    ("aicoder.tool_manager.executor", "ToolExecutor.execute_tool"),
+    ("aicoder.tool_manager.executor", "ToolExecutor.execute_tool_calls"),
+    ("aicoder.tool_manager.approval_system", "ApprovalSystem.request_user_approval"),
+    ("aicoder.app", "AICoder._get_multiline_input"),
+]
+
+# The same methods patched on the live objects: (path from the AICoder instance, attribute)
+INSTANCE_HOT_PATHS: List[Tuple[str, str]] = [
+    ("message_history", "add_user_message"),
+    ("message_history", "add_assistant_message"),
+    ("message_history", "add_tool_results"),
+    ("tool_manager.executor", "execute_tool"),
+    ("tool_manager.executor", "execute_tool_calls"),
+]
+
+_INTERNAL_TOOLS_MODULE = "aicoder.tool_manager.internal_tools"
+
+
+class CallStats:
+    """Call count and sampled duration of one hook or patched function."""
+
+    __slots__ = ("calls", "sampled", "sampled_time", "max_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.sampled = 0
+        self.sampled_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, seconds: float):
+        self.sampled += 1
+        self.sampled_time += seconds
+        self.max_time = max(self.max_time, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.sampled_time / self.sampled if self.sampled else 0.0
+
+    @property
+    def estimated_total(self) -> float:
+        """Sampled mean scaled to every call."""
+        return self.mean * self.calls
+
+
+class PluginStats:
+    """Everything measured for one plugin."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.load_time = 0.0
+        self.hooks: Dict[str, CallStats] = {}
+        self.patches: Dict[str, CallStats] = {}
+
+    @property
+    def hook_time(self) -> float:
+        return sum(stats.sampled_time for stats in self.hooks.values())
+
+    @property
+    def patch_time(self) -> float:
+        return sum(stats.estimated_total for stats in self.patches.values())
+
+    @property
+    def total_time(self) -> float:
+        return self.load_time + self.hook_time + self.patch_time
+
+
+def _is_perf_wrapper(value: Any) -> bool:
+    return getattr(value, "__aicoder_perf__", None) is not None
+
+
+class PluginPerf:
+    """Per-plugin load, hook and hot-path timings."""
+
+    def __init__(self):
+        self.plugins: Dict[str, PluginStats] = {}
+        self._seen: Dict[str, Any] = {}
+
+    def plugin(self, name: str) -> PluginStats:
+        stats = self.plugins.get(name)
+        if stats is None:
+            stats = self.plugins[name] = PluginStats(name)
+        return stats
+
+    @contextmanager
+    def time_load(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.plugin(name).load_time += time.perf_counter() - start
+
+    @contextmanager
+    def time_hook(self, name: str, hook: str) -> Iterator[None]:
+        stats = self.plugin(name).hooks.setdefault(hook, CallStats())
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.add(time.perf_counter() - start)
+
+    # -- hot-path patch detection -------------------------------------------
+
+    def _slots(self, app=None) -> Iterator[Tuple[str, Any, str, bool]]:
+        """(label, container, key, is_mapping) for every resolvable hot path.
+
+        Only modules that are already imported are looked at; a plugin has
+        to import a module before it can patch it.
+        """
+        for module_name, path in HOT_PATHS:
+            owner = sys.modules.get(module_name)
+            *parents, attr = path.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent, None)
+            if owner is not None:
+                yield f"{module_name}.{path}", owner, attr, False
+        tools = getattr(sys.modules.get(_INTERNAL_TOOLS_MODULE), "INTERNAL_TOOL_FUNCTIONS", None)
+        if isinstance(tools, dict):
+            for tool_name in list(tools):
+                yield f"INTERNAL_TOOL_FUNCTIONS[{tool_name!r}]", tools, tool_name, True
+        if app is not None:
+            for path, attr in INSTANCE_HOT_PATHS:
+                owner = app
+                for parent in path.split("."):
+                    owner = getattr(owner, parent, None)
+                if owner is not None and hasattr(owner, "__dict__"):
+                    yield f"app.{path}.{attr}", owner, attr, False
+
+    @staticmethod
+    def _get(container, key, is_mapping):
+        if is_mapping:
+            return container.get(key)
+        return vars(container).get(key)
+
+    def snapshot(self, app=None):
+        """Remember the current hot-path functions as the unpatched baseline."""
+        for label, container, key, is_mapping in self._slots(app):
+            self._seen.setdefault(label, self._get(container, key, is_mapping))
+
+    def detect_patches(self, plugin_name: str, app=None) -> List[str]:
+        """Wrap hot paths replaced since the last check and charge them to plugin_name."""
+        if not config.PLUGIN_PERF:
+            return []
+        patched = []
+        for label, container, key, is_mapping in self._slots(app):
+            value = self._get(container, key, is_mapping)
+            if label not in self._seen:
+                # Module imported by this plugin: only a non-aicoder function can be a patch
+                module = getattr(value, "__module__", "") or ""
+                if module == "builtins" or module.startswith("aicoder"):
+                    self._seen[label] = value
+                    continue
+            elif value is self._seen[label]:
+                continue
+            if value is None or not callable(value) or _is_perf_wrapper(value):
+                self._seen[label] = value
+                continue
+            if isinstance(value, (staticmethod, classmethod, type)):
+                self._seen[label] = value
+                continue
+            wrapper = self._wrap(value, self.plugin(plugin_name).patches.setdefault(label, CallStats()))
+            if is_mapping:
+                container[key] = wrapper
+            else:
+                setattr(container, key, wrapper)
+            self._seen[label] = wrapper
+            patched.append(label)
+        return patched
+
+    @staticmethod
+    def _wrap(func: Callable, stats: CallStats) -> Callable:
+        sample_every = max(1, config.PLUGIN_PERF_SAMPLE_EVERY)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stats.calls += 1
+            if sample_every > 1 and stats.calls % sample_every != 1:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(time.perf_counter() - start)
+
+        timed.__aicoder_perf__ = stats
+        return timed
+
+    # -- report ---------------------------------------------------------------
+
+    def ranked(self) -> List[PluginStats]:
+        return sorted(self.plugins.values(), key=lambda stats: -stats.total_time)
+
+    def report_lines(self) -> List[str]:
+        lines = []
+        for stats in self.ranked():
+            lines.append(
+                f"{stats.name}: {stats.total_time * 1000:.1f} ms total "
+                f"(load {stats.load_time * 1000:.1f} ms, hooks {stats.hook_time * 1000:.1f} ms, "
+                f"patches ~{stats.patch_time * 1000:.1f} ms)"
+            )
+            for hook, call_stats in sorted(stats.hooks.items()):
+                lines.append(
+                    f"    hook {hook}: {call_stats.calls}x, "
+                    f"avg {call_stats.mean * 1000:.2f} ms, max {call_stats.max_time * 1000:.2f} ms"
+                )
+            for label, call_stats in sorted(stats.patches.items()):
+                lines.append(
+                    f"    patched {label}: {call_stats.calls}x, "
+                    f"avg {call_stats.mean * 1000:.3f} ms (sampled {call_stats.sampled}x)"
+                )
+        return lines
+
+
+_plugin_perf: Optional[PluginPerf] = None
+
+
+def get_plugin_perf() -> PluginPerf:
+    global _plugin_perf
+    if _plugin_perf is None:
+        _plugin_perf = PluginPerf()
+    return _plugin_perf
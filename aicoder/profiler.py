@@ -0,0 +1,196 @@
+"""
+On-demand CPU profiling for /profile.
+
+SamplingProfiler runs a background thread that snapshots the stack of every
+other thread with sys._current_frames() at a fixed rate and counts each
+distinct stack. Samples are wall-clock: a thread blocked in a read or a
+sleep is sampled like a busy one, which is what shows up as a stall. The
+counts are written in the collapsed format ("frame;frame;frame count") that
+flamegraph.pl, speedscope and inferno read.
+
+ProfileSession ties this to the app: /profile start and stop drive the
+sampler, and /profile once runs cProfile over the next interaction only.
+Both write their output to config.PROFILE_DIR (.aicoder/profiles).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from . import config
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1:]
+            break
+    # ';' separates frames in the collapsed format
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads in a background thread."""
+
+    def __init__(self, hz: float = 100.0):
+        self.interval = 1.0 / max(1.0, hz)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._labels: Dict[object, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.stopped_at or time.perf_counter()) - self.started_at
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self.stopped_at = None
+        self._thread = threading.Thread(
+            target=self._run, name="aicoder-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self.stopped_at = time.perf_counter()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip_thread=own_id)
+
+    def sample(self, skip_thread: Optional[int] = None):
+        """Record the current stack of every thread but skip_thread."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """The samples in collapsed stack format, one stack per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int, int]]:
+        """(frame, self samples, total samples) ranked by total samples."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # Drop the thread name
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        ranked = sorted(total, key=lambda frame: (-total[frame], -own[frame], frame))
+        return [(frame, own[frame], total[frame]) for frame in ranked[:limit]]
+
+
+def _profile_path(kind: str, extension: str) -> str:
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(config.PROFILE_DIR, f"{kind}-{stamp}.{extension}")
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(config.PROFILE_DIR, f"{kind}-{stamp}-{suffix}.{extension}")
+    return path
+
+
+class ProfileSession:
+    """The sampler started by /profile and the one-shot cProfile of /profile once."""
+
+    def __init__(self):
+        self.sampler: Optional[SamplingProfiler] = None
+        self.last_output: Optional[str] = None
+        self.cprofile_armed = False
+        self._cprofile = None
+
+    def start_sampling(self, hz: Optional[float] = None) -> SamplingProfiler:
+        if self.sampler is None or not self.sampler.running:
+            self.sampler = SamplingProfiler(hz or config.PROFILE_SAMPLE_HZ)
+            self.sampler.start()
+        return self.sampler
+
+    def stop_sampling(self) -> Optional[str]:
+        """Stop the sampler and write its collapsed stacks; returns the file."""
+        if self.sampler is None or not self.sampler.running:
+            return None
+        self.sampler.stop()
+        path = _profile_path("sample", "collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.sampler.collapsed())
+        self.last_output = path
+        return path
+
+    def arm_cprofile(self):
+        self.cprofile_armed = True
+
+    def begin_interaction(self):
+        """Called before the API requests for a user prompt."""
+        if not self.cprofile_armed or self._cprofile is not None:
+            return
+        import cProfile
+
+        self.cprofile_armed = False
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def end_interaction(self) -> Optional[str]:
+        """Called once the prompt is answered; writes the cProfile output if running."""
+        if self._cprofile is None:
+            return None
+        import io
+        import pstats
+
+        profile, self._cprofile = self._cprofile, None
+        profile.disable()
+        path = _profile_path("cprofile", "pstats")
+        profile.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(40)
+        with open(path[: -len(".pstats")] + ".txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        self.last_output = path
+        return path
+
+
+_session: Optional[ProfileSession] = None
+
+
+def get_profile_session() -> ProfileSession:
+    global _session
+    if _session is None:
+        _session = ProfileSession()
+    return _session
@@ -20,6 +20,7 @@ from pathlib import Path
 
 from . import config
 from .utils import wmsg, imsg, emsg
+from .startup_snapshot import get_file as get_snapshot_file
 
 
 def _load_default_prompt(prompt_name: str) -> Optional[str]:
@@ -40,6 +41,11 @@ def _load_default_prompt(prompt_name: str) -> Optional[str]:
     """
     prompt_filename = f"{prompt_name}.md"
 
+    # 0. Snapshot embedded in the zipapp
+    content = get_snapshot_file(f"prompts/{prompt_filename}")
+    if content:
+        return content
+
     # List of possible locations for prompt files (mirroring AICODER.md logic)
     possible_paths = []
 
@@ -0,0 +1,156 @@
+"""
+Per-request latency breakdown for API calls.
+
+A RequestTiming follows one attempt of an API request: how long the request
+took to serialize, when the response headers arrived (time to first byte,
+which includes connecting), when the first content or tool call token
+arrived, the gaps between SSE chunks and how fast output tokens streamed.
+Finished timings are kept on Stats in a bounded ring buffer and summarized
+with percentiles by /stats. With REQUEST_TIMING_LOG set, each one is also
+appended to that file as a JSON line.
+"""
+
+import json
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Upper bounds (ms) of the inter-chunk gap histogram buckets; the last bucket is open
+GAP_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500)
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of values, or None when there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def gap_bucket_labels() -> List[str]:
+    labels = [f"<{bound}ms" for bound in GAP_BUCKETS_MS]
+    labels.append(f">={GAP_BUCKETS_MS[-1]}ms")
+    return labels
+
+
+class RequestTiming:
+    """Timing of one API request attempt, in time.perf_counter() seconds."""
+
+    def __init__(self, streaming: bool = True, model: str = ""):
+        self.streaming = streaming
+        self.model = model
+        self.wall_time = time.time()
+        self.start = time.perf_counter()
+        self.serialized_at: Optional[float] = None
+        self.response_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.end: Optional[float] = None
+        self.chunks = 0
+        self.gap_histogram = [0] * (len(GAP_BUCKETS_MS) + 1)
+        self.max_gap = 0.0
+        self.completion_tokens = 0
+        self.success = False
+        self.error: Optional[str] = None
+        self.rss_kb: Optional[int] = None  # Process RSS when the request was recorded
+
+    def mark_serialized(self):
+        self.serialized_at = time.perf_counter()
+
+    def mark_response(self, when: Optional[float] = None):
+        """Response headers received (when may be taken on another thread)."""
+        self.response_at = when if when is not None else time.perf_counter()
+
+    def mark_chunk(self):
+        """An SSE line arrived; records the gap since the previous one."""
+        now = time.perf_counter()
+        previous = self.last_chunk_at if self.last_chunk_at is not None else self.response_at
+        if previous is not None:
+            gap = now - previous
+            self.max_gap = max(self.max_gap, gap)
+            gap_ms = gap * 1000
+            for index, bound in enumerate(GAP_BUCKETS_MS):
+                if gap_ms < bound:
+                    break
+            else:
+                index = len(GAP_BUCKETS_MS)
+            self.gap_histogram[index] += 1
+        self.last_chunk_at = now
+        self.chunks += 1
+
+    def mark_first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def finish(self, success: bool, completion_tokens: int = 0, error: Optional[str] = None):
+        self.end = time.perf_counter()
+        self.success = success
+        self.completion_tokens = completion_tokens or 0
+        self.error = error
+
+    def _since_start(self, moment: Optional[float]) -> Optional[float]:
+        return None if moment is None else moment - self.start
+
+    @property
+    def serialize_time(self) -> Optional[float]:
+        return self._since_start(self.serialized_at)
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        """Request sent to response headers received."""
+        if self.response_at is None:
+            return None
+        return self.response_at - (self.serialized_at or self.start)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Request start to the first content or tool call token."""
+        return self._since_start(self.first_token_at)
+
+    @property
+    def stream_duration(self) -> Optional[float]:
+        if self.response_at is None or self.end is None:
+            return None
+        return self.end - self.response_at
+
+    @property
+    def total(self) -> Optional[float]:
+        return self._since_start(self.end)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Output tokens per second, measured from the first token."""
+        if not self.completion_tokens or self.first_token_at is None or self.end is None:
+            return None
+        elapsed = self.end - self.first_token_at
+        return self.completion_tokens / elapsed if elapsed > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time": self.wall_time,
+            "model": self.model,
+            "streaming": self.streaming,
+            "success": self.success,
+            "error": self.error,
+            "serialize": self.serialize_time,
+            "ttfb": self.ttfb,
+            "ttft": self.ttft,
+            "stream": self.stream_duration,
+            "total": self.total,
+            "chunks": self.chunks,
+            "max_gap": self.max_gap,
+            "gap_histogram": dict(zip(gap_bucket_labels(), self.gap_histogram)),
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "rss_kb": self.rss_kb,
+        }
+
+
+def append_timing_log(path: str, record: Dict[str, Any]):
+    """Append one record to the timing log, ignoring I/O errors."""
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
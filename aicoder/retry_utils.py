@@ -301,6 +301,8 @@ class APIRetryHandler(_APIRetryHandlerSingleton):
             )
             # Increment retry attempt counter for exponential backoff
             self.retry_attempt_count += 1
+            if self.stats:
+                self.stats.api_retries += 1
             # Use cancellable sleep to allow user to cancel retries
             if not cancellable_sleep(retry_sleep_secs, self.animator):
                 self.animator.stop_animation()
@@ -393,6 +395,8 @@ class APIRetryHandler(_APIRetryHandlerSingleton):
         )
         # Increment retry attempt counter for exponential backoff
         self.retry_attempt_count += 1
+        if self.stats:
+            self.stats.api_retries += 1
         # Use cancellable sleep to allow user to cancel retries
         if not cancellable_sleep(retry_sleep_secs, self.animator):
             self.animator.stop_animation()
@@ -537,6 +541,7 @@ def handle_request_error(exception):
             )
 
         retry_handler.retry_attempt_count += 1
+        stats.api_retries += 1
         if cancellable_sleep(delay, animator):
             raise ShouldRetryException(exception)
         else:
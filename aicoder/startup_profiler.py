@@ -0,0 +1,223 @@
+"""
+Startup profiler for AI Coder.
+
+Run with --profile-startup to see how long each module import and each
+initialization phase (plugins, MCP servers, prompt loading, history, ...)
+takes. With --profile-startup=FILE the measurements are also written to
+FILE as JSON, which is what the startup benchmark compares.
+
+This module only uses the standard library so that enabling it does not
+itself pull in any of the modules being measured.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+FLAG = "--profile-startup"
+
+_profiler = None
+
+
+class _TimedLoader:
+    """Wraps a module loader to time exec_module."""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Put the real loader back before the module runs, so that
+        # pkgutil.get_data() and friends see the loader they expect
+        spec = module.__spec__
+        if spec is not None and spec.loader is self:
+            spec.loader = self._loader
+        if getattr(module, "__loader__", None) is self:
+            module.__loader__ = self._loader
+        self._profiler._enter_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(module.__name__)
+
+
+class _ImportTimer:
+    """Meta path finder that wraps the loader of every newly imported module."""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """Records per-module import times and per-phase init times."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.imports: Dict[str, Dict[str, float]] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self._import_stack: List[List[float]] = []
+        self._phase_depth = 0
+        self._finder: Optional[_ImportTimer] = None
+        self.output_file: Optional[str] = None
+
+    def install(self):
+        """Start timing imports."""
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """Stop timing imports."""
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+
+    def _enter_import(self, name: str):
+        # [start time, time spent in nested imports]
+        self._import_stack.append([time.perf_counter(), 0.0])
+
+    def _exit_import(self, name: str):
+        started, nested = self._import_stack.pop()
+        cumulative = time.perf_counter() - started
+        self.imports[name] = {"self": cumulative - nested, "cumulative": cumulative}
+        if self._import_stack:
+            self._import_stack[-1][1] += cumulative
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time an initialization phase; phases may nest."""
+        entry = {"name": name, "depth": self._phase_depth, "seconds": 0.0}
+        self.phases.append(entry)
+        self._phase_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["seconds"] = time.perf_counter() - started
+            self._phase_depth -= 1
+
+    def total(self) -> float:
+        """Seconds since the profiler was created."""
+        return time.perf_counter() - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total(),
+            "python": sys.version.split()[0],
+            "phases": self.phases,
+            "imports": self.imports,
+        }
+
+    def format_report(self, top: int = 20) -> str:
+        lines = [f"*** Startup profile ({self.total() * 1000:.1f} ms total)"]
+        if self.phases:
+            lines.append("    Phases:")
+            for entry in self.phases:
+                label = "  " * entry["depth"] + entry["name"]
+                lines.append(f"      {label:<32} {entry['seconds'] * 1000:8.1f} ms")
+        if self.imports:
+            import_total = sum(item["self"] for item in self.imports.values())
+            lines.append(
+                f"    Imports: {len(self.imports)} modules, {import_total * 1000:.1f} ms"
+                f" (slowest {min(top, len(self.imports))}, self / cumulative):"
+            )
+            slowest = sorted(
+                self.imports.items(), key=lambda item: item[1]["self"], reverse=True
+            )[:top]
+            for name, item in slowest:
+                lines.append(
+                    f"      {name:<48} {item['self'] * 1000:7.1f} ms"
+                    f" {item['cumulative'] * 1000:8.1f} ms"
+                )
+        return "\n".join(lines)
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def enable_from_argv(argv: Optional[List[str]] = None) -> Optional[StartupProfiler]:
+    """Enable the profiler if --profile-startup[=FILE] is on the command line.
+
+    The flag is removed from argv. AICODER_PROFILE_STARTUP=1 (or =FILE) in
+    the environment has the same effect.
+    """
+    global _profiler
+    argv = sys.argv if argv is None else argv
+    output = None
+    enabled = False
+    for arg in list(argv[1:]):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            enabled = True
+            output = arg.partition("=")[2] or output
+            argv.remove(arg)
+    env_value = os.environ.get("AICODER_PROFILE_STARTUP", "")
+    if env_value and env_value != "0":
+        enabled = True
+        if env_value not in ("1", "true", "on"):
+            output = output or env_value
+    if not enabled:
+        return None
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.output_file = output
+        _profiler.install()
+    return _profiler
+
+
+def get_startup_profiler() -> Optional[StartupProfiler]:
+    """The active profiler, or None if startup profiling is off."""
+    return _profiler
+
+
+def startup_phase(name: str):
+    """Context manager timing an init phase; does nothing when profiling is off."""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.phase(name)
+
+
+def finish_startup_profile():
+    """Stop timing imports and report the profile, if profiling is on."""
+    global _profiler
+    profiler = _profiler
+    if profiler is None:
+        return None
+    profiler.uninstall()
+    print(profiler.format_report())
+    output = profiler.output_file
+    if output:
+        try:
+            profiler.write_json(output)
+            print(f"*** Startup profile written to {output}")
+        except OSError as e:
+            print(f"*** Failed to write startup profile: {e}", file=sys.stderr)
+    _profiler = None
+    return profiler
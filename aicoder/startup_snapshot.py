@@ -0,0 +1,114 @@
+"""
+Precomputed startup data for the zipapp build.
+
+build_zipapp.py generates an aicoder/_startup_snapshot.py module holding the
+default prompts, AICODER.md and the internal tool definitions, so a zipapp
+can start without searching the filesystem and the zip for them. In a source
+checkout or installed package there is no snapshot: every lookup returns
+None and callers load the data as usual.
+
+Tool schema defaults that are read from the environment are left out of the
+snapshot and filled in from the environment of the process loading it.
+"""
+
+import copy
+import importlib
+import os
+from typing import Any, Dict, Optional
+
+SNAPSHOT_MODULE = "_startup_snapshot"
+SNAPSHOT_VERSION = 2
+
+# Environment-derived parameter defaults: (tool, parameter, env var, fallback)
+ENV_DEFAULTS = [
+    ("run_shell_command", "timeout", "SHELL_COMMAND_TIMEOUT", 30),
+]
+
+_snapshot = None
+_loaded = False
+
+
+def _get_snapshot():
+    global _snapshot, _loaded
+    if not _loaded:
+        _loaded = True
+        try:
+            module = importlib.import_module(f".{SNAPSHOT_MODULE}", __package__)
+            if getattr(module, "SNAPSHOT_VERSION", None) == SNAPSHOT_VERSION:
+                _apply_env_defaults(module.INTERNAL_TOOLS)
+                _snapshot = module
+        except ImportError:
+            _snapshot = None
+    return _snapshot
+
+
+def _env_parameters(internal_tools: Dict[str, Dict[str, Any]]):
+    for tool_name, parameter, env_var, fallback in ENV_DEFAULTS:
+        definition = internal_tools.get(tool_name)
+        if definition is None:
+            continue
+        properties = definition.get("parameters", {}).get("properties", {})
+        if parameter in properties:
+            yield properties[parameter], env_var, fallback
+
+
+def _apply_env_defaults(internal_tools: Dict[str, Dict[str, Any]]):
+    for schema, env_var, fallback in _env_parameters(internal_tools):
+        schema["default"] = int(os.environ.get(env_var, fallback))
+
+
+def get_file(relative_path: str) -> Optional[str]:
+    """Stripped content of a package data file, e.g. "prompts/plan.md"."""
+    snapshot = _get_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot.FILES.get(relative_path)
+
+
+def get_internal_tools() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Internal tool definitions by tool name."""
+    snapshot = _get_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot.INTERNAL_TOOLS
+
+
+def build_snapshot(package_dir: str) -> Dict[str, Any]:
+    """Collect the snapshot data from a package source directory."""
+    files = {}
+    data_files = ["AICODER.md"] + [
+        f"prompts/{name}"
+        for name in sorted(os.listdir(os.path.join(package_dir, "prompts")))
+        if name.endswith(".md")
+    ]
+    for relative_path in data_files:
+        with open(os.path.join(package_dir, relative_path), "r", encoding="utf-8") as f:
+            content = f.read().strip()
+        if content:
+            files[relative_path] = content
+
+    internal_tools_pkg = importlib.import_module(".tool_manager.internal_tools", __package__)
+    internal_tools = {}
+    for attr_name in dir(internal_tools_pkg):
+        if attr_name.startswith("_"):
+            continue
+        definition = getattr(getattr(internal_tools_pkg, attr_name), "TOOL_DEFINITION", None)
+        if isinstance(definition, dict):
+            internal_tools[attr_name] = copy.deepcopy(definition)
+    # Whatever the build machine's environment says does not belong in the zipapp
+    for schema, _, _ in _env_parameters(internal_tools):
+        schema.pop("default", None)
+
+    return {"files": files, "internal_tools": internal_tools}
+
+
+def render_snapshot(data: Dict[str, Any]) -> str:
+    """Python source of the snapshot module for the given data."""
+    import pprint
+
+    return (
+        '"""Startup snapshot generated by build_zipapp.py. Do not edit."""\n\n'
+        f"SNAPSHOT_VERSION = {SNAPSHOT_VERSION}\n\n"
+        f"FILES = {pprint.pformat(data['files'], width=100)}\n\n"
+        f"INTERNAL_TOOLS = {pprint.pformat(data['internal_tools'], width=100)}\n"
+    )
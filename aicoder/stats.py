@@ -3,12 +3,17 @@ Statistics tracking for AI Coder.
 """
 
 import os
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import timedelta
 
 from . import config
 from .utils import imsg
+from .memory_tracker import get_memory_tracker, rss_kb
+from .histograms import TOOL_BUCKETS, EndpointMetrics, Histogram
+from .request_timing import append_timing_log, percentile
 
 
 def get_stats():
@@ -38,6 +43,7 @@ class Stats:
             self.api_requests = 0
             self.api_success = 0
             self.api_errors = 0
+            self.api_retries = 0  # Requests retried after an error
             self.api_time_spent = 0.0  # Time spent in API calls
             self.tool_calls = 0
             self.tool_errors = 0
@@ -52,10 +58,104 @@ class Stats:
             self.current_prompt_size_estimated = False  # Whether current_prompt_size is estimated or from API
             self.last_user_prompt = ""  # Last user prompt content for plugins (spell check, etc.)
             self.usage_infos = []  # List of usage objects returned by the API with timestamps
+            # Latency breakdown of recent API requests (RequestTiming), oldest first
+            self.request_timings = deque(maxlen=max(1, config.REQUEST_TIMING_HISTORY))
+            self.tool_timings = {}  # Tool name -> deque of recent execution times (seconds)
+            self.peak_rss_kb = 0  # Highest RSS sampled after a request
+            # Cumulative metrics for export: (model, endpoint) -> EndpointMetrics,
+            # tool name -> Histogram of execution times
+            self.endpoint_metrics = {}
+            self.tool_histograms = {}
+            # Held while those are updated or read; the exporter reads them on its own threads
+            self.metrics_lock = threading.Lock()
             
             if os.environ.get("AICODER_TEST_MODE") != "1":
                 self._initialized = True
 
+    def record_request_timing(self, timing):
+        """Keep a finished RequestTiming and append it to REQUEST_TIMING_LOG if set.
+
+        The process RSS is sampled with it; in debug mode memory growth is checked too.
+        """
+        timing.rss_kb = rss_kb()
+        self.peak_rss_kb = max(self.peak_rss_kb, timing.rss_kb)
+        self.request_timings.append(timing)
+        key = (timing.model, config.get_api_endpoint())
+        with self.metrics_lock:
+            endpoint_metrics = self.endpoint_metrics.get(key)
+            if endpoint_metrics is None:
+                endpoint_metrics = self.endpoint_metrics[key] = EndpointMetrics()
+            endpoint_metrics.observe(timing)
+        get_memory_tracker().check_growth(timing.rss_kb)
+        if config.REQUEST_TIMING_LOG:
+            append_timing_log(config.REQUEST_TIMING_LOG, timing.to_dict())
+
+    def record_tool_timing(self, tool_name: str, seconds: float):
+        """Keep the execution time of one tool call."""
+        timings = self.tool_timings.get(tool_name)
+        if timings is None:
+            timings = self.tool_timings[tool_name] = deque(
+                maxlen=max(1, config.REQUEST_TIMING_HISTORY)
+            )
+        timings.append(seconds)
+        with self.metrics_lock:
+            histogram = self.tool_histograms.get(tool_name)
+            if histogram is None:
+                histogram = self.tool_histograms[tool_name] = Histogram(TOOL_BUCKETS)
+            histogram.observe(seconds)
+
+    def last_request_error(self):
+        """Error of the latest API request, or None if it succeeded."""
+        if not self.request_timings or self.request_timings[-1].success:
+            return None
+        error = self.request_timings[-1].error
+        if error == "cancelled":
+            return "API request cancelled"
+        return f"API request failed: {error}" if error else "API request failed"
+
+    def latency_summary(self):
+        """p50/p95 of each request timing field and of each tool's execution time."""
+        records = [t.to_dict() for t in self.request_timings if t.success]
+        summary = {"requests": len(self.request_timings), "fields": {}, "tools": {}}
+        for field_name in ("serialize", "ttfb", "ttft", "stream", "total", "max_gap", "tokens_per_second"):
+            values = [r[field_name] for r in records if r[field_name] is not None]
+            if values:
+                summary["fields"][field_name] = (percentile(values, 50), percentile(values, 95))
+        for tool_name, values in sorted(self.tool_timings.items()):
+            summary["tools"][tool_name] = (
+                len(values),
+                percentile(values, 50),
+                percentile(values, 95),
+            )
+        return summary
+
+    def _print_latency_breakdown(self):
+        """Print p50/p95 latencies of recent requests and tool calls."""
+        summary = self.latency_summary()
+        if not summary["fields"] and not summary["tools"]:
+            return
+        labels = {
+            "serialize": "Serialize",
+            "ttfb": "Time to first byte",
+            "ttft": "Time to first token",
+            "stream": "Streaming",
+            "total": "Total",
+            "max_gap": "Longest chunk gap",
+        }
+        if summary["fields"]:
+            print(f"Request latency (last {summary['requests']} requests, p50 / p95):")
+            for field_name, label in labels.items():
+                if field_name in summary["fields"]:
+                    p50, p95 = summary["fields"][field_name]
+                    print(f"  - {label}: {p50 * 1000:,.0f} ms / {p95 * 1000:,.0f} ms")
+            if "tokens_per_second" in summary["fields"]:
+                p50, p95 = summary["fields"]["tokens_per_second"]
+                print(f"  - Output tokens/sec: {p50:.1f} / {p95:.1f}")
+        if summary["tools"]:
+            print("Tool latency (p50 / p95):")
+            for tool_name, (count, p50, p95) in summary["tools"].items():
+                print(f"  - {tool_name} ({count}x): {p50 * 1000:,.0f} ms / {p95 * 1000:,.0f} ms")
+
     def print_stats(self, message_history=None):
         """Displays session statistics."""
 
@@ -95,6 +195,11 @@ class Stats:
         print(f"  - Errors: {self.tool_errors}")
         print(f"  - Time spent: {timedelta(seconds=int(self.tool_time_spent))}")
         print(f"Memory compactions: {self.compactions}")
+        if self.peak_rss_kb:
+            print(
+                f"Process memory: {rss_kb() / 1024:.1f} MB RSS (peak after a request: {self.peak_rss_kb / 1024:.1f} MB)"
+            )
+        self._print_latency_breakdown()
 
         # Calculate success rates
         if self.api_requests > 0:
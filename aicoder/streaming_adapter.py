@@ -23,6 +23,7 @@ from .retry_utils import (
     handle_request_error,
 )
 from .streaming_colorizer import MarkdownColorizer
+from .request_timing import RequestTiming
 from .terminal_manager import is_esc_pressed
 from .utils import wmsg, emsg, imsg, dmsg
 
@@ -37,6 +38,8 @@ class StreamingAdapter(APIClient):
         self.stats = getattr(api_handler, "stats", None)
         # Get the log file path from environment variable
         self.stream_log_file = os.environ.get("STREAM_LOG_FILE", None)
+        self._stream_log_start = None  # perf_counter() when the logged request started
+        self.on_content_delta = None  # Callable(text) that replaces printing of content deltas
         if self.stream_log_file:
             imsg(f"*** Streaming log enabled: {self.stream_log_file}")
 
@@ -54,6 +57,18 @@ class StreamingAdapter(APIClient):
         except Exception as e:
             dmsg(f"Error writing to stream log: {e}")
 
+    def _log_sse_line(self, line: str):
+        """Log a raw SSE line, prefixed with @<seconds since the request started>.
+
+        The offsets let benchmarks/replay.py serve the stream with its original timing.
+        """
+        if not self.stream_log_file:
+            return
+        if self._stream_log_start is None:
+            self._log_stream_data(line)
+        else:
+            self._log_stream_data(f"@{time.perf_counter() - self._stream_log_start:.4f} {line}")
+
     def _reset_colorization_state(self):
         """Reset markdown colorization state for a new streaming response."""
         self.colorizer.reset_state()
@@ -130,6 +145,8 @@ class StreamingAdapter(APIClient):
         if self.stats:
             self.stats.api_requests += 1
 
+        timing = RequestTiming(streaming=False, model=config.get_api_model())
+
         # Prepare API request data using shared functionality
         api_data = self._prepare_api_request_data(
             messages,
@@ -148,6 +165,7 @@ class StreamingAdapter(APIClient):
                 
                 # Use centralized request preparation with caching
                 request_body = self._prepare_and_cache_request(api_data)
+                timing.mark_serialized()
             except TypeError as e:
                 self.animator.stop_animation()
                 emsg(f"\nError serializing data for API request: {e}")
@@ -167,6 +185,7 @@ class StreamingAdapter(APIClient):
                     response_data = self._make_http_request(
                         api_data, timeout=http_timeout
                     )
+                    result_dict["response_at"] = time.perf_counter()
                     result_dict["response"] = response_data
                     result_dict["success"] = True
                 except socket.timeout as e:
@@ -214,6 +233,7 @@ class StreamingAdapter(APIClient):
                     if is_esc_pressed():
                         self.animator.stop_animation()
                         emsg("\nRequest cancelled by user (ESC).")
+                        self._finish_request_timing(timing, error="cancelled")
                         # Note: We can't actually terminate the API request thread,
                         # but we can ignore its result
                         return None
@@ -225,6 +245,9 @@ class StreamingAdapter(APIClient):
                 if result_dict.get("success"):
                     processed_response = result_dict["response"]
                     self._update_stats_on_success(api_start_time, processed_response)
+                    timing.mark_response(result_dict.get("response_at"))
+                    timing.first_token_at = timing.response_at
+                    self._finish_request_timing(timing, processed_response)
 
                     return processed_response
 
@@ -234,10 +257,13 @@ class StreamingAdapter(APIClient):
                 # Handle specific error types with user-friendly messages
                 error = result_dict.get("error")
                 error_type = result_dict.get("error_type", "general_error")
+                self._finish_request_timing(timing, error=error_type)
                 return self._handle_error_response(error, error_type)
 
             except Exception as e:
                 self.animator.stop_animation()
+                self._finish_request_timing(timing, error=type(e).__name__)
+                timing = RequestTiming(streaming=False, model=config.get_api_model())
                 dmsg(
                     f"DEBUG: _make_non_streaming_request caught exception: {type(e).__name__}: {e}"
                 )
@@ -264,6 +290,8 @@ class StreamingAdapter(APIClient):
         if self.stats:
             self.stats.api_requests += 1
 
+        timing = RequestTiming(streaming=True, model=config.get_api_model())
+
         # Prepare API request data using shared functionality
         api_data = self._prepare_api_request_data(
             messages,
@@ -277,6 +305,7 @@ class StreamingAdapter(APIClient):
             try:
                 self._log_stream_data("=== REQUEST ===")
                 self._log_stream_data(json.dumps(api_data, indent=2))
+                self._stream_log_start = time.perf_counter()
             except Exception as e:
                 dmsg(f"Error logging request data: {e}")
 
@@ -290,6 +319,7 @@ class StreamingAdapter(APIClient):
                 
                 # Use centralized request preparation with caching
                 request_body = self._prepare_and_cache_request(api_data)
+                timing.mark_serialized()
             except TypeError as e:
                 self.animator.stop_animation()
                 emsg(f"\nError serializing data for API request: {e}")
@@ -327,6 +357,7 @@ class StreamingAdapter(APIClient):
                     http_timeout = int(os.environ.get("HTTP_TIMEOUT", "300"))
                     # Use timeout for streaming requests
                     response = urllib.request.urlopen(req, timeout=http_timeout)
+                    result_dict["response_at"] = time.perf_counter()
                     result_dict["response"] = response
                     result_dict["success"] = True
                 except socket.timeout as e:
@@ -374,6 +405,7 @@ class StreamingAdapter(APIClient):
                     if is_esc_pressed():
                         self.animator.stop_animation()
                         emsg("\nRequest cancelled by user (ESC).")
+                        self._finish_request_timing(timing, error="cancelled")
                         # Note: We can't actually terminate the API request thread,
                         # but we can ignore its result
                         return None
@@ -384,6 +416,7 @@ class StreamingAdapter(APIClient):
 
                 if result_dict.get("success"):
                     response = result_dict["response"]
+                    timing.mark_response(result_dict.get("response_at"))
 
                     # Process the streaming response in a separate thread to allow ESC monitoring
                     streaming_result = {}
@@ -400,7 +433,7 @@ class StreamingAdapter(APIClient):
                             # We'll modify _process_streaming_response to be interruptible
                             streaming_result["response"] = (
                                 self._process_streaming_response(
-                                    response, cancellation_event
+                                    response, cancellation_event, timing
                                 )
                             )
                         except ShouldRetryException as e:
@@ -433,6 +466,7 @@ class StreamingAdapter(APIClient):
                             break
 
                     if esc_pressed:
+                        self._finish_request_timing(timing, error="cancelled")
                         # Return immediately without waiting for streaming thread
                         return None
 
@@ -449,6 +483,7 @@ class StreamingAdapter(APIClient):
                     self._update_stats_on_success(
                         api_start_time, processed_response or {}
                     )
+                    self._finish_request_timing(timing, processed_response)
 
                     return processed_response
 
@@ -458,14 +493,19 @@ class StreamingAdapter(APIClient):
                 # Handle specific error types with user-friendly messages
                 error = result_dict.get("error")
                 error_type = result_dict.get("error_type", "general_error")
+                self._finish_request_timing(timing, error=error_type)
                 return self._handle_error_response(error, error_type)
 
-            except ShouldRetryException:
+            except ShouldRetryException as e:
                 # Direct retry for ShouldRetryException from streaming
                 self.animator.stop_animation()
+                self._finish_request_timing(timing, error=type(e).__name__)
+                timing = RequestTiming(streaming=True, model=config.get_api_model())
                 continue
             except Exception as e:
                 self.animator.stop_animation()
+                self._finish_request_timing(timing, error=type(e).__name__)
+                timing = RequestTiming(streaming=True, model=config.get_api_model())
                 try:
                     handle_request_error(e)
                     break  # Exit the retry loop when handle_request_error returns False (will not retry)
@@ -477,11 +517,15 @@ class StreamingAdapter(APIClient):
                 pass
 
     def _process_streaming_response(
-        self, response, cancellation_event=None
+        self, response, cancellation_event=None, timing: Optional[RequestTiming] = None
     ) -> Optional[Dict[str, Any]]:
-        """Process streaming response and return final message."""
+        """Process streaming response and return final message.
+
+        When a RequestTiming is given, chunk arrival and the first token are recorded on it.
+        """
         # Reset colorization state for new streaming response
         self._reset_colorization_state()
+        on_content_delta = self.on_content_delta
 
         # Process the streaming response
         full_response = {
@@ -635,6 +679,8 @@ class StreamingAdapter(APIClient):
 
                 # Update last data time
                 last_data_time = time.time()
+                if timing is not None:
+                    timing.mark_chunk()
 
                 line = line.decode("utf-8").strip()
 
@@ -652,8 +698,8 @@ class StreamingAdapter(APIClient):
                 if line.startswith("data:"):
                     data_str = line[5:]  # Remove "data:" prefix
 
-                    # Log the raw SSE data if logging is enabled
-                    self._log_stream_data(data_str)
+                    # Log the raw SSE line if logging is enabled
+                    self._log_sse_line(line)
 
                     # End of stream
                     if data_str == "[DONE]":
@@ -691,9 +737,15 @@ class StreamingAdapter(APIClient):
                                     # Ignore non string deltas, sometimes thinking comes as list
                                     continue
                                 else:
+                                    if timing is not None:
+                                        timing.mark_first_token()
                                     content_buffer += content
-                                    # Use new buffering system to handle whitespace
-                                    self._buffer_and_print_content(content)
+                                    if on_content_delta is not None:
+                                        # Headless mode forwards deltas instead of printing them
+                                        on_content_delta(content)
+                                    else:
+                                        # Use new buffering system to handle whitespace
+                                        self._buffer_and_print_content(content)
 
                             # Process tool calls - handle null or missing tool_calls gracefully
                             if "delta" in choice and "tool_calls" in choice["delta"]:
@@ -711,6 +763,8 @@ class StreamingAdapter(APIClient):
                                     )
                                     tool_calls = []
 
+                                if tool_calls and timing is not None:
+                                    timing.mark_first_token()
                                 for tool_call in tool_calls:
                                     self._process_streaming_tool_call(
                                         tool_call, tool_call_buffers
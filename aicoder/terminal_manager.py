@@ -26,10 +26,12 @@ class TerminalManager:
         if self._initialized:
             return
 
-        # Check if we're in test mode (disable terminal operations)
+        # Check if we're in test or headless mode (disable terminal operations)
         import os
 
-        self._test_mode = os.environ.get("TEST_MODE") == "1"
+        self._test_mode = (
+            os.environ.get("TEST_MODE") == "1" or os.environ.get("AICODER_HEADLESS") == "1"
+        )
 
         # ESC detection state
         self._esc_pressed = False
@@ -7,6 +7,7 @@ from typing import Dict, Any, List
 from .. import config
 from ..utils import format_tool_prompt, make_readline_safe, wmsg, imsg, emsg
 from ..readline_history_manager import prompt_history_manager
+from ..tracing import get_tracer
 
 
 # Constants for approval system responses
@@ -22,6 +23,10 @@ class CancelAllToolCalls(Exception):
 class ApprovalSystem:
     """Handles user approval for tool execution."""
 
+    # Callable (tool_name, arguments, prompt_message) -> answer used instead of
+    # the terminal, e.g. by headless mode; None reads the answer with input()
+    answer_source = None
+
     def __init__(self, tool_registry, stats, animator):
         self.tool_registry = tool_registry
         self.stats = stats
@@ -129,7 +134,14 @@ class ApprovalSystem:
                     enter_prompt_mode()
 
                     try:
-                        raw_answer = input(safe_approval_prompt).lower().strip()
+                        with get_tracer().span("approval_wait", tool=tool_name):
+                            if ApprovalSystem.answer_source is not None:
+                                raw_answer = ApprovalSystem.answer_source(
+                                    tool_name, arguments, prompt_message
+                                )
+                            else:
+                                raw_answer = input(safe_approval_prompt)
+                            raw_answer = raw_answer.lower().strip()
                     finally:
                         exit_prompt_mode()
 
@@ -351,12 +363,7 @@ class ApprovalSystem:
                         with open(file_path, "r", encoding="utf-8") as f:
                             old_content = f.read()
 
-                    old_string = arguments.get("old_string", "")
-                    new_string = arguments.get("new_string", "")
-                    if old_string in old_content:
-                        new_content = old_content.replace(old_string, new_string, 1)
-                    else:
-                        new_content = old_content  # Fallback if no match
+                    new_content = self._simulate_edit(old_content, arguments)
 
                 tmp_file.write(new_content)
 
@@ -426,6 +433,20 @@ class ApprovalSystem:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
 
+    def _simulate_edit(self, old_content: str, arguments: Dict[str, Any]) -> str:
+        """Return the content an edit_file call would produce (unchanged if it would fail)."""
+        from .internal_tools.edit_file import build_edit_list, apply_edits
+
+        edit_list, error = build_edit_list(
+            arguments.get("old_string"),
+            arguments.get("new_string"),
+            arguments.get("edits"),
+        )
+        if error:
+            return old_content
+        new_content, error = apply_edits(old_content, edit_list)
+        return old_content if error else new_content
+
     def _show_external_diff(self, tool_name: str, arguments: Dict[str, Any]):
         """Show external diff viewer for file operations."""
         import os
@@ -489,12 +510,7 @@ class ApprovalSystem:
                         with open(file_path, "r", encoding="utf-8") as f:
                             old_content = f.read()
 
-                    old_string = arguments.get("old_string", "")
-                    new_string = arguments.get("new_string", "")
-                    if old_string in old_content:
-                        new_content = old_content.replace(old_string, new_string, 1)
-                    else:
-                        new_content = old_content  # Fallback if no match
+                    new_content = self._simulate_edit(old_content, arguments)
 
                 tmp_file.write(new_content)
 
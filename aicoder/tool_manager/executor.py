@@ -15,6 +15,7 @@ from datetime import datetime
 from .. import config
 from ..utils import colorize_diff_lines, make_readline_safe
 from ..readline_history_manager import prompt_history_manager
+from ..tracing import get_tracer
 from .internal_tools import INTERNAL_TOOL_FUNCTIONS
 from .validator import (
     validate_tool_parameters,
@@ -187,6 +188,18 @@ class ToolExecutor:
         self, message: Dict[str, Any]
     ) -> Tuple[List[Dict[str, Any]], bool, bool]:
         """Executes tool calls from an AI message and returns the results."""
+        # Let auto-approved MCP calls to the same server run concurrently
+        self._start_parallel_calls(message.get("tool_calls") or [])
+        try:
+            return self._run_tool_calls(message)
+        finally:
+            # Calls sent up front but never handled must not be picked up later
+            self.mcp_stdio_handler.clear_parallel_calls()
+            self.jsonrpc_handler.clear_batched_calls()
+
+    def _run_tool_calls(
+        self, message: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], bool, bool]:
         tool_results = []
         cancel_all_active = False
         show_main_prompt = False  # Flag to indicate if we should return to main prompt after execution
@@ -372,6 +385,37 @@ class ToolExecutor:
 
         return tool_results, cancel_all_active, show_main_prompt
 
+    def _start_parallel_calls(self, tool_calls: List[Dict[str, Any]]):
+        """
+        Send auto-approved MCP stdio calls up front so they overlap, and
+        JSON-RPC calls to the same URL as one batch.
+        """
+        calls = []
+        try:
+            from ..planning_mode import get_planning_mode
+
+            planning_mode = get_planning_mode()
+            for tool_call in tool_calls:
+                function_info = tool_call["function"]
+                if planning_mode.should_disable_tool(function_info["name"]):
+                    return
+                arguments = parse_json_arguments(function_info["arguments"])
+                if not isinstance(arguments, dict):
+                    return
+                calls.append((function_info["name"], arguments))
+        except Exception:
+            return
+        try:
+            self.mcp_stdio_handler.start_parallel_calls(calls)
+        except Exception as e:
+            if config.DEBUG:
+                print(f"DEBUG: Could not start MCP calls in parallel: {e}")
+        try:
+            self.jsonrpc_handler.start_batched_calls(calls)
+        except Exception as e:
+            if config.DEBUG:
+                print(f"DEBUG: Could not batch JSON-RPC calls: {e}")
+
     def _print_command_info_once(
         self,
         command: str,
@@ -468,6 +512,7 @@ class ToolExecutor:
 
         # Track tool execution time
         tool_start_time = time.time()
+        tool_span = get_tracer().start_span(f"tool_call:{tool_name}", start=tool_start_time)
         tool_config = {}  # Initialize tool_config to empty dict
         try:
             tool_config = self.tool_registry.mcp_tools.get(tool_name)
@@ -480,7 +525,7 @@ class ToolExecutor:
 
             if not tool_config:
                 # Check if this is a tool from an MCP server
-                for server_name, (_, tools) in self.tool_registry.mcp_servers.items():
+                for server_name, tools in self.tool_registry.known_mcp_server_tools():
                     if tool_name in tools:
                         tool_config = {"type": "mcp-stdio", "server": server_name}
                         break
@@ -535,4 +580,9 @@ class ToolExecutor:
             return f"Error in tool execution system: {e}", tool_config, False
         finally:
             # Record time spent on tool call
-            self.stats.tool_time_spent += time.time() - tool_start_time
\ No newline at end of file
+            tool_elapsed = time.time() - tool_start_time
+            self.stats.tool_time_spent += tool_elapsed
+            record = getattr(self.stats, "record_tool_timing", None)
+            if callable(record):
+                record(tool_name, tool_elapsed)
+            get_tracer().end_span(tool_span)
\ No newline at end of file
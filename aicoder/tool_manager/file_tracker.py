@@ -195,8 +195,8 @@ def track_file_edit(file_path: str, message_history=None) -> Optional[str]:
 
         efficiency_tip = (
             f"EFFICIENCY TIP: You've made multiple edits to {file_path} recently. "
-            f"For multiple changes to the same file, consider using write_file instead - "
-            f"it's more efficient as it makes fewer API requests and handles all changes at once. "
+            f"For multiple changes to the same file, pass them all in one edit_file call using the edits list, "
+            f"or use write_file - both make fewer API requests and handle all changes at once. "
             f"If this is your final edit or you only have one more small change, continue using edit_file. "
             f"If you anticipate many more changes to this file, write_file would be more efficient."
         )
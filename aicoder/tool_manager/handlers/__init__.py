@@ -6,5 +6,6 @@ from .internal_handler import InternalToolHandler
 from .command_handler import CommandToolHandler
 from .jsonrpc_handler import JsonRpcToolHandler
 from .mcp_stdio_handler import McpStdioToolHandler
+from .mcp_client import McpStdioClient, get_mcp_client
 
-__all__ = ['InternalToolHandler', 'CommandToolHandler', 'JsonRpcToolHandler', 'McpStdioToolHandler']
\ No newline at end of file
+__all__ = ['InternalToolHandler', 'CommandToolHandler', 'JsonRpcToolHandler', 'McpStdioToolHandler', 'McpStdioClient', 'get_mcp_client']
\ No newline at end of file
@@ -7,6 +7,7 @@ from typing import Dict, Any, Tuple
 
 from ...utils import emsg, colorize_diff_lines
 from ...tool_manager.approval_system import CancelAllToolCalls, DENIED_MESSAGE
+from ..metadata_commands import METADATA_COMMANDS, run_metadata_command
 
 
 class CommandToolHandler:
@@ -21,104 +22,9 @@ class CommandToolHandler:
         """Handle execution of a command tool."""
         tool_config = self._current_tool_config
         
-        # 1) Dynamic description: allow tools to supply a runtime description
-        if isinstance(tool_config, dict) and tool_config.get(
-            "tool_description_command"
-        ):
-            try:
-                if config_module.DEBUG:
-                    print(
-                        f"DEBUG: Running tool_description_command for {tool_name}"
-                    )
-                    print(f"DEBUG: Current working directory: {self.tool_registry.message_history.current_directory if hasattr(self.tool_registry.message_history, 'current_directory') else 'unknown'}")
-                desc_proc = subprocess.run(
-                    tool_config["tool_description_command"],
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=5,
-                )
-                if desc_proc.returncode == 0:
-                    desc_lines = (desc_proc.stdout or "").strip().splitlines()
-                    if desc_lines:
-                        dynamic_desc = "\n".join(desc_lines).strip()
-                        if dynamic_desc:
-                            tool_config = dict(tool_config)
-                            old_desc = tool_config.get("description", "")
-                            tool_config["description"] = dynamic_desc
-                            if config_module.DEBUG:
-                                print(
-                                    f"DEBUG: Updated description for {tool_name}"
-                                )
-                                print(f"DEBUG: Old description: {old_desc}")
-                                print(
-                                    f"DEBUG: New description length: {len(dynamic_desc)}"
-                                )
-            except subprocess.TimeoutExpired:
-                print(
-                    f"ERROR: tool_description_command for {tool_name} timed out"
-                )
-            except Exception as e:
-                print(
-                    f"ERROR: Exception in tool_description_command for {tool_name}: {e}"
-                )
-                if config_module.DEBUG:
-                    import traceback
-
-                    traceback.print_exc()
-
-        # 2) Append to system prompt if command specifies it
-        if isinstance(tool_config, dict) and tool_config.get(
-            "append_to_system_prompt_command"
-        ):
-            try:
-                if config_module.DEBUG:
-                    print(
-                        f"DEBUG: Running append_to_system_prompt_command for {tool_name}"
-                    )
-                    print(f"DEBUG: Current working directory: {self.tool_registry.message_history.current_directory if hasattr(self.tool_registry.message_history, 'current_directory') else 'unknown'}")
-                append_proc = subprocess.run(
-                    tool_config["append_to_system_prompt_command"],
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=5,
-                )
-                if append_proc.returncode == 0:
-                    append_content = (append_proc.stdout or "").strip()
-                    if append_content:
-                        # Augment the system prompt
-                        if (
-                            self.tool_registry.message_history
-                            and hasattr(
-                                self.tool_registry.message_history, "messages"
-                            )
-                            and self.tool_registry.message_history.messages
-                        ):
-                            self.tool_registry.message_history.messages[0][
-                                "content"
-                            ] += f"\n\n{append_content}"
-                else:
-                    print(
-                        f"WARNING: append_to_system_prompt_command failed for {tool_name} with return code {append_proc.returncode}"
-                    )
-                    if config_module.DEBUG:
-                        print(f"DEBUG: stderr: {append_proc.stderr}")
-                        print(f"DEBUG: stdout: {append_proc.stdout}")
-            except subprocess.TimeoutExpired:
-                print(
-                    f"ERROR: append_to_system_prompt_command for {tool_name} timed out"
-                )
-            except Exception as e:
-                print(
-                    f"ERROR: Exception in append_to_system_prompt_command for {tool_name}: {e}"
-                )
-                if config_module.DEBUG:
-                    import traceback
-
-                    traceback.print_exc()
+        # Tools opting in refresh their description and system prompt text per call
+        if isinstance(tool_config, dict) and tool_config.get("metadata_refresh_on_call"):
+            tool_config = self._refresh_tool_metadata(tool_name, tool_config, config_module)
 
         try:
             # Handle approval
@@ -257,6 +163,37 @@ class CommandToolHandler:
         # in the refactored version. For now, return None to maintain compatibility.
         return None
 
+    def _refresh_tool_metadata(
+        self, tool_name: str, tool_config: Dict[str, Any], config_module
+    ) -> Dict[str, Any]:
+        """
+        Re-run (or reuse the cached output of) a tool's description and system
+        prompt commands. Returns the tool config with the current description.
+        """
+        for kind in METADATA_COMMANDS:
+            if not tool_config.get(kind):
+                continue
+            if config_module.DEBUG:
+                print(f"DEBUG: Running {kind} for {tool_name}")
+            result = run_metadata_command(tool_config, kind)
+            if result.output is None:
+                print(f"WARNING: {kind} for {tool_name} {result.error}")
+                if config_module.DEBUG:
+                    print(f"DEBUG: stderr: {result.stderr}")
+                    print(f"DEBUG: stdout: {result.stdout}")
+                continue
+            if not result.output:
+                continue
+            if kind == "tool_description_command":
+                if result.output != tool_config.get("description"):
+                    if config_module.DEBUG:
+                        print(f"DEBUG: Updated description for {tool_name}")
+                    tool_config = dict(tool_config, description=result.output)
+                    self.tool_registry.update_tool_description(tool_name, result.output)
+            else:
+                self.tool_registry.append_to_system_prompt(tool_name, result.output)
+        return tool_config
+
     def _prepare_tool_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize and validate arguments for tool execution.
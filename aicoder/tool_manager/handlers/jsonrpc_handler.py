@@ -2,11 +2,15 @@
 Handler for JSON-RPC tools in AI Coder.
 """
 
-import urllib.request
 import json
-from typing import Dict, Any, Tuple
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
 
+from ... import config
 from ...tool_manager.approval_system import CancelAllToolCalls, DENIED_MESSAGE
+from ...tool_manager.validator import validate_tool_parameters
+from .jsonrpc_transport import get_jsonrpc_transport
 
 
 class JsonRpcToolHandler:
@@ -16,6 +20,72 @@ class JsonRpcToolHandler:
         self.tool_registry = tool_registry
         self.stats = stats
         self.approval_system = approval_system
+        # Futures for calls sent by start_batched_calls, keyed by _call_key
+        self._started_calls = {}
+
+    @staticmethod
+    def _call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True)}"
+
+    def start_batched_calls(self, calls: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Send a turn's calls to the same JSON-RPC URL as one batch request.
+
+        Like McpStdioToolHandler.start_parallel_calls, this only happens when
+        every call in the turn is an auto-approved JSON-RPC call, so no
+        approval prompt (or Cancel all) can come between sending and
+        handling, and only when every call's arguments match its schema. The batch runs in the background; handle() collects each
+        call's response in order.
+        """
+        by_url = {}
+        for tool_name, arguments in calls:
+            tool_config = self.tool_registry.mcp_tools.get(tool_name)
+            if not isinstance(tool_config, dict) or tool_config.get("type") != "jsonrpc":
+                return
+            if not (tool_config.get("auto_approved", False) or config.YOLO_MODE):
+                return
+            if not isinstance(arguments, dict) or "url" not in tool_config or "method" not in tool_config:
+                return
+            if not validate_tool_parameters(tool_name, tool_config, arguments)[0]:
+                return
+            by_url.setdefault(tool_config["url"], []).append((tool_name, arguments, tool_config))
+
+        for url, group in by_url.items():
+            if len(group) < 2:
+                continue
+            futures = [Future() for _ in group]
+            for (tool_name, arguments, _), future in zip(group, futures):
+                self._started_calls.setdefault(self._call_key(tool_name, arguments), []).append(future)
+            timeouts = [tool_config.get("timeout") for _, _, tool_config in group]
+            timeout = max((t for t in timeouts if t), default=None)
+            batch = [(tool_config["method"], arguments) for _, arguments, tool_config in group]
+            threading.Thread(
+                target=self._run_batch,
+                args=(url, batch, timeout, futures),
+                name="jsonrpc-batch",
+                daemon=True,
+            ).start()
+
+    @staticmethod
+    def _run_batch(url, batch, timeout, futures):
+        try:
+            replies = get_jsonrpc_transport().call_batch(url, batch, timeout=timeout)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, reply in zip(futures, replies):
+            future.set_result(reply)
+
+    def clear_batched_calls(self):
+        """Drop batched calls that were never handled (e.g. after Cancel all)."""
+        self._started_calls.clear()
+
+    def _take_started_call(self, tool_name: str, arguments: Dict[str, Any]):
+        started = self._started_calls.get(self._call_key(tool_name, arguments))
+        if started:
+            return started.pop(0)
+        return None
 
     def handle(self, tool_name: str, arguments: Dict[str, Any], config_module) -> Tuple[str, Dict[str, Any], bool]:
         """Handle execution of a JSON-RPC tool."""
@@ -52,44 +122,33 @@ class JsonRpcToolHandler:
 
             url = tool_config["url"]
             method = tool_config["method"]
-            payload = {
-                "jsonrpc": "2.0",
-                "method": method,
-                "params": arguments,
-                "id": 1,
-            }
-            print(f"   - Executing JSON-RPC call to {url} with method {method}")
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(payload).encode("utf-8"),
-                headers={"Content-Type": "application/json"},
-                method="POST",
-            )
-            with urllib.request.urlopen(req) as response:
-                response_data = response.read()
-                # Handle the case where response_data might be a mock object
-                if hasattr(response_data, 'decode'):
-                    decoded_data = response_data.decode("utf-8")
-                else:
-                    decoded_data = str(response_data)
-                
-                rpc_result = json.loads(decoded_data)
-                if "error" in rpc_result:
-                    self.stats.tool_errors += 1
-                    return (
-                        json.dumps(rpc_result["error"]),
-                        tool_config,
-                        False,
-                    )
-                result = json.dumps(rpc_result.get("result"))
+            # Collect the result of a batch start_batched_calls sent, if any
+            started = self._take_started_call(tool_name, arguments)
+            if started:
+                print(f"   - Collecting batched JSON-RPC call to {url} with method {method}")
+                rpc_result = started.result()
+            else:
+                print(f"   - Executing JSON-RPC call to {url} with method {method}")
+                rpc_result = get_jsonrpc_transport().call(
+                    url, method, arguments, timeout=tool_config.get("timeout")
+                )
 
-                # Handle guidance prompt after successful execution
-                if not auto_approved and not config_module.YOLO_MODE and with_guidance:
-                    self._handle_guidance_prompt(
-                        with_guidance
-                    )
+            if "error" in rpc_result:
+                self.stats.tool_errors += 1
+                return (
+                    json.dumps(rpc_result["error"]),
+                    tool_config,
+                    False,
+                )
+            result = json.dumps(rpc_result.get("result"))
+
+            # Handle guidance prompt after successful execution
+            if not auto_approved and not config_module.YOLO_MODE and with_guidance:
+                self._handle_guidance_prompt(
+                    with_guidance
+                )
 
-                return result, tool_config, show_main_prompt
+            return result, tool_config, show_main_prompt
         except json.JSONDecodeError as e:
             self.stats.tool_errors += 1
             return f"Error executing JSON-RPC tool '{tool_name}': {e}", tool_config, False
@@ -0,0 +1,162 @@
+"""
+HTTP transport for JSON-RPC tools.
+
+Connections are kept alive and reused per endpoint (scheme, host and port),
+every request gets a unique id and a timeout, and several calls to the same
+URL can be sent as one JSON-RPC 2.0 batch.
+"""
+
+import http.client
+import itertools
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ... import config
+
+# Errors meaning a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+# JSON-RPC error code used when a batch response lacks an entry for a call
+INTERNAL_ERROR = -32603
+
+
+class JsonRpcTransport:
+    """Pooled keep-alive JSON-RPC client."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._idle = {}  # (scheme, netloc) -> idle connections
+        self._lock = threading.Lock()
+
+    def _take_connection(self, scheme: str, netloc: str, timeout: float):
+        """Reuse an idle connection to the endpoint, or open a new one."""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout), False
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    def _release_connection(self, scheme: str, netloc: str, connection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def _post(self, url: str, body: bytes, timeout: float) -> bytes:
+        """POST a JSON body and return the response body."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported JSON-RPC URL scheme: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        while True:
+            connection, reused = self._take_connection(parts.scheme, parts.netloc, timeout)
+            try:
+                connection.request("POST", path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    # The server dropped the idle connection; retry on a fresh one
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release_connection(parts.scheme, parts.netloc, connection)
+
+        if response.status >= 400 and not data.strip():
+            raise Exception(f"HTTP Error {response.status}: {response.reason}")
+        return data
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        return float(timeout) if timeout else config.JSONRPC_TIMEOUT
+
+    def call(
+        self,
+        url: str,
+        method: str,
+        params: Any = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Make one call and return the response object."""
+        payload = {"jsonrpc": "2.0", "method": method, "params": params, "id": next(self._ids)}
+        data = self._post(url, json.dumps(payload).encode("utf-8"), self._timeout(timeout))
+        return json.loads(data.decode("utf-8"))
+
+    def call_batch(
+        self,
+        url: str,
+        calls: List[Tuple[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Send (method, params) calls as one batch request.
+
+        Returns the response objects in the order of calls. Calls the server
+        did not answer get an error response.
+        """
+        payload = []
+        for method, params in calls:
+            payload.append(
+                {"jsonrpc": "2.0", "method": method, "params": params, "id": next(self._ids)}
+            )
+        data = self._post(url, json.dumps(payload).encode("utf-8"), self._timeout(timeout))
+        replies = json.loads(data.decode("utf-8"))
+        if isinstance(replies, dict):
+            # Servers without batch support answer with a single error object
+            if "error" in replies:
+                raise Exception(f"Batch request rejected: {json.dumps(replies['error'])}")
+            replies = [replies]
+
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        results = []
+        for request in payload:
+            results.append(
+                by_id.get(request["id"])
+                or {
+                    "jsonrpc": "2.0",
+                    "id": request["id"],
+                    "error": {"code": INTERNAL_ERROR, "message": "No response in batch"},
+                }
+            )
+        return results
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+_transport = None
+
+
+def get_jsonrpc_transport() -> JsonRpcTransport:
+    """Get the shared JSON-RPC transport."""
+    global _transport
+    if _transport is None:
+        _transport = JsonRpcTransport()
+    return _transport
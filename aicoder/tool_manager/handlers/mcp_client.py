@@ -0,0 +1,217 @@
+"""
+JSON-RPC client for MCP stdio servers.
+
+One reader thread per server owns the server's stdout. Responses are matched
+to pending requests by id and delivered through futures, so several requests
+to the same server can be in flight at once and replies may arrive in any
+order. Server notifications, server-to-client requests (such as ping) and
+non-JSON lines on stdout are handled without disturbing pending calls.
+"""
+
+import itertools
+import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+from ... import config
+
+# JSON-RPC error code for server requests the client does not implement
+METHOD_NOT_FOUND = -32601
+
+
+class McpStdioClient:
+    """Multiplexed JSON-RPC connection to one MCP stdio server process."""
+
+    def __init__(self, process, name: str = ""):
+        self.process = process
+        self.name = name
+        self.tools_changed = False
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._error = None
+        self._reader = threading.Thread(
+            target=self._read_loop, name=f"mcp-reader-{name}", daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def closed(self) -> bool:
+        """True once the server's output has ended or failed."""
+        return self._error is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of requests still waiting for a response."""
+        return len(self._pending)
+
+    def _write(self, message: Dict[str, Any]):
+        data = json.dumps(message) + "\n"
+        with self._write_lock:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+
+    def request_async(self, method: str, params: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Send a request and return a future for the response message.
+
+        The future's result is the full JSON-RPC response (with either
+        "result" or "error"); it fails if the server goes away first.
+        """
+        request_id = next(self._ids)
+        future = Future()
+        future.request_id = request_id
+        with self._lock:
+            if self._error is not None:
+                future.set_exception(self._error)
+                return future
+            self._pending[request_id] = future
+
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            self._write(message)
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            if not future.done():
+                future.set_exception(e)
+        return future
+
+    def wait(self, future: Future, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for a request_async() future, cancelling the request on timeout."""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            request_id = getattr(future, "request_id", None)
+            with self._lock:
+                self._pending.pop(request_id, None)
+            try:
+                self.notify(
+                    "notifications/cancelled",
+                    {"requestId": request_id, "reason": "timeout"},
+                )
+            except Exception:
+                pass
+            raise TimeoutError(
+                f"MCP server '{self.name}' did not respond within {timeout} seconds"
+            )
+
+    def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Send a request and wait for its response message."""
+        return self.wait(self.request_async(method, params), timeout)
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a notification (no response expected)."""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self._write(message)
+
+    def _read_loop(self):
+        """Reader thread body: dispatch every line the server writes."""
+        error = None
+        try:
+            while True:
+                line = self.process.stdout.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    # Servers sometimes log to stdout; don't let it break the stream
+                    if config.DEBUG:
+                        print(f"DEBUG: MCP {self.name}: ignoring non-JSON output: {line[:200]}")
+                    continue
+                for item in message if isinstance(message, list) else [message]:
+                    if isinstance(item, dict):
+                        self._dispatch(item)
+        except Exception as e:
+            error = e
+        self._fail_pending(
+            error or ConnectionError(f"MCP server '{self.name}' closed its output")
+        )
+
+    def _dispatch(self, message: Dict[str, Any]):
+        """Route one incoming message."""
+        if "method" not in message:
+            with self._lock:
+                future = self._pending.pop(message.get("id"), None)
+            if future is not None:
+                future.set_result(message)
+            elif config.DEBUG:
+                print(f"DEBUG: MCP {self.name}: response for unknown request {message.get('id')}")
+            return
+
+        if "id" in message:
+            self._answer_server_request(message)
+        else:
+            self._handle_notification(message)
+
+    def _answer_server_request(self, message: Dict[str, Any]):
+        """Reply to a request the server sent us."""
+        if message["method"] == "ping":
+            reply = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {
+                    "code": METHOD_NOT_FOUND,
+                    "message": f"Method not supported: {message['method']}",
+                },
+            }
+        try:
+            self._write(reply)
+        except Exception:
+            pass
+
+    def _handle_notification(self, message: Dict[str, Any]):
+        """Handle a notification from the server."""
+        method = message["method"]
+        if method == "notifications/tools/list_changed":
+            self.tools_changed = True
+        if config.DEBUG:
+            params = json.dumps(message.get("params", {}))[:200]
+            print(f"DEBUG: MCP {self.name}: {method} {params}")
+
+    def _fail_pending(self, error: Exception):
+        """Mark the connection dead and fail every pending request."""
+        with self._lock:
+            self._error = error
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        """Forget the client; pending requests fail once the process exits."""
+        with _clients_lock:
+            if _clients.get(self.process) is self:
+                del _clients[self.process]
+
+
+# Clients keyed by server process (created on first use)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_mcp_client(process, name: str = "") -> McpStdioClient:
+    """Get the client that owns a server process's stdout, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(process)
+        if client is None:
+            client = McpStdioClient(process, name)
+            _clients[process] = client
+        return client
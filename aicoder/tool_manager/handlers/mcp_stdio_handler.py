@@ -3,9 +3,13 @@ Handler for MCP stdio tools in AI Coder.
 """
 
 import json
-from typing import Dict, Any, Tuple
+import time
+from typing import Dict, Any, List, Tuple
 
+from ... import config
 from ...tool_manager.approval_system import CancelAllToolCalls, DENIED_MESSAGE
+from ...tool_manager.validator import validate_tool_parameters
+from .mcp_client import get_mcp_client
 
 
 class McpStdioToolHandler:
@@ -15,54 +19,115 @@ class McpStdioToolHandler:
         self.tool_registry = tool_registry
         self.stats = stats
         self.approval_system = approval_system
+        # Calls already sent by start_parallel_calls, keyed by _call_key
+        self._started_calls = {}
 
-    def handle(self, tool_name: str, arguments: Dict[str, Any], config_module) -> Tuple[str, Dict[str, Any], bool]:
-        """Handle execution of an MCP stdio tool."""
-        # Get tool configuration from the registry
+    @staticmethod
+    def _call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True)}"
+
+    def _resolve(self, tool_name: str):
+        """Find (tool_config, server_name) for an MCP tool, or (None, None)."""
         tool_config = self.tool_registry.mcp_tools.get(tool_name)
-        server_name = None  # Initialize server_name
-        
+        server_name = None
+
         if not tool_config:
-            # If direct lookup fails, check if it's a tool from an MCP server
             # Find which server this tool belongs to
-            for name, config in self.tool_registry.mcp_tools.items():
-                if config.get("type") == "mcp-stdio":
-                    # Check if this server has been discovered and contains this tool
-                    if name in self.tool_registry.mcp_servers:
-                        _, server_tools = self.tool_registry.mcp_servers[name]
-                        if tool_name in server_tools:
-                            server_name = name
-                            # Use the individual tool's config from the server, not the server config
-                            tool_config = dict(server_tools[tool_name])  # Make a copy to avoid modifying original
-                            tool_config["server"] = name
-                            tool_config["type"] = "mcp-stdio"  # Ensure type is set
-                            break
-            
+            # Check discovered servers, and cached tools of servers still starting
+            for name, server_tools in self.tool_registry.known_mcp_server_tools():
+                if tool_name in server_tools:
+                    server_name = name
+                    # Use the individual tool's config from the server, not the server config
+                    tool_config = dict(server_tools[tool_name])  # Make a copy to avoid modifying original
+                    tool_config["server"] = name
+                    tool_config["type"] = "mcp-stdio"  # Ensure type is set
+                    break
             if not tool_config:
-                raise Exception(f"MCP tool '{tool_name}' not found in configuration")
+                return None, None
         else:
-            # Direct lookup succeeded, get server name from config
             server_name = tool_config.get("server")
 
         # Use the tool name as server name if not specified in config
-        server_name = server_name or tool_name
+        return tool_config, server_name or tool_name
+
+    def start_parallel_calls(self, calls: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Send MCP calls that need no approval before they are handled one by one.
+
+        The executor handles tool calls in order; sending them up front lets
+        several calls to the same server run concurrently. handle() then
+        picks up the already-running call instead of sending it. This only
+        happens when every call is an auto-approved MCP call, so no approval
+        prompt (or Cancel all) can come between sending and handling, and
+        only when every call's arguments match its schema.
+        """
+        ready = []
+        for tool_name, arguments in calls:
+            try:
+                tool_config, server_name = self._resolve(tool_name)
+            except Exception:
+                return
+            if not isinstance(tool_config, dict) or tool_config.get("type") != "mcp-stdio":
+                return
+            if not (tool_config.get("auto_approved", False) or config.YOLO_MODE):
+                return
+            if server_name not in self.tool_registry.mcp_servers:
+                return
+            if not validate_tool_parameters(tool_name, tool_config, arguments)[0]:
+                return
+            ready.append((tool_name, arguments, server_name))
+
+        if len(ready) < 2:
+            return
+        for tool_name, arguments, server_name in ready:
+            process, _ = self.tool_registry.mcp_servers[server_name]
+            client = get_mcp_client(process, server_name)
+            future = client.request_async(
+                "tools/call", {"name": tool_name, "arguments": arguments}
+            )
+            key = self._call_key(tool_name, arguments)
+            self._started_calls.setdefault(key, []).append((client, future))
+
+    def clear_parallel_calls(self):
+        """Drop started calls that were never handled (e.g. after Cancel all)."""
+        self._started_calls.clear()
+
+    def _take_started_call(self, tool_name: str, arguments: Dict[str, Any]):
+        started = self._started_calls.get(self._call_key(tool_name, arguments))
+        if started:
+            return started.pop(0)
+        return None
+
+    def _live_client(self, server_name: str):
+        """
+        Client for a running server, (re)starting it if it was stopped for
+        being idle or has exited since it was last used.
+        """
+        registry = self.tool_registry
+        entry = registry.mcp_servers.get(server_name)
+        if entry is not None and get_mcp_client(entry[0], server_name).closed:
+            registry.report_mcp_failure(server_name, entry[0], "server exited")
+        if server_name not in registry.mcp_servers:
+            registry._discover_mcp_server_tools(server_name)
+        if server_name not in registry.mcp_servers:
+            raise Exception(f"MCP server {server_name} not available")
+        process, _ = registry.mcp_servers[server_name]
+        return get_mcp_client(process, server_name)
+
+    def handle(self, tool_name: str, arguments: Dict[str, Any], config_module) -> Tuple[str, Dict[str, Any], bool]:
+        """Handle execution of an MCP stdio tool."""
+        tool_config, server_name = self._resolve(tool_name)
+        if not tool_config:
+            raise Exception(f"MCP tool '{tool_name}' not found in configuration")
+
         if server_name not in self.tool_registry.mcp_servers:
-            # Discover tools if server not yet initialized
+            # Discover tools if server not yet initialized (lazy servers start here)
             self.tool_registry._discover_mcp_server_tools(server_name)
 
         if server_name not in self.tool_registry.mcp_servers:
             raise Exception(f"MCP server {server_name} not available")
 
-        process, _ = self.tool_registry.mcp_servers[server_name]
-
-        def send_request(request_data):
-            js = json.dumps(request_data) + "\n"
-            process.stdin.write(js)
-            process.stdin.flush()
-            if request_data.get("id") is not None:
-                response_line = process.stdout.readline()
-                return json.loads(response_line)
-            return None
+        self.tool_registry.touch_mcp_server(server_name)
 
         try:
             # Handle approval
@@ -90,15 +155,35 @@ class McpStdioToolHandler:
             # Determine if guidance was requested for successful execution
             show_main_prompt = with_guidance
 
-            # Execute tool call
-            tool_call_request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {"name": tool_name, "arguments": arguments},
-            }
-
-            response = send_request(tool_call_request)
+            # Execute tool call (or collect the one start_parallel_calls sent)
+            started = self._take_started_call(tool_name, arguments)
+            if started:
+                client, future = started
+            else:
+                client = self._live_client(server_name)
+                future = client.request_async(
+                    "tools/call", {"name": tool_name, "arguments": arguments}
+                )
+            call_start = time.monotonic()
+            response = None
+            try:
+                response = client.wait(future, timeout=config.MCP_TOOL_CALL_TIMEOUT)
+            except ConnectionError as e:
+                # The server died during the call; the supervisor restarts it
+                self.tool_registry.report_mcp_failure(
+                    server_name, client.process, f"server exited during a call: {e}"
+                )
+                raise Exception(
+                    f"MCP server {server_name} exited while running the tool. "
+                    f"It will be restarted; the call was not retried"
+                )
+            finally:
+                self.tool_registry.touch_mcp_server(server_name)
+                self.tool_registry.record_mcp_call(
+                    server_name,
+                    time.monotonic() - call_start,
+                    bool(response) and "result" in response,
+                )
 
             if not response or "result" not in response:
                 raise Exception(f"Tool call failed: {response}")
@@ -3,15 +3,16 @@ Edit file internal tool implementation.
 """
 
 import os
-import difflib
-from typing import Dict, Any, List
+import shutil
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
 from ..file_tracker import record_file_read, check_file_modification_strict
 TOOL_DEFINITION = {
     "type": "internal",
     "auto_approved": False,
     "approval_excludes_arguments": True,
-    "approval_key_exclude_arguments": ["old_string", "new_string"],
-    "hidden_parameters": ["old_string", "new_string"],
+    "approval_key_exclude_arguments": ["old_string", "new_string", "edits"],
+    "hidden_parameters": ["old_string", "new_string", "edits"],
     "available_in_plan_mode": False,
     "description": """Efficiently edit files by replacing exact text matches.
 
@@ -24,6 +25,15 @@ COMMON OPERATIONS:
 - Replace text: Provide both old_string and new_string
 - Delete text: new_string = "" (empty string)
 - Add text: old_string = "" with existing file path
+- Several changes to one file: pass edits = [{old_string, new_string}, ...]
+  instead of old_string/new_string
+
+MULTIPLE EDITS:
+- Every edits[i].old_string is matched against the file as it is now
+  (not against the result of earlier edits), must be unique and must not
+  overlap another edit
+- All edits are applied together and shown as one diff; if any edit
+  fails, none are applied
 
 UNIQUE MATCHING:
 - If old_string appears multiple times, operation fails
@@ -49,8 +59,26 @@ PERFORMANCE NOTE:
                 "type": "string",
                 "description": "New text to replace old_string with",
             },
+            "edits": {
+                "type": "array",
+                "description": "List of replacements to apply in one call, used instead of old_string/new_string",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "old_string": {
+                            "type": "string",
+                            "description": "Text to replace (must match file content exactly)",
+                        },
+                        "new_string": {
+                            "type": "string",
+                            "description": "New text to replace old_string with",
+                        },
+                    },
+                    "required": ["old_string", "new_string"],
+                },
+            },
         },
-        "required": ["path", "old_string", "new_string"],
+        "required": ["path"],
     },
     "validate_function": "validate_edit_file",
 }
@@ -58,16 +86,9 @@ PERFORMANCE NOTE:
 
 def generate_diff(old_content: str, new_content: str, path: str) -> str:
     """Generate a unified diff between old and new content."""
-    old_lines = old_content.splitlines(keepends=True)
-    new_lines = new_content.splitlines(keepends=True)
-
-    diff = difflib.unified_diff(
-        old_lines, new_lines, fromfile=f"{path} (old)", tofile=f"{path} (new)"
-    )
+    from ...diff_engine import unified_diff
 
-    # Convert generator to list and join properly
-    diff_lines = list(diff)
-    return "".join(diff_lines)
+    return unified_diff(old_content, new_content, path)
 
 
 def count_occurrences(content: str, substring: str) -> int:
@@ -100,11 +121,132 @@ def generate_not_found_suggestion(content: str, old_string: str, path: str) -> s
     return f"Use read_file('{path}') to see current content and ensure old_string matches exactly."
 
 
+def build_edit_list(
+    old_string: Optional[str] = None,
+    new_string: Optional[str] = None,
+    edits: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[List[Tuple[str, str]], str]:
+    """
+    Turn the tool arguments into a list of (old_string, new_string) pairs.
+
+    Returns:
+        Tuple of (edit list, error message); the error message is empty on success
+    """
+    if edits is None:
+        if old_string is None or new_string is None:
+            return [], "Error: Provide old_string and new_string, or a list of edits."
+        return [(old_string, new_string)], ""
+
+    if old_string is not None or new_string is not None:
+        return [], "Error: Provide either old_string/new_string or edits, not both."
+    if not isinstance(edits, list) or not edits:
+        return [], "Error: edits must be a non-empty list of {old_string, new_string} objects."
+
+    edit_list = []
+    for i, edit in enumerate(edits):
+        if not isinstance(edit, dict):
+            return [], f"Error: edits[{i}] must be an object with old_string and new_string."
+        old, new = edit.get("old_string"), edit.get("new_string")
+        if not isinstance(old, str) or not isinstance(new, str):
+            return [], f"Error: edits[{i}] must have string old_string and new_string."
+        if old == "":
+            return [], f"Error: edits[{i}].old_string is empty. Use a single old_string = \"\" edit to create a file."
+        edit_list.append((old, new))
+    return edit_list, ""
+
+
+def locate_edits(
+    content: str, edit_list: List[Tuple[str, str]], path: str = ""
+) -> Tuple[List[Tuple[int, int, str]], str]:
+    """
+    Find where each edit applies in content.
+
+    Every old_string is located in the original content, so edits never see
+    each other's results. All edits are checked before any is applied.
+
+    Returns:
+        Tuple of (sorted (start, end, new_string) spans, error message); the
+        error message is empty on success
+    """
+    multiple = len(edit_list) > 1
+    matches = []
+    for i, (old_string, new_string) in enumerate(edit_list):
+        name = f"edits[{i}].old_string" if multiple else "old_string"
+
+        start = content.find(old_string)
+        if start == -1:
+            suggestion = generate_not_found_suggestion(content, old_string, path)
+            return [], f"Error: {name} not found in file. {suggestion}"
+
+        occurrences = count_occurrences(content, old_string)
+        if occurrences > 1:
+            return [], f"Error: {name} appears {occurrences} times in file. Please provide more context to make it unique."
+
+        if old_string == new_string:
+            if multiple:
+                return [], f"Error: edits[{i}].new_string is the same as old_string. Remove this edit."
+            return [], "Error: new_string is the same as old_string. No changes needed."
+
+        matches.append((start, start + len(old_string), new_string, i))
+
+    matches.sort()
+    for previous, current in zip(matches, matches[1:]):
+        if current[0] < previous[1]:
+            first, second = sorted((previous[3], current[3]))
+            return [], f"Error: edits[{first}] and edits[{second}] overlap. Combine them into one edit."
+
+    return [(start, end, new_string) for start, end, new_string, _ in matches], ""
+
+
+def apply_edits(
+    content: str, edit_list: List[Tuple[str, str]], path: str = ""
+) -> Tuple[str, str]:
+    """
+    Apply all edits to content in a single pass.
+
+    Returns:
+        Tuple of (new content, error message); the error message is empty on success
+    """
+    spans, error = locate_edits(content, edit_list, path)
+    if error:
+        return content, error
+
+    parts = []
+    position = 0
+    for start, end, new_string in spans:
+        parts.append(content[position:start])
+        parts.append(new_string)
+        position = end
+    parts.append(content[position:])
+    return "".join(parts), ""
+
+
+def _write_atomic(path: str, content: str):
+    """Write content to path via a temp file and rename, keeping the file mode."""
+    target = os.path.realpath(path)
+    directory = os.path.dirname(target)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def execute_edit_file(
     path: str,
-    old_string: str,
-    new_string: str,
+    old_string: str = None,
+    new_string: str = None,
     stats=None,
+    edits: List[Dict[str, Any]] = None,
 ) -> str:
     """
     Edit a file.
@@ -114,6 +256,8 @@ def execute_edit_file(
         old_string: Text to be replaced (must be unique)
         new_string: Replacement text
         stats: Stats object to track tool usage
+        edits: List of {old_string, new_string} replacements, used instead
+            of old_string/new_string
 
     Returns:
         String with results of the operation
@@ -122,12 +266,16 @@ def execute_edit_file(
         # Convert to absolute path
         path = os.path.abspath(path)
 
+        edit_list, error = build_edit_list(old_string, new_string, edits)
+        if error:
+            return error
+
         # Handle file creation (when old_string is empty)
-        if old_string == "":
+        if edits is None and old_string == "":
             return _create_file(path, new_string, stats)
 
         # Handle content replacement (including deletion when new_string is empty)
-        return _replace_content(path, old_string, new_string, stats)
+        return _replace_content(path, edit_list, stats)
 
     except Exception as e:
         if stats:
@@ -166,8 +314,7 @@ def _create_file(path: str, content: str, stats) -> str:
 
 def _replace_content(
     path: str,
-    old_string: str,
-    new_string: str,
+    edit_list: List[Tuple[str, str]],
     stats,
 ) -> str:
     """Replace content in existing file."""
@@ -189,31 +336,19 @@ def _replace_content(
         with open(path, "r", encoding="utf-8") as f:
             content = f.read()
 
-        # Check if old_string exists
-        if old_string not in content:
-            suggestion = generate_not_found_suggestion(content, old_string, path)
-            return f"Error: old_string not found in file. {suggestion}"
-
-        # Check for multiple matches
-        occurrences = count_occurrences(content, old_string)
-        if occurrences > 1:
-            positions = get_occurrence_positions(content, old_string)
-            return f"Error: old_string appears {occurrences} times in file. Please provide more context to make it unique."
-
-        # Check if content is actually changing
-        if old_string == new_string:
-            return "Error: new_string is the same as old_string. No changes needed."
-
-        # Perform replacement
-        new_content = content.replace(old_string, new_string)
+        # Check every edit against this snapshot and apply them together
+        new_content, error = apply_edits(content, edit_list, path)
+        if error:
+            return error
 
         # Write back to file
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        _write_atomic(path, new_content)
 
         # Record file operations
         record_file_read(path)
 
+        if len(edit_list) > 1:
+            return f"Successfully updated '{path}' ({len(new_content)} characters, {len(edit_list)} edits)"
         return f"Successfully updated '{path}' ({len(new_content)} characters)"
 
     except Exception as e:
@@ -224,11 +359,19 @@ def validate_edit_file(arguments: Dict[str, Any]) -> str | bool:
     """Pre-validation."""
     try:
         path = arguments.get("path", "")
-        old_string = arguments.get("old_string", "")
-        new_string = arguments.get("new_string", "")
+        edits = arguments.get("edits")
+        old_string = arguments.get("old_string")
+        new_string = arguments.get("new_string")
+        if edits is None:
+            old_string = old_string if old_string is not None else ""
+            new_string = new_string if new_string is not None else ""
+
+        edit_list, error = build_edit_list(old_string, new_string, edits)
+        if error:
+            return error
 
         # Handle file creation (when old_string is empty)
-        if old_string == "":
+        if edits is None and old_string == "":
             # For file creation, just check if file already exists
             if os.path.exists(path) and os.path.isdir(path):
                 return f"Error: Path is a directory, not a file: {path}"
@@ -255,19 +398,10 @@ def validate_edit_file(arguments: Dict[str, Any]) -> str | bool:
         except Exception as e:
             return f"Error reading file '{path}': {e}"
 
-        # Check if old_string exists
-        if old_string not in content:
-            suggestion = generate_not_found_suggestion(content, old_string, path)
-            return f"Error: old_string not found in file. {suggestion}"
-
-        # Check if old_string is unique
-        occurrences = count_occurrences(content, old_string)
-        if occurrences > 1:
-            return f"Error: old_string appears {occurrences} times in file. Please provide more context to make it unique."
-
-        # Check if content is actually changing
-        if old_string == new_string:
-            return "Error: new_string is the same as old_string. No changes needed."
+        # Check every edit against the same snapshot the tool will use
+        _, error = apply_edits(content, edit_list, path)
+        if error:
+            return error
 
         return True
 
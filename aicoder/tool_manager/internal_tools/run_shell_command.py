@@ -7,6 +7,10 @@ import os
 import shlex
 import re
 import signal
+import sys
+
+from ... import config
+from ..shell_capture import capture_process_output
 
 # Get default timeout from environment variable, fallback to 30 if not set
 DEFAULT_TIMEOUT_SECS = int(os.environ.get("SHELL_COMMAND_TIMEOUT", 30))
@@ -273,6 +277,74 @@ def get_dynamic_tool_config(base_config: dict, arguments: dict) -> dict:
     return base_config
 
 
+def _live_output_enabled() -> bool:
+    """Live output display is only useful when a user is watching a terminal."""
+    return config.SHELL_LIVE_OUTPUT and sys.stdout.isatty()
+
+
+def _format_command_output(return_code, stdout_capture, stderr_capture) -> str:
+    """Format captured output - only include return code, stdout, and stderr."""
+    output = f"Return code: {return_code}\n" if return_code is not None else ""
+    stdout = stdout_capture.text()
+    stderr = stderr_capture.text()
+    if stdout:
+        output += f"Stdout: {stdout}\n"
+    if stderr:
+        output += f"Stderr: {stderr}\n"
+
+    # Tell the AI when output was cut down and where to find the rest
+    for capture in (stdout_capture, stderr_capture):
+        if capture.truncated:
+            output += f"{capture.summary()}\n"
+
+    return output
+
+
+def _timeout_message(command: str, timeout) -> str:
+    """Error returned to the AI when a command hits its timeout."""
+    return f"Error: Command '{command}' timed out after {timeout} seconds.\nTo retry with a longer timeout, use: run_shell_command(command=\"{command}\", timeout=60)"
+
+
+def _execute_in_session(command: str, stats, timeout) -> str:
+    """Run a command in the persistent shell session."""
+    from ..shell_session import get_shell_session
+
+    session = get_shell_session()
+
+    def reader(on_output, stop_event):
+        return session.run(command, timeout, on_output=on_output, stop_event=stop_event)
+
+    cancelled = False
+    if _live_output_enabled():
+        from ..shell_live import LiveOutputPump
+
+        stdout_capture, stderr_capture, timed_out, cancelled = LiveOutputPump(
+            None, timeout, reader=reader, on_cancel=session.interrupt
+        ).run()
+    else:
+        stdout_capture, stderr_capture, timed_out = reader(None, None)
+
+    # Let the AI know that earlier cd/export/activate state is gone
+    reset_note = ""
+    if session.was_reset:
+        reset_note = f"[Shell session was restarted - environment changes from earlier commands were lost. Working directory: {session.cwd}]\n"
+
+    if cancelled:
+        return (
+            f"Error: Command '{command}' was cancelled by the user (ESC).\n"
+            + _format_command_output(None, stdout_capture, stderr_capture)
+            + reset_note
+        )
+    if timed_out:
+        stats.tool_errors += 1
+        return _timeout_message(command, timeout) + "\n" + reset_note
+
+    return (
+        _format_command_output(session.last_return_code, stdout_capture, stderr_capture)
+        + reset_note
+    )
+
+
 def execute_run_shell_command(
     command: str,
     stats,
@@ -294,24 +366,46 @@ def execute_run_shell_command(
         # Handle None timeout - use default
         if timeout is None:
             timeout = DEFAULT_TIMEOUT_SECS
-            
+
+        if config.SHELL_PERSISTENT_SESSION:
+            # Opt-in: keep cwd/env between commands in one long-lived bash
+            return _execute_in_session(command, stats, timeout)
+
         # Use timeout command at the beginning to ensure system-level timeout enforcement
         # Add --kill-after=5 to send KILL signal if process doesn't terminate after SIGTERM
         shell_cmd = ["timeout", "--kill-after=5", str(timeout), "bash", "-c", command]
 
         # Use Popen to have more control over the process
+        # Pipes are read as bytes so output can be captured incrementally
         process = subprocess.Popen(
             shell_cmd,
+            stdin=subprocess.DEVNULL,  # Commands never read our stdin (the headless protocol)
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
             preexec_fn=os.setsid,  # Create a new process group
         )
 
-        try:
-            stdout, stderr = process.communicate(timeout=timeout)
-            return_code = process.returncode
-        except subprocess.TimeoutExpired:
+        # Read both pipes with bounded memory instead of communicate()
+        cancelled = False
+        if _live_output_enabled():
+            # Echo output as it arrives so slow commands can be told from hung ones
+            from ..shell_live import LiveOutputPump
+
+            stdout_capture, stderr_capture, timed_out, cancelled = LiveOutputPump(
+                process, timeout
+            ).run()
+        else:
+            stdout_capture, stderr_capture, timed_out = capture_process_output(
+                process, timeout
+            )
+
+        if cancelled:
+            return (
+                f"Error: Command '{command}' was cancelled by the user (ESC).\n"
+                + _format_command_output(None, stdout_capture, stderr_capture)
+            )
+
+        if timed_out:
             # Kill the entire process group to ensure all child processes are terminated
             try:
                 os.killpg(os.getpgid(process.pid), signal.SIGTERM)
@@ -332,16 +426,11 @@ def execute_run_shell_command(
                     pass
 
             stats.tool_errors += 1
-            return f"Error: Command '{command}' timed out after {timeout} seconds.\nTo retry with a longer timeout, use: run_shell_command(command=\"{command}\", timeout=60)"
-
-        # Format the output - only include return code, stdout, and stderr
-        output = f"Return code: {return_code}\n"
-        if stdout:
-            output += f"Stdout: {stdout}\n"
-        if stderr:
-            output += f"Stderr: {stderr}\n"
+            return _timeout_message(command, timeout)
 
-        return output
+        return _format_command_output(
+            process.returncode, stdout_capture, stderr_capture
+        )
     except Exception as e:
         stats.tool_errors += 1
         return f"Error executing command '{command}': {e}"
@@ -0,0 +1,93 @@
+"""
+On-disk cache of MCP stdio servers' tools/list results.
+
+Entries are keyed by the server's command string and stamped with the
+modification time of the command's executable, so upgrading the server
+binary invalidates its entry. With a cached entry the tool schemas can be
+offered to the model before the server has finished starting.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .. import config
+
+CACHE_FILE_NAME = "mcp_tools_cache.json"
+
+_lock = threading.Lock()
+
+
+def _cache_path() -> Path:
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return Path(config_home) / "aicoder" / CACHE_FILE_NAME
+
+
+def _binary_mtime(command: str) -> Optional[float]:
+    """Modification time of the command's executable, or None if not found."""
+    parts = command.split()
+    if not parts:
+        return None
+    executable = shutil.which(parts[0])
+    if not executable:
+        return None
+    try:
+        return os.stat(executable).st_mtime
+    except OSError:
+        return None
+
+
+def _read_all() -> Dict[str, Any]:
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached_tools(command: str) -> Optional[List[Dict[str, Any]]]:
+    """Cached tool list for a server command, or None if missing or stale."""
+    if not config.MCP_TOOLS_CACHE:
+        return None
+    mtime = _binary_mtime(command)
+    if mtime is None:
+        return None
+    with _lock:
+        entry = _read_all().get(command)
+    if not isinstance(entry, dict) or entry.get("mtime") != mtime:
+        return None
+    tools = entry.get("tools")
+    return tools if isinstance(tools, list) else None
+
+
+def save_cached_tools(command: str, tools: List[Dict[str, Any]]):
+    """Store a server's tool list, replacing the cache file atomically."""
+    if not config.MCP_TOOLS_CACHE:
+        return
+    mtime = _binary_mtime(command)
+    if mtime is None:
+        return
+    path = _cache_path()
+    with _lock:
+        data = _read_all()
+        data[command] = {"mtime": mtime, "tools": tools}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(path.parent), prefix=f".{CACHE_FILE_NAME}."
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            if config.DEBUG:
+                print(f"DEBUG: Failed to write MCP tools cache {path}: {e}")
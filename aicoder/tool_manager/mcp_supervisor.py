@@ -0,0 +1,227 @@
+"""
+Health supervision for MCP stdio servers.
+
+The supervisor drains each server's stderr into a bounded buffer (an unread
+stderr pipe eventually fills up and blocks the server), checks running
+servers periodically (process exit, then a ping) and restarts servers that
+died, backing off exponentially when they keep failing. It also keeps
+per-server counters shown by /mcp.
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .. import config
+from ..utils import imsg
+from .handlers.mcp_client import get_mcp_client
+
+
+@dataclass
+class ServerHealth:
+    """Counters and recent stderr output for one MCP server."""
+
+    starts: int = 0
+    restarts: int = 0
+    crashes: int = 0
+    failed_pings: int = 0
+    calls: int = 0
+    call_errors: int = 0
+    call_time: float = 0.0
+    started_at: Optional[float] = None
+    last_error: str = ""
+    consecutive_failures: int = 0
+    restart_at: Optional[float] = None  # Pending background restart time
+    stderr: deque = field(default_factory=lambda: deque(maxlen=config.MCP_STDERR_LINES))
+
+
+class McpSupervisor:
+    """Watches the MCP stdio servers of a ToolRegistry."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.health: Dict[str, ServerHealth] = {}
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._stop = threading.Event()
+
+    def _health(self, server_name: str) -> ServerHealth:
+        with self._lock:
+            if server_name not in self.health:
+                self.health[server_name] = ServerHealth()
+            return self.health[server_name]
+
+    def attach(self, server_name: str, process):
+        """Start watching a freshly spawned server process."""
+        health = self._health(server_name)
+        health.starts += 1
+        health.started_at = time.time()
+        health.restart_at = None
+        if process.stderr is not None:
+            threading.Thread(
+                target=self._drain_stderr,
+                args=(process, health.stderr),
+                name=f"mcp-stderr-{server_name}",
+                daemon=True,
+            ).start()
+        self._ensure_monitor()
+
+    @staticmethod
+    def _drain_stderr(process, buffer: deque):
+        """Keep reading stderr so the server never blocks on a full pipe."""
+        try:
+            for line in process.stderr:
+                buffer.append(line.rstrip("\n"))
+        except (OSError, ValueError):
+            pass  # Pipe closed
+
+    def record_call(self, server_name: str, seconds: float, ok: bool):
+        """Count a tool call and its duration."""
+        health = self._health(server_name)
+        health.calls += 1
+        health.call_time += seconds
+        if not ok:
+            health.call_errors += 1
+
+    def report_failure(self, server_name: str, process, reason: str):
+        """
+        Handle a server found dead or unresponsive.
+
+        The server is dropped from the registry (its tools stay advertised)
+        and, unless it is lazy, restarted in the background after a backoff.
+        Does nothing if the process has already been replaced or stopped.
+        """
+        entry = self.registry.mcp_servers.get(server_name)
+        if entry is None or entry[0] is not process:
+            return
+        health = self._health(server_name)
+        health.crashes += 1
+        health.last_error = reason
+        health.consecutive_failures += 1
+        try:
+            # Output ends just before the exit status is available
+            exit_code = process.wait(timeout=0.5)
+        except subprocess.TimeoutExpired:
+            exit_code = None
+        if exit_code is not None:
+            health.last_error += f" (exit code {exit_code})"
+        self.registry.stop_mcp_server(server_name, quiet=True)
+        if config.DEBUG:
+            print(f"DEBUG: MCP server {server_name} failed: {health.last_error}")
+        if not self.registry._is_lazy(server_name):
+            health.restart_at = time.monotonic() + self._backoff(health)
+            self._ensure_monitor()
+
+    @staticmethod
+    def _backoff(health: ServerHealth) -> float:
+        delay = config.MCP_RESTART_BACKOFF * 2 ** max(health.consecutive_failures - 1, 0)
+        return min(delay, config.MCP_RESTART_BACKOFF_MAX)
+
+    def check_servers(self):
+        """Check every running server once: process alive, then ping."""
+        for server_name, (process, _) in list(self.registry.mcp_servers.items()):
+            client = get_mcp_client(process, server_name)
+            if process.poll() is not None or client.closed:
+                self.report_failure(server_name, process, "server exited")
+                continue
+            try:
+                # Any reply (even an error for an unsupported method) proves liveness
+                client.request("ping", timeout=config.MCP_REQUEST_TIMEOUT)
+            except TimeoutError:
+                self._health(server_name).failed_pings += 1
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+                self.report_failure(server_name, process, "server stopped responding to ping")
+                continue
+            except Exception as e:
+                self.report_failure(server_name, process, f"ping failed: {e}")
+                continue
+            self._health(server_name).consecutive_failures = 0
+
+    def _restart_due_servers(self):
+        now = time.monotonic()
+        for server_name, health in list(self.health.items()):
+            if health.restart_at is None or health.restart_at > now:
+                continue
+            health.restart_at = None
+            if server_name in self.registry.mcp_servers:
+                continue
+            for future in self.registry.start_mcp_servers([server_name]).values():
+                future.add_done_callback(
+                    lambda _, name=server_name: self._restart_done(name)
+                )
+
+    def _restart_done(self, server_name: str):
+        health = self._health(server_name)
+        if server_name in self.registry.mcp_servers:
+            health.restarts += 1
+            imsg(f"*** MCP server '{server_name}' restarted")
+        else:
+            health.consecutive_failures += 1
+            health.restart_at = time.monotonic() + self._backoff(health)
+
+    def _ensure_monitor(self):
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(
+                    target=self._run, name="mcp-supervisor", daemon=True
+                )
+                self._monitor.start()
+
+    def _run(self):
+        """Monitor thread: restart failed servers and run periodic health checks."""
+        last_check = time.monotonic()
+        while not self._stop.wait(min(1.0, config.MCP_HEALTH_CHECK_INTERVAL)):
+            try:
+                if time.monotonic() - last_check >= config.MCP_HEALTH_CHECK_INTERVAL:
+                    last_check = time.monotonic()
+                    self.check_servers()
+                self._restart_due_servers()
+            except Exception as e:
+                if config.DEBUG:
+                    print(f"DEBUG: MCP supervisor error: {e}")
+
+    def stop(self):
+        """Stop the monitor thread (no more checks or restarts)."""
+        self._stop.set()
+
+    def stderr_tail(self, server_name: str, lines: int = 20) -> List[str]:
+        """Last lines a server wrote to stderr."""
+        health = self.health.get(server_name)
+        if health is None:
+            return []
+        return list(health.stderr)[-lines:]
+
+    def status_lines(self) -> List[str]:
+        """One summary line per known MCP stdio server."""
+        lines = []
+        for server_name, tool_config in list(self.registry.mcp_tools.items()):
+            if tool_config.get("type") != "mcp-stdio":
+                continue
+            health = self.health.get(server_name) or ServerHealth()
+            entry = self.registry.mcp_servers.get(server_name)
+            if entry is not None:
+                uptime = int(time.time() - (health.started_at or time.time()))
+                state = f"running (pid {entry[0].pid}, up {uptime}s)"
+            elif health.restart_at is not None:
+                wait = max(0, int(health.restart_at - time.monotonic()))
+                state = f"restarting in {wait}s"
+            else:
+                state = "stopped"
+            average = health.call_time / health.calls * 1000 if health.calls else 0
+            line = (
+                f"{server_name}: {state}; {health.calls} calls "
+                f"({health.call_errors} errors, avg {average:.0f} ms), "
+                f"{health.starts} starts, {health.crashes} crashes, "
+                f"{health.restarts} restarts"
+            )
+            if health.last_error:
+                line += f"; last error: {health.last_error}"
+            lines.append(line)
+        return lines
+
@@ -0,0 +1,123 @@
+"""
+Metadata commands of command tools.
+
+A tool can compute its description ("tool_description_command") and text
+appended to the system prompt ("append_to_system_prompt_command") with a
+shell command. Startup runs these commands for all tools concurrently, and
+outputs are reused for "metadata_cache_ttl" seconds. A tool may also set
+"metadata_cache_key_command", a cheap command whose output (e.g. a version
+or a file's mtime) is part of the cache key, so a change in its output
+invalidates the cached metadata before the TTL runs out.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .. import config
+
+METADATA_COMMANDS = ("tool_description_command", "append_to_system_prompt_command")
+
+# Seconds a metadata command may run
+METADATA_COMMAND_TIMEOUT = 5
+# Upper bound on metadata commands running at once
+METADATA_MAX_WORKERS = 16
+
+
+@dataclass
+class MetadataResult:
+    """Outcome of a metadata command: stripped stdout, or an error."""
+
+    output: Optional[str] = None
+    error: str = ""
+    stdout: str = ""
+    stderr: str = ""
+
+
+_cache: Dict[Tuple[str, str, str], Tuple[float, MetadataResult]] = {}
+_lock = threading.Lock()
+
+
+def _run(command: str) -> MetadataResult:
+    try:
+        proc = subprocess.run(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=METADATA_COMMAND_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        return MetadataResult(error="timed out")
+    except Exception as e:
+        return MetadataResult(error=f"raised an exception: {e}")
+    if proc.returncode != 0:
+        return MetadataResult(
+            error=f"failed with return code {proc.returncode}",
+            stdout=proc.stdout or "",
+            stderr=proc.stderr or "",
+        )
+    return MetadataResult(output=(proc.stdout or "").strip())
+
+
+def _cache_key(tool_config: Dict[str, Any], command: str) -> Optional[Tuple[str, str, str]]:
+    """Key of a command's output, or None if the key command failed."""
+    key_output = ""
+    key_command = tool_config.get("metadata_cache_key_command")
+    if key_command:
+        key_output = _run(key_command).output
+        if key_output is None:
+            return None
+    return (command, os.getcwd(), key_output)
+
+
+def run_metadata_command(tool_config: Dict[str, Any], kind: str) -> MetadataResult:
+    """Output of a tool's metadata command, from the cache while it is fresh."""
+    command = tool_config[kind]
+    ttl = float(tool_config.get("metadata_cache_ttl", config.TOOL_METADATA_CACHE_TTL))
+    key = _cache_key(tool_config, command) if ttl > 0 else None
+
+    if key is not None:
+        with _lock:
+            entry = _cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+
+    result = _run(command)
+    if key is not None and result.output is not None:
+        with _lock:
+            _cache[key] = (time.monotonic(), result)
+    return result
+
+
+def run_metadata_commands(tools: Dict[str, Any]) -> Dict[Tuple[str, str], MetadataResult]:
+    """
+    Run the metadata commands of all tools concurrently.
+
+    Returns {(tool name, command key): result} for every tool that has one.
+    """
+    jobs = [
+        (name, kind)
+        for name, tool_config in tools.items()
+        if isinstance(tool_config, dict)
+        for kind in METADATA_COMMANDS
+        if tool_config.get(kind)
+    ]
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(METADATA_MAX_WORKERS, len(jobs))) as pool:
+        futures = {
+            job: pool.submit(run_metadata_command, tools[job[0]], job[1]) for job in jobs
+        }
+    return {job: future.result() for job, future in futures.items()}
+
+
+def clear_metadata_cache():
+    """Forget all cached outputs."""
+    with _lock:
+        _cache.clear()
@@ -4,26 +4,66 @@ Tool Registry for AI Coder - Handles tool discovery and definitions.
 
 import json
 import os
+import sys
 import subprocess
 import importlib
-from typing import Any, Dict, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 from .. import config
 from ..utils import emsg, wmsg
+from .handlers.mcp_client import get_mcp_client
+from .mcp_cache import load_cached_tools, save_cached_tools
+from .mcp_supervisor import McpSupervisor
+from ..startup_snapshot import get_internal_tools
+from .metadata_commands import METADATA_COMMANDS, MetadataResult, run_metadata_commands
+from .tool_definitions import ToolDefinitions, ToolTable, validate_parameters
+
+# Upper bound on MCP servers spawned at the same time during startup
+MCP_STARTUP_MAX_WORKERS = 16
+
+# Seconds between checks for MCP servers past their idle timeout
+MCP_IDLE_CHECK_INTERVAL = 5
+
+
+def _in_test_mode() -> bool:
+    """True when running under tests, where MCP server processes are not launched."""
+    return bool(os.environ.get("AICODER_TEST_MODE")) or any(
+        "pytest" in arg for arg in sys.argv
+    )
 
 
 class ToolRegistry:
     """Handles tool discovery, registration, and definitions."""
 
     def __init__(self, message_history=None):
+        self._tool_version = 0
+        self._definitions = None
+        self._system_prompt_additions = {}  # tool name -> text appended to the system prompt
         self.mcp_tools = {}
         self.mcp_servers = {}  # Maps server names to (process, tools) tuples
         self.message_history = message_history
+        self._mcp_lock = threading.Lock()
+        self._mcp_startups = {}  # Server name -> Future for servers being started
+        self._mcp_starting = {}  # Server name -> process still in its handshake
+        self._mcp_cached_tools = {}  # Server name -> cached or declared tools
+        self._mcp_last_used = {}  # Server name -> time.monotonic() of last use
+        self._mcp_reaper = None
+        self._mcp_reaper_stop = threading.Event()
+        self.supervisor = McpSupervisor(self)
         self._load_internal_tools()
         self._load_external_tools()
 
     def _load_internal_tools(self):
         """Load internal tools and their definitions dynamically."""
+        # The zipapp ships the definitions precomputed
+        snapshot_tools = get_internal_tools()
+        if snapshot_tools:
+            self.mcp_tools.update(snapshot_tools)
+            return
+
         try:
             # Import the internal tools package
             internal_tools_pkg = importlib.import_module(
@@ -85,137 +125,22 @@ class ToolRegistry:
                     # Merge external tools, overriding defaults if there are conflicts
                     self.mcp_tools[name] = tool_config
 
-                    # 1) Dynamic description: allow tools to supply a runtime description
-                    if isinstance(tool_config, dict) and tool_config.get(
-                        "tool_description_command"
-                    ):
-                        try:
-                            if config.DEBUG:
-                                print(
-                                    f"DEBUG: Running tool_description_command for {name} during load"
-                                )
-                                print(
-                                    f"DEBUG: Current working directory: {os.getcwd()}"
-                                )
-                            desc_proc = subprocess.run(
-                                tool_config["tool_description_command"],
-                                shell=True,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                text=True,
-                                timeout=5,
-                            )
-                            if desc_proc.returncode == 0:
-                                desc_lines = (
-                                    (desc_proc.stdout or "").strip().splitlines()
-                                )
-                                if desc_lines:
-                                    dynamic_desc = "\n".join(desc_lines).strip()
-                                    if dynamic_desc:
-                                        self.mcp_tools[name]["description"] = (
-                                            dynamic_desc
-                                        )
-                                        if config.DEBUG:
-                                            print(
-                                                f"DEBUG: Updated description for {name}"
-                                            )
-                                            print(
-                                                f"DEBUG: New description length: {len(dynamic_desc)}"
-                                            )
-                            else:
-                                print(
-                                    f"WARNING: tool_description_command failed for {name} with return code {desc_proc.returncode}"
-                                )
-                                if config.DEBUG:
-                                    print(f"DEBUG: stderr: {desc_proc.stderr}")
-                                    print(f"DEBUG: stdout: {desc_proc.stdout}")
-                        except subprocess.TimeoutExpired:
-                            print(
-                                f"ERROR: tool_description_command for {name} timed out"
-                            )
-                        except Exception as e:
-                            print(
-                                f"ERROR: Exception in tool_description_command for {name}: {e}"
-                            )
-                            if config.DEBUG:
-                                import traceback
-
-                                traceback.print_exc()
-
-                    # 2) Append to system prompt if command specifies it
-                    if isinstance(tool_config, dict) and tool_config.get(
-                        "append_to_system_prompt_command"
-                    ):
-                        try:
-                            if config.DEBUG:
-                                print(
-                                    f"DEBUG: Running append_to_system_prompt_command for {name} during load"
-                                )
-                                print(
-                                    f"DEBUG: Current working directory: {os.getcwd()}"
-                                )
-                                print(
-                                    f"DEBUG: Has message_history: {hasattr(self, 'message_history')}"
-                                )
-                            append_proc = subprocess.run(
-                                tool_config["append_to_system_prompt_command"],
-                                shell=True,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                text=True,
-                                timeout=5,
-                            )
-                            if append_proc.returncode == 0:
-                                append_content = (append_proc.stdout or "").strip()
-                                if append_content:
-                                    # Augment the system prompt
-                                    if (
-                                        self.message_history
-                                        and hasattr(self.message_history, "messages")
-                                        and self.message_history.messages
-                                    ):
-                                        old_len = len(
-                                            self.message_history.messages[0]["content"]
-                                        )
-                                        self.message_history.messages[0]["content"] += (
-                                            f"\n\n{append_content}"
-                                        )
-                                        if config.DEBUG:
-                                            print(
-                                                f"DEBUG: Appended content to system prompt for {name}"
-                                            )
-                                            print(
-                                                f"DEBUG: Appended content length: {len(append_content)}"
-                                            )
-                                            print(
-                                                f"DEBUG: System prompt length before: {old_len}, after: {len(self.message_history.messages[0]['content'])}"
-                                            )
-                            else:
-                                print(
-                                    f"WARNING: append_to_system_prompt_command failed for {name} with return code {append_proc.returncode}"
-                                )
-                                if config.DEBUG:
-                                    print(f"DEBUG: stderr: {append_proc.stderr}")
-                                    print(f"DEBUG: stdout: {append_proc.stdout}")
-                        except subprocess.TimeoutExpired:
-                            print(
-                                f"ERROR: append_to_system_prompt_command for {name} timed out"
-                            )
-                        except Exception as e:
-                            print(
-                                f"ERROR: Exception in append_to_system_prompt_command for {name}: {e}"
-                            )
-                            if config.DEBUG:
-                                import traceback
-
-                                traceback.print_exc()
-
                     # Count tools vs servers
                     if tool_config.get("type") == "mcp-stdio":
                         mcp_servers_count += 1
                     else:
                         external_tools_count += 1
 
+                # Dynamic descriptions and system prompt additions, run concurrently
+                loaded = {
+                    name: tool_config
+                    for name, tool_config in external_tools.items()
+                    if self.mcp_tools.get(name) is tool_config
+                }
+                results = run_metadata_commands(loaded)
+                for name, tool_config in loaded.items():
+                    self._apply_tool_metadata(name, tool_config, results)
+
                 print(
                     f"{config.GREEN}*** Loaded {len(self.mcp_tools)} tools ({len([t for t in self.mcp_tools.values() if t.get('type') == 'internal'])} internal, {external_tools_count} external) and {mcp_servers_count} external MCP servers.{config.RESET}"
                 )
@@ -235,14 +160,116 @@ class ToolRegistry:
                 f"{config.RED}*** Could not load external MCP tools: {e}. Using internal tools only.{config.RESET}"
             )
 
+    def _apply_tool_metadata(
+        self,
+        name: str,
+        tool_config: Dict[str, Any],
+        results: Dict[Tuple[str, str], MetadataResult],
+    ):
+        """Use the output of a tool's description and system prompt commands."""
+        for kind in METADATA_COMMANDS:
+            result = results.get((name, kind))
+            if result is None:
+                continue
+            if result.output is None:
+                print(f"WARNING: {kind} for {name} {result.error}")
+                if config.DEBUG:
+                    print(f"DEBUG: stderr: {result.stderr}")
+                    print(f"DEBUG: stdout: {result.stdout}")
+                continue
+            if not result.output:
+                continue
+            if kind == "tool_description_command":
+                tool_config["description"] = result.output
+                self.bump_tool_version()
+                if config.DEBUG:
+                    print(f"DEBUG: Updated description for {name}")
+                    print(f"DEBUG: New description length: {len(result.output)}")
+            else:
+                self.append_to_system_prompt(name, result.output)
+
+    def update_tool_description(self, name: str, description: str):
+        """Change a tool's description; the next request sends the new one."""
+        tool_config = self.mcp_tools.get(name)
+        if isinstance(tool_config, dict):
+            self.mcp_tools[name] = dict(tool_config, description=description)
+
+    def append_to_system_prompt(self, name: str, content: str):
+        """
+        Append a tool's text to the system prompt.
+
+        Text previously appended for the tool is replaced, so refreshing it
+        doesn't grow the prompt.
+        """
+        history = self.message_history
+        if not (history and hasattr(history, "messages") and history.messages):
+            return
+        system_message = history.messages[0]
+        previous = self._system_prompt_additions.get(name)
+        if previous == content:
+            return
+        old_len = len(system_message["content"])
+        if previous is not None and f"\n\n{previous}" in system_message["content"]:
+            system_message["content"] = system_message["content"].replace(
+                f"\n\n{previous}", f"\n\n{content}", 1
+            )
+        else:
+            system_message["content"] += f"\n\n{content}"
+        self._system_prompt_additions[name] = content
+        if config.DEBUG:
+            print(f"DEBUG: Appended content to system prompt for {name}")
+            print(f"DEBUG: Appended content length: {len(content)}")
+            print(
+                f"DEBUG: System prompt length before: {old_len}, after: {len(system_message['content'])}"
+            )
+
+    @property
+    def mcp_tools(self) -> Dict[str, Any]:
+        """Tool name -> config; any change makes the tool definitions rebuild."""
+        return self._mcp_tools
+
+    @mcp_tools.setter
+    def mcp_tools(self, tools: Dict[str, Any]):
+        self._mcp_tools = ToolTable(self.bump_tool_version, tools)
+        self.bump_tool_version()
+
+    @property
+    def tool_version(self) -> int:
+        """Counter bumped whenever the set of tools or their definitions change."""
+        return self._tool_version
+
+    def bump_tool_version(self):
+        """
+        Mark the tool definitions as changed. Adding or removing tools does
+        this automatically; call it after editing a tool's config in place.
+        """
+        self._tool_version += 1
+
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        """
+        Tool definitions for the API, rebuilt only when the tools changed.
+
+        The returned list is shared between requests and must not be modified.
+        """
+        definitions = self._definitions
+        if definitions is not None and definitions.version == self._tool_version:
+            return definitions
+        version = self._tool_version
+        definitions = ToolDefinitions(self._build_tool_definitions(), version)
+        for error in validate_parameters(definitions):
+            print(f"{config.RED} * Error: {error}{config.RESET}")
+        self._definitions = definitions
+        return definitions
+
+    def _build_tool_definitions(self) -> List[Dict[str, Any]]:
         """Generate tool definitions for the API."""
         definitions = []
         for name, tool_config in self.mcp_tools.items():
             # Skip stdio servers in tool definitions (they're not directly callable tools)
             if tool_config.get("type") == "mcp-stdio":
                 # Discover tools from the server
-                server_tools = self._discover_mcp_server_tools(name)
+                # Servers still starting contribute their tools once ready
+                server_tools = self._mcp_server_tools_for_request(name)
                 for tool_name, tool_def in server_tools.items():
                     definitions.append(
                         {
@@ -276,23 +303,162 @@ class ToolRegistry:
                 definitions.append(tool_def)
         return definitions
 
-    def _discover_mcp_server_tools(self, server_name: str) -> Dict[str, Any]:
-        """Discover tools available from an MCP stdio server."""
+    def _mcp_server_tools_for_request(self, server_name: str) -> Dict[str, Any]:
+        """
+        Tools of a server for the next API request.
+
+        A server that isn't running yet but has cached or declared tools is
+        started in the background (or, if lazy, on first use) and those tools
+        are offered meanwhile.
+        """
+        if server_name not in self.mcp_servers:
+            advertised = self.advertised_mcp_server_tools(server_name)
+            if advertised:
+                if not self._is_lazy(server_name):
+                    self.start_mcp_servers([server_name])
+                return advertised
+        return self._discover_mcp_server_tools(server_name, wait=False)
+
+    def advertised_mcp_server_tools(self, server_name: str) -> Dict[str, Any]:
+        """
+        Tools for a server that isn't running: from the on-disk cache, else
+        the "tools" list declared in its config, else {}.
+        """
+        if server_name not in self._mcp_cached_tools:
+            server_config = self.mcp_tools.get(server_name) or {}
+            tool_list = None
+            if not _in_test_mode():
+                tool_list = load_cached_tools(server_config.get("command", ""))
+            if tool_list is None:
+                tool_list = server_config.get("tools") or []
+            self._mcp_cached_tools[server_name] = {
+                tool["name"]: tool for tool in tool_list if "name" in tool
+            }
+        return self._mcp_cached_tools[server_name]
+
+    def known_mcp_server_tools(self) -> List[tuple]:
+        """(server name, tools) for each stdio server, live or advertised."""
+        known = []
+        for name, tool_config in list(self.mcp_tools.items()):
+            if tool_config.get("type") != "mcp-stdio":
+                continue
+            if name in self.mcp_servers:
+                known.append((name, self.mcp_servers[name][1]))
+            elif self.advertised_mcp_server_tools(name):
+                known.append((name, self.advertised_mcp_server_tools(name)))
+        return known
+
+    def _is_lazy(self, server_name: str) -> bool:
+        """Whether a server is only spawned when one of its tools is called."""
+        server_config = self.mcp_tools.get(server_name) or {}
+        return bool(server_config.get("lazy", config.MCP_LAZY_START))
+
+    def _idle_timeout(self, server_name: str) -> float:
+        """Seconds a server may sit unused before it is stopped (0 = never)."""
+        server_config = self.mcp_tools.get(server_name) or {}
+        default = config.MCP_IDLE_TIMEOUT if self._is_lazy(server_name) else 0
+        return float(server_config.get("idle_timeout", default) or 0)
+
+    def touch_mcp_server(self, server_name: str):
+        """Record that a server is in use, postponing its idle shutdown."""
+        self._mcp_last_used[server_name] = time.monotonic()
+
+    def start_mcp_servers(self, names: List[str] = None) -> Dict[str, Future]:
+        """
+        Start MCP stdio servers concurrently (all non-lazy ones by default).
+
+        Each server is spawned and handshaken on a worker thread and its tools
+        are registered as soon as it is ready; a slow server only delays its
+        own tools. Returns futures (server name -> discovered tools) for the
+        servers being started.
+        """
+        if names is None:
+            # Lazy servers wait for their first call, unless their tools are
+            # unknown and have to be discovered
+            names = [
+                name
+                for name in list(self.mcp_tools)
+                if not (
+                    self._is_lazy(name) and self.advertised_mcp_server_tools(name)
+                )
+            ]
+        names = [
+            name
+            for name in names
+            if (self.mcp_tools.get(name) or {}).get("type") == "mcp-stdio"
+            and name not in self.mcp_servers
+        ]
+        if not names or _in_test_mode():
+            return {}
+
+        startups = {}
+        to_run = []
+        with self._mcp_lock:
+            for name in names:
+                future = self._mcp_startups.get(name)
+                if future is None:
+                    future = Future()
+                    self._mcp_startups[name] = future
+                    to_run.append((name, future))
+                startups[name] = future
+
+        if to_run:
+            pool = ThreadPoolExecutor(
+                max_workers=min(len(to_run), MCP_STARTUP_MAX_WORKERS),
+                thread_name_prefix="mcp-startup",
+            )
+            for name, future in to_run:
+                pool.submit(self._run_mcp_startup, name, future)
+            # Workers finish on their own; don't wait for them here
+            pool.shutdown(wait=False)
+        return startups
+
+    def _run_mcp_startup(self, server_name: str, future: Future):
+        """Start one server and resolve its startup future with its tools."""
+        tools = {}
+        try:
+            tools = self._start_mcp_server(server_name)
+        finally:
+            with self._mcp_lock:
+                self._mcp_startups.pop(server_name, None)
+            future.set_result(tools)
+
+    def _discover_mcp_server_tools(
+        self, server_name: str, wait: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Discover tools available from an MCP stdio server.
+
+        If the server is still starting in the background, wait for it, or
+        return no tools yet when wait is False.
+        """
         # Check if we've already discovered tools for this server
         if server_name in self.mcp_servers:
             _, tools = self.mcp_servers[server_name]
             return tools
 
         # Check if we're running in test mode to avoid launching actual server processes
-        import os
-        import sys
-        from .. import config
-        if os.environ.get("AICODER_TEST_MODE") or any('pytest' in arg for arg in sys.argv):
+        if _in_test_mode():
             # In test mode, return empty tools to avoid launching server processes
             if config.DEBUG:
                 print(f"DEBUG: Skipping MCP server {server_name} in test mode")
             return {}
 
+        with self._mcp_lock:
+            future = self._mcp_startups.get(server_name)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._mcp_startups[server_name] = future
+
+        if owner:
+            self._run_mcp_startup(server_name, future)
+        elif not wait and not future.done():
+            return {}
+        return future.result()
+
+    def _start_mcp_server(self, server_name: str) -> Dict[str, Any]:
+        """Spawn an MCP stdio server, run the handshake and register its tools."""
         # Get server configuration
         server_config = self.mcp_tools.get(server_name)
         if not server_config or server_config.get("type") != "mcp-stdio":
@@ -308,34 +474,12 @@ class ToolRegistry:
                 text=True,
                 bufsize=1,
             )
+            self._mcp_starting[server_name] = process
+            self.supervisor.attach(server_name, process)
 
-            def send_request(request_data):
-                js = json.dumps(request_data) + "\n"
-                process.stdin.write(js)
-                process.stdin.flush()
-                if request_data.get("id") is not None:
-                    response_line = process.stdout.readline()
-                    return json.loads(response_line)
-                return None
-
-            # Initialize the server
-            initialize_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2025-06-18",
-                    "capabilities": {"elicitation": {}},
-                    "clientInfo": {
-                        "name": f"{config.APP_NAME}-client",
-                        "version": "1.0.0",
-                    },
-                },
-            }
+            client = get_mcp_client(process, server_name)
 
-            response = send_request(initialize_request)
-            if not response or "result" not in response:
-                # Clean up the process if initialization fails
+            def stop_process():
                 try:
                     process.terminate()
                     process.wait(timeout=1)
@@ -344,33 +488,55 @@ class ToolRegistry:
                         process.kill()
                     except:
                         pass  # Process might have already terminated
-                raise Exception(f"Failed to initialize MCP server: {response}")
-
-            # Send initialized notification
-            send_request({"jsonrpc": "2.0", "method": "notifications/initialized"})
+                client.close()
 
-            # Get tool list
-            tools_response = send_request(
-                {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
-            )
-
-            if not tools_response or "result" not in tools_response:
-                # Clean up the process if tools list fails
-                try:
-                    process.terminate()
-                    process.wait(timeout=1)
-                except:
-                    try:
-                        process.kill()
-                    except:
-                        pass  # Process might have already terminated
-                raise Exception(f"Failed to get tools list: {tools_response}")
+            try:
+                # Initialize the server
+                response = client.request(
+                    "initialize",
+                    {
+                        "protocolVersion": "2025-06-18",
+                        "capabilities": {"elicitation": {}},
+                        "clientInfo": {
+                            "name": f"{config.APP_NAME}-client",
+                            "version": "1.0.0",
+                        },
+                    },
+                    timeout=config.MCP_REQUEST_TIMEOUT,
+                )
+                if not response or "result" not in response:
+                    raise Exception(f"Failed to initialize MCP server: {response}")
+
+                # Send initialized notification
+                client.notify("notifications/initialized")
+
+                # Get tool list, following pagination cursors
+                tool_list = []
+                params = None
+                while True:
+                    tools_response = client.request(
+                        "tools/list", params, timeout=config.MCP_REQUEST_TIMEOUT
+                    )
+                    if not tools_response or "result" not in tools_response:
+                        raise Exception(f"Failed to get tools list: {tools_response}")
+                    tool_list.extend(tools_response["result"].get("tools", []))
+                    cursor = tools_response["result"].get("nextCursor")
+                    if not cursor:
+                        break
+                    params = {"cursor": cursor}
+            except Exception:
+                # Clean up the process if the handshake fails
+                stop_process()
+                raise
 
             # Store server process and discovered tools
-            tools = {
-                tool["name"]: tool for tool in tools_response["result"].get("tools", [])
-            }
+            tools = {tool["name"]: tool for tool in tool_list}
             self.mcp_servers[server_name] = (process, tools)
+            self.bump_tool_version()
+            self._reconcile_cached_tools(server_name, server_config["command"], tool_list)
+            self.touch_mcp_server(server_name)
+            if self._idle_timeout(server_name) > 0:
+                self._ensure_idle_reaper()
 
             # Print discovered tools count
             print(
@@ -381,23 +547,93 @@ class ToolRegistry:
         except Exception as e:
             print(f"Error discovering tools from server {server_name}: {e}")
             return {}
+        finally:
+            self._mcp_starting.pop(server_name, None)
+
+    def _reconcile_cached_tools(
+        self, server_name: str, command: str, tool_list: List[Dict[str, Any]]
+    ):
+        """Re-cache a server's live tool list if it differs from the cached one."""
+        if _in_test_mode():
+            return
+        served = self._mcp_cached_tools.pop(server_name, None)
+        if served and served != {tool["name"]: tool for tool in tool_list}:
+            wmsg(
+                f"*** MCP server '{server_name}' tools changed since they were cached; updated"
+            )
+        if load_cached_tools(command) != tool_list:
+            save_cached_tools(command, tool_list)
+
+    def record_mcp_call(self, server_name: str, seconds: float, ok: bool):
+        """Count a tool call in the server's health metrics."""
+        self.supervisor.record_call(server_name, seconds, ok)
+
+    def report_mcp_failure(self, server_name: str, process, reason: str):
+        """Drop a dead server; the supervisor restarts it."""
+        self.supervisor.report_failure(server_name, process, reason)
+
+    def _ensure_idle_reaper(self):
+        """Start the thread that stops idle servers, once."""
+        with self._mcp_lock:
+            if self._mcp_reaper is None:
+                self._mcp_reaper = threading.Thread(
+                    target=self._reap_idle_mcp_servers, name="mcp-idle", daemon=True
+                )
+                self._mcp_reaper.start()
+
+    def _reap_idle_mcp_servers(self):
+        """Stop servers that have had no calls for their idle timeout."""
+        while not self._mcp_reaper_stop.wait(MCP_IDLE_CHECK_INTERVAL):
+            now = time.monotonic()
+            for server_name, (process, _) in list(self.mcp_servers.items()):
+                timeout = self._idle_timeout(server_name)
+                if timeout <= 0 or get_mcp_client(process, server_name).pending:
+                    continue
+                if now - self._mcp_last_used.get(server_name, now) >= timeout:
+                    if config.DEBUG:
+                        print(f"DEBUG: Stopping MCP server {server_name} after {timeout}s idle")
+                    self.stop_mcp_server(server_name, quiet=True)
+
+    def stop_mcp_server(self, server_name: str, quiet: bool = False):
+        """
+        Stop a running server. Its tools stay advertised, and calling one
+        starts the server again.
+        """
+        entry = self.mcp_servers.pop(server_name, None)
+        if entry is None:
+            return
+        process, tools = entry
+        self._mcp_cached_tools[server_name] = tools
+        self.bump_tool_version()
+        try:
+            if not quiet:
+                print(f"Terminating MCP server: {server_name}")
+            # Try graceful termination first
+            process.terminate()
+            try:
+                # Wait for up to 2 seconds for process to terminate
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                # Force kill if it doesn't terminate gracefully
+                if not quiet:
+                    print(f"Force killing MCP server: {server_name}")
+                process.kill()
+                process.wait()
+        except Exception as e:
+            print(f"Error terminating MCP server {server_name}: {e}")
+        get_mcp_client(process, server_name).close()
 
     def cleanup_mcp_servers(self):
         """Clean up all MCP server processes when shutting down."""
-        for server_name, (process, _) in self.mcp_servers.items():
+        self._mcp_reaper_stop.set()
+        self.supervisor.stop()
+        # Servers still in their handshake are killed outright
+        for server_name, process in list(self._mcp_starting.items()):
             try:
-                print(f"Terminating MCP server: {server_name}")
-                # Try graceful termination first
-                process.terminate()
-                try:
-                    # Wait for up to 2 seconds for process to terminate
-                    process.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    # Force kill if it doesn't terminate gracefully
-                    print(f"Force killing MCP server: {server_name}")
-                    process.kill()
-                    process.wait()
-            except Exception as e:
-                print(f"Error terminating MCP server {server_name}: {e}")
+                process.kill()
+            except Exception:
+                pass
+        for server_name in list(self.mcp_servers):
+            self.stop_mcp_server(server_name)
         # Clear the servers dictionary
         self.mcp_servers.clear()
@@ -0,0 +1,247 @@
+"""
+Bounded output capture for shell commands.
+
+Reads a child process's stdout and stderr incrementally with a selector
+instead of buffering everything through communicate(). Each stream keeps
+only a head and tail window in memory, while byte and line counts cover the
+whole output. Truncated output can optionally be spilled to a temp file so
+the AI can page through it with read_file. Only the newest
+SHELL_OUTPUT_SPILL_KEEP spill files are kept, and they are deleted at exit.
+"""
+
+import atexit
+import os
+import time
+import selectors
+import subprocess
+import tempfile
+
+from .. import config
+
+# Read size for each pipe read
+READ_CHUNK_SIZE = 65536
+# How often a stop_event is checked while waiting for output
+STOP_POLL_INTERVAL = 0.1
+
+# Spill files of this process, oldest first
+_spill_paths = []
+
+
+def _remove_spill(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _track_spill(path: str):
+    """Remember a new spill file, deleting the oldest beyond the keep limit."""
+    _spill_paths.append(path)
+    while len(_spill_paths) > max(1, config.SHELL_OUTPUT_SPILL_KEEP):
+        _remove_spill(_spill_paths.pop(0))
+
+
+@atexit.register
+def cleanup_spill_files():
+    """Delete every spill file this process created."""
+    while _spill_paths:
+        _remove_spill(_spill_paths.pop())
+
+
+class StreamCapture:
+    """Keeps a bounded head+tail window of a single output stream."""
+
+    def __init__(self, name: str, max_bytes: int = None, spill: bool = None):
+        self.name = name
+        self.max_bytes = max(
+            2, max_bytes if max_bytes is not None else config.SHELL_OUTPUT_MAX_BYTES
+        )
+        self.spill = config.SHELL_OUTPUT_SPILL if spill is None else spill
+        self.head_limit = self.max_bytes // 2
+        self.tail_limit = self.max_bytes - self.head_limit
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.spill_path = None
+        self.spill_complete = True
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._last_byte = b""
+        self._spill_file = None
+        self._spill_bytes = 0
+
+    @property
+    def truncated(self) -> bool:
+        """True when part of the output was dropped from memory."""
+        return self.total_bytes > self.max_bytes
+
+    @property
+    def omitted_bytes(self) -> int:
+        """Number of bytes not present in the head+tail window."""
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    def feed(self, data: bytes):
+        """Add a chunk of output to the capture."""
+        if not data:
+            return
+
+        self.total_bytes += len(data)
+        self.total_lines += data.count(b"\n")
+        self._last_byte = data[-1:]
+
+        # Everything seen so far still fits in head+tail, so the spill file
+        # can be seeded from memory the moment the cap is first exceeded
+        if self.spill and self.spill_path is None and self.truncated:
+            self._open_spill()
+        if self._spill_file is not None:
+            self._write_spill(data)
+
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._tail += data
+            if len(self._tail) > self.tail_limit:
+                del self._tail[: len(self._tail) - self.tail_limit]
+
+    def _open_spill(self):
+        """Create the spill file and seed it with the output captured so far."""
+        try:
+            fd, self.spill_path = tempfile.mkstemp(
+                prefix="aicoder-shell-", suffix=f".{self.name}.log"
+            )
+            _track_spill(self.spill_path)
+            self._spill_file = os.fdopen(fd, "wb")
+            self._spill_file.write(self._head)
+            self._spill_file.write(self._tail)
+            self._spill_bytes = len(self._head) + len(self._tail)
+        except OSError as e:
+            if config.DEBUG:
+                print(f"DEBUG: Could not create shell output spill file: {e}")
+            self.spill_path = ""
+            self._spill_file = None
+
+    def _write_spill(self, data: bytes):
+        """Append a chunk to the spill file, honoring the spill size cap."""
+        room = config.SHELL_OUTPUT_SPILL_MAX_BYTES - self._spill_bytes
+        if room <= 0:
+            self.spill_complete = False
+            return
+        chunk = data[:room]
+        try:
+            self._spill_file.write(chunk)
+            self._spill_bytes += len(chunk)
+            if len(chunk) < len(data):
+                self.spill_complete = False
+        except OSError:
+            self.spill_complete = False
+
+    def close(self):
+        """Close the spill file if one was opened."""
+        if self._spill_file is not None:
+            try:
+                self._spill_file.close()
+            except OSError:
+                pass
+            self._spill_file = None
+
+    def line_count(self) -> int:
+        """Number of lines in the whole output (a trailing partial line counts)."""
+        if self.total_bytes and self._last_byte != b"\n":
+            return self.total_lines + 1
+        return self.total_lines
+
+    def text(self) -> str:
+        """Decoded output, with a marker where the middle was dropped."""
+        head = self._head.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + self._tail.decode("utf-8", errors="replace")
+        tail = self._tail.decode("utf-8", errors="replace")
+        return f"{head}\n\n... [{self.omitted_bytes:,} bytes omitted] ...\n\n{tail}"
+
+    def summary(self) -> str:
+        """Note for the AI describing a truncated stream, or '' if complete."""
+        if not self.truncated:
+            return ""
+        label = self.name.capitalize()
+        note = (
+            f"[{label} truncated: {self.total_bytes:,} bytes, {self.line_count():,} lines total. "
+            f"Showing the first {len(self._head):,} and last {len(self._tail):,} bytes."
+        )
+        if self.spill_path:
+            if self.spill_complete:
+                note += f" Full output saved to {self.spill_path} - use read_file to page through it."
+            else:
+                note += (
+                    f" The first {self._spill_bytes:,} bytes were saved to {self.spill_path}"
+                    " - use read_file to page through it."
+                )
+        return note + "]"
+
+
+def capture_process_output(
+    process,
+    timeout: float,
+    max_bytes: int = None,
+    spill: bool = None,
+    on_output=None,
+    stop_event=None,
+):
+    """
+    Read a process's stdout and stderr until EOF, the process exits, or timeout.
+
+    The process must have been started with binary stdout/stderr pipes.
+
+    Args:
+        on_output: Optional callback(stream_name, data) called for each chunk read
+        stop_event: Optional threading.Event that stops reading early when set
+
+    Returns:
+        tuple: (stdout_capture, stderr_capture, timed_out)
+    """
+    stdout_capture = StreamCapture("stdout", max_bytes, spill)
+    stderr_capture = StreamCapture("stderr", max_bytes, spill)
+    deadline = time.monotonic() + timeout
+    timed_out = False
+
+    selector = selectors.DefaultSelector()
+    try:
+        for pipe, capture in (
+            (process.stdout, stdout_capture),
+            (process.stderr, stderr_capture),
+        ):
+            if pipe is not None:
+                selector.register(pipe, selectors.EVENT_READ, capture)
+
+        while selector.get_map():
+            if stop_event is not None and stop_event.is_set():
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            if stop_event is not None:
+                # Wake up regularly so a stop request is noticed promptly
+                remaining = min(remaining, STOP_POLL_INTERVAL)
+            for key, _ in selector.select(timeout=remaining):
+                data = os.read(key.fd, READ_CHUNK_SIZE)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                key.data.feed(data)
+                if on_output is not None:
+                    on_output(key.data.name, data)
+
+        if not timed_out and not (stop_event is not None and stop_event.is_set()):
+            # Pipes are closed; wait for the exit status within the time left
+            remaining = max(0, deadline - time.monotonic())
+            try:
+                process.wait(timeout=remaining)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+    finally:
+        selector.close()
+        stdout_capture.close()
+        stderr_capture.close()
+
+    return stdout_capture, stderr_capture, timed_out
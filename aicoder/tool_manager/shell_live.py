@@ -0,0 +1,197 @@
+"""
+Live output display for long-running shell commands.
+
+A pump thread reads the command's output (see shell_capture) while the main
+thread echoes complete lines to the terminal at a limited rate, keeps the
+animator's elapsed-time status line up to date and watches for ESC, which
+cancels the command by killing its process group.
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+from .. import config
+from ..terminal_manager import is_esc_pressed, reset_esc_state
+from .shell_capture import capture_process_output
+
+# How often the display loop wakes up to print lines and check for ESC
+DISPLAY_INTERVAL = 0.1
+# Longest partial line buffered for display before it is shown anyway
+MAX_PENDING_LINE_BYTES = 4096
+
+
+class LiveOutputPump:
+    """Runs a process's output capture in a thread and streams lines to the terminal."""
+
+    def __init__(
+        self,
+        process,
+        timeout: float,
+        animator=None,
+        max_lines_per_sec=None,
+        reader=None,
+        on_cancel=None,
+    ):
+        """
+        Args:
+            process: The running command (its process group is killed on ESC)
+            timeout: Seconds before the command is considered timed out
+            reader: Optional callable(on_output, stop_event) returning
+                (stdout_capture, stderr_capture, timed_out), used instead of
+                reading the process's own pipes
+            on_cancel: Optional callable used instead of killing the process group
+        """
+        self.process = process
+        self.timeout = timeout
+        self.reader = reader
+        self.on_cancel = on_cancel
+        if animator is None:
+            from ..animator import get_animator
+
+            animator = get_animator()
+        self.animator = animator
+        self.max_lines_per_sec = max(
+            1,
+            max_lines_per_sec
+            if max_lines_per_sec is not None
+            else config.SHELL_LIVE_OUTPUT_MAX_LINES_PER_SEC,
+        )
+        self.cancelled = False
+        self.lines_skipped = 0
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._lines = deque()
+        self._partial = {"stdout": b"", "stderr": b""}
+        self._result = None
+        self._error = None
+
+    def _on_output(self, stream_name: str, data: bytes):
+        """Split a chunk into complete lines and queue them for display."""
+        buffered = self._partial[stream_name] + data
+        *lines, rest = buffered.split(b"\n")
+        if len(rest) > MAX_PENDING_LINE_BYTES:
+            lines.append(rest)
+            rest = b""
+        self._partial[stream_name] = rest
+        if lines:
+            with self._lock:
+                for line in lines:
+                    self._lines.append((stream_name, line))
+
+    def _pump(self):
+        """Pump thread body: capture output until the process finishes."""
+        try:
+            if self.reader is not None:
+                self._result = self.reader(self._on_output, self._stop_event)
+            else:
+                self._result = capture_process_output(
+                    self.process,
+                    self.timeout,
+                    on_output=self._on_output,
+                    stop_event=self._stop_event,
+                )
+        except Exception as e:
+            self._error = e
+
+    def _format_line(self, stream_name: str, line: bytes, width: int) -> str:
+        """Format one output line for the terminal, clipped to its width."""
+        text = line.decode("utf-8", errors="replace").rstrip("\r")
+        text = text.expandtabs(4)[: max(10, width - 6)]
+        if stream_name == "stderr":
+            return f"   {config.YELLOW}│{config.RESET} {text}"
+        return f"   │ {text}"
+
+    def _flush_lines(self, budget: int):
+        """Print up to budget queued lines, dropping the backlog beyond one second's worth."""
+        with self._lock:
+            backlog = len(self._lines) - self.max_lines_per_sec
+            skipped = 0
+            if backlog > 0:
+                for _ in range(backlog):
+                    self._lines.popleft()
+                skipped = backlog
+            batch = [self._lines.popleft() for _ in range(min(budget, len(self._lines)))]
+
+        width = shutil.get_terminal_size().columns
+        if skipped:
+            self.lines_skipped += skipped
+            self.animator.print_above(
+                f"   {config.YELLOW}... [{skipped} lines skipped]{config.RESET}"
+            )
+        for stream_name, line in batch:
+            self.animator.print_above(self._format_line(stream_name, line, width))
+
+    def _cancel(self):
+        """Kill the command's process group after the user pressed ESC."""
+        self.cancelled = True
+        if self.on_cancel is not None:
+            self.on_cancel()
+            self._stop_event.set()
+            return
+        try:
+            os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
+        except (ProcessLookupError, OSError):
+            try:
+                self.process.kill()
+            except (ProcessLookupError, OSError):
+                pass
+        self._stop_event.set()
+
+    def run(self):
+        """
+        Run the command to completion while displaying its output.
+
+        Returns:
+            tuple: (stdout_capture, stderr_capture, timed_out, cancelled)
+        """
+        reset_esc_state()
+        self.animator.start_animation("Running command...")
+        pump_thread = threading.Thread(target=self._pump, daemon=True)
+        pump_thread.start()
+
+        credit = 0.0
+        last_tick = time.monotonic()
+        try:
+            while pump_thread.is_alive():
+                pump_thread.join(DISPLAY_INTERVAL)
+
+                if not self.cancelled and is_esc_pressed():
+                    self.animator.print_above(
+                        f"   {config.RED}Cancelling command (ESC)...{config.RESET}"
+                    )
+                    self._cancel()
+
+                # Token bucket: earn max_lines_per_sec lines per second of wall time
+                now = time.monotonic()
+                credit = min(
+                    credit + (now - last_tick) * self.max_lines_per_sec,
+                    self.max_lines_per_sec,
+                )
+                last_tick = now
+                budget = int(credit)
+                if budget:
+                    credit -= budget
+                    self._flush_lines(budget)
+
+            # Show trailing partial lines and whatever the rate limit allows
+            for stream_name, rest in self._partial.items():
+                if rest:
+                    self._on_output(stream_name, b"\n")
+            self._flush_lines(self.max_lines_per_sec)
+        finally:
+            self.animator.stop_animation()
+
+        if self._error is not None:
+            raise self._error
+
+        stdout_capture, stderr_capture, timed_out = self._result
+        return stdout_capture, stderr_capture, timed_out, self.cancelled
@@ -0,0 +1,328 @@
+"""
+Persistent shell session for run_shell_command.
+
+Instead of forking a fresh `bash -c` for every command, a single long-lived
+bash worker runs each command with `eval`, so `cd`, `export` and
+`source venv/bin/activate` carry over between calls. Commands are delimited
+by a random sentinel printed after each one, together with the exit code and
+the worker's current directory.
+
+The worker runs with job control enabled (`set -m`), so every command gets
+its own process group. Timeouts and ESC kill those groups and leave the
+worker alive; if the worker itself is stuck or has died it is replaced,
+starting in the last known working directory.
+"""
+
+import atexit
+import os
+import selectors
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+
+from .. import config
+from .shell_capture import StreamCapture, READ_CHUNK_SIZE
+
+# How often the read loop wakes up to check deadlines and stop requests
+POLL_INTERVAL = 0.1
+# Seconds after SIGTERM before the command's process groups get SIGKILL
+KILL_GRACE = 1.0
+# Seconds after SIGTERM before a worker that never answers is replaced
+RESTART_GRACE = 3.0
+
+
+class _SentinelReader:
+    """Passes stream data through until the end-of-command sentinel is seen."""
+
+    def __init__(self, token: bytes, capture: StreamCapture, on_output=None):
+        self.token = token
+        self.capture = capture
+        self.on_output = on_output
+        self.done = False
+        self.eof = False
+        self.trailer = ""
+        self._pending = b""
+
+    def _emit(self, data: bytes):
+        if data:
+            self.capture.feed(data)
+            if self.on_output is not None:
+                self.on_output(self.capture.name, data)
+
+    def feed(self, data: bytes):
+        """Add a chunk read from the worker."""
+        self._pending += data
+        index = self._pending.find(self.token)
+        if index == -1:
+            # Hold back enough bytes to catch a sentinel split across reads
+            keep = len(self.token) - 1
+            emit_len = max(0, len(self._pending) - keep)
+            self._emit(self._pending[:emit_len])
+            self._pending = self._pending[emit_len:]
+            return
+
+        self._emit(self._pending[:index])
+        self._pending = self._pending[index:]
+        newline = self._pending.find(b"\n")
+        if newline == -1:
+            return  # Wait for the rest of the sentinel line
+        self.trailer = (
+            self._pending[len(self.token) : newline].decode("utf-8", "replace").strip()
+        )
+        self._pending = b""
+        self.done = True
+
+    def flush(self):
+        """Emit anything held back (used when the worker exits)."""
+        self._emit(self._pending)
+        self._pending = b""
+        self.eof = True
+
+
+class ShellSession:
+    """A long-lived bash worker that keeps cwd and environment between commands."""
+
+    def __init__(self, cwd: str = None):
+        self.process = None
+        self.cwd = cwd or os.getcwd()
+        self.last_return_code = None
+        self.restarts = 0
+        self.was_reset = False
+        self._token = b""
+        self._lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        """True if the worker process is running."""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start a fresh worker in the last known working directory."""
+        self._token = f"__AICODER_DONE_{uuid.uuid4().hex}__".encode()
+        cwd = self.cwd if os.path.isdir(self.cwd) else None
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            preexec_fn=os.setsid,  # Keep the worker out of our process group
+        )
+        # Job control gives every command its own process group
+        self._write(b"set -m\n")
+        if config.DEBUG:
+            print(f"DEBUG: Started shell session worker (pid {self.process.pid})")
+
+    def close(self):
+        """Stop the worker and everything it started."""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        # Children first: once the worker is gone they are reparented
+        for pgid in self._child_process_groups(process.pid):
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except (ProcessLookupError, OSError):
+                pass
+        try:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        except (ProcessLookupError, OSError):
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        for pipe in (process.stdin, process.stdout, process.stderr):
+            try:
+                pipe.close()
+            except (OSError, AttributeError):
+                pass
+
+    def restart(self):
+        """Replace the worker; environment changes made so far are lost."""
+        self.close()
+        self.restarts += 1
+        self.was_reset = True
+        self.start()
+
+    def _write(self, data: bytes):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    @staticmethod
+    def _child_process_groups(pid: int) -> set:
+        """Process groups of the worker's direct children."""
+        children = []
+        if os.path.isdir("/proc"):
+            for entry in os.listdir("/proc"):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry}/stat", "rb") as f:
+                        stat = f.read()
+                    # The ppid is the second field after the parenthesized command name
+                    if int(stat[stat.rindex(b")") + 2 :].split()[1]) == pid:
+                        children.append(int(entry))
+                except (OSError, ValueError, IndexError):
+                    continue
+        else:
+            try:
+                result = subprocess.run(
+                    ["pgrep", "-P", str(pid)], capture_output=True, text=True
+                )
+                children = [int(p) for p in result.stdout.split()]
+            except (OSError, ValueError):
+                return set()
+
+        groups = set()
+        for child in children:
+            try:
+                pgid = os.getpgid(child)
+            except (ProcessLookupError, OSError):
+                continue
+            if pgid != pid:  # Never signal the worker's own group
+                groups.add(pgid)
+        return groups
+
+    def interrupt(self, sig=signal.SIGTERM):
+        """Kill the commands the worker is running, leaving the worker alive."""
+        process = self.process
+        if process is None:
+            return
+        for pgid in self._child_process_groups(process.pid):
+            try:
+                os.killpg(pgid, sig)
+            except (ProcessLookupError, OSError):
+                pass
+
+    def run(
+        self, command: str, timeout: float, on_output=None, stop_event=None
+    ):
+        """
+        Run a command in the worker.
+
+        Returns:
+            tuple: (stdout_capture, stderr_capture, timed_out)
+
+        The exit code is left in last_return_code (None if the worker never
+        reported one) and was_reset tells whether the worker had to be
+        replaced, losing earlier environment changes.
+        """
+        with self._lock:
+            self.was_reset = False
+            self.last_return_code = None
+            if not self.is_alive():
+                if self.process is not None:
+                    self.restart()  # The previous worker died
+                else:
+                    self.start()
+
+            stdout_capture = StreamCapture("stdout")
+            stderr_capture = StreamCapture("stderr")
+            out_reader = _SentinelReader(self._token, stdout_capture, on_output)
+            err_reader = _SentinelReader(self._token, stderr_capture, on_output)
+
+            token = self._token.decode()
+            script = (
+                f"eval {shlex.quote(command)} </dev/null\n"
+                "__aicoder_rc=$?\n"
+                f"printf '%s %d %s\\n' '{token}' \"$__aicoder_rc\" \"$PWD\"\n"
+                f"printf '%s\\n' '{token}' >&2\n"
+            )
+            try:
+                self._write(script.encode("utf-8"))
+            except (BrokenPipeError, OSError):
+                self.restart()
+                self._write(script.encode("utf-8"))
+
+            timed_out = self._read_until_done(
+                out_reader, err_reader, timeout, stop_event
+            )
+
+            stdout_capture.close()
+            stderr_capture.close()
+
+            if out_reader.done:
+                rc, _, cwd = out_reader.trailer.partition(" ")
+                try:
+                    self.last_return_code = int(rc)
+                except ValueError:
+                    pass
+                if cwd:
+                    self.cwd = cwd
+            elif not self.is_alive() and self.process is not None:
+                # The command ended the worker itself (exit, exec, set -e...)
+                self.last_return_code = self.process.returncode
+
+            return stdout_capture, stderr_capture, timed_out
+
+    def _read_until_done(self, out_reader, err_reader, timeout, stop_event) -> bool:
+        """Read both streams until their sentinels arrive; returns True on timeout."""
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        interrupted_at = None
+        killed = False
+
+        selector = selectors.DefaultSelector()
+        selector.register(self.process.stdout, selectors.EVENT_READ, out_reader)
+        selector.register(self.process.stderr, selectors.EVENT_READ, err_reader)
+        try:
+            while not (out_reader.done and err_reader.done):
+                now = time.monotonic()
+                if interrupted_at is None:
+                    stop_requested = stop_event is not None and stop_event.is_set()
+                    if now >= deadline or stop_requested:
+                        timed_out = not stop_requested
+                        self.interrupt(signal.SIGTERM)
+                        interrupted_at = now
+                elif not killed and now - interrupted_at >= KILL_GRACE:
+                    self.interrupt(signal.SIGKILL)
+                    killed = True
+                elif now - interrupted_at >= RESTART_GRACE:
+                    # The worker itself is stuck (e.g. a builtin loop)
+                    self.restart()
+                    break
+
+                if out_reader.eof and err_reader.eof:
+                    break
+
+                for key, _ in selector.select(timeout=POLL_INTERVAL):
+                    reader = key.data
+                    data = os.read(key.fd, READ_CHUNK_SIZE)
+                    if not data:
+                        reader.flush()
+                        selector.unregister(key.fileobj)
+                        continue
+                    reader.feed(data)
+        finally:
+            selector.close()
+
+        if out_reader.eof and err_reader.eof and self.process is not None:
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+        return timed_out
+
+
+# Global shell session (created on first use)
+_shell_session = None
+
+
+def get_shell_session() -> ShellSession:
+    """Get the persistent shell session, starting it on first use."""
+    global _shell_session
+    if _shell_session is None:
+        _shell_session = ShellSession()
+        atexit.register(close_shell_session)
+    return _shell_session
+
+
+def close_shell_session():
+    """Stop the persistent shell session if one was started."""
+    global _shell_session
+    if _shell_session is not None:
+        _shell_session.close()
+        _shell_session = None
@@ -0,0 +1,104 @@
+"""
+Versioned tool definitions.
+
+The registry's tool table counts its changes. The definitions list sent to
+the API is built once per version, together with the forms each request
+derives from it (compact JSON, token estimate, plan-mode subset), so a
+request with unchanged tools costs a version comparison.
+"""
+
+import json
+from typing import Any, Callable, Dict, List
+
+
+class ToolTable(dict):
+    """Tool name -> config dict that reports every change to a callback."""
+
+    def __init__(self, on_change: Callable[[], None], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_change = on_change
+
+    def _changed(self):
+        self._on_change()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+class ToolDefinitions(list):
+    """
+    API tool definitions for one tool table version.
+
+    Derived forms are computed on first use and kept for the lifetime of
+    the list; the registry builds a new list when the tools change.
+    """
+
+    def __init__(self, definitions: List[Dict[str, Any]], version: int):
+        super().__init__(definitions)
+        self.version = version
+        self._memo = {}
+
+    def memo(self, key, compute: Callable[[], Any]) -> Any:
+        """Value of compute() for key, computed once."""
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    @property
+    def json(self) -> str:
+        """Compact JSON of the definitions, as sent in the request body."""
+        return self.memo("json", lambda: json.dumps(self, separators=(",", ":")))
+
+    @property
+    def token_estimate(self) -> int:
+        """Estimated tokens of the serialized definitions."""
+        from ..utils import estimate_tokens
+
+        return self.memo("tokens", lambda: estimate_tokens(self.json))
+
+
+def validate_parameters(definitions: List[Dict[str, Any]]) -> List[str]:
+    """
+    Replace parameter blocks that can't be serialized with an empty schema.
+
+    Returns the error messages for the definitions that were fixed.
+    """
+    errors = []
+    for tool_def in definitions:
+        function = tool_def.get("function", {})
+        if "parameters" not in function:
+            continue
+        try:
+            json.dumps(function["parameters"])
+        except Exception as e:
+            errors.append(f"Malformed tool definition parameters: {e}")
+            function["parameters"] = {"type": "object", "properties": {}}
+    return errors
@@ -0,0 +1,322 @@
+"""
+Structured trace log of interactions (TRACE=1).
+
+Each user turn is a trace whose root span ("turn") contains nested spans:
+api_request (with an sse_stream child for streamed responses),
+tool_call:<name>, approval_wait, compaction, autosave and plugin_hook.
+Finished spans are written as JSON lines to TRACE_DIR by a background
+writer, one file per session:
+
+    {"trace": 3, "id": 17, "parent": 12, "name": "tool_call:read_file",
+     "start": 1760000000.123, "end": 1760000000.140, "thread": "MainThread",
+     "attrs": {"success": true}}
+
+Times are wall-clock seconds. Spans opened outside a turn (plugin hooks
+at startup, /compact) have no trace. Convert a log for chrome://tracing
+or Perfetto with:
+
+    python -m aicoder.tracing .aicoder/traces/<file>.jsonl -o trace.json
+
+Nothing is recorded while tracing is disabled; span() then returns a
+shared no-op context manager.
+"""
+
+import contextlib
+import functools
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import config
+from .utils import wmsg
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Span:
+    """An open span; attrs may be added until it is ended."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "attrs", "thread")
+
+    def __init__(self, trace_id, span_id, parent_id, name, start, attrs):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+
+    def to_dict(self, end: float) -> Dict[str, Any]:
+        return {
+            "trace": self.trace_id,
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": end,
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class TraceWriter:
+    """Appends records to a JSONL file from a background thread, in batches."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="aicoder-trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]):
+        self._queue.put(record)
+
+    def _run(self):
+        directory = os.path.dirname(self.path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            wmsg(f"*** Tracing: could not open {self.path}: {e}")
+            return
+        with f:
+            while True:
+                batch = [self._queue.get()]
+                # Drain whatever else is queued so a busy turn costs one write
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                closing = None in batch
+                lines = [json.dumps(record, default=str) for record in batch if record is not None]
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                if closing:
+                    return
+
+    def close(self, timeout: float = 2.0):
+        """Write everything queued so far and stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class Tracer:
+    """Turns (traces) and the spans opened in them."""
+
+    def __init__(self, enabled: bool = False, trace_dir: str = ""):
+        self.enabled = enabled
+        self.trace_dir = trace_dir
+        self.path: Optional[str] = None
+        self._writer: Optional[TraceWriter] = None
+        self._ids = itertools.count(1)
+        self._trace_ids = itertools.count(1)
+        self._local = threading.local()
+        self._turn: Optional[Span] = None
+
+    def _emit(self, record: Dict[str, Any]):
+        if self._writer is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self.path = os.path.join(self.trace_dir, f"{stamp}-{os.getpid()}.jsonl")
+            self._writer = TraceWriter(self.path)
+        self._writer.write(record)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # -- turns ----------------------------------------------------------------
+
+    def begin_turn(self, **attrs):
+        """Start the trace of one user turn; ends any turn still open."""
+        if not self.enabled:
+            return
+        if self._turn is not None:
+            self.end_turn()
+        self._turn = Span(next(self._trace_ids), next(self._ids), None, "turn", time.time(), attrs)
+
+    def end_turn(self, **attrs):
+        turn = self._turn
+        if turn is None:
+            return
+        self._turn = None
+        turn.attrs.update(attrs)
+        self._emit(turn.to_dict(time.time()))
+
+    # -- spans ----------------------------------------------------------------
+
+    def start_span(self, name: str, start: Optional[float] = None, **attrs) -> Optional[Span]:
+        """Open a span under this thread's innermost span, else under the turn."""
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        turn = self._turn
+        if stack:
+            parent = stack[-1]
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif turn is not None:
+            trace_id, parent_id = turn.trace_id, turn.span_id
+        else:
+            trace_id = parent_id = None
+        span = Span(trace_id, next(self._ids), parent_id, name, start or time.time(), attrs)
+        stack.append(span)
+        return span
+
+    def end_span(self, span: Optional[Span], end: Optional[float] = None, **attrs):
+        if span is None:
+            return
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+        span.attrs.update(attrs)
+        self._emit(span.to_dict(end or time.time()))
+
+    def span(self, name: str, **attrs):
+        """Context manager for a span; a shared no-op when tracing is disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, attrs)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, attrs: Dict[str, Any]):
+        span = self.start_span(name, **attrs)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if error:
+                self.end_span(span, error=error)
+            else:
+                self.end_span(span)
+
+    def record_request(self, timing):
+        """api_request (and sse_stream) spans from a finished RequestTiming."""
+        if not self.enabled or timing.end is None:
+            return
+
+        def wall(moment):
+            return timing.wall_time + (moment - timing.start)
+
+        request = self.start_span(
+            "api_request",
+            start=timing.wall_time,
+            model=timing.model,
+            streaming=timing.streaming,
+            success=timing.success,
+        )
+        if timing.error:
+            request.attrs["error"] = timing.error
+        if timing.ttfb is not None:
+            request.attrs["ttfb"] = round(timing.ttfb, 6)
+        if timing.streaming and timing.response_at is not None:
+            stream = self.start_span("sse_stream", start=wall(timing.response_at), chunks=timing.chunks)
+            if timing.ttft is not None:
+                stream.attrs["ttft"] = round(timing.ttft, 6)
+            stream.attrs["completion_tokens"] = timing.completion_tokens
+            self.end_span(stream, end=wall(timing.end))
+        self.end_span(request, end=wall(timing.end))
+
+    def close(self):
+        """End the open turn and flush the writer."""
+        self.end_turn()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def traced(name: str):
+    """Decorator running the function inside a span of the given name."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(config.TRACE, config.TRACE_DIR)
+    return _tracer
+
+
+# -- Chrome trace-event conversion -------------------------------------------
+
+
+def read_trace_log(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def to_chrome_trace(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chrome trace-event JSON ("X" complete events, microseconds) for spans."""
+    records = list(records)
+    origin = min((record["start"] for record in records), default=0.0)
+    thread_ids: Dict[str, int] = {}
+    events = []
+    for record in sorted(records, key=lambda r: (r["start"], -r["end"])):
+        tid = thread_ids.setdefault(record.get("thread", "main"), len(thread_ids) + 1)
+        args = dict(record.get("attrs") or {})
+        if record.get("trace") is not None:
+            args["trace"] = record["trace"]
+        events.append({
+            "name": record["name"],
+            "cat": record["name"].split(":", 1)[0],
+            "ph": "X",
+            "ts": round((record["start"] - origin) * 1e6, 1),
+            "dur": round((record["end"] - record["start"]) * 1e6, 1),
+            "pid": 1,
+            "tid": tid,
+            "args": args,
+        })
+    for thread_name, tid in thread_ids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert an aicoder trace log to Chrome trace-event JSON")
+    parser.add_argument("trace_log", help="JSONL file written with TRACE=1")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    document = json.dumps(to_chrome_trace(read_trace_log(args.trace_log)))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document)
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
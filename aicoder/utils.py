@@ -6,13 +6,15 @@ import os
 import sys
 import re
 import time
-import difflib
 import shutil
 import json
 import datetime
 from typing import Dict, Any, List, Union
 
 from . import config
+from .lazy_import import lazy_import
+
+_diff_engine = lazy_import(".diff_engine", __package__)
 
 
 # Cache for the last API request token estimation - memory efficient
@@ -24,6 +26,18 @@ _last_tool_definitions_tokens = 0
 _tools_definitions_token_est_cache = {}
 _messages_token_est_cache = {}
 
+# Cache name -> [hits, misses] of the token estimation caches (exported as metrics)
+cache_counters = {"messages_token_estimate": [0, 0], "tools_token_estimate": [0, 0]}
+
+
+def count_cache_lookups(name: str, hits: int, misses: int = 0):
+    """Add lookups of a named cache to cache_counters."""
+    counter = cache_counters.get(name)
+    if counter is None:
+        counter = cache_counters[name] = [0, 0]
+    counter[0] += hits
+    counter[1] += misses
+
 # Pre-defined punctuation set at module level for fast lookup (created once, reused)
 _PUNCTUATION_SET = {
     ".",
@@ -205,21 +219,11 @@ def format_tool_prompt(
                     pass
 
             if old_content != content:
-                # Simple line-based diff
-                old_lines = old_content.splitlines(keepends=True)
-                new_lines = content.splitlines(keepends=True)
-                diff = list(
-                    difflib.unified_diff(
-                        old_lines,
-                        new_lines,
-                        fromfile=f"{path} (old)",
-                        tofile=f"{path} (new)",
-                    )
-                )
+                diff = _diff_engine.unified_diff(old_content, content, path)
 
                 if diff:
                     # Colorize the diff output using our new function
-                    diff_text = colorize_diff_lines("".join(diff))
+                    diff_text = colorize_diff_lines(diff)
                 else:
                     diff_text = "No significant changes detected."
 
@@ -238,7 +242,31 @@ def format_tool_prompt(
             # Check if parameters should be hidden
             hidden_parameters = tool_config.get("hidden_parameters", [])
 
-            if file_path and os.path.exists(file_path):
+            if arguments.get("edits") is not None:
+                # Several edits: show them as one combined diff
+                from .tool_manager.internal_tools.edit_file import (
+                    build_edit_list,
+                    locate_edits,
+                )
+
+                prompt_lines.append(f"File: {file_path}")
+                try:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        old_content = f.read()
+
+                    edit_list, error = build_edit_list(edits=arguments["edits"])
+                    if not error:
+                        spans, error = locate_edits(old_content, edit_list, file_path)
+                    if error:
+                        prompt_lines.append(f"Warning: {error[len('Error: '):]}")
+                    else:
+                        # Only the lines around each edit are diffed
+                        diff = _diff_engine.replacement_diff(old_content, spans, file_path)
+                        prompt_lines.append(f"Changes ({len(edit_list)} edits):")
+                        prompt_lines.append(colorize_diff_lines(diff))
+                except Exception as e:
+                    prompt_lines.append(f"Error reading file {file_path}: {e}")
+            elif file_path and os.path.exists(file_path):
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
                         old_content = f.read()
@@ -257,28 +285,22 @@ def format_tool_prompt(
                         else:
                             # Always generate diff for edit_file - users need to see changes to approve them
                             # Even when parameters are hidden, we can show the actual file changes
-                            # Generate the new content
-                            new_content = (
-                                old_content[:first_index]
-                                + new_string
-                                + old_content[first_index + len(old_string) :]
-                            )
-
-                            # Generate diff
-                            old_lines = old_content.splitlines(keepends=True)
-                            new_lines = new_content.splitlines(keepends=True)
-                            diff = list(
-                                difflib.unified_diff(
-                                    old_lines,
-                                    new_lines,
-                                    fromfile=f"{file_path} (old)",
-                                    tofile=f"{file_path} (new)",
-                                )
+                            # Diff only the lines around the replaced span
+                            diff = _diff_engine.replacement_diff(
+                                old_content,
+                                [
+                                    (
+                                        first_index,
+                                        first_index + len(old_string),
+                                        new_string,
+                                    )
+                                ],
+                                file_path,
                             )
 
                             if diff:
                                 # Colorize the diff output
-                                diff_text = colorize_diff_lines("".join(diff))
+                                diff_text = colorize_diff_lines(diff)
                                 prompt_lines.append(f"File: {file_path}")
                                 prompt_lines.append("Changes:")
                                 prompt_lines.append(diff_text)
@@ -291,24 +313,12 @@ def format_tool_prompt(
                     prompt_lines.append(f"Error reading file {file_path}: {e}")
             elif file_path and not os.path.exists(file_path) and old_string == "":
                 # For new file creation (old_string is empty), show a diff with all lines as additions
-                old_content = ""
-                new_content = new_string
-
                 # Generate diff for new file (empty old content vs new content)
-                old_lines = old_content.splitlines(keepends=True)
-                new_lines = new_content.splitlines(keepends=True)
-                diff = list(
-                    difflib.unified_diff(
-                        old_lines,
-                        new_lines,
-                        fromfile=f"{file_path} (old)",
-                        tofile=f"{file_path} (new)",
-                    )
-                )
+                diff = _diff_engine.unified_diff("", new_string, file_path)
 
                 if diff:
                     # Colorize the diff output
-                    diff_text = colorize_diff_lines("".join(diff))
+                    diff_text = colorize_diff_lines(diff)
                     prompt_lines.append(f"File: {file_path} (new file)")
                     prompt_lines.append("Changes:")
                     prompt_lines.append(diff_text)
@@ -611,15 +621,21 @@ def _estimate_tools_definitions_tokens(tools_definitions):
     Estimate the tools definitions tokens and cache it
     """
     from .utils import estimate_tokens
+    from .tool_manager.tool_definitions import ToolDefinitions
+
+    if isinstance(tools_definitions, ToolDefinitions):
+        return tools_definitions.token_estimate
 
     tools_definitions_json = json.dumps(tools_definitions, separators=(",", ":"))
 
     hash_tdef = hash(tools_definitions_json)
     if hash_tdef in _tools_definitions_token_est_cache:
         tokens_estimation = _tools_definitions_token_est_cache[hash_tdef]
+        count_cache_lookups("tools_token_estimate", 1)
     else:
         tokens_estimation = estimate_tokens(tools_definitions_json)
         _tools_definitions_token_est_cache[hash_tdef] = tokens_estimation
+        count_cache_lookups("tools_token_estimate", 0, 1)
 
     return tokens_estimation
 
@@ -642,6 +658,7 @@ def estimate_messages_tokens(messages: List[Dict]) -> int:
     global _last_tool_definitions_tokens
 
     stoken = 0
+    misses = 0
     for msg in messages:
         id_msg = id(msg)
         if id_msg in _messages_token_est_cache:
@@ -651,6 +668,8 @@ def estimate_messages_tokens(messages: List[Dict]) -> int:
             msg_estimation = estimate_tokens(msg_json)
             _messages_token_est_cache[id_msg] = msg_estimation
             stoken += msg_estimation
+            misses += 1
+    count_cache_lookups("messages_token_estimate", len(messages) - misses, misses)
 
     return stoken + _last_tool_definitions_tokens
 
@@ -0,0 +1 @@
+"""Offline benchmarks for AICoder, run with: python -m benchmarks.run"""
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Configurable mock OpenAI chat completions server for the benchmarks.
+
+Answers POST .../chat/completions like the real API, in SSE (streaming) or
+plain JSON form. Every user prompt is answered with `tool_rounds` rounds of
+`tool_fanout` parallel tool calls followed by a text answer, so one prompt
+drives a full request -> tools -> request loop in AICoder. Output "tokens"
+are short words, sent `chunk_tokens` at a time at `token_rate` tokens per
+second (0 sends as fast as possible).
+
+Run standalone to point an interactive AICoder at it:
+    python -m benchmarks.mock_server --port 8765 --tool-rounds 2 --tool-fanout 3
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=x python aicoder.py
+"""
+
+import argparse
+import http.server
+import itertools
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List
+
+_WORDS = (
+    "the", "quick", "brown", "fox", "jumps", "over", "a", "lazy", "dog", "and",
+    "then", "reads", "some", "code", "to", "find", "every", "slow", "path",
+)
+
+
+@dataclass
+class MockServerConfig:
+    """Shape of the responses the mock server produces."""
+
+    token_rate: float = 0.0  # Output tokens per second, 0 = unthrottled
+    chunk_tokens: int = 4  # Tokens per SSE chunk
+    response_tokens: int = 200  # Tokens in each text answer
+    tool_rounds: int = 0  # Tool call rounds before the text answer
+    tool_fanout: int = 1  # Parallel tool calls per round
+    tool_name: str = "read_file"
+    tool_file: str = "bench_fixture.txt"  # Path passed to read_file
+    tool_command: str = "true"  # Command passed to run_shell_command
+    error_status: int = 0  # Answer completions with this HTTP error, 0 = never
+    error_after: int = 0  # Completions answered normally before error_status applies
+
+
+def _tokens(count: int) -> Iterator[str]:
+    words = itertools.cycle(_WORDS)
+    for index in range(count):
+        yield ("" if index == 0 else " ") + next(words)
+
+
+def _tool_arguments(config: MockServerConfig, index: int) -> str:
+    if config.tool_name == "read_file":
+        return json.dumps({"path": config.tool_file})
+    if config.tool_name == "list_directory":
+        return json.dumps({"path": "."})
+    if config.tool_name == "run_shell_command":
+        return json.dumps({"command": config.tool_command})
+    return json.dumps({"index": index})
+
+
+def _completed_tool_rounds(messages: List[Dict[str, Any]]) -> int:
+    """Tool call rounds the assistant made since the last user message."""
+    rounds = 0
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            break
+        if message.get("role") == "assistant" and message.get("tool_calls"):
+            rounds += 1
+    return rounds
+
+
+class MockOpenAIHandler(http.server.BaseHTTPRequestHandler):
+    """Request handler; the server's `config` shapes every response."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock-model"}]})
+        else:
+            self._send_json(200, {"status": "healthy", "config": asdict(self.server.config)})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "code": 404}})
+            return
+        try:
+            request = json.loads(body)
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON", "code": 400}})
+            return
+
+        self.server.record_request(len(body))
+        config = self.server.config
+        if config.error_status and self.server.requests > config.error_after:
+            message = f"Mock error {config.error_status}"
+            self._send_json(config.error_status, {"error": {"message": message, "code": config.error_status}})
+            return
+        messages = request.get("messages", [])
+        wants_tools = bool(request.get("tools")) and (
+            _completed_tool_rounds(messages) < config.tool_rounds
+        )
+        usage = {
+            "prompt_tokens": len(body) // 4,
+            "completion_tokens": config.response_tokens,
+            "total_tokens": len(body) // 4 + config.response_tokens,
+        }
+        if request.get("stream"):
+            self._stream_response(config, wants_tools, usage)
+        else:
+            self._send_json(200, self._completion(config, wants_tools, usage))
+
+    def _tool_calls(self, config: MockServerConfig) -> List[Dict[str, Any]]:
+        request_id = self.server.requests
+        return [
+            {
+                "id": f"call_{request_id}_{index}",
+                "type": "function",
+                "function": {
+                    "name": config.tool_name,
+                    "arguments": _tool_arguments(config, index),
+                },
+            }
+            for index in range(config.tool_fanout)
+        ]
+
+    def _completion(self, config, wants_tools, usage) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant"}
+        if wants_tools:
+            message["content"] = None
+            message["tool_calls"] = self._tool_calls(config)
+        else:
+            message["content"] = "".join(_tokens(config.response_tokens))
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "mock-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if wants_tools else "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    def _chunk(self, delta: Dict[str, Any], finish_reason=None, usage=None) -> bytes:
+        data: Dict[str, Any] = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "mock-model",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if usage:
+            data["usage"] = usage
+        return f"data: {json.dumps(data)}\n\n".encode("utf-8")
+
+    def _stream_response(self, config, wants_tools, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_tokens = max(1, config.chunk_tokens)
+        delay = chunk_tokens / config.token_rate if config.token_rate > 0 else 0.0
+
+        def send(payload: bytes):
+            self.wfile.write(payload)
+            self.wfile.flush()
+            if delay:
+                time.sleep(delay)
+
+        try:
+            send(self._chunk({"role": "assistant", "content": ""}))
+            if wants_tools:
+                # Each call's arguments arrive in chunk_tokens * 4 character pieces
+                piece = chunk_tokens * 4
+                for index, call in enumerate(self._tool_calls(config)):
+                    arguments = call["function"]["arguments"]
+                    send(self._chunk({"tool_calls": [{
+                        "index": index,
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": call["function"]["name"], "arguments": ""},
+                    }]}))
+                    for start in range(0, len(arguments), piece):
+                        send(self._chunk({"tool_calls": [{
+                            "index": index,
+                            "function": {"arguments": arguments[start:start + piece]},
+                        }]}))
+                finish_reason = "tool_calls"
+            else:
+                tokens = list(_tokens(config.response_tokens))
+                for start in range(0, len(tokens), chunk_tokens):
+                    send(self._chunk({"content": "".join(tokens[start:start + chunk_tokens])}))
+                finish_reason = "stop"
+            self.wfile.write(self._chunk({}, finish_reason=finish_reason, usage=usage))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_json(self, code: int, data: Dict[str, Any]):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockOpenAIServer(http.server.ThreadingHTTPServer):
+    """Threaded mock server; counts the requests and request bytes it sees."""
+
+    daemon_threads = True
+
+    def __init__(self, config: MockServerConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), MockOpenAIHandler)
+        self.config = config
+        self.requests = 0
+        self.request_bytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record_request(self, size: int):
+        with self._lock:
+            self.requests += 1
+            self.request_bytes += size
+
+    def start(self) -> "MockOpenAIServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    defaults = MockServerConfig()
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate)
+    parser.add_argument("--chunk-tokens", type=int, default=defaults.chunk_tokens)
+    parser.add_argument("--response-tokens", type=int, default=defaults.response_tokens)
+    parser.add_argument("--tool-rounds", type=int, default=defaults.tool_rounds)
+    parser.add_argument("--tool-fanout", type=int, default=defaults.tool_fanout)
+    parser.add_argument("--tool-name", default=defaults.tool_name)
+    parser.add_argument("--tool-file", default=defaults.tool_file)
+    parser.add_argument("--tool-command", default=defaults.tool_command)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--error-after", type=int, default=defaults.error_after)
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        token_rate=args.token_rate,
+        chunk_tokens=args.chunk_tokens,
+        response_tokens=args.response_tokens,
+        tool_rounds=args.tool_rounds,
+        tool_fanout=args.tool_fanout,
+        tool_name=args.tool_name,
+        tool_file=args.tool_file,
+        tool_command=args.tool_command,
+        error_status=args.error_status,
+        error_after=args.error_after,
+    )
+    server = MockOpenAIServer(config, args.host, args.port)
+    print(f"Mock OpenAI server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
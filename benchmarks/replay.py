@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Replay a STREAM_LOG_FILE recording against the real app.
+
+A stream log (STREAM_LOG_FILE=session.log) holds every streaming request
+the app sent, the raw SSE lines that came back (prefixed with their offset
+from the request start) and the response the app assembled from them. This
+tool serves the recorded responses in order from a local HTTP server, with
+the original timing (--speed 1) or as fast as possible (the default), and
+drives aicoder.py in file-prompt mode with the recorded user prompts. The
+SSE lines are served byte for byte, so pathological provider output is
+reproduced exactly: tool call arguments split into single characters,
+streams that end without [DONE], odd usage chunks.
+
+The replayed app logs its own stream, and afterwards every assembled
+response is compared with the recorded one. Requests whose message roles
+differ from the recording are reported as divergences.
+
+Recorded tool calls are executed for real, in a scratch directory
+(--workdir, default: a new temporary directory) with HOME pointed there too.
+Replay only logs you trust.
+
+Usage:
+    python -m benchmarks.replay session.log
+    python -m benchmarks.replay session.log --speed 1 --show-output
+    python -m benchmarks.replay session.log --cprofile replay.prof --report report.json
+    python -m benchmarks.replay session.log --serve-only --port 8765
+"""
+
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.run import ROOT, app_env
+
+REQUEST_MARKER = "=== REQUEST ==="
+FINAL_RESPONSE_MARKER = "=== FINAL RESPONSE ==="
+
+
+@dataclass
+class RecordedExchange:
+    """One logged streaming request and what came back."""
+
+    request: Dict[str, Any]
+    # (seconds since the request started or None for old logs, raw SSE line)
+    events: List[Tuple[Optional[float], str]] = field(default_factory=list)
+    final_response: Optional[Dict[str, Any]] = None
+
+
+def _read_json_block(first_line: str, lines) -> Optional[Dict[str, Any]]:
+    """Read an indented JSON dump that starts at first_line."""
+    block = [first_line]
+    if first_line.strip() == "{}":
+        return {}
+    for line in lines:
+        block.append(line)
+        if line == "}":
+            try:
+                return json.loads("\n".join(block))
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def parse_stream_log(path: str) -> List[RecordedExchange]:
+    """Parse a stream log into its request/response exchanges."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = iter(f.read().splitlines())
+
+    exchanges: List[RecordedExchange] = []
+    for line in lines:
+        if line in (REQUEST_MARKER, FINAL_RESPONSE_MARKER):
+            data = _read_json_block(next(lines, "").rstrip(), lines)
+            if data is None:
+                break
+            if line == REQUEST_MARKER:
+                exchanges.append(RecordedExchange(request=data))
+            elif exchanges:
+                exchanges[-1].final_response = data
+        elif not exchanges or not line.strip() or line.startswith("DEBUG:"):
+            continue
+        elif line.startswith("@"):
+            offset, _, raw = line[1:].partition(" ")
+            try:
+                exchanges[-1].events.append((float(offset), raw))
+            except ValueError:
+                continue
+        else:
+            # Older logs hold only the payload after "data:"
+            exchanges[-1].events.append((None, "data:" + line))
+    return exchanges
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = "\n".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return content
+
+
+def recorded_prompts(exchanges: List[RecordedExchange]) -> List[str]:
+    """User prompts that started a turn, in order."""
+    prompts = []
+    for exchange in exchanges:
+        messages = exchange.request.get("messages") or []
+        if messages and messages[-1].get("role") == "user":
+            prompts.append(_message_text(messages[-1]))
+    return prompts
+
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            request = json.loads(body)
+        except json.JSONDecodeError:
+            request = {}
+        exchange = self.server.next_exchange(request)
+        if exchange is None or not request.get("stream"):
+            reason = "recording exhausted" if exchange is None else "only streaming requests are recorded"
+            payload = json.dumps({"error": {"message": f"Replay: {reason}", "code": 400}}).encode()
+            self.send_response(400)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        started = time.perf_counter()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        speed = self.server.speed
+        try:
+            for offset, raw in exchange.events:
+                if speed > 0 and offset is not None:
+                    delay = started + offset / speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.wfile.write(raw.encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class ReplayServer(http.server.ThreadingHTTPServer):
+    """Serves recorded exchanges in order and notes where requests diverge."""
+
+    daemon_threads = True
+
+    def __init__(self, exchanges: List[RecordedExchange], speed: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), ReplayHandler)
+        self.exchanges = exchanges
+        self.speed = speed
+        self.served = 0
+        self.extra_requests = 0
+        self.divergences: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_exchange(self, request: Dict[str, Any]) -> Optional[RecordedExchange]:
+        with self._lock:
+            if self.served >= len(self.exchanges):
+                self.extra_requests += 1
+                return None
+            index = self.served
+            self.served += 1
+        exchange = self.exchanges[index]
+        expected = [m.get("role") for m in exchange.request.get("messages", [])]
+        actual = [m.get("role") for m in request.get("messages", [])]
+        if expected != actual:
+            with self._lock:
+                self.divergences.append(
+                    {"request": index, "expected_roles": expected, "actual_roles": actual}
+                )
+        return exchange
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def _response_summary(response: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The parts of an assembled response a replay must reproduce."""
+    if not response or not response.get("choices"):
+        return {}
+    choice = response["choices"][0]
+    message = choice.get("message", {})
+    return {
+        "content": message.get("content"),
+        "tool_calls": [
+            (call.get("function", {}).get("name"), call.get("function", {}).get("arguments"))
+            for call in message.get("tool_calls") or []
+        ],
+        "finish_reason": choice.get("finish_reason"),
+    }
+
+
+def compare_final_responses(recorded: List[RecordedExchange],
+                            replayed: List[RecordedExchange]) -> List[Dict[str, Any]]:
+    """Requests whose assembled response differs between the two logs."""
+    differences = []
+    for index, original in enumerate(recorded):
+        if original.final_response is None:
+            continue
+        expected = _response_summary(original.final_response)
+        actual = _response_summary(replayed[index].final_response) if index < len(replayed) else {}
+        changed = sorted(key for key in expected if expected.get(key) != actual.get(key))
+        if changed:
+            differences.append({"request": index, "fields": changed})
+    return differences
+
+
+def _wait_until_consumed(path: str, proc: subprocess.Popen, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while os.path.exists(path):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def replay_session(
+    log_path: str,
+    speed: float = 0.0,
+    workdir: Optional[str] = None,
+    timeout: float = 300.0,
+    show_output: bool = False,
+    cprofile: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Replay a stream log through aicoder.py and report how it went."""
+    exchanges = parse_stream_log(log_path)
+    if not exchanges:
+        raise ValueError(f"No requests found in {log_path}")
+    prompts = recorded_prompts(exchanges)
+
+    with tempfile.TemporaryDirectory(prefix="aicoder-replay-") as scratch:
+        workdir = os.path.abspath(workdir or scratch)
+        home = os.path.join(scratch, "home")
+        os.makedirs(home, exist_ok=True)
+        prompt_file = os.path.join(scratch, "prompt.txt")
+        replay_log = os.path.join(scratch, "replay_stream.log")
+
+        server = ReplayServer(exchanges, speed).start()
+        env = app_env(server.base_url, home)
+        env.update(
+            {
+                "AICODER_PROMPT_FILE": prompt_file,
+                "STREAM_LOG_FILE": replay_log,
+                "OPENAI_MODEL": exchanges[0].request.get("model") or "replay-model",
+            }
+        )
+        command = [sys.executable]
+        if cprofile:
+            command += ["-m", "cProfile", "-o", os.path.abspath(cprofile)]
+        command.append(os.path.join(ROOT, "aicoder.py"))
+
+        started = time.perf_counter()
+        output = None if show_output else subprocess.DEVNULL
+        proc = subprocess.Popen(
+            command, cwd=workdir, env=env, stdin=subprocess.DEVNULL,
+            stdout=output, stderr=output,
+        )
+        completed = True
+        try:
+            # The app only reads a prompt when it is back at the input
+            # prompt, so each one can be queued as soon as the last is read
+            for prompt in prompts + ["/quit"]:
+                with open(prompt_file, "w", encoding="utf-8") as f:
+                    f.write(prompt)
+                if not _wait_until_consumed(prompt_file, proc, timeout):
+                    completed = False
+                    break
+            proc.wait(timeout=timeout if completed else 5)
+        except subprocess.TimeoutExpired:
+            completed = False
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            server.stop()
+        wall = time.perf_counter() - started
+
+        replayed = parse_stream_log(replay_log) if os.path.exists(replay_log) else []
+
+    return {
+        "log": log_path,
+        "speed": speed,
+        "completed": completed,
+        "exit_code": proc.returncode,
+        "wall_s": wall,
+        "prompts": len(prompts),
+        "recorded_requests": len(exchanges),
+        "served_requests": server.served,
+        "extra_requests": server.extra_requests,
+        "divergences": server.divergences,
+        "response_differences": compare_final_responses(exchanges, replayed),
+    }
+
+
+def serve_only(log_path: str, speed: float, host: str, port: int):
+    exchanges = parse_stream_log(log_path)
+    server = ReplayServer(exchanges, speed, host, port)
+    print(f"Replaying {len(exchanges)} recorded request(s) on {server.base_url}")
+    for index, prompt in enumerate(recorded_prompts(exchanges), 1):
+        print(f"  prompt {index}: {prompt[:70]!r}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {server.served}/{len(exchanges)}, divergences: {len(server.divergences)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a STREAM_LOG_FILE recording")
+    parser.add_argument("log", help="Stream log written with STREAM_LOG_FILE")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 = original timing, 2 = twice as fast, 0 = no delays (default)")
+    parser.add_argument("--workdir", help="Directory the app runs (and executes tools) in")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--show-output", action="store_true", help="Show the app's output")
+    parser.add_argument("--cprofile", metavar="FILE", help="Run the app under cProfile")
+    parser.add_argument("--report", metavar="FILE", help="Write the replay report as JSON")
+    parser.add_argument("--serve-only", action="store_true",
+                        help="Only serve the recording; point OPENAI_BASE_URL at it")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.serve_only:
+        serve_only(args.log, args.speed, args.host, args.port)
+        return 0
+
+    report = replay_session(
+        args.log,
+        speed=args.speed,
+        workdir=args.workdir,
+        timeout=args.timeout,
+        show_output=args.show_output,
+        cprofile=args.cprofile,
+    )
+    print(
+        f"Replayed {report['served_requests']}/{report['recorded_requests']} requests "
+        f"from {report['prompts']} prompt(s) in {report['wall_s']:.2f}s"
+    )
+    for divergence in report["divergences"]:
+        print(f"  request {divergence['request']}: message roles differ from the recording")
+    for difference in report["response_differences"]:
+        print(f"  request {difference['request']}: {', '.join(difference['fields'])} differ")
+    if report["extra_requests"]:
+        print(f"  {report['extra_requests']} request(s) beyond the recording")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    ok = (
+        report["completed"]
+        and report["served_requests"] == report["recorded_requests"]
+        and not report["divergences"]
+        and not report["response_differences"]
+        and not report["extra_requests"]
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: full AICoder request -> tool -> request loops
+against the local mock server in benchmarks/mock_server.py.
+
+Each run starts a fresh AICoder in a child process (so imports, singletons
+and RSS start cold), feeds it the scenario's prompts and measures the client
+per phase:
+
+    import   importing aicoder.app
+    init     constructing AICoder
+    request  every _make_api_request call (serialize, wait, stream, parse)
+    tools    every _execute_tool_calls call
+    session  the whole interactive loop, including the two above
+
+For each phase the result holds wall time, user/system CPU time, RSS after
+the phase, and read/write syscall and context switch counts (Linux
+/proc/self/io and getrusage). The mock server runs in this parent process,
+so its CPU time never shows up in the client numbers.
+
+Usage:
+    python -m benchmarks.run                        # all scenarios, 3 runs each
+    python -m benchmarks.run -s tool_fanout -n 5 --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+    python -m benchmarks.run -s chat --token-rate 50 --chunk-tokens 1
+
+Results are JSON with the git commit, Python version and scenario
+parameters, so files written on different commits can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULT_SCHEMA = 1
+PHASES = ("import", "init", "request", "tools", "session")
+METRICS = (
+    "wall_s",
+    "cpu_user_s",
+    "cpu_system_s",
+    "rss_kb",
+    "syscalls_read",
+    "syscalls_write",
+    "ctx_switches_voluntary",
+    "ctx_switches_involuntary",
+    "calls",
+)
+
+
+@dataclass
+class Scenario:
+    """One benchmark workload; server-side fields mirror MockServerConfig."""
+
+    name: str
+    turns: int = 3  # User prompts per session
+    context_kb: int = 0  # Padding added to the first prompt
+    file_kb: int = 4  # Size of the file the read_file calls return
+    streaming: bool = True
+    token_rate: float = 0.0
+    chunk_tokens: int = 4
+    response_tokens: int = 200
+    tool_rounds: int = 0
+    tool_fanout: int = 1
+    tool_name: str = "read_file"
+
+
+SCENARIOS = {
+    "chat": Scenario("chat", turns=5, response_tokens=400),
+    "tool_fanout": Scenario("tool_fanout", turns=2, tool_rounds=3, tool_fanout=4),
+    "large_context": Scenario(
+        "large_context", turns=3, context_kb=256, file_kb=64, tool_rounds=1, tool_fanout=2
+    ),
+    "throttled": Scenario("throttled", turns=2, token_rate=400, chunk_tokens=2),
+    "non_streaming": Scenario("non_streaming", turns=3, streaming=False, tool_rounds=1, tool_fanout=4),
+}
+
+FIXTURE_FILE = "bench_fixture.txt"
+
+
+# ----------------------------------------------------------------------------
+# Client side (child process)
+# ----------------------------------------------------------------------------
+
+
+def _proc_io() -> Dict[str, int]:
+    """syscr/syscw from /proc/self/io; empty where unavailable."""
+    counters = {}
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("syscr", "syscw"):
+                    counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def _sample() -> Dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    io = _proc_io()
+    return {
+        "wall_s": time.perf_counter(),
+        "cpu_user_s": usage.ru_utime,
+        "cpu_system_s": usage.ru_stime,
+        "syscalls_read": io.get("syscr", 0),
+        "syscalls_write": io.get("syscw", 0),
+        "ctx_switches_voluntary": usage.ru_nvcsw,
+        "ctx_switches_involuntary": usage.ru_nivcsw,
+    }
+
+
+class PhaseMeter:
+    """Accumulates resource usage per named phase; phases may repeat."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        before = _sample()
+        try:
+            yield
+        finally:
+            after = _sample()
+            totals = self.phases.setdefault(name, {"calls": 0})
+            for key, value in after.items():
+                totals[key] = totals.get(key, 0) + value - before[key]
+            totals["calls"] += 1
+            # Imported here, after the sample, so the import phase does not count it
+            from aicoder.memory_tracker import rss_kb
+
+            totals["rss_kb"] = rss_kb()
+
+    def wrap(self, name: str, func):
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def _prompts(scenario: Scenario) -> List[str]:
+    prompts = []
+    for turn in range(scenario.turns):
+        prompt = f"Benchmark turn {turn + 1}: look at {FIXTURE_FILE} and summarize it."
+        if turn == 0 and scenario.context_kb:
+            line = "context padding for the benchmark, one line of filler text\n"
+            prompt += "\n" + line * (scenario.context_kb * 1024 // len(line))
+        prompts.append(prompt)
+    return prompts
+
+
+def run_worker(scenario: Scenario, result_path: str):
+    """Run one AICoder session against the mock server; write the metrics."""
+    meter = PhaseMeter()
+    with meter.phase("import"):
+        from aicoder.app import AICoder
+
+    with meter.phase("init"):
+        app = AICoder()
+
+    app._make_api_request = meter.wrap("request", app._make_api_request)
+    app._execute_tool_calls = meter.wrap("tools", app._execute_tool_calls)
+    prompts = iter(_prompts(scenario))
+
+    def next_prompt():
+        try:
+            return next(prompts)
+        except StopIteration:
+            raise EOFError
+
+    app._get_multiline_input = next_prompt
+
+    with meter.phase("session"):
+        app.run()
+
+    stats = app.stats
+    result = {
+        "phases": meter.phases,
+        "api_requests": stats.api_requests,
+        "api_success": stats.api_success,
+        "tool_calls": stats.tool_calls,
+        "prompt_tokens": stats.prompt_tokens,
+        "completion_tokens": stats.completion_tokens,
+        "messages": len(app.message_history.messages),
+    }
+    timings = getattr(stats, "request_timings", None)
+    if timings:
+        from aicoder.request_timing import percentile
+
+        for field_name in ("ttfb", "ttft", "total"):
+            values = [getattr(t, field_name) for t in timings if getattr(t, field_name) is not None]
+            result[f"{field_name}_p50_s"] = percentile(values, 50)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ----------------------------------------------------------------------------
+# Driver side (parent process)
+# ----------------------------------------------------------------------------
+
+
+def _git_info() -> Dict[str, Any]:
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def app_env(base_url: str, home: str, streaming: bool = True) -> Dict[str, str]:
+    """Environment for an AICoder child isolated from the user's setup."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(("AICODER_", "OPENAI_", "PLAN_", "REQUEST_TIMING"))
+    }
+    env.update(
+        {
+            "PYTHONPATH": ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+            "HOME": home,
+            "XDG_CONFIG_HOME": os.path.join(home, ".config"),
+            "OPENAI_BASE_URL": base_url,
+            "OPENAI_API_KEY": "mock-key",
+            "OPENAI_MODEL": "mock-model",
+            "YOLO_MODE": "1",
+            "AICODER_THEME": "original",
+            # Large enough that auto-compaction never changes the workload
+            "CONTEXT_SIZE": "10000000",
+        }
+    )
+    if not streaming:
+        env["DISABLE_STREAMING"] = "1"
+    else:
+        env.pop("DISABLE_STREAMING", None)
+    return env
+
+
+def run_once(scenario: Scenario, timeout: float = 300) -> Dict[str, Any]:
+    """Run one session of a scenario in a fresh process."""
+    from benchmarks.mock_server import MockOpenAIServer, MockServerConfig
+
+    server_fields = {f.name for f in fields(MockServerConfig)}
+    config = MockServerConfig(
+        **{k: v for k, v in asdict(scenario).items() if k in server_fields}
+    )
+    config.tool_file = FIXTURE_FILE
+    server = MockOpenAIServer(config).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="aicoder-bench-") as workdir:
+            with open(os.path.join(workdir, FIXTURE_FILE), "w", encoding="utf-8") as f:
+                line = "fixture line for the read_file tool in the benchmark\n"
+                f.write(line * max(1, scenario.file_kb * 1024 // len(line)))
+            result_path = os.path.join(workdir, "result.json")
+            home = os.path.join(workdir, "home")
+            os.makedirs(home)
+            proc = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.run",
+                    "--worker", json.dumps(asdict(scenario)), result_path,
+                ],
+                cwd=workdir,
+                env=app_env(server.base_url, home, scenario.streaming),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=timeout,
+            )
+            if proc.returncode != 0 or not os.path.exists(result_path):
+                raise RuntimeError(
+                    f"Benchmark worker for {scenario.name} failed "
+                    f"(exit {proc.returncode}):\n{proc.stderr[-2000:]}"
+                )
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+    finally:
+        server.stop()
+    result["server_requests"] = server.requests
+    result["server_request_bytes"] = server.request_bytes
+    return result
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Median of every metric of every phase across runs."""
+    summary = {}
+    for phase in PHASES:
+        samples = [run["phases"][phase] for run in runs if phase in run["phases"]]
+        if samples:
+            summary[phase] = {
+                metric: statistics.median(sample.get(metric, 0) for sample in samples)
+                for metric in METRICS
+            }
+    return summary
+
+
+def run_benchmarks(scenarios: List[Scenario], repeat: int = 3, log=print) -> Dict[str, Any]:
+    results = {
+        "schema": RESULT_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": _git_info(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        runs = []
+        for index in range(repeat):
+            log(f"  {scenario.name}: run {index + 1}/{repeat}")
+            runs.append(run_once(scenario))
+        results["scenarios"][scenario.name] = {
+            "params": asdict(scenario),
+            "runs": runs,
+            "summary": summarize(runs),
+        }
+    return results
+
+
+def format_summary(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Table of the headline metrics, with the change against a baseline."""
+    headline = ("wall_s", "cpu_user_s", "cpu_system_s", "rss_kb", "syscalls_read", "syscalls_write")
+    lines = []
+    for name, scenario in results["scenarios"].items():
+        base = ((baseline or {}).get("scenarios", {}).get(name) or {}).get("summary", {})
+        lines.append(f"{name}:")
+        lines.append(f"  {'phase':<9}" + "".join(f"{m:>22}" for m in headline))
+        for phase, metrics in scenario["summary"].items():
+            cells = []
+            for metric in headline:
+                value = metrics[metric]
+                cell = f"{value:.4f}" if metric.endswith("_s") else f"{value:.0f}"
+                old = base.get(phase, {}).get(metric)
+                if old:
+                    cell += f" ({(value - old) / old * 100:+.0f}%)"
+                cells.append(f"{cell:>22}")
+            lines.append(f"  {phase:<9}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def _scenario_overrides(args) -> Dict[str, Any]:
+    overrides = {}
+    for field in fields(Scenario):
+        value = getattr(args, field.name, None)
+        if field.name != "name" and value is not None:
+            overrides[field.name] = value
+    return overrides
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--worker"]:
+        run_worker(Scenario(**json.loads(argv[1])), argv[2])
+        return 0
+
+    parser = argparse.ArgumentParser(description="Run the offline AICoder benchmarks")
+    parser.add_argument(
+        "-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Runs per scenario")
+    parser.add_argument("-o", "--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    parser.add_argument("--turns", type=int)
+    parser.add_argument("--context-kb", type=int)
+    parser.add_argument("--file-kb", type=int)
+    parser.add_argument("--token-rate", type=float)
+    parser.add_argument("--chunk-tokens", type=int)
+    parser.add_argument("--response-tokens", type=int)
+    parser.add_argument("--tool-rounds", type=int)
+    parser.add_argument("--tool-fanout", type=int)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name}: {asdict(scenario)}")
+        return 0
+
+    overrides = _scenario_overrides(args)
+    scenarios = [
+        replace(SCENARIOS[name], **overrides) for name in (args.scenario or SCENARIOS)
+    ]
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"Running {len(scenarios)} scenario(s), {args.repeat} run(s) each")
+    results = run_benchmarks(scenarios, repeat=args.repeat)
+    print(format_summary(results, baseline))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
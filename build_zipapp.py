@@ -1,38 +1,85 @@
 #!/usr/bin/env python3
 """
 Script to build a zipapp version of AI Coder for easy distribution.
+
+The zipapp ships bytecode compiled by the Python running this script next to
+each source file. zipimport loads that bytecode directly when the versions
+match and falls back to compiling the source on any other Python, so build
+with the Python the zipapp will mostly run on (e.g. python3.11 build_zipapp.py).
+
+Options:
+    --optimize N     Bytecode optimization level (0 or 1, default 1; 2 would
+                     strip the docstrings /help displays)
+    --no-bytecode    Ship sources only
+    --no-snapshot    Don't embed the precomputed startup data
+    --output FILE    Output file (default aicoder.pyz)
 """
 
+import argparse
 import os
+import py_compile
 import shutil
+import sys
 import zipfile
 
+from aicoder.startup_snapshot import SNAPSHOT_MODULE, build_snapshot, render_snapshot
+
+
+def write_snapshot(package_dir):
+    """Generate the startup snapshot module inside the package copy."""
+    snapshot_path = os.path.join(package_dir, f"{SNAPSHOT_MODULE}.py")
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        f.write(render_snapshot(build_snapshot(package_dir)))
+    return snapshot_path
+
+
+def compile_bytecode(source_path, optimize):
+    """Compile a source file to a .pyc next to it, as zipimport expects.
+
+    Unchecked hash-based pycs are used, so zipimport neither compares them
+    against zip timestamps nor rehashes the source.
+    """
+    pyc_path = source_path + "c"
+    py_compile.compile(
+        source_path,
+        cfile=pyc_path,
+        dfile=os.path.relpath(source_path, "build"),
+        doraise=True,
+        optimize=optimize,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    return pyc_path
+
 
-def build_zipapp():
+def build_zipapp(output="aicoder.pyz", bytecode=True, optimize=1, snapshot=True):
     """Build a zipapp version of AI Coder."""
     # Create a temporary directory for building
     if os.path.exists("build"):
         shutil.rmtree("build")
     os.makedirs("build")
 
-    # Copy the aicoder package
-    shutil.copytree("aicoder", "build/aicoder")
+    # Copy the aicoder package, without any local bytecode caches
+    shutil.copytree(
+        "aicoder", "build/aicoder", ignore=shutil.ignore_patterns("__pycache__", "*.pyc")
+    )
 
     # Copy the main entry point
     shutil.copy("aicoder.py", "build/__main__.py")
 
-    # Create the zipapp
-    with zipfile.ZipFile("aicoder.pyz", "w", zipfile.ZIP_DEFLATED) as zf:
-        # Add all files from the build directory, excluding cache files
-        for root, dirs, files in os.walk("build"):
-            # Remove __pycache__ directories to avoid including compiled Python files
-            dirs[:] = [d for d in dirs if d != "__pycache__"]
+    if snapshot:
+        write_snapshot("build/aicoder")
 
+    if bytecode:
+        for root, dirs, files in os.walk("build"):
             for file in files:
-                # Skip .pyc files as well
-                if file.endswith(".pyc"):
-                    continue
+                if file.endswith(".py"):
+                    compile_bytecode(os.path.join(root, file), optimize)
 
+    # Create the zipapp
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk("build"):
+            dirs.sort()
+            for file in sorted(files):
                 file_path = os.path.join(root, file)
                 arc_path = os.path.relpath(file_path, "build")
                 zf.write(file_path, arc_path)
@@ -41,11 +88,29 @@ def build_zipapp():
     shutil.rmtree("build")
 
     # Make it executable
-    os.chmod("aicoder.pyz", 0o755)
+    os.chmod(output, 0o755)
+
+    print(f"Zipapp created: {output}")
+    if bytecode:
+        version = ".".join(str(part) for part in sys.version_info[:2])
+        print(f"Bytecode compiled for Python {version} (optimize={optimize})")
+    print(f"Run with: python {output}")
+
 
-    print("Zipapp created: aicoder.pyz")
-    print("Run with: python aicoder.pyz")
+def main():
+    parser = argparse.ArgumentParser(description="Build the AI Coder zipapp")
+    parser.add_argument("--output", default="aicoder.pyz")
+    parser.add_argument("--optimize", type=int, choices=[0, 1], default=1)
+    parser.add_argument("--no-bytecode", action="store_true")
+    parser.add_argument("--no-snapshot", action="store_true")
+    args = parser.parse_args()
+    build_zipapp(
+        output=args.output,
+        bytecode=not args.no_bytecode,
+        optimize=args.optimize,
+        snapshot=not args.no_snapshot,
+    )
 
 
 if __name__ == "__main__":
-    build_zipapp()
+    main()
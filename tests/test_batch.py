@@ -0,0 +1,148 @@
+"""
+Tests for the JSONL batch runner.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.batch import _kill_session, load_tasks, main, run_task, task_env
+from benchmarks.mock_server import MockOpenAIServer, MockServerConfig
+
+
+def _env(home):
+    return {
+        "OPENAI_API_KEY": "mock-key",
+        "HOME": str(home),
+        "XDG_CONFIG_HOME": str(home / ".config"),
+        "AICODER_THEME": "original",
+        "CONTEXT_SIZE": "10000000",
+    }
+
+
+def test_load_tasks_and_env(tmp_path):
+    tasks_file = tmp_path / "tasks.jsonl"
+    tasks_file.write_text('{"prompt": "a", "model": "m1"}\n\nnot json\n{"id": "x", "prompt": ["b", "c"]}\n')
+    tasks = load_tasks(str(tasks_file))
+    assert [task["id"] for task in tasks] == ["1", "3", "x"]
+    assert "invalid JSON" in tasks[1]["error"]
+
+    env = task_env({"model": "m1", "env": {"TEMPERATURE": 0}})
+    assert env["OPENAI_MODEL"] == "m1" and env["TEMPERATURE"] == "0" and env["YOLO_MODE"] == "1"
+
+
+def test_invalid_tasks_fail_without_a_session(tmp_path):
+    assert run_task({"id": "1", "error": "invalid JSON"})["status"] == "error"
+    assert run_task({"id": "2", "prompt": " "})["error"] == "task has no prompt"
+    missing = run_task({"id": "3", "prompt": "hi", "cwd": str(tmp_path / "missing")})
+    assert missing["status"] == "error" and "cwd does not exist" in missing["error"]
+
+
+def test_unexpected_errors_become_error_results(tmp_path):
+    not_a_dir = tmp_path / "logs"
+    not_a_dir.write_text("")
+    result = run_task({"id": "1", "prompt": "hi", "cwd": str(tmp_path)}, log_dir=str(not_a_dir))
+    assert result["status"] == "error" and "FileExistsError" in result["error"]
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except OSError:
+        return False
+
+
+def test_kill_session_reaches_detached_tool_processes():
+    """Commands a session started in their own process groups die with it."""
+    code = (
+        "import subprocess, sys\n"
+        "child = subprocess.Popen(['sleep', '300'], start_new_session=True)\n"
+        "print(child.pid, flush=True)\n"
+        "child.wait()\n"
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, text=True, start_new_session=True
+    )
+    child_pid = int(proc.stdout.readline())
+    assert _alive(child_pid)
+
+    _kill_session(proc)
+    proc.wait(timeout=5)
+    proc.stdout.close()
+    deadline = time.time() + 5
+    while _alive(child_pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not _alive(child_pid)
+
+
+def test_batch_runs_sessions_concurrently(tmp_path):
+    server = MockOpenAIServer(MockServerConfig(response_tokens=5)).start()
+    try:
+        env = _env(tmp_path / "home")
+        workdirs = []
+        tasks = []
+        for index in range(3):
+            workdir = tmp_path / f"work{index}"
+            workdir.mkdir()
+            workdirs.append(str(workdir))
+            tasks.append({
+                "id": f"t{index}",
+                "prompt": ["hello", "again"] if index == 0 else "hello",
+                "cwd": str(workdir),
+                "base_url": server.base_url,
+                "model": f"model-{index}",
+                "env": env,
+            })
+        tasks.append({"id": "bad"})
+        tasks_file = tmp_path / "tasks.jsonl"
+        tasks_file.write_text("".join(json.dumps(task) + "\n" for task in tasks))
+        output = tmp_path / "results.jsonl"
+
+        exit_code = main([str(tasks_file), "-o", str(output), "-j", "2", "--log-dir", str(tmp_path / "logs")])
+    finally:
+        server.stop()
+
+    results = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert exit_code == 1  # The task without a prompt
+    assert results["bad"]["status"] == "error"
+    for index in range(3):
+        result = results[f"t{index}"]
+        assert result["status"] == "ok", result
+        assert result["cwd"] == workdirs[index]
+        assert len(result["response"].split()) == 5
+        assert result["usage"]["completion_tokens"] > 0
+        assert result["timing"]["session_s"] > 0
+        assert os.path.exists(result["log"])
+    assert results["t0"]["api_requests"] == 2 and results["t1"]["api_requests"] == 1
+    assert server.requests == 4
+
+
+def test_failed_last_turn_is_an_error(tmp_path):
+    """A session whose last prompt got an API error is not reported as ok."""
+    server = MockOpenAIServer(MockServerConfig(response_tokens=3, error_status=401, error_after=1)).start()
+    try:
+        task = {
+            "id": "t",
+            "prompt": ["hello", "again"],
+            "cwd": str(tmp_path),
+            "base_url": server.base_url,
+            "env": _env(tmp_path / "home"),
+        }
+        tasks_file = tmp_path / "tasks.jsonl"
+        tasks_file.write_text(json.dumps(task) + "\n")
+        output = tmp_path / "results.jsonl"
+        exit_code = main([str(tasks_file), "-o", str(output)])
+    finally:
+        server.stop()
+
+    result = json.loads(output.read_text())
+    assert exit_code == 1
+    assert result["status"] == "error" and "API request failed" in result["error"]
+    # The first prompt's answer is not passed off as the reply to the second
+    assert result["response"] is None
+    assert result["api_errors"] == 1
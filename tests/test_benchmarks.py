@@ -0,0 +1,78 @@
+"""
+Tests for the offline benchmark suite and its mock OpenAI server.
+"""
+
+import json
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.mock_server import MockOpenAIServer, MockServerConfig
+from benchmarks.run import PhaseMeter, Scenario, format_summary, run_once, summarize
+
+
+def _post(server, payload):
+    request = urllib.request.Request(
+        server.base_url + "/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read().decode("utf-8")
+
+
+def test_mock_server_tool_rounds_then_text():
+    config = MockServerConfig(response_tokens=6, chunk_tokens=2, tool_rounds=1, tool_fanout=3)
+    server = MockOpenAIServer(config).start()
+    try:
+        user = {"role": "user", "content": "hi"}
+        tools = [{"type": "function", "function": {"name": "read_file"}}]
+
+        first = json.loads(_post(server, {"messages": [user], "tools": tools}))
+        calls = first["choices"][0]["message"]["tool_calls"]
+        assert len(calls) == 3
+        assert json.loads(calls[0]["function"]["arguments"]) == {"path": config.tool_file}
+
+        history = [user, {"role": "assistant", "tool_calls": calls}]
+        body = _post(server, {"messages": history, "tools": tools, "stream": True})
+        events = [line[6:] for line in body.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        text = "".join(c["choices"][0]["delta"].get("content") or "" for c in chunks)
+        assert len(text.split()) == 6
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+        assert chunks[-1]["usage"]["completion_tokens"] == 6
+        assert server.requests == 2
+    finally:
+        server.stop()
+
+
+def test_phase_meter_accumulates_repeated_phases():
+    meter = PhaseMeter()
+    for _ in range(2):
+        with meter.phase("work"):
+            sum(range(10000))
+    phase = meter.phases["work"]
+    assert phase["calls"] == 2
+    assert phase["wall_s"] > 0 and phase["rss_kb"] > 0
+
+
+def test_run_once_drives_request_tool_loop():
+    scenario = Scenario(
+        "smoke", turns=1, response_tokens=10, tool_rounds=1, tool_fanout=2, file_kb=1
+    )
+    result = run_once(scenario, timeout=120)
+
+    assert result["api_requests"] == 2 and result["api_success"] == 2
+    assert result["tool_calls"] == 2
+    assert result["server_requests"] == 2
+    for phase in ("import", "init", "request", "tools", "session"):
+        assert phase in result["phases"]
+    assert result["phases"]["request"]["calls"] == 2
+
+    summary = summarize([result])
+    assert summary["session"]["wall_s"] >= summary["request"]["wall_s"]
+    results = {"scenarios": {"smoke": {"summary": summary}}}
+    assert "(+0%)" in format_summary(results, baseline=results)
@@ -0,0 +1,107 @@
+"""
+Tests for the zipapp build: shipped bytecode and the startup snapshot.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import startup_snapshot
+from aicoder.startup_snapshot import build_snapshot, render_snapshot
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _build(tmp_path, *args):
+    output = tmp_path / "aicoder.pyz"
+    result = subprocess.run(
+        [sys.executable, "build_zipapp.py", "--output", str(output), *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return output
+
+
+def test_snapshot_round_trip():
+    """The rendered snapshot module evaluates back to the collected data."""
+    data = build_snapshot(os.path.join(ROOT, "aicoder"))
+    assert "AICODER.md" in data["files"]
+    assert "prompts/plan.md" in data["files"]
+    assert "read_file" in data["internal_tools"]
+
+    namespace = {}
+    exec(render_snapshot(data), namespace)
+    assert namespace["SNAPSHOT_VERSION"] == startup_snapshot.SNAPSHOT_VERSION
+    assert namespace["FILES"] == data["files"]
+    assert namespace["INTERNAL_TOOLS"] == data["internal_tools"]
+
+
+def test_env_defaults_are_read_when_the_snapshot_loads(monkeypatch):
+    """The shell timeout default comes from the running environment, not the build."""
+    from aicoder.tool_manager.internal_tools import run_shell_command
+
+    monkeypatch.setenv("SHELL_COMMAND_TIMEOUT", "99")
+    tools = build_snapshot(os.path.join(ROOT, "aicoder"))["internal_tools"]
+    timeout = tools["run_shell_command"]["parameters"]["properties"]["timeout"]
+    assert "default" not in timeout
+    assert "default" in run_shell_command.TOOL_DEFINITION["parameters"]["properties"]["timeout"]
+
+    startup_snapshot._apply_env_defaults(tools)
+    assert timeout["default"] == 99
+    monkeypatch.delenv("SHELL_COMMAND_TIMEOUT")
+    startup_snapshot._apply_env_defaults(tools)
+    assert timeout["default"] == 30
+
+
+def test_no_snapshot_in_source_tree():
+    assert startup_snapshot.get_file("AICODER.md") is None
+    assert startup_snapshot.get_internal_tools() is None
+
+
+def test_zipapp_ships_bytecode_and_snapshot(tmp_path):
+    output = _build(tmp_path)
+    with zipfile.ZipFile(output) as zf:
+        names = set(zf.namelist())
+    assert "aicoder/app.pyc" in names and "aicoder/app.py" in names
+    assert "aicoder/_startup_snapshot.pyc" in names
+    assert not any("__pycache__" in name for name in names)
+
+    code = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {str(output)!r})\n"
+        "from aicoder import prompt_loader, startup_snapshot\n"
+        "print(json.dumps({\n"
+        "    'file': prompt_loader.__file__,\n"
+        "    'plan': prompt_loader._load_default_prompt('plan'),\n"
+        "    'snapshot_plan': startup_snapshot.get_file('prompts/plan.md'),\n"
+        "    'tools': sorted(startup_snapshot.get_internal_tools()),\n"
+        "}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(tmp_path),
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env=dict(os.environ, AICODER_TEST_MODE="1"),
+    )
+    assert result.returncode == 0, result.stderr
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert data["file"].endswith("prompt_loader.pyc")
+    assert data["plan"] and data["plan"] == data["snapshot_plan"]
+    assert "edit_file" in data["tools"]
+
+
+def test_zipapp_without_bytecode(tmp_path):
+    output = _build(tmp_path, "--no-bytecode", "--no-snapshot")
+    with zipfile.ZipFile(output) as zf:
+        names = zf.namelist()
+    assert not any(name.endswith(".pyc") for name in names)
+    assert "aicoder/_startup_snapshot.py" not in names
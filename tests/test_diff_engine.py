@@ -0,0 +1,141 @@
+"""
+Tests for the approval preview diff engine.
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.diff_engine import unified_diff, replacement_diff
+
+
+def _lines(text):
+    """Split text into newline-terminated lines."""
+    return [line + "\n" for line in text.split("\n")[:-1]] + (
+        [text.split("\n")[-1] + "\n"] if not text.endswith("\n") and text else []
+    )
+
+
+def _patch(old_text, diff):
+    """Apply a unified diff to old_text, checking context and removed lines."""
+    old = _lines(old_text)
+    out = []
+    i = 0
+    body = diff.splitlines(True)[2:]
+    k = 0
+    while k < len(body):
+        match = re.match(r"@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@", body[k])
+        assert match, body[k]
+        start = int(match.group(1)) - (1 if match.group(2) != "0" else 0)
+        out += old[i:start]
+        i = start
+        k += 1
+        while k < len(body) and not body[k].startswith("@@"):
+            tag, line = body[k][0], body[k][1:]
+            if tag in " -":
+                assert old[i] == line
+                i += 1
+            if tag in " +":
+                out.append(line)
+            k += 1
+    return "".join(out + old[i:])
+
+
+def test_unified_diff_format():
+    """Output uses the same header and hunk format as difflib."""
+    diff = unified_diff("a\nb\nc\n", "a\nB\nc\n", "f.py")
+    assert diff == "--- f.py (old)\n+++ f.py (new)\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+    assert unified_diff("same\n", "same\n", "f.py") == ""
+
+
+def test_random_diffs_apply_cleanly():
+    """Whole-file and span diffs both reproduce the new content."""
+    rng = random.Random(7)
+    for _ in range(300):
+        old = [rng.choice("abcde") + "\n" for _ in range(rng.randint(0, 40))]
+        new = list(old)
+        for _ in range(rng.randint(1, 6)):
+            op = rng.random()
+            if op < 0.3 and new:
+                del new[rng.randrange(len(new))]
+            elif op < 0.6:
+                new.insert(rng.randint(0, len(new)), rng.choice("abcxyz") + "\n")
+            elif new:
+                new[rng.randrange(len(new))] = rng.choice("xyz") + "\n"
+        old_text, new_text = "".join(old), "".join(new)
+        if old_text != new_text:
+            assert _patch(old_text, unified_diff(old_text, new_text, "f")) == new_text
+
+        if old_text:
+            start = rng.randrange(len(old_text))
+            end = rng.randint(start + 1, len(old_text))
+            replacement = rng.choice(["", "Q\n", "Q\nR\n", "\n"])
+            expected = old_text[:start] + replacement + old_text[end:]
+            diff = replacement_diff(old_text, [(start, end, replacement)], "f")
+            if expected != old_text:
+                # A final line without a newline is shown with one
+                assert _patch(old_text, diff) == "".join(_lines(expected))
+
+
+def test_replacement_diff_uses_real_line_numbers():
+    """Span diffs report file line numbers and merge nearby spans into one hunk."""
+    content = "".join(f"line {i}\n" for i in range(1, 101))
+    first = content.index("line 50\n")
+    second = content.index("line 52\n")
+    far = content.index("line 90\n")
+    diff = replacement_diff(
+        content,
+        [
+            (first, first + 7, "LINE 50"),
+            (second, second + 7, "LINE 52"),
+            (far, far + 8, ""),
+        ],
+        "f",
+    )
+    hunks = re.findall(r"^@@ .* @@$", diff, re.M)
+    assert hunks == ["@@ -47,9 +47,9 @@", "@@ -87,7 +87,6 @@"]
+    assert "-line 90\n" in diff
+    assert "+LINE 52\n" in diff
+
+
+def test_large_file_preview_is_fast():
+    """A one-line edit in a 50k-line file previews without diffing the whole file."""
+    content = "".join(f"value_{i} = {i * 7}\n" for i in range(50000))
+    start = content.index("value_25000 =")
+
+    began = time.time()
+    diff = replacement_diff(content, [(start, start + 11, "renamed")], "big.py")
+    whole = unified_diff(content, content.replace("value_100 ", "v100 "), "big.py")
+    assert time.time() - began < 1.0
+
+    assert "@@ -24998,7 +24998,7 @@" in diff
+    assert "+renamed = 175000\n" in diff
+    assert "+v100 = 700\n" in whole
+
+
+def test_falls_back_to_summary_over_budget():
+    """Too many scattered changes produce a summary instead of a slow diff."""
+    old = "".join(f"{i}\n" for i in range(2000))
+    new = "".join(f"{i}\n" if i % 2 else f"changed {i}\n" for i in range(2000))
+
+    with patch("aicoder.config.DIFF_PREVIEW_MAX_CHANGES", 100):
+        diff = unified_diff(old, new, "f")
+
+    assert diff.startswith("[Diff preview skipped for f: more than 100 lines differ")
+    assert "(2,000 lines -> 2,000 lines)" in diff
+
+
+def test_long_diffs_are_cut_off():
+    """Diffs longer than DIFF_PREVIEW_MAX_LINES are truncated with a note."""
+    new = "".join(f"{i}\n" for i in range(500))
+
+    with patch("aicoder.config.DIFF_PREVIEW_MAX_LINES", 50):
+        diff = unified_diff("", new, "f")
+
+    assert len(diff.splitlines()) == 51
+    assert "[453 more diff lines not shown" in diff
@@ -0,0 +1,180 @@
+"""
+Tests for applying several replacements in one edit_file call.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.internal_tools.edit_file import (
+    execute_edit_file,
+    validate_edit_file,
+    apply_edits,
+)
+from aicoder.tool_manager.file_tracker import record_file_read
+from aicoder.utils import format_tool_prompt
+
+
+class MockStats:
+    """Mock stats object for testing."""
+
+    def __init__(self):
+        self.tool_errors = 0
+
+
+CONTENT = "def a():\n    return 1\n\ndef b():\n    return 2\n\ndef c():\n    return 3\n"
+
+
+def _make_file(content=CONTENT):
+    fd, path = tempfile.mkstemp(suffix=".py")
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    record_file_read(path)
+    return path
+
+
+def test_edits_are_applied_together():
+    """All edits land in one write and are matched against the original content."""
+    path = _make_file()
+    try:
+        result = execute_edit_file(
+            path,
+            edits=[
+                {"old_string": "return 3", "new_string": "return 30"},
+                {"old_string": "return 1", "new_string": "return 10"},
+                # Matches the original text, not the result of the edit above
+                {"old_string": "def a():", "new_string": "def a2():"},
+            ],
+            stats=MockStats(),
+        )
+
+        assert "Successfully updated" in result
+        assert "3 edits" in result
+        with open(path) as f:
+            assert f.read() == CONTENT.replace("return 3", "return 30").replace(
+                "return 1", "return 10"
+            ).replace("def a():", "def a2():")
+    finally:
+        os.unlink(path)
+
+
+def test_failing_edit_leaves_file_untouched():
+    """If any edit fails validation, none of them are written."""
+    path = _make_file()
+    try:
+        result = execute_edit_file(
+            path,
+            edits=[
+                {"old_string": "return 1", "new_string": "return 10"},
+                {"old_string": "missing", "new_string": "x"},
+            ],
+        )
+
+        assert result.startswith("Error: edits[1].old_string not found")
+        with open(path) as f:
+            assert f.read() == CONTENT
+    finally:
+        os.unlink(path)
+
+
+def test_overlapping_and_ambiguous_edits_are_rejected():
+    """Edits must be unique in the file and must not overlap each other."""
+    _, error = apply_edits(
+        CONTENT,
+        [("def b():\n    return 2", "x"), ("return 2\n\ndef c", "y")],
+    )
+    assert error == "Error: edits[0] and edits[1] overlap. Combine them into one edit."
+
+    _, error = apply_edits(CONTENT, [("return 1", "r"), ("return", "x")])
+    assert error.startswith("Error: edits[1].old_string appears 3 times")
+
+    _, error = apply_edits(CONTENT, [("return 1", "r"), ("return 2", "return 2")])
+    assert "edits[1].new_string is the same as old_string" in error
+
+
+def test_validation_and_argument_errors():
+    """validate_edit_file checks the whole list; bad argument shapes are errors."""
+    path = _make_file()
+    try:
+        assert (
+            validate_edit_file(
+                {
+                    "path": path,
+                    "edits": [
+                        {"old_string": "return 1", "new_string": "one"},
+                        {"old_string": "return 2", "new_string": "two"},
+                    ],
+                }
+            )
+            is True
+        )
+        assert "edits[0].old_string is empty" in validate_edit_file(
+            {"path": path, "edits": [{"old_string": "", "new_string": "x"}]}
+        )
+        assert "not both" in execute_edit_file(
+            path, "return 1", "one", edits=[{"old_string": "a", "new_string": "b"}]
+        )
+        assert "non-empty list" in execute_edit_file(path, edits=[])
+    finally:
+        os.unlink(path)
+
+
+def test_write_is_atomic_and_keeps_mode():
+    """The file is replaced in one rename and keeps its permissions."""
+    path = _make_file()
+    try:
+        os.chmod(path, 0o750)
+        with patch(
+            "aicoder.tool_manager.internal_tools.edit_file.os.replace",
+            side_effect=OSError("disk full"),
+        ):
+            result = execute_edit_file(
+                path, edits=[{"old_string": "return 1", "new_string": "return 10"}]
+            )
+        assert "disk full" in result
+        with open(path) as f:
+            assert f.read() == CONTENT
+        assert not [
+            name
+            for name in os.listdir(os.path.dirname(path))
+            if name.startswith(f".{os.path.basename(path)}.")
+        ]
+
+        execute_edit_file(
+            path, edits=[{"old_string": "return 1", "new_string": "return 10"}]
+        )
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o750
+    finally:
+        os.unlink(path)
+
+
+def test_approval_prompt_shows_combined_diff():
+    """The approval prompt shows every edit in a single diff."""
+    path = _make_file()
+    try:
+        prompt = format_tool_prompt(
+            "edit_file",
+            {
+                "path": path,
+                "edits": [
+                    {"old_string": "return 1", "new_string": "return 10"},
+                    {"old_string": "return 3", "new_string": "return 30"},
+                ],
+            },
+            {},
+            path,
+        )
+        assert "Changes (2 edits):" in prompt
+        assert "return 10" in prompt
+        assert "return 30" in prompt
+        assert prompt.count("(old)") == 1
+    finally:
+        os.unlink(path)
@@ -227,6 +227,7 @@ class TestCommandToolsExecution:
             "type": "command",
             "command": "echo {message}",
             "tool_description_command": "echo 'Dynamic description'",
+            "metadata_refresh_on_call": True,
             "auto_approved": True
         }
 
@@ -241,6 +242,9 @@ class TestCommandToolsExecution:
         # Tool config should have description added
         assert "description" in returned_config
         assert returned_config["description"] == "Dynamic description"
+        self.mock_tool_registry.update_tool_description.assert_called_once_with(
+            'test_command', "Dynamic description"
+        )
 
     def test_command_tool_with_append_to_system_prompt(self):
         """Test command tool that appends to system prompt."""
@@ -248,14 +252,10 @@ class TestCommandToolsExecution:
             "type": "command",
             "command": "echo {message}",
             "append_to_system_prompt_command": "echo 'Additional context'",
+            "metadata_refresh_on_call": True,
             "auto_approved": True
         }
 
-        # Mock message history
-        mock_history = Mock()
-        mock_history.messages = [{"role": "system", "content": "Original system prompt"}]
-        self.mock_tool_registry.message_history = mock_history
-
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         result, _, _ = self.executor.execute_tool(
@@ -265,7 +265,33 @@ class TestCommandToolsExecution:
         )
 
         # System prompt should be updated
-        assert "Additional context" in mock_history.messages[0]["content"]
+        self.mock_tool_registry.append_to_system_prompt.assert_called_once_with(
+            'test_command', "Additional context"
+        )
+
+    def test_metadata_commands_not_run_per_call_by_default(self):
+        """Description and system prompt commands only run per call when opted in."""
+        tool_config = {
+            "type": "command",
+            "command": "echo {message}",
+            "tool_description_command": "echo 'Dynamic description'",
+            "append_to_system_prompt_command": "echo 'Additional context'",
+            "auto_approved": True
+        }
+
+        self.mock_tool_registry.mcp_tools.get.return_value = tool_config
+
+        with patch(
+            'aicoder.tool_manager.handlers.command_handler.run_metadata_command'
+        ) as mock_run:
+            result, returned_config, _ = self.executor.execute_tool(
+                'test_command',
+                {"message": "test"},
+                1, 1
+            )
+
+        mock_run.assert_not_called()
+        assert "description" not in returned_config
 
     def test_command_tool_with_colorize_diff(self):
         """Test command tool with diff colorization enabled."""
@@ -31,6 +31,7 @@ class TestExecutorErrorHandling:
         self.mock_tool_registry.mcp_servers = {}
         self.mock_tool_registry.mcp_tools = Mock()
         self.mock_tool_registry.mcp_servers = {}
+        self.mock_tool_registry.known_mcp_server_tools.return_value = []
         self.mock_stats = Stats()
         self.mock_animator = Mock(spec=Animator)
         self.executor = ToolExecutor(self.mock_tool_registry, self.mock_stats, self.mock_animator)
@@ -177,7 +177,7 @@ class TestExecutorIntegration:
                 mock_response = Mock()
                 mock_response.read.return_value = b'{"result": "rpc_result", "id": 1}'
 
-                with patch('urllib.request.urlopen') as mock_urlopen:
+                with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
                     message = {
                         "tool_calls": [
                             {
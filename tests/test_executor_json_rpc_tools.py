@@ -33,6 +33,7 @@ class TestExecutorJSONRPCTools:
         self.mock_tool_registry = Mock(spec=ToolRegistry)
         self.mock_tool_registry.mcp_tools = Mock()
         self.mock_tool_registry.mcp_servers = {}
+        self.mock_tool_registry.known_mcp_server_tools.return_value = []
         self.mock_stats = Stats()
         self.initial_tool_errors = self.mock_stats.tool_errors
         self.initial_tool_time = self.mock_stats.tool_time_spent
@@ -57,8 +58,8 @@ class TestExecutorJSONRPCTools:
         mock_response.info.return_value = {"Content-Type": "application/json"}
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1", "param2": 42},
@@ -84,8 +85,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"error": {"code": -32600, "message": "Invalid Request"}, "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -117,8 +118,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "approved", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -149,8 +150,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "with_guidance", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -173,8 +174,8 @@ class TestExecutorJSONRPCTools:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.side_effect = urllib.error.URLError("Network error")
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.side_effect = urllib.error.URLError("Network error")
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -197,8 +198,8 @@ class TestExecutorJSONRPCTools:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.side_effect = urllib.error.URLError("timed out")
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.side_effect = urllib.error.URLError("timed out")
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -224,8 +225,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'invalid json response'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
@@ -263,8 +264,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "complex_handled", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'complex_rpc_tool',
                 complex_params,
@@ -286,8 +287,8 @@ class TestExecutorJSONRPCTools:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.side_effect = Exception("CANCEL_ALL_TOOL_CALLS")
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.side_effect = Exception("CANCEL_ALL_TOOL_CALLS")
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param": "test"},
@@ -370,20 +371,24 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "success", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
 
-            # Capture request data
-            mock_request = Mock()
-            with patch('urllib.request.Request', return_value=mock_request):
-                result, _, _ = self.executor.execute_tool(
-                    'test_rpc_tool',
-                    {"param": "test"},
-                    1, 1
-                )
+            result, _, _ = self.executor.execute_tool(
+                'test_rpc_tool',
+                {"param": "test"},
+                1, 1
+            )
 
-                # Should have called Request with proper JSON-RPC format
-                assert urllib.request.Request.called
+            # Should have posted a proper JSON-RPC request with the tool's timeout
+            url, body, timeout = mock_post.call_args[0]
+            payload = json.loads(body)
+            assert url == "http://example.com/rpc"
+            assert payload["jsonrpc"] == "2.0"
+            assert payload["method"] == "test_method"
+            assert payload["params"] == {"param": "test"}
+            assert isinstance(payload["id"], int)
+            assert timeout == 30
 
     def test_json_rpc_tool_execution_time_tracking(self):
         """Test that JSON-RPC tool execution time is properly tracked."""
@@ -402,8 +407,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "success", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             with patch('time.time', side_effect=[100.0, 100.4]):  # Mock 0.4 second execution
                 result, _, _ = self.executor.execute_tool(
                     'test_rpc_tool',
@@ -430,8 +435,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "no_params_success", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {},  # Empty params
@@ -457,8 +462,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"id": 1, "error": null}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param": "test"},
@@ -485,8 +490,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = b'{"result": "success", "id": 1}'
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
 
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
@@ -495,7 +500,7 @@ class TestExecutorJSONRPCTools:
             )
 
             # Should have made the request
-            assert mock_urlopen.called
+            assert mock_post.called
 
     def test_json_rpc_tool_error_with_details(self):
         """Test JSON-RPC tool execution with detailed error response."""
@@ -523,8 +528,8 @@ class TestExecutorJSONRPCTools:
         mock_response.read.return_value = json.dumps(error_response).encode()
 
         self.executor.tool_registry.message_history = Mock()
-        with patch('urllib.request.urlopen') as mock_urlopen:
-            mock_urlopen.return_value.__enter__.return_value = mock_response
+        with patch('aicoder.tool_manager.handlers.jsonrpc_transport.JsonRpcTransport._post') as mock_post:
+            mock_post.return_value = mock_response.read.return_value
             result, _, _ = self.executor.execute_tool(
                 'test_rpc_tool',
                 {"param1": "value1"},
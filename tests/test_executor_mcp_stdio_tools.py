@@ -10,6 +10,7 @@ This test triggers tool approval prompts that will hang indefinitely without YOL
 
 import json
 import os
+import queue
 import sys
 from unittest.mock import Mock, patch
 
@@ -22,6 +23,39 @@ from aicoder.stats import Stats
 from aicoder.animator import Animator
 
 
+def _mock_server_process(response_line):
+    """
+    Mock MCP server process that answers the first request with response_line.
+
+    The response's id is rewritten to match the request, as a real server
+    would; after that the mock's stdout reaches end of file.
+    """
+    requests = queue.Queue()
+    process = Mock()
+    process.stdin = Mock()
+    process.stdin.write.side_effect = requests.put
+    process.stdout = Mock()
+    answered = []
+
+    def readline():
+        if answered:
+            return ""
+        try:
+            request = json.loads(requests.get(timeout=5))
+        except queue.Empty:
+            return ""
+        answered.append(request)
+        try:
+            response = json.loads(response_line)
+        except json.JSONDecodeError:
+            return response_line + "\n"
+        response["id"] = request["id"]
+        return json.dumps(response) + "\n"
+
+    process.stdout.readline.side_effect = readline
+    return process
+
+
 class TestMcpStdioToolsExecution:
     """Test MCP-stdio tool execution in ToolExecutor."""
 
@@ -51,10 +85,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "test_result"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "test_result"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -90,10 +121,7 @@ class TestMcpStdioToolsExecution:
         self.executor.approval_system.format_tool_prompt = Mock(return_value="Mock prompt")
 
         # Mock MCP server process (to avoid "server not available" error)
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "test_result"}, "id": 1}'
+        mock_process = _mock_server_process('{"result": {"content": "test_result"}, "id": 1}')
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
         result, returned_config, show_main_prompt = self.executor.execute_tool(
@@ -122,10 +150,7 @@ class TestMcpStdioToolsExecution:
         self.executor.approval_system.format_tool_prompt = Mock(return_value="Mock prompt")
 
         # Mock MCP server process
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "approved_result"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "approved_result"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -152,10 +177,7 @@ class TestMcpStdioToolsExecution:
         self.executor.approval_system.format_tool_prompt = Mock(return_value="Mock prompt")
 
         # Mock MCP server process
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "with_guidance"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "with_guidance"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -181,10 +203,7 @@ class TestMcpStdioToolsExecution:
         # Mock the discovery process
         def mock_discover(server_name):
             if server_name == "unknown_server":
-                mock_process = Mock()
-                mock_process.stdin = Mock()
-                mock_process.stdout = Mock()
-                mock_process.stdout.readline.return_value = '{"result": {"content": "discovered_result"}, "id": 3}'
+                mock_process = _mock_server_process('{"result": {"content": "discovered_result"}, "id": 3}')
                 self.mock_tool_registry.mcp_servers[server_name] = (mock_process, {})
 
         self.mock_tool_registry._discover_mcp_server_tools = mock_discover
@@ -231,10 +250,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process with error response
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"error": {"code": -32000, "message": "Server error"}, "id": 3}'
+        mock_process = _mock_server_process('{"error": {"code": -32000, "message": "Server error"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -258,10 +274,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process with invalid JSON
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = 'invalid json response'
+        mock_process = _mock_server_process('invalid json response')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -285,10 +298,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process with response missing result
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"id": 3, "method": "tools/call"}'
+        mock_process = _mock_server_process('{"id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -356,10 +366,7 @@ class TestMcpStdioToolsExecution:
         }
 
         # Mock MCP server process with complex response
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = json.dumps({"result": complex_result, "id": 3})
+        mock_process = _mock_server_process(json.dumps({"result": complex_result, "id": 3}))
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -383,10 +390,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process using tool name as server name
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "fallback_result"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "fallback_result"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"mcp_stdio_tool": (mock_process, {})}
 
@@ -432,10 +436,7 @@ class TestMcpStdioToolsExecution:
         initial_tool_time = self.mock_stats.tool_time_spent
 
         # Mock MCP server process
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "timed_result"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "timed_result"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
@@ -461,10 +462,7 @@ class TestMcpStdioToolsExecution:
         self.mock_tool_registry.mcp_tools.get.return_value = tool_config
 
         # Mock MCP server process
-        mock_process = Mock()
-        mock_process.stdin = Mock()
-        mock_process.stdout = Mock()
-        mock_process.stdout.readline.return_value = '{"result": {"content": "empty_args_result"}, "id": 3}'
+        mock_process = _mock_server_process('{"result": {"content": "empty_args_result"}, "id": 3}')
 
         self.mock_tool_registry.mcp_servers = {"test_server": (mock_process, {})}
 
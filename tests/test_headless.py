@@ -0,0 +1,318 @@
+"""
+Tests for the headless JSON-lines protocol mode.
+"""
+
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.headless import HeadlessSession
+from benchmarks.mock_server import MockOpenAIServer, MockServerConfig
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+class FakeChannel:
+    def __init__(self, *messages):
+        self.messages = queue.Queue()
+        for message in messages:
+            self.messages.put(message)
+        self.sent = []
+
+    def send(self, event):
+        self.sent.append(event)
+
+
+def _fake_app():
+    app = SimpleNamespace(
+        message_history=SimpleNamespace(messages=[]),
+        stats=SimpleNamespace(prompt_tokens=10, completion_tokens=2, api_requests=1, current_prompt_size=12),
+    )
+    app._get_multiline_input = None
+    app._make_api_request = lambda messages, *args, **kwargs: {
+        "choices": [{"message": {"role": "assistant", "content": "done"}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+    }
+    app._execute_tool_calls = lambda message: (
+        [{"tool_call_id": "c1", "role": "tool", "name": "grep", "content": "found"}],
+        False,
+        False,
+    )
+    return app
+
+
+def _env(home, base_url):
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("AICODER_", "OPENAI_"))}
+    env.update({
+        "PYTHONPATH": ROOT,
+        "HOME": str(home),
+        "XDG_CONFIG_HOME": str(home / ".config"),
+        "OPENAI_BASE_URL": base_url,
+        "OPENAI_API_KEY": "mock-key",
+        "AICODER_THEME": "original",
+    })
+    return env
+
+
+def test_session_turns_and_events():
+    channel = FakeChannel(
+        {"type": "approval", "id": 9},
+        {"type": "user_message", "content": ""},
+        {"type": "user_message", "id": "t1", "content": "hi"},
+        {"type": "shutdown"},
+    )
+    app = _fake_app()
+    session = HeadlessSession(app, channel)
+
+    assert app._get_multiline_input() == "hi"
+    assert [event["type"] for event in channel.sent] == ["error", "error"]
+
+    app.message_history.messages.append({"role": "user", "content": "hi"})
+    app.on_content_delta("do")
+    app._make_api_request(app.message_history.messages)
+    app._make_api_request(app.message_history.messages, disable_streaming_mode=True)
+    app._execute_tool_calls({"tool_calls": [{"id": "c1", "function": {"name": "grep", "arguments": "{}"}}]})
+    app.message_history.messages.append({"role": "assistant", "content": "done"})
+    try:
+        app._get_multiline_input()
+        assert False, "shutdown should end the input"
+    except EOFError:
+        pass
+
+    events = channel.sent[2:]
+    assert [event["type"] for event in events] == [
+        "content_delta", "assistant_message", "usage", "tool_call", "tool_result", "turn_end",
+    ]
+    assert events[2]["session"]["context_tokens"] == 12
+    assert events[3] == {"type": "tool_call", "id": "c1", "name": "grep", "arguments": "{}"}
+    assert events[4]["name"] == "grep" and events[4]["content"] == "found"
+    assert events[5] == {"type": "turn_end", "id": "t1", "status": "ok", "response": "done"}
+    assert session._turn_id == "t1"
+
+
+def test_turn_error_is_cleared_by_the_next_turn():
+    channel = FakeChannel(
+        {"type": "user_message", "id": "t1", "content": "hi"},
+        {"type": "user_message", "id": "t2", "content": "hi"},
+        {"type": "shutdown"},
+    )
+    app = _fake_app()
+    app.stats.last_request_error = lambda: "API request failed: HTTPError"
+    responses = iter([None, {"choices": [{"message": {"role": "assistant", "content": "ok"}}]}])
+    app._make_api_request = lambda messages, *args, **kwargs: next(responses)
+    HeadlessSession(app, channel)
+
+    app._get_multiline_input()
+    app._make_api_request([])
+    app._get_multiline_input()
+    app._make_api_request([])
+    try:
+        app._get_multiline_input()
+    except EOFError:
+        pass
+
+    turn_ends = [event for event in channel.sent if event["type"] == "turn_end"]
+    assert channel.sent[0] == {"type": "error", "message": "API request failed: HTTPError"}
+    assert turn_ends[0]["status"] == "error" and turn_ends[0]["error"] == "API request failed: HTTPError"
+    assert turn_ends[1]["status"] == "ok" and "error" not in turn_ends[1]
+
+
+def test_approval_waits_for_matching_decision():
+    channel = FakeChannel(
+        {"type": "user_message", "content": "later"},
+        {"type": "approval", "id": 2, "decision": "allow"},
+        {"type": "approval", "id": 1, "decision": "maybe"},
+        {"type": "approval", "id": 1, "decision": "session"},
+        {"type": "shutdown"},
+    )
+    session = HeadlessSession(_fake_app(), channel)
+    assert session.ask_approval("write_file", {"path": "x"}, "Write x?") == "s"
+    request = channel.sent[0]
+    assert request == {
+        "type": "approval_request", "id": 1, "tool": "write_file",
+        "arguments": {"path": "x"}, "prompt": "Write x?",
+    }
+    assert [event["type"] for event in channel.sent[1:]] == ["error", "error"]
+
+    # Shutdown while waiting cancels the tool calls and still ends the session
+    assert session.ask_approval("write_file", {}, "") == "c"
+    assert session._next_message()["content"] == "later"
+    assert session._next_message()["type"] == "shutdown"
+
+
+def _read_events(stream, until, timeout=20):
+    events = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        line = stream.readline()
+        if not line:
+            break
+        events.append(json.loads(line))
+        if events[-1]["type"] == until:
+            break
+    return events
+
+
+def test_stdio_session_against_mock_server(tmp_path):
+    config = MockServerConfig(response_tokens=6, tool_rounds=1, tool_file="notes.txt")
+    server = MockOpenAIServer(config).start()
+    (tmp_path / "notes.txt").write_text("remember the milk\n")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "aicoder.headless"],
+        cwd=str(tmp_path),
+        env=_env(tmp_path / "home", server.base_url),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        assert _read_events(proc.stdout, "ready")[-1]["type"] == "ready"
+        for turn in ("t1", "t2"):
+            proc.stdin.write(json.dumps({"type": "user_message", "id": turn, "content": "go"}) + "\n")
+            proc.stdin.flush()
+            events = _read_events(proc.stdout, "turn_end")
+            types = [event["type"] for event in events]
+            assert types[0] == "assistant_message" and types[-1] == "turn_end"
+            assert "tool_call" in types and "content_delta" in types and "usage" in types
+            result = next(event for event in events if event["type"] == "tool_result")
+            assert result["name"] == "read_file" and "remember the milk" in result["content"]
+            deltas = "".join(event["text"] for event in events if event["type"] == "content_delta")
+            assert events[-1] == {"type": "turn_end", "id": turn, "status": "ok", "response": deltas}
+        proc.stdin.close()
+        assert _read_events(proc.stdout, "bye")[-1]["type"] == "bye"
+        assert proc.wait(timeout=20) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        server.stop()
+    assert server.requests == 4
+
+
+def test_tool_commands_do_not_read_protocol_input(tmp_path):
+    """A command reading stdin sees end of input, not the client's messages."""
+    config = MockServerConfig(
+        response_tokens=3, tool_rounds=1, tool_name="run_shell_command", tool_command="cat; echo read-done"
+    )
+    server = MockOpenAIServer(config).start()
+    env = _env(tmp_path / "home", server.base_url)
+    env["YOLO_MODE"] = "1"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "aicoder.headless"],
+        cwd=str(tmp_path),
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        assert _read_events(proc.stdout, "ready")[-1]["type"] == "ready"
+        # Both turns are queued before the first tool runs; cat must not take the second
+        proc.stdin.write(json.dumps({"type": "user_message", "id": "t1", "content": "go"}) + "\n")
+        proc.stdin.write(json.dumps({"type": "user_message", "id": "t2", "content": "go"}) + "\n")
+        proc.stdin.flush()
+        for turn in ("t1", "t2"):
+            events = _read_events(proc.stdout, "turn_end")
+            result = next(event for event in events if event["type"] == "tool_result")
+            assert "read-done" in result["content"] and "user_message" not in result["content"]
+            assert events[-1]["id"] == turn
+        proc.stdin.close()
+        assert proc.wait(timeout=20) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        server.stop()
+
+
+def test_failed_request_is_reported(tmp_path):
+    """An API error sends an error event and ends the turn with status "error"."""
+    server = MockOpenAIServer(MockServerConfig(response_tokens=3, error_status=401, error_after=1)).start()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "aicoder.headless"],
+        cwd=str(tmp_path),
+        env=_env(tmp_path / "home", server.base_url),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        assert _read_events(proc.stdout, "ready")[-1]["type"] == "ready"
+        turns = {}
+        for turn in ("t1", "t2", "t3"):
+            proc.stdin.write(json.dumps({"type": "user_message", "id": turn, "content": "go"}) + "\n")
+            proc.stdin.flush()
+            turns[turn] = _read_events(proc.stdout, "turn_end")
+        proc.stdin.close()
+        assert proc.wait(timeout=20) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        server.stop()
+
+    assert turns["t1"][-1]["status"] == "ok" and turns["t1"][-1]["response"]
+    for turn in ("t2", "t3"):
+        events = turns[turn]
+        types = [event["type"] for event in events]
+        assert "assistant_message" not in types and "usage" not in types
+        error = next(event for event in events if event["type"] == "error")
+        assert "API request failed" in error["message"]
+        assert events[-1] == {
+            "type": "turn_end", "id": turn, "status": "error", "error": error["message"], "response": None,
+        }
+
+
+def test_socket_session_survives_reconnects(tmp_path):
+    server = MockOpenAIServer(MockServerConfig(response_tokens=3)).start()
+    socket_path = str(tmp_path / "aicoder.sock")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "aicoder.headless", "--socket", socket_path, "--log", str(tmp_path / "app.log")],
+        cwd=str(tmp_path),
+        env=_env(tmp_path / "home", server.base_url),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def connect():
+        deadline = time.time() + 20
+        while True:
+            try:
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(socket_path)
+                client.settimeout(20)
+                return client, client.makefile("rw", encoding="utf-8")
+            except OSError:
+                client.close()
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    try:
+        for turn in ("t1", "t2"):
+            client, stream = connect()
+            assert _read_events(stream, "ready")[-1]["type"] == "ready"
+            stream.write(json.dumps({"type": "user_message", "id": turn, "content": "hi"}) + "\n")
+            stream.flush()
+            assert _read_events(stream, "turn_end")[-1]["id"] == turn
+            if turn == "t2":
+                stream.write(json.dumps({"type": "shutdown"}) + "\n")
+                stream.flush()
+                assert _read_events(stream, "bye")[-1]["type"] == "bye"
+            stream.close()
+            client.close()
+        assert proc.wait(timeout=20) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        server.stop()
+    assert server.requests == 2
+    assert not os.path.exists(socket_path)
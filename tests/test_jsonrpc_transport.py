@@ -0,0 +1,161 @@
+"""
+Tests for the pooled, batching JSON-RPC transport.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import config
+from aicoder.tool_manager.handlers.jsonrpc_handler import JsonRpcToolHandler
+from aicoder.tool_manager.handlers.jsonrpc_transport import JsonRpcTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers "echo" and "sleep" calls; batches are answered in reverse order."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.bodies.append(body)
+        requests = body if isinstance(body, list) else [body]
+        replies = []
+        for request in requests:
+            if request["method"] == "sleep":
+                time.sleep(request["params"]["seconds"])
+            replies.append({"jsonrpc": "2.0", "id": request["id"], "result": request["params"]})
+        data = json.dumps(replies[::-1] if isinstance(body, list) else replies[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.connections = set()
+    httpd.bodies = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}/rpc"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_calls_reuse_one_connection(server):
+    """Sequential calls share a kept-alive connection and get unique ids."""
+    httpd, url = server
+    transport = JsonRpcTransport()
+    try:
+        for i in range(5):
+            assert transport.call(url, "echo", {"n": i})["result"] == {"n": i}
+    finally:
+        transport.close()
+
+    assert len(httpd.connections) == 1
+    assert len({body["id"] for body in httpd.bodies}) == 5
+
+
+def test_timeout_stops_waiting(server):
+    """A slow server raises a timeout instead of blocking forever."""
+    _, url = server
+    transport = JsonRpcTransport()
+    try:
+        started = time.time()
+        with pytest.raises(OSError):
+            transport.call(url, "sleep", {"seconds": 2}, timeout=0.3)
+        assert time.time() - started < 1.5
+        # The pool recovers with a fresh connection
+        assert transport.call(url, "echo", {"ok": True}, timeout=5)["result"] == {"ok": True}
+    finally:
+        transport.close()
+
+
+def test_turn_calls_to_same_url_are_batched(server):
+    """Several auto-approved calls to one URL go out as a single batch request."""
+    httpd, url = server
+    registry = Mock()
+    registry.mcp_tools = {
+        "first": {"type": "jsonrpc", "url": url, "method": "echo", "auto_approved": True},
+        "second": {"type": "jsonrpc", "url": url, "method": "echo", "auto_approved": True},
+    }
+    handler = JsonRpcToolHandler(registry, Mock(tool_errors=0), Mock())
+    calls = [("first", {"a": 1}), ("second", {"b": 2}), ("first", {"a": 3})]
+
+    handler.start_batched_calls(calls)
+    results = []
+    for name, arguments in calls:
+        handler._current_tool_config = registry.mcp_tools[name]
+        results.append(handler.handle(name, arguments, config)[0])
+    handler.clear_batched_calls()
+
+    # Replies came back in reverse order but are matched to their calls by id
+    assert results == ['{"a": 1}', '{"b": 2}', '{"a": 3}']
+    assert len(httpd.bodies) == 1
+    assert [request["method"] for request in httpd.bodies[0]] == ["echo"] * 3
+
+
+def test_calls_needing_approval_are_not_batched(server):
+    """A turn with a call that needs approval is sent call by call."""
+    httpd, url = server
+    registry = Mock()
+    registry.mcp_tools = {
+        "safe": {"type": "jsonrpc", "url": url, "method": "echo", "auto_approved": True},
+        "risky": {"type": "jsonrpc", "url": url, "method": "echo"},
+    }
+    handler = JsonRpcToolHandler(registry, Mock(tool_errors=0), Mock())
+
+    with patch("aicoder.config.YOLO_MODE", False):
+        handler.start_batched_calls([("safe", {}), ("risky", {})])
+
+    assert handler._started_calls == {}
+    assert httpd.bodies == []
+
+
+def test_calls_failing_validation_are_not_batched(server):
+    """A turn with arguments that do not match the schema is sent call by call."""
+    httpd, url = server
+    schema = {"type": "object", "properties": {"a": {"type": "integer"}}, "required": ["a"]}
+    registry = Mock()
+    registry.mcp_tools = {
+        "first": {"type": "jsonrpc", "url": url, "method": "echo", "auto_approved": True, "parameters": schema},
+    }
+    handler = JsonRpcToolHandler(registry, Mock(tool_errors=0), Mock())
+
+    handler.start_batched_calls([("first", {"a": 1}), ("first", {"b": 2})])
+
+    assert handler._started_calls == {}
+    assert httpd.bodies == []
+
+
+def test_started_calls_are_cleared_when_a_turn_fails():
+    """Calls sent up front are dropped even if handling the turn raises."""
+    from aicoder.tool_manager.executor import ToolExecutor
+
+    executor = ToolExecutor(Mock(mcp_tools={}), Mock(tool_calls=0), Mock())
+    executor.jsonrpc_handler._started_calls["first:{}"] = ["stale"]
+    executor._start_parallel_calls = Mock()
+    with patch.object(executor, "_run_tool_calls", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            executor.execute_tool_calls({"tool_calls": []})
+    assert executor.jsonrpc_handler._started_calls == {}
@@ -0,0 +1,164 @@
+"""
+Tests for the multiplexed MCP stdio client.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import config
+from aicoder.tool_manager.handlers.mcp_client import McpStdioClient
+from aicoder.tool_manager.handlers.mcp_stdio_handler import McpStdioToolHandler
+
+# A small MCP server: answers each request on its own thread (so replies can
+# come back out of order), logs junk to stdout and sends notifications.
+SERVER = textwrap.dedent(
+    """
+    import json, sys, threading, time
+
+    lock = threading.Lock()
+
+    def send(message):
+        with lock:
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def handle(message):
+        method = message.get("method")
+        if method == "tools/call":
+            args = message["params"]["arguments"]
+            time.sleep(args.get("sleep", 0))
+            send({"jsonrpc": "2.0", "method": "notifications/message",
+                  "params": {"data": "working"}})
+            if args.get("exit"):
+                sys.stdout.flush()
+                import os; os._exit(0)
+            result = {"content": [{"type": "text", "text": args.get("echo", "")}]}
+        elif method == "ping_client":
+            send({"jsonrpc": "2.0", "id": "srv-1", "method": "ping"})
+            result = {}
+        else:
+            result = {"tools": []}
+        send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    print("server starting up (not JSON)", flush=True)
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message.get("method") is None:
+            with lock:
+                sys.stderr.write("client replied: " + line)
+                sys.stderr.flush()
+            continue
+        threading.Thread(target=handle, args=(message,), daemon=True).start()
+    """
+)
+
+
+@pytest.fixture
+def server():
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+    yield process
+    process.kill()
+    process.wait()
+
+
+def _call(client, **arguments):
+    return client.request_async(
+        "tools/call", {"name": "test", "arguments": arguments}
+    )
+
+
+def _text(response):
+    return response["result"]["content"][0]["text"]
+
+
+def test_concurrent_requests_are_matched_by_id(server):
+    """A slow call does not block a fast one, and each gets its own reply."""
+    client = McpStdioClient(server, "test")
+
+    started = time.time()
+    slow = _call(client, sleep=0.6, echo="slow")
+    fast = _call(client, sleep=0.1, echo="fast")
+
+    assert _text(client.wait(fast, timeout=5)) == "fast"
+    assert not slow.done()
+    assert _text(client.wait(slow, timeout=5)) == "slow"
+    # The calls overlapped instead of running one after the other
+    assert time.time() - started < 1.2
+
+
+def test_timeout_cancels_only_that_request(server):
+    """A timed out request raises, and the connection keeps working."""
+    client = McpStdioClient(server, "test")
+
+    with pytest.raises(TimeoutError):
+        client.wait(_call(client, sleep=2), timeout=0.2)
+
+    response = client.request(
+        "tools/call", {"name": "t", "arguments": {"echo": "ok"}}, timeout=5
+    )
+    assert _text(response) == "ok"
+
+
+def test_server_ping_is_answered(server):
+    """Requests from the server are replied to without disturbing our calls."""
+    client = McpStdioClient(server, "test")
+
+    assert client.request("ping_client", timeout=5)["result"] == {}
+    reply = server.stderr.readline()
+    assert reply.startswith('client replied: {"jsonrpc": "2.0", "id": "srv-1", "result": {}}')
+
+
+def test_server_exit_fails_pending_requests(server):
+    """When the server dies, waiting calls fail instead of hanging."""
+    client = McpStdioClient(server, "test")
+
+    pending = _call(client, sleep=5)
+    _call(client, exit=True)
+
+    with pytest.raises(ConnectionError):
+        client.wait(pending, timeout=5)
+    assert client.closed
+    with pytest.raises(ConnectionError):
+        client.request("tools/list", timeout=1)
+
+
+def test_handler_runs_auto_approved_calls_concurrently(server):
+    """Auto-approved calls in one turn are sent together and collected in order."""
+    registry = Mock()
+    registry.mcp_tools = {"srv": {"type": "mcp-stdio", "auto_approved": True}}
+    registry.mcp_servers = {"srv": (server, {"slow": {}, "fast": {}})}
+    registry.known_mcp_server_tools.return_value = [("srv", registry.mcp_servers["srv"][1])]
+    handler = McpStdioToolHandler(registry, Mock(tool_errors=0), Mock())
+
+    calls = [("slow", {"sleep": 0.6, "echo": "a"}), ("fast", {"sleep": 0.6, "echo": "b"})]
+    started = time.time()
+    with patch("aicoder.config.YOLO_MODE", True):
+        handler.start_parallel_calls(calls)
+        results = [handler.handle(name, args, config)[0] for name, args in calls]
+    elapsed = time.time() - started
+    handler.clear_parallel_calls()
+
+    assert '"text": "a"' in results[0]
+    assert '"text": "b"' in results[1]
+    assert elapsed < 1.1
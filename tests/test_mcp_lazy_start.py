@@ -0,0 +1,107 @@
+"""
+Tests for spawning MCP stdio servers on first use and stopping idle ones.
+"""
+
+import os
+import sys
+import textwrap
+import time
+from unittest.mock import Mock, patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import config
+from aicoder.tool_manager.handlers.mcp_stdio_handler import McpStdioToolHandler
+from aicoder.tool_manager.registry import ToolRegistry
+
+SERVER = textwrap.dedent(
+    """
+    import json, sys
+
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "initialize":
+            result = {"protocolVersion": "2025-06-18"}
+        elif message["method"] == "tools/list":
+            result = {"tools": [{"name": "echo", "description": "Echo text"}]}
+        else:
+            text = message["params"]["arguments"]["text"]
+            result = {"content": [{"type": "text", "text": text}]}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+def _registry(tmp_path, **server_options):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    registry = ToolRegistry()
+    registry.mcp_tools = {
+        "srv": {
+            "type": "mcp-stdio",
+            "command": f"{sys.executable} {script}",
+            "lazy": True,
+            "tools": [{"name": "echo", "description": "Echo text"}],
+            **server_options,
+        }
+    }
+    return registry
+
+
+def _running_for_real(tmp_path):
+    """Let the registry launch servers although pytest is running."""
+    return patch("sys.argv", ["aicoder"]), patch.dict(
+        os.environ, {"AICODER_TEST_MODE": "", "XDG_CONFIG_HOME": str(tmp_path)}
+    )
+
+
+def test_lazy_server_starts_on_first_call(tmp_path):
+    """Declared tools are advertised without spawning; a call starts the server."""
+    registry = _registry(tmp_path)
+    handler = McpStdioToolHandler(registry, Mock(tool_errors=0), Mock())
+    argv, env = _running_for_real(tmp_path)
+    with argv, env:
+        try:
+            assert registry.start_mcp_servers() == {}
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert names == ["echo"]
+            assert registry.mcp_servers == {}
+
+            result, _, _ = handler.handle("echo", {"text": "hi"}, config)
+            assert '"text": "hi"' in result
+            assert "srv" in registry.mcp_servers
+        finally:
+            registry.cleanup_mcp_servers()
+
+
+def test_idle_server_is_stopped_and_restarted(tmp_path):
+    """An unused server is stopped after its idle timeout and restarts when called."""
+    registry = _registry(tmp_path, idle_timeout=0.3)
+    handler = McpStdioToolHandler(registry, Mock(tool_errors=0), Mock())
+    argv, env = _running_for_real(tmp_path)
+    with argv, env, patch("aicoder.tool_manager.registry.MCP_IDLE_CHECK_INTERVAL", 0.05):
+        try:
+            handler.handle("echo", {"text": "one"}, config)
+            process, _ = registry.mcp_servers["srv"]
+
+            deadline = time.time() + 5
+            while "srv" in registry.mcp_servers and time.time() < deadline:
+                time.sleep(0.05)
+            assert "srv" not in registry.mcp_servers
+            assert process.wait(timeout=5) is not None
+            # Its tools are still offered while it is stopped
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert names == ["echo"]
+
+            result, _, _ = handler.handle("echo", {"text": "two"}, config)
+            assert '"text": "two"' in result
+            assert registry.mcp_servers["srv"][0] is not process
+        finally:
+            registry.cleanup_mcp_servers()
@@ -0,0 +1,148 @@
+"""
+Tests for starting MCP stdio servers concurrently.
+"""
+
+import os
+import sys
+import textwrap
+import time
+from unittest.mock import patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.mcp_cache import load_cached_tools, save_cached_tools
+from aicoder.tool_manager.registry import ToolRegistry
+
+# An MCP server that takes `delay` seconds to answer initialize
+SERVER = textwrap.dedent(
+    """
+    import json, sys, time
+
+    delay, tool = float(sys.argv[1]), sys.argv[2]
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "initialize":
+            time.sleep(delay)
+            result = {"protocolVersion": "2025-06-18"}
+        else:
+            result = {"tools": [{"name": tool, "description": tool}]}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+def _registry(tmp_path, servers):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    registry = ToolRegistry()
+    registry.mcp_tools = {
+        name: {"type": "mcp-stdio", "command": command.format(script=script)}
+        for name, command in servers.items()
+    }
+    return registry
+
+
+def _not_test_mode():
+    """Let the registry launch servers although pytest is running."""
+    return patch("sys.argv", ["aicoder"]), patch.dict(os.environ, {"AICODER_TEST_MODE": ""})
+
+
+def test_servers_start_concurrently(tmp_path):
+    """Startup takes about as long as the slowest server, not the sum."""
+    registry = _registry(
+        tmp_path,
+        {f"srv{i}": f"{sys.executable} {{script}} 0.5 tool{i}" for i in range(4)},
+    )
+    argv, env = _not_test_mode()
+    with argv, env:
+        try:
+            started = time.time()
+            startups = registry.start_mcp_servers()
+            results = {name: future.result(timeout=10) for name, future in startups.items()}
+            elapsed = time.time() - started
+        finally:
+            registry.cleanup_mcp_servers()
+
+    assert {name: list(tools) for name, tools in results.items()} == {
+        f"srv{i}": [f"tool{i}"] for i in range(4)
+    }
+    assert elapsed < 1.5
+
+
+def test_broken_or_slow_server_does_not_block_others(tmp_path):
+    """A failing server yields no tools and a slow one registers once ready."""
+    registry = _registry(
+        tmp_path,
+        {
+            "fast": f"{sys.executable} {{script}} 0 fast_tool",
+            "slow": f"{sys.executable} {{script}} 1 slow_tool",
+            "broken": "/nonexistent/mcp-server",
+        },
+    )
+    argv, env = _not_test_mode()
+    with argv, env:
+        try:
+            startups = registry.start_mcp_servers()
+            assert startups["fast"].result(timeout=5) == {
+                "fast_tool": {"name": "fast_tool", "description": "fast_tool"}
+            }
+            assert startups["broken"].result(timeout=5) == {}
+
+            # The slow server is still starting: its tools are not listed yet
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert "fast_tool" in names
+            assert "slow_tool" not in names
+            # Asking again for the same server joins the startup in flight
+            assert registry.start_mcp_servers()["slow"] is startups["slow"]
+
+            startups["slow"].result(timeout=10)
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert "slow_tool" in names
+            assert registry._discover_mcp_server_tools("slow") is registry.mcp_servers["slow"][1]
+        finally:
+            registry.cleanup_mcp_servers()
+
+
+def test_cached_tools_are_used_while_server_starts(tmp_path):
+    """With a cached tools/list the tools are offered before the server is up."""
+    servers = {"srv": f"{sys.executable} {{script}} 1 live_tool"}
+    registry = _registry(tmp_path, servers)
+    command = registry.mcp_tools["srv"]["command"]
+    argv, env = _not_test_mode()
+    with argv, env, patch.dict(os.environ, {"XDG_CONFIG_HOME": str(tmp_path)}):
+        try:
+            # First run: nothing cached, so the definitions wait for the server
+            started = time.time()
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert names == ["live_tool"]
+            assert time.time() - started >= 1
+            assert load_cached_tools(command) == [
+                {"name": "live_tool", "description": "live_tool"}
+            ]
+        finally:
+            registry.cleanup_mcp_servers()
+
+        # Next launch: cached tools are listed at once and the server boots behind them
+        save_cached_tools(command, [{"name": "old_tool", "description": "old"}])
+        registry = _registry(tmp_path, servers)
+        try:
+            started = time.time()
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert time.time() - started < 0.5
+            assert names == ["old_tool"]
+            assert registry.known_mcp_server_tools()[0][0] == "srv"
+
+            # Once live, the real list replaces the cached one on screen and on disk
+            registry._discover_mcp_server_tools("srv")
+            names = [tool["function"]["name"] for tool in registry.get_tool_definitions()]
+            assert names == ["live_tool"]
+            assert load_cached_tools(command)[0]["name"] == "live_tool"
+        finally:
+            registry.cleanup_mcp_servers()
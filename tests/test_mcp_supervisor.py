@@ -0,0 +1,150 @@
+"""
+Tests for MCP server health supervision.
+"""
+
+import os
+import sys
+import textwrap
+import time
+from unittest.mock import Mock, patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import config
+from aicoder.tool_manager.handlers.mcp_stdio_handler import McpStdioToolHandler
+from aicoder.tool_manager.mcp_supervisor import McpSupervisor, ServerHealth
+from aicoder.tool_manager.registry import ToolRegistry
+
+# Writes a lot to stderr at startup; "crash" exits, "hang" ignores pings
+SERVER = textwrap.dedent(
+    """
+    import json, os, sys
+
+    mode = sys.argv[1]
+    for i in range(5000):
+        sys.stderr.write(f"log line {i} " + "x" * 60 + "\\n")
+    sys.stderr.flush()
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        method = message["method"]
+        if method == "ping" and mode == "hang":
+            continue
+        if method == "tools/list":
+            result = {"tools": [{"name": "work", "description": "Do work"}]}
+        elif method == "tools/call":
+            if message["params"]["arguments"].get("crash"):
+                os._exit(3)
+            result = {"content": [{"type": "text", "text": "done"}]}
+        else:
+            result = {}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+def _registry(tmp_path, mode="ok"):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    registry = ToolRegistry()
+    registry.mcp_tools = {
+        "srv": {"type": "mcp-stdio", "command": f"{sys.executable} {script} {mode}"}
+    }
+    return registry
+
+
+def _running_for_real(tmp_path):
+    """Let the registry launch servers although pytest is running."""
+    return patch("sys.argv", ["aicoder"]), patch.dict(
+        os.environ, {"AICODER_TEST_MODE": "", "XDG_CONFIG_HOME": str(tmp_path)}
+    )
+
+
+def test_stderr_is_drained_into_bounded_buffer(tmp_path):
+    """A server flooding stderr still starts, and only the last lines are kept."""
+    registry = _registry(tmp_path)
+    argv, env = _running_for_real(tmp_path)
+    with argv, env, patch("aicoder.config.MCP_STDERR_LINES", 50):
+        try:
+            assert list(registry._discover_mcp_server_tools("srv")) == ["work"]
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                tail = registry.supervisor.stderr_tail("srv", 100)
+                if tail and tail[-1].startswith("log line 4999 "):
+                    break
+                time.sleep(0.05)
+            assert len(tail) == 50
+            assert tail[-1].startswith("log line 4999 ")
+        finally:
+            registry.cleanup_mcp_servers()
+
+
+def test_crashed_server_is_restarted(tmp_path):
+    """A crash fails that call only; the server comes back on its own."""
+    registry = _registry(tmp_path)
+    handler = McpStdioToolHandler(registry, Mock(tool_errors=0), Mock())
+    argv, env = _running_for_real(tmp_path)
+    with argv, env, patch("aicoder.config.MCP_RESTART_BACKOFF", 0.1), patch(
+        "aicoder.config.MCP_HEALTH_CHECK_INTERVAL", 0.05
+    ):
+        try:
+            registry._discover_mcp_server_tools("srv")
+            first, _ = registry.mcp_servers["srv"]
+
+            result, _, _ = handler.handle("work", {"crash": True}, config)
+            assert "exited while running the tool" in result
+
+            deadline = time.time() + 5
+            while "srv" not in registry.mcp_servers and time.time() < deadline:
+                time.sleep(0.05)
+            assert registry.mcp_servers["srv"][0] is not first
+
+            result, _, _ = handler.handle("work", {}, config)
+            assert '"text": "done"' in result
+            health = registry.supervisor.health["srv"]
+            assert (health.crashes, health.restarts, health.calls, health.call_errors) == (1, 1, 2, 1)
+            assert "exit code 3" in health.last_error
+            assert "srv: running" in registry.supervisor.status_lines()[0]
+        finally:
+            registry.cleanup_mcp_servers()
+
+
+def test_unresponsive_server_is_killed(tmp_path):
+    """A server that stops answering pings is killed and scheduled for restart."""
+    registry = _registry(tmp_path, mode="hang")
+    argv, env = _running_for_real(tmp_path)
+    with argv, env, patch("aicoder.config.MCP_REQUEST_TIMEOUT", 0.5), patch(
+        "aicoder.config.MCP_RESTART_BACKOFF", 60
+    ):
+        try:
+            registry._discover_mcp_server_tools("srv")
+            process, _ = registry.mcp_servers["srv"]
+
+            registry.supervisor.check_servers()
+
+            assert "srv" not in registry.mcp_servers
+            assert process.wait(timeout=5) is not None
+            health = registry.supervisor.health["srv"]
+            assert health.failed_pings == 1
+            assert "restarting in" in registry.supervisor.status_lines()[0]
+        finally:
+            registry.cleanup_mcp_servers()
+
+
+def test_restart_backoff_doubles_up_to_max():
+    """Each consecutive failure doubles the restart delay, up to the cap."""
+    health = ServerHealth()
+    delays = []
+    with patch("aicoder.config.MCP_RESTART_BACKOFF", 1), patch(
+        "aicoder.config.MCP_RESTART_BACKOFF_MAX", 10
+    ):
+        for failures in range(1, 6):
+            health.consecutive_failures = failures
+            delays.append(McpSupervisor._backoff(health))
+    assert delays == [1, 2, 4, 8, 10]
@@ -0,0 +1,107 @@
+"""
+Tests for memory instrumentation: RSS sampling, structure sizes, growth
+warnings and tracemalloc diffs.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.commands.mem_command import MemCommand
+from aicoder.memory_tracker import MemoryTracker, rss_kb
+from aicoder.request_timing import RequestTiming
+from aicoder.stats import Stats
+
+
+def _stats():
+    with patch.dict(os.environ, {"AICODER_TEST_MODE": "1"}):
+        return Stats()
+
+
+def test_rss_is_positive():
+    assert rss_kb() > 0
+
+
+def test_structure_sizes_include_module_caches_and_registered():
+    tracker = MemoryTracker()
+    app = SimpleNamespace(
+        message_history=SimpleNamespace(messages=[{}, {}]),
+        stats=SimpleNamespace(usage_infos=[1, 2, 3], request_timings=[]),
+    )
+    tracker.register_app(app)
+    tracker.register("broken", lambda: app.missing)
+    sizes = tracker.structure_sizes()
+
+    assert sizes["message_history.messages"][0] == 2
+    assert sizes["stats.usage_infos"][0] == 3
+    assert "utils._messages_token_est_cache" in sizes
+    assert "broken" not in sizes
+
+
+def test_growth_warnings_only_in_debug_and_on_doubling():
+    tracker = MemoryTracker()
+    cache = {}
+    tracker.register("cache", lambda: cache)
+    cache.update((i, i) for i in range(10))
+    with patch("aicoder.config.MEMORY_WARN_ENTRIES", 10), patch(
+        "aicoder.config.MEMORY_WARN_RSS_MB", 0
+    ), patch("aicoder.memory_tracker.MODULE_STRUCTURES", []), patch(
+        "aicoder.memory_tracker.wmsg"
+    ) as warn:
+        with patch("aicoder.config.DEBUG", False):
+            assert tracker.check_growth() == []
+        with patch("aicoder.config.DEBUG", True):
+            assert tracker.check_growth() == ["cache has grown to 10 entries"]
+            cache.update((i, i) for i in range(10, 19))
+            assert tracker.check_growth() == []  # Next warning at 20
+            cache[19] = 19
+            assert tracker.check_growth() == ["cache has grown to 20 entries"]
+    assert warn.call_count == 2
+
+
+def test_rss_growth_warning():
+    tracker = MemoryTracker()
+    tracker.start_rss_kb = 1000
+    with patch("aicoder.config.DEBUG", True), patch(
+        "aicoder.config.MEMORY_WARN_ENTRIES", 0
+    ), patch("aicoder.config.MEMORY_WARN_RSS_MB", 1), patch("aicoder.memory_tracker.wmsg"):
+        assert tracker.check_growth(current_rss_kb=1500) == []
+        assert tracker.check_growth(current_rss_kb=3048) == ["RSS has grown by 2 MB since startup"]
+
+
+def test_tracemalloc_snapshot_and_diff():
+    tracker = MemoryTracker()
+    try:
+        assert tracker.diff() is None
+        tracker.take_snapshot()
+        assert tracker.tracing
+        kept = [bytearray(1024) for _ in range(200)]
+        lines = tracker.diff(5)
+        assert lines and any("test_memory_tracker.py" in line for line in lines)
+        del kept
+    finally:
+        tracker.stop_tracing()
+    assert not tracker.tracing
+
+
+def test_stats_records_rss_per_request(capsys):
+    stats = _stats()
+    timing = RequestTiming()
+    timing.finish(True)
+    stats.record_request_timing(timing)
+    assert timing.rss_kb > 0 and stats.peak_rss_kb == timing.rss_kb
+    assert timing.to_dict()["rss_kb"] == timing.rss_kb
+    stats.print_stats()
+    assert "Process memory:" in capsys.readouterr().out
+
+
+def test_mem_command_usage(capsys):
+    app = Mock()
+    app.stats.peak_rss_kb = 2048
+    MemCommand(app).execute([])
+    out = capsys.readouterr().out
+    assert "RSS:" in out and "Peak RSS after a request: 2.0 MB" in out
+    assert "Caches and histories" in out
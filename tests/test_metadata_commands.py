@@ -0,0 +1,136 @@
+"""
+Tests for running and caching tool description / system prompt commands.
+"""
+
+import json
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.metadata_commands import (
+    clear_metadata_cache,
+    run_metadata_command,
+    run_metadata_commands,
+)
+from aicoder.tool_manager.registry import ToolRegistry
+
+
+def setup_function():
+    clear_metadata_cache()
+
+
+def _counting_command(tmp_path, text):
+    """Command printing text and recording each run in a file."""
+    runs = tmp_path / "runs"
+    return f"echo x >> {runs} && echo '{text}'", runs
+
+
+def _run_count(runs):
+    return len(runs.read_text().splitlines()) if runs.exists() else 0
+
+
+def test_commands_run_concurrently():
+    """Metadata commands of different tools run at the same time."""
+    tools = {
+        f"tool{i}": {
+            "type": "command",
+            "tool_description_command": f"sleep 0.5 && echo 'Tool {i}'",
+        }
+        for i in range(4)
+    }
+
+    start = time.monotonic()
+    results = run_metadata_commands(tools)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.5
+    assert results[("tool2", "tool_description_command")].output == "Tool 2"
+
+
+def test_output_cached_for_ttl(tmp_path):
+    """A fresh cached output is reused instead of running the command again."""
+    command, runs = _counting_command(tmp_path, "Description")
+    tool_config = {"tool_description_command": command, "metadata_cache_ttl": 60}
+
+    assert run_metadata_command(tool_config, "tool_description_command").output == "Description"
+    assert run_metadata_command(tool_config, "tool_description_command").output == "Description"
+    assert _run_count(runs) == 1
+
+    with patch("aicoder.tool_manager.metadata_commands.time.monotonic", return_value=time.monotonic() + 61):
+        run_metadata_command(tool_config, "tool_description_command")
+    assert _run_count(runs) == 2
+
+
+def test_zero_ttl_disables_cache(tmp_path):
+    command, runs = _counting_command(tmp_path, "Description")
+    tool_config = {"tool_description_command": command, "metadata_cache_ttl": 0}
+
+    run_metadata_command(tool_config, "tool_description_command")
+    run_metadata_command(tool_config, "tool_description_command")
+
+    assert _run_count(runs) == 2
+
+
+def test_cache_key_command_invalidates(tmp_path):
+    """A change in the cache key command's output re-runs the command."""
+    command, runs = _counting_command(tmp_path, "Description")
+    version = tmp_path / "version"
+    version.write_text("1")
+    tool_config = {
+        "tool_description_command": command,
+        "metadata_cache_key_command": f"cat {version}",
+    }
+
+    run_metadata_command(tool_config, "tool_description_command")
+    run_metadata_command(tool_config, "tool_description_command")
+    assert _run_count(runs) == 1
+
+    version.write_text("2")
+    run_metadata_command(tool_config, "tool_description_command")
+    assert _run_count(runs) == 2
+
+
+def test_failure_reported_and_not_cached():
+    tool_config = {"tool_description_command": "exit 3"}
+
+    result = run_metadata_command(tool_config, "tool_description_command")
+
+    assert result.output is None
+    assert "return code 3" in result.error
+
+
+def test_registry_applies_metadata_at_load(tmp_path):
+    """Loading external tools sets descriptions and extends the system prompt."""
+    config_file = tmp_path / "mcp_tools.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "dynamic_tool": {
+                    "type": "command",
+                    "command": "echo hi",
+                    "description": "Static",
+                    "tool_description_command": "echo 'Dynamic description'",
+                    "append_to_system_prompt_command": "echo 'Extra context'",
+                }
+            }
+        )
+    )
+    history = Mock()
+    history.messages = [{"role": "system", "content": "System prompt"}]
+
+    with patch.dict(os.environ, {"MCP_TOOLS_CONF_PATH": str(config_file)}):
+        registry = ToolRegistry(history)
+
+    assert registry.mcp_tools["dynamic_tool"]["description"] == "Dynamic description"
+    assert history.messages[0]["content"] == "System prompt\n\nExtra context"
+
+    # Refreshed text replaces the earlier addition instead of piling up
+    registry.append_to_system_prompt("dynamic_tool", "New context")
+    assert history.messages[0]["content"] == "System prompt\n\nNew context"
@@ -0,0 +1,156 @@
+"""
+Tests for the OpenMetrics/JSON metrics exporter.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import utils
+from aicoder.metrics_export import Histogram, MetricsExporter, collect_metrics, render_openmetrics
+from aicoder.request_timing import RequestTiming
+from aicoder.stats import Stats
+
+
+def _stats():
+    with patch.dict(os.environ, {"AICODER_TEST_MODE": "1"}):
+        stats = Stats()
+    stats.api_requests = 3
+    stats.api_errors = 1
+    stats.api_retries = 1
+    stats.prompt_tokens = 120
+    stats.completion_tokens = 30
+    stats.compactions = 2
+    with patch("aicoder.config.get_api_endpoint", return_value="http://mock/v1/chat/completions"):
+        for success, total in ((True, 0.3), (True, 1.5), (False, 0.1)):
+            timing = RequestTiming(model="gpt-test")
+            timing.first_token_at = timing.start + 0.05
+            timing.finish(success)
+            timing.end = timing.start + total
+            stats.record_request_timing(timing)
+    stats.record_tool_timing("read_file", 0.02)
+    stats.record_tool_timing("read_file", 0.2)
+    stats.record_tool_timing("run_shell_command", 2.0)
+    return stats
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert histogram.count == 4 and histogram.sum == 3.65
+
+
+def test_openmetrics_text():
+    text = render_openmetrics(collect_metrics(_stats()))
+    labels = 'model="gpt-test",endpoint="http://mock/v1/chat/completions"'
+
+    assert "# TYPE aicoder_api_requests counter" in text
+    assert "aicoder_api_retries_total 1" in text
+    assert 'aicoder_tokens_total{type="prompt"} 120' in text
+    assert f'aicoder_model_requests_total{{{labels},result="error"}} 1' in text
+    assert f'aicoder_request_duration_seconds_bucket{{{labels},le="0.5"}} 1' in text
+    assert f'aicoder_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"aicoder_request_duration_seconds_count{{{labels}}} 2" in text
+    assert 'aicoder_tool_calls_total{tool="read_file"} 2' in text
+    assert 'aicoder_tool_duration_seconds_bucket{tool="run_shell_command",le="1"} 0' in text
+    assert "aicoder_compactions_total 2" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_cache_lookups_are_counted():
+    before = list(utils.cache_counters["messages_token_estimate"])
+    messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+    utils.estimate_messages_tokens(messages)
+    utils.estimate_messages_tokens(messages)
+    hits, misses = utils.cache_counters["messages_token_estimate"]
+    assert (hits - before[0], misses - before[1]) == (2, 2)
+
+    text = render_openmetrics(collect_metrics(_stats()))
+    assert 'aicoder_cache_lookups_total{cache="messages_token_estimate",result="hit"}' in text
+    assert 'aicoder_cache_hit_ratio{cache="messages_token_estimate"}' in text
+
+
+def test_file_export_picks_format_by_extension(tmp_path):
+    stats = _stats()
+    exporter = MetricsExporter(stats, file_path=str(tmp_path / "m-{pid}.json"))
+    exporter.write_file()
+    path = tmp_path / f"m-{os.getpid()}.json"
+    document = json.loads(path.read_text())
+    assert document["metrics"]["aicoder_api_errors"]["samples"][0]["value"] == 1
+
+    exporter = MetricsExporter(stats, file_path=str(tmp_path / "metrics.prom"))
+    exporter.stop()  # Writes a final time
+    assert (tmp_path / "metrics.prom").read_text().endswith("# EOF\n")
+
+
+def test_file_writer_survives_errors(tmp_path):
+    """An unexpected error in one write does not stop the writer thread."""
+    exporter = MetricsExporter(_stats(), file_path=str(tmp_path / "metrics.prom"), interval=0.1)
+    calls = []
+
+    def write_file():
+        calls.append(time.time())
+        if len(calls) == 1:
+            raise ValueError("boom")
+
+    with patch.object(exporter, "write_file", write_file), patch("aicoder.metrics_export.wmsg"):
+        exporter.start()
+        deadline = time.time() + 5
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        exporter._stop.set()
+    assert len(calls) >= 2
+
+
+def test_stats_does_not_import_the_http_server():
+    code = "import sys, aicoder.stats; print('http.server' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert result.stdout.strip() == "False", result.stderr
+
+
+def test_http_and_unix_socket_servers(tmp_path):
+    socket_path = str(tmp_path / "metrics.sock")
+    exporter = MetricsExporter(_stats(), port=_free_port(), socket_path=socket_path).start()
+    try:
+        host, port = exporter.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+            assert b"aicoder_api_requests_total 3" in response.read()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(5)
+            client.connect(socket_path)
+            client.sendall(b"GET /metrics.json HTTP/1.0\r\n\r\n")
+            response = b""
+            while True:
+                data = client.recv(65536)
+                if not data:
+                    break
+                response += data
+        head, body = response.split(b"\r\n\r\n", 1)
+        assert b"200" in head.split(b"\r\n")[0]
+        assert json.loads(body)["metrics"]["aicoder_compactions"]["samples"][0]["value"] == 2
+    finally:
+        exporter.stop()
+    assert not os.path.exists(socket_path)
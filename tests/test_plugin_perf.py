@@ -0,0 +1,117 @@
+"""
+Tests for plugin load/hook timing and hot-path patch accounting.
+"""
+
+import os
+import sys
+import textwrap
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import aicoder.utils
+from aicoder.commands.plugins_command import PluginsCommand
+from aicoder.plugin_system import loader
+from aicoder.plugin_system.perf import PluginPerf
+from aicoder.tool_manager.internal_tools import INTERNAL_TOOL_FUNCTIONS
+
+PATCHER = '''
+import aicoder.utils
+from aicoder.tool_manager.internal_tools import INTERNAL_TOOL_FUNCTIONS
+
+_original_parse = aicoder.utils.parse_markdown
+
+def patched_parse(text):
+    return _original_parse(text)
+
+aicoder.utils.parse_markdown = patched_parse
+
+def on_aicoder_init(app):
+    original_read = INTERNAL_TOOL_FUNCTIONS["read_file"]
+    INTERNAL_TOOL_FUNCTIONS["read_file"] = lambda *a, **k: original_read(*a, **k)
+    app.message_history.add_user_message = lambda message: "added"
+'''
+
+SLOW = '''
+import time
+time.sleep(0.02)
+calls = []
+
+def on_before_user_prompt():
+    calls.append(1)
+'''
+
+
+def _write_plugins(tmp_path):
+    (tmp_path / "01_patcher.py").write_text(textwrap.dedent(PATCHER))
+    (tmp_path / "slow.py").write_text(textwrap.dedent(SLOW))
+
+
+def test_load_hooks_and_patches_are_measured(tmp_path):
+    _write_plugins(tmp_path)
+    perf = PluginPerf()
+    original_parse = aicoder.utils.parse_markdown
+    original_read = INTERNAL_TOOL_FUNCTIONS["read_file"]
+    app = SimpleNamespace(message_history=SimpleNamespace())
+    try:
+        with patch.object(loader, "get_plugin_perf", return_value=perf), patch(
+            "aicoder.config.PLUGIN_PERF_SAMPLE_EVERY", 2
+        ), patch("builtins.print"):
+            plugins = loader.load_plugins(str(tmp_path))
+            loader.notify_plugins_of_aicoder_init(plugins, app)
+            for _ in range(3):
+                loader.notify_plugins_before_user_prompt(plugins)
+            for _ in range(4):
+                aicoder.utils.parse_markdown("**hi**")
+            assert app.message_history.add_user_message({}) == "added"
+
+        patcher, slow = perf.plugins["01_patcher"], perf.plugins["slow"]
+        assert slow.load_time >= 0.02
+        assert slow.hooks["on_before_user_prompt"].calls == 3
+        assert dict(plugins)["slow"].calls == [1, 1, 1]
+
+        assert "on_aicoder_init" in patcher.hooks
+        parse_stats = patcher.patches["aicoder.utils.parse_markdown"]
+        assert parse_stats.calls == 4 and parse_stats.sampled == 2
+        assert "INTERNAL_TOOL_FUNCTIONS['read_file']" in patcher.patches
+        assert patcher.patches["app.message_history.add_user_message"].calls == 1
+        assert not slow.patches
+
+        assert perf.ranked()[0] is slow
+        report = "\n".join(perf.report_lines())
+        assert "hook on_before_user_prompt: 3x" in report
+        assert "patched aicoder.utils.parse_markdown: 4x" in report
+    finally:
+        aicoder.utils.parse_markdown = original_parse
+        INTERNAL_TOOL_FUNCTIONS["read_file"] = original_read
+
+
+def test_patch_wrapping_can_be_disabled(tmp_path):
+    _write_plugins(tmp_path)
+    perf = PluginPerf()
+    original_parse = aicoder.utils.parse_markdown
+    try:
+        with patch.object(loader, "get_plugin_perf", return_value=perf), patch(
+            "aicoder.config.PLUGIN_PERF", False
+        ), patch("builtins.print"):
+            loader.load_plugins(str(tmp_path))
+        assert aicoder.utils.parse_markdown.__name__ == "patched_parse"
+        assert not hasattr(aicoder.utils.parse_markdown, "__aicoder_perf__")
+        assert perf.plugins["slow"].load_time > 0
+    finally:
+        aicoder.utils.parse_markdown = original_parse
+
+
+def test_plugins_command(capsys):
+    perf = PluginPerf()
+    with perf.time_hook("notify", "on_before_ai_prompt"):
+        pass
+    app = Mock(loaded_plugins=[("notify", Mock())])
+    with patch("aicoder.plugin_system.perf.get_plugin_perf", return_value=perf):
+        command = PluginsCommand(app)
+        command.execute([])
+        command.execute(["perf"])
+    out = capsys.readouterr().out
+    assert "notify (loaded in 0.0 ms)" in out
+    assert "hook on_before_ai_prompt: 1x" in out
@@ -0,0 +1,93 @@
+"""
+Tests for the /profile sampling profiler and one-shot cProfile.
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.commands.profile_command import ProfileCommand
+from aicoder.profiler import ProfileSession, SamplingProfiler
+
+
+def _busy_wait(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collects_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_wait, args=(stop,), name="busy")
+    worker.start()
+    sampler = SamplingProfiler(hz=500)
+    try:
+        sampler.start()
+        time.sleep(0.2)
+        sampler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert not sampler.running
+    assert sampler.samples > 5
+    lines = sampler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "_busy_wait (" in busy[0]
+    assert not any("aicoder-sampler" in line for line in lines)
+
+    frames = {frame: total for frame, _, total in sampler.top_functions(50)}
+    busy_frame = next(frame for frame in frames if frame.startswith("_busy_wait ("))
+    assert frames[busy_frame] <= sampler.samples
+
+
+def test_top_functions_counts_self_and_total():
+    sampler = SamplingProfiler()
+    sampler.stacks.update({"main;a;b": 3, "main;a": 1, "main;a;c;a": 2})
+    sampler.samples = 6
+    ranking = sampler.top_functions()
+    assert ranking[0] == ("a", 3, 6)  # Recursive frames are counted once per stack
+    assert ("b", 3, 3) in ranking and ("c", 0, 2) in ranking
+
+
+def test_one_shot_cprofile_writes_files(tmp_path):
+    session = ProfileSession()
+    with patch("aicoder.config.PROFILE_DIR", str(tmp_path)):
+        session.begin_interaction()
+        assert session.end_interaction() is None  # Not armed
+
+        session.arm_cprofile()
+        session.begin_interaction()
+        sorted(range(10000), key=lambda n: -n)
+        path = session.end_interaction()
+
+    assert path.endswith(".pstats") and os.path.exists(path)
+    summary = path[: -len(".pstats")] + ".txt"
+    assert "function calls" in open(summary).read()
+    assert not session.cprofile_armed
+
+
+def test_profile_command_start_stop_report(tmp_path, capsys):
+    session = ProfileSession()
+    command = ProfileCommand(Mock())
+    with patch("aicoder.profiler.get_profile_session", return_value=session), patch(
+        "aicoder.config.PROFILE_DIR", str(tmp_path)
+    ):
+        command.execute(["start", "200"])
+        assert session.sampler.running
+        time.sleep(0.1)
+        command.execute(["stop"])
+        command.execute(["report", "5"])
+        command.execute(["once"])
+        command.execute([])
+
+    out = capsys.readouterr().out
+    assert "Sampling profiler started (200 samples/s)" in out
+    assert "Hot spots" in out
+    assert "cProfile armed for the next prompt" in out
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith(".collapsed")
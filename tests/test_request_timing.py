@@ -0,0 +1,122 @@
+"""
+Tests for the per-request latency breakdown.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.request_timing import GAP_BUCKETS_MS, RequestTiming, percentile
+from aicoder.stats import Stats
+from aicoder.streaming_adapter import StreamingAdapter
+
+
+def _stats():
+    with patch.dict(os.environ, {"AICODER_TEST_MODE": "1"}):
+        return Stats()
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_timing_breakdown():
+    timing = RequestTiming(streaming=True, model="m")
+    timing.start = 100.0
+    timing.serialized_at = 100.01
+    timing.mark_response(100.5)
+    with patch("aicoder.request_timing.time.perf_counter", side_effect=[100.505, 100.6, 103.6, 103.6, 104.0]):
+        timing.mark_chunk()  # 5 ms after the headers
+        timing.mark_chunk()  # 95 ms gap
+        timing.mark_first_token()
+        timing.mark_chunk()  # 3 s gap
+        timing.mark_first_token()  # Only the first one counts
+        timing.finish(True, completion_tokens=40)
+
+    assert abs(timing.serialize_time - 0.01) < 1e-9
+    assert abs(timing.ttfb - 0.49) < 1e-9
+    assert abs(timing.ttft - 3.6) < 1e-9
+    assert abs(timing.total - 4.0) < 1e-9
+    assert abs(timing.tokens_per_second - 100.0) < 1e-6
+    assert abs(timing.max_gap - 3.0) < 1e-9
+    assert timing.chunks == 3
+    assert timing.gap_histogram[0] == 1  # < 10 ms
+    assert timing.gap_histogram[GAP_BUCKETS_MS.index(100)] == 1
+    assert timing.gap_histogram[-1] == 1
+    record = timing.to_dict()
+    assert record["success"] and record["model"] == "m"
+    assert sum(record["gap_histogram"].values()) == 3
+
+
+def test_stats_keeps_bounded_history(tmp_path):
+    log_file = tmp_path / "timings.jsonl"
+    with patch("aicoder.config.REQUEST_TIMING_HISTORY", 3), patch(
+        "aicoder.config.REQUEST_TIMING_LOG", str(log_file)
+    ):
+        stats = _stats()
+        for _ in range(5):
+            timing = RequestTiming()
+            timing.mark_serialized()
+            timing.mark_response()
+            timing.finish(True)
+            stats.record_request_timing(timing)
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            stats.record_tool_timing("grep", seconds)
+
+    assert len(stats.request_timings) == 3
+    assert list(stats.tool_timings["grep"]) == [0.2, 0.3, 0.4]
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 5 and "ttfb" in json.loads(lines[0])
+
+    summary = stats.latency_summary()
+    assert set(summary["fields"]) >= {"serialize", "ttfb", "total"}
+    assert summary["tools"]["grep"] == (3, 0.3, 0.4)
+
+
+def test_print_stats_shows_latency(capsys):
+    stats = _stats()
+    timing = RequestTiming()
+    timing.mark_response()
+    timing.mark_first_token()
+    timing.finish(True, completion_tokens=10)
+    stats.record_request_timing(timing)
+    stats.record_tool_timing("read_file", 0.05)
+    stats.print_stats()
+    out = capsys.readouterr().out
+    assert "Request latency (last 1 requests, p50 / p95):" in out
+    assert "Time to first token" in out
+    assert "read_file (1x): 50 ms / 50 ms" in out
+
+
+def test_streaming_response_records_chunks_and_first_token():
+    api_handler = Mock(loaded_plugins=[])
+    api_handler.stats = _stats()
+    adapter = StreamingAdapter(api_handler, animator=Mock())
+    chunks = [
+        {"choices": [{"index": 0, "delta": {"role": "assistant"}}]},
+        {"choices": [{"index": 0, "delta": {"content": "Hello"}}]},
+        {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+    ]
+    response = Mock()
+    response.readline.side_effect = [
+        f"data: {json.dumps(chunk)}\n".encode("utf-8") for chunk in chunks
+    ]
+    cancellation_event = Mock()
+    cancellation_event.is_set.return_value = False
+    timing = RequestTiming()
+    timing.mark_response()
+
+    with patch("builtins.print"):
+        result = adapter._process_streaming_response(response, cancellation_event, timing)
+
+    assert result["choices"][0]["message"]["content"] == "Hello"
+    assert timing.chunks == 3
+    assert timing.first_token_at is not None
+    assert sum(timing.gap_histogram) == 3
@@ -55,6 +55,7 @@ def test_retry_handler_should_retry_502():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -92,6 +93,7 @@ def test_retry_handler_should_retry_500_with_429_content():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -149,6 +151,7 @@ def test_retry_handler_should_not_retry_401():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -182,6 +185,7 @@ def test_api_client_handle_http_error_with_retry():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -224,6 +228,7 @@ def test_api_client_handle_http_error_max_attempts():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -299,6 +304,7 @@ def test_actual_api_call_retry_with_502():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -361,6 +367,7 @@ def test_retry_with_multiple_error_codes():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -405,6 +412,7 @@ def test_500_error_without_rate_limiting_content():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -443,6 +451,7 @@ def test_calculate_retry_delay_exponential():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -500,6 +509,7 @@ def test_calculate_retry_delay_fixed():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -571,6 +581,7 @@ def test_retry_handler_reset_counter():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -604,6 +615,7 @@ def test_request_success_endpoint():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -643,6 +655,7 @@ def test_request_502_error():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -679,6 +692,7 @@ def test_request_500_error():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -715,6 +729,7 @@ def test_request_429_error():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
@@ -751,6 +766,7 @@ def test_request_500_with_429_content():
     mock_stats.api_requests = 0
     mock_stats.api_success = 0
     mock_stats.api_errors = 0
+    mock_stats.api_retries = 0
     mock_stats.api_time_spent = 0.0
     mock_stats.prompt_tokens = 0
     mock_stats.completion_tokens = 0
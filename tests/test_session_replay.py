@@ -0,0 +1,114 @@
+"""
+Tests for replaying STREAM_LOG_FILE recordings (benchmarks/replay.py).
+"""
+
+import json
+import os
+import sys
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.replay import (
+    compare_final_responses,
+    parse_stream_log,
+    recorded_prompts,
+    replay_session,
+)
+from aicoder.streaming_adapter import StreamingAdapter
+
+
+def _chunk(delta, finish_reason=None):
+    return json.dumps(
+        {"id": "rec", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+    )
+
+
+def _write_recording(path):
+    """Two requests: a tool call with per-character argument deltas, then text."""
+    arguments = json.dumps({"path": "."})
+    system = {"role": "system", "content": "You are a helpful assistant."}
+    user = {"role": "user", "content": "What is in this directory?"}
+    call = {
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "list_directory", "arguments": arguments},
+    }
+    lines = ["=== REQUEST ===", json.dumps({"model": "rec-model", "messages": [system, user]}, indent=2)]
+    events = [_chunk({"role": "assistant", "content": ""})]
+    events.append(_chunk({"tool_calls": [{
+        "index": 0, "id": "call_1", "type": "function",
+        "function": {"name": "list_directory", "arguments": ""},
+    }]}))
+    events += [
+        _chunk({"tool_calls": [{"index": 0, "function": {"arguments": char}}]})
+        for char in arguments
+    ]
+    events.append(_chunk({}, "tool_calls"))
+    lines += [f"@{0.001 * i:.4f} data: {event}" for i, event in enumerate(events)]
+    lines.append("DEBUG: Tool call summary - Total: 1, Valid: 1, Content length: 0")
+    lines += ["=== FINAL RESPONSE ===", json.dumps({"choices": [{
+        "message": {"role": "assistant", "content": "", "tool_calls": [call]},
+        "finish_reason": "tool_calls",
+    }]}, indent=2)]
+
+    messages = [
+        system,
+        user,
+        {"role": "assistant", "content": "", "tool_calls": [call]},
+        {"role": "tool", "tool_call_id": "call_1", "content": "..."},
+    ]
+    lines += ["=== REQUEST ===", json.dumps({"model": "rec-model", "messages": messages}, indent=2)]
+    # Old-style payload lines, and no [DONE] at the end
+    lines += [" " + _chunk({"content": "Just one"}), " " + _chunk({"content": " file."}, "stop")]
+    lines += ["=== FINAL RESPONSE ===", json.dumps({"choices": [{
+        "message": {"role": "assistant", "content": "Just one file."},
+        "finish_reason": "stop",
+    }]}, indent=2)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_parse_stream_log(tmp_path):
+    log = tmp_path / "session.log"
+    _write_recording(log)
+    exchanges = parse_stream_log(str(log))
+
+    assert len(exchanges) == 2
+    assert exchanges[0].request["model"] == "rec-model"
+    assert exchanges[0].events[1][0] == 0.001
+    assert all(raw.startswith("data:") for _, raw in exchanges[1].events)
+    assert exchanges[1].events[0][0] is None
+    assert exchanges[1].final_response["choices"][0]["message"]["content"] == "Just one file."
+    assert recorded_prompts(exchanges) == ["What is in this directory?"]
+    assert compare_final_responses(exchanges, exchanges) == []
+    assert compare_final_responses(exchanges, exchanges[:1]) == [
+        {"request": 1, "fields": ["content", "finish_reason", "tool_calls"]}
+    ]
+
+
+def test_adapter_logs_sse_offsets(tmp_path, monkeypatch):
+    log = tmp_path / "stream.log"
+    monkeypatch.setenv("STREAM_LOG_FILE", str(log))
+    adapter = StreamingAdapter(Mock(loaded_plugins=[]), animator=Mock())
+    adapter._log_sse_line("data: {}")
+    adapter._stream_log_start = 0.0
+    adapter._log_sse_line("data: [DONE]")
+    first, second = log.read_text().splitlines()
+    assert first == "data: {}"
+    assert second.startswith("@") and second.endswith(" data: [DONE]")
+
+
+def test_replay_drives_the_app(tmp_path):
+    log = tmp_path / "session.log"
+    _write_recording(log)
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    (workdir / "only_file.txt").write_text("x")
+
+    report = replay_session(str(log), workdir=str(workdir), timeout=60)
+
+    assert report["completed"] and report["exit_code"] == 0
+    assert report["served_requests"] == 2
+    assert report["extra_requests"] == 0
+    assert report["divergences"] == []
+    assert report["response_differences"] == []
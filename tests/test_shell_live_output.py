@@ -0,0 +1,81 @@
+"""
+Tests for live output display of long-running shell commands.
+"""
+
+import os
+import sys
+import time
+import subprocess
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.shell_live import LiveOutputPump
+
+
+def _start(command):
+    """Start a command the same way run_shell_command does."""
+    return subprocess.Popen(
+        ["bash", "-c", command],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=os.setsid,
+    )
+
+
+def _printed(animator):
+    return [call.args[0] for call in animator.print_above.call_args_list]
+
+
+def test_lines_are_streamed_to_terminal():
+    """Each output line is echoed above the status line."""
+    animator = MagicMock()
+    process = _start("echo first; echo oops >&2; sleep 0.2; echo last")
+
+    with patch("aicoder.tool_manager.shell_live.is_esc_pressed", return_value=False):
+        stdout, stderr, timed_out, cancelled = LiveOutputPump(
+            process, 10, animator=animator
+        ).run()
+
+    printed = _printed(animator)
+    assert any(line.endswith("first") for line in printed)
+    assert any(line.endswith("last") for line in printed)
+    assert any("oops" in line for line in printed)
+    assert stdout.text() == "first\nlast\n"
+    assert stderr.text() == "oops\n"
+    assert not timed_out and not cancelled
+    animator.start_animation.assert_called_once()
+    animator.stop_animation.assert_called()
+
+
+def test_noisy_output_is_rate_limited():
+    """Bursts beyond the line rate are skipped on screen but fully captured."""
+    animator = MagicMock()
+    process = _start("seq 1 5000")
+
+    with patch("aicoder.tool_manager.shell_live.is_esc_pressed", return_value=False):
+        stdout, _, _, _ = LiveOutputPump(
+            process, 10, animator=animator, max_lines_per_sec=10
+        ).run()
+
+    printed = _printed(animator)
+    assert len(printed) < 100
+    assert any("lines skipped" in line for line in printed)
+    assert stdout.line_count() == 5000
+
+
+def test_esc_cancels_command():
+    """Pressing ESC kills the process group and reports cancellation."""
+    animator = MagicMock()
+    process = _start("echo started; sleep 30")
+
+    start = time.time()
+    with patch("aicoder.tool_manager.shell_live.is_esc_pressed", return_value=True):
+        stdout, _, timed_out, cancelled = LiveOutputPump(
+            process, 60, animator=animator
+        ).run()
+
+    assert cancelled
+    assert not timed_out
+    assert time.time() - start < 5
+    assert process.poll() is not None
@@ -0,0 +1,141 @@
+"""
+Tests for bounded, incremental capture of run_shell_command output.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.shell_capture import StreamCapture
+from aicoder.tool_manager.internal_tools import execute_run_shell_command
+
+
+class MockStats:
+    """Mock stats object for testing."""
+
+    def __init__(self):
+        self.tool_errors = 0
+
+
+def test_small_output_is_kept_whole():
+    """Output under the cap is returned unchanged."""
+    capture = StreamCapture("stdout", max_bytes=100, spill=False)
+    capture.feed(b"line one\n")
+    capture.feed(b"line two")
+
+    assert not capture.truncated
+    assert capture.text() == "line one\nline two"
+    assert capture.total_bytes == 17
+    assert capture.line_count() == 2
+    assert capture.summary() == ""
+
+
+def test_large_output_keeps_head_and_tail():
+    """Output over the cap keeps only the first and last half of the window."""
+    capture = StreamCapture("stdout", max_bytes=20, spill=False)
+    data = b"".join(f"{i:04d}\n".encode() for i in range(100))
+    for i in range(0, len(data), 7):
+        capture.feed(data[i : i + 7])
+
+    assert capture.truncated
+    assert capture.total_bytes == len(data)
+    assert capture.line_count() == 100
+    assert capture.omitted_bytes == len(data) - 20
+
+    text = capture.text()
+    assert text.startswith(data[:10].decode())
+    assert text.endswith(data[-10:].decode())
+    assert "bytes omitted" in text
+    assert "100 lines total" in capture.summary()
+
+
+def test_spill_file_contains_full_output():
+    """Truncated output is spilled in full to a temp file."""
+    capture = StreamCapture("stdout", max_bytes=16, spill=True)
+    data = b"".join(f"row {i}\n".encode() for i in range(50))
+    for i in range(0, len(data), 5):
+        capture.feed(data[i : i + 5])
+    capture.close()
+
+    try:
+        assert capture.spill_path
+        with open(capture.spill_path, "rb") as f:
+            assert f.read() == data
+        assert capture.spill_path in capture.summary()
+        assert "read_file" in capture.summary()
+    finally:
+        os.unlink(capture.spill_path)
+
+
+def test_spill_respects_size_cap():
+    """The spill file stops growing at SHELL_OUTPUT_SPILL_MAX_BYTES."""
+    with patch("aicoder.config.SHELL_OUTPUT_SPILL_MAX_BYTES", 30):
+        capture = StreamCapture("stdout", max_bytes=10, spill=True)
+        capture.feed(b"x" * 8)
+        capture.feed(b"y" * 40)
+        capture.close()
+
+    try:
+        assert os.path.getsize(capture.spill_path) == 30
+        assert not capture.spill_complete
+        assert "first 30 bytes" in capture.summary()
+    finally:
+        os.unlink(capture.spill_path)
+
+
+def test_old_spill_files_are_deleted():
+    """Only the newest SHELL_OUTPUT_SPILL_KEEP spill files are kept."""
+    from aicoder.tool_manager import shell_capture
+
+    with patch("aicoder.config.SHELL_OUTPUT_SPILL_KEEP", 2), patch.object(
+        shell_capture, "_spill_paths", []
+    ):
+        captures = []
+        for _ in range(3):
+            capture = StreamCapture("stdout", max_bytes=4, spill=True)
+            capture.feed(b"x" * 20)
+            capture.close()
+            captures.append(capture)
+        assert not os.path.exists(captures[0].spill_path)
+        assert all(os.path.exists(c.spill_path) for c in captures[1:])
+
+        shell_capture.cleanup_spill_files()
+        assert not any(os.path.exists(c.spill_path) for c in captures)
+
+
+def test_run_shell_command_caps_output():
+    """A command producing lots of output returns a bounded result."""
+    mock_stats = MockStats()
+
+    with patch("aicoder.config.SHELL_OUTPUT_MAX_BYTES", 1000), patch(
+        "aicoder.config.SHELL_OUTPUT_SPILL", False
+    ):
+        result = execute_run_shell_command(command="seq 1 100000", stats=mock_stats)
+
+    assert "Return code: 0" in result
+    assert result.startswith("Return code: 0\nStdout: 1\n2\n3\n")
+    assert "100000\n" in result
+    assert "bytes omitted" in result
+    assert "[Stdout truncated: 588,895 bytes, 100,000 lines total." in result
+    assert len(result) < 2000
+    assert mock_stats.tool_errors == 0
+
+
+def test_run_shell_command_reads_both_streams():
+    """Interleaved stdout and stderr are both captured."""
+    mock_stats = MockStats()
+
+    result = execute_run_shell_command(
+        command="for i in 1 2 3; do echo out$i; echo err$i >&2; done",
+        stats=mock_stats,
+    )
+
+    assert "Stdout: out1\nout2\nout3\n" in result
+    assert "Stderr: err1\nerr2\nerr3\n" in result
+    assert "truncated" not in result
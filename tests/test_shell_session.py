@@ -0,0 +1,155 @@
+"""
+Tests for the persistent shell session used by run_shell_command.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.tool_manager.shell_session import ShellSession
+from aicoder.tool_manager.internal_tools import execute_run_shell_command
+
+
+class MockStats:
+    """Mock stats object for testing."""
+
+    def __init__(self):
+        self.tool_errors = 0
+
+
+@pytest.fixture
+def session():
+    shell = ShellSession(cwd=tempfile.gettempdir())
+    yield shell
+    shell.close()
+
+
+def test_cwd_and_env_persist(session):
+    """cd and export in one command are visible to the next."""
+    target = tempfile.mkdtemp()
+    session.run(f"cd {target} && export AICODER_TEST_VAR=kept", 10)
+    stdout, _, timed_out = session.run("pwd; echo $AICODER_TEST_VAR", 10)
+
+    assert not timed_out
+    assert stdout.text() == f"{os.path.realpath(target)}\nkept\n"
+    assert session.cwd == os.path.realpath(target)
+    assert session.last_return_code == 0
+
+
+def test_return_code_and_stderr(session):
+    """Exit codes and stderr are reported per command."""
+    stdout, stderr, _ = session.run("echo out; echo err >&2; false", 10)
+
+    assert stdout.text() == "out\n"
+    assert stderr.text() == "err\n"
+    assert session.last_return_code == 1
+
+
+def test_output_without_trailing_newline(session):
+    """Output not ending in a newline is kept intact."""
+    stdout, _, _ = session.run("printf 'no newline'", 10)
+    assert stdout.text() == "no newline"
+
+
+def test_commands_do_not_read_protocol_stream(session):
+    """A command reading stdin must not swallow the following protocol lines."""
+    stdout, _, _ = session.run("cat; echo after", 10)
+    assert stdout.text() == "after\n"
+    stdout, _, _ = session.run("echo next", 10)
+    assert stdout.text() == "next\n"
+
+
+def test_syntax_error_keeps_session_usable(session):
+    """Unbalanced quotes only fail the one command."""
+    _, stderr, _ = session.run("echo 'unterminated", 10)
+    assert stderr.text()
+    assert session.last_return_code != 0
+    stdout, _, _ = session.run("echo fine", 10)
+    assert stdout.text() == "fine\n"
+
+
+def test_timeout_kills_command_but_keeps_worker(session):
+    """A timed out command is killed while cwd/env survive."""
+    session.run("export KEEP=yes", 10)
+    worker_pid = session.process.pid
+
+    start = time.time()
+    _, _, timed_out = session.run("sleep 30", 1)
+
+    assert timed_out
+    assert time.time() - start < 5
+    assert session.process.pid == worker_pid
+    stdout, _, _ = session.run("echo $KEEP", 10)
+    assert stdout.text() == "yes\n"
+
+
+def test_stuck_builtin_restarts_worker(session):
+    """A shell builtin loop that ignores signals forces a worker restart."""
+    session.run(f"cd {tempfile.gettempdir()}", 10)
+    with patch("aicoder.tool_manager.shell_session.RESTART_GRACE", 0.5), patch(
+        "aicoder.tool_manager.shell_session.KILL_GRACE", 0.2
+    ):
+        _, _, timed_out = session.run("while true; do :; done", 1)
+
+    assert timed_out
+    assert session.was_reset
+    stdout, _, _ = session.run("echo back", 10)
+    assert stdout.text() == "back\n"
+    assert session.cwd == os.path.realpath(tempfile.gettempdir())
+
+
+def test_worker_restarts_after_exit(session):
+    """If a command exits the shell, the next command gets a fresh worker."""
+    session.run("exit 3", 10)
+    assert session.last_return_code == 3
+
+    stdout, _, _ = session.run("echo revived", 10)
+    assert stdout.text() == "revived\n"
+    assert session.was_reset
+
+
+def test_stop_event_interrupts_command(session):
+    """Setting the stop event (ESC) kills the running command."""
+    stop_event = threading.Event()
+    threading.Timer(0.3, stop_event.set).start()
+
+    start = time.time()
+    _, _, timed_out = session.run("sleep 30", 60, stop_event=stop_event)
+
+    assert not timed_out
+    assert time.time() - start < 5
+    stdout, _, _ = session.run("echo ok", 10)
+    assert stdout.text() == "ok\n"
+
+
+def test_run_shell_command_uses_session_when_enabled():
+    """With SHELL_PERSISTENT_SESSION the tool keeps state between calls."""
+    mock_stats = MockStats()
+    shell = ShellSession(cwd=tempfile.gettempdir())
+
+    try:
+        with patch("aicoder.config.SHELL_PERSISTENT_SESSION", True), patch(
+            "aicoder.tool_manager.shell_session.get_shell_session", return_value=shell
+        ):
+            execute_run_shell_command("export GREETING=hello", mock_stats)
+            result = execute_run_shell_command("echo $GREETING", mock_stats)
+            timeout_result = execute_run_shell_command(
+                "sleep 10", mock_stats, timeout=1
+            )
+    finally:
+        shell.close()
+
+    assert result == "Return code: 0\nStdout: hello\n\n"
+    assert "timed out after 1 seconds" in timeout_result
+    assert mock_stats.tool_errors == 1
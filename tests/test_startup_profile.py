@@ -0,0 +1,153 @@
+"""
+Tests for the startup profiler, lazy imports and the startup regression budget.
+"""
+
+import importlib
+import json
+import os
+import subprocess
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import startup_profiler
+from aicoder.commands.registry import COMMAND_TABLE, CommandRegistry, LazyCommand
+from aicoder.lazy_import import lazy_import
+from aicoder.startup_profiler import StartupProfiler, enable_from_argv
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Subsystems that must not be loaded just by importing the application
+DEFERRED_MODULES = [
+    "aicoder.diff_engine",
+    "aicoder.image_utils",
+    "aicoder.streaming_adapter",
+    "aicoder.commands.prompt_command",
+    "aicoder.commands.compact_command",
+]
+
+# Generous bound on importing the app; the README promises ~2s on low-end machines
+IMPORT_BUDGET_SECONDS = 2.0
+
+
+def _make_package(tmp_path, name, marker):
+    package = tmp_path / name
+    package.mkdir()
+    (package / "__init__.py").write_text("from . import child\n")
+    (package / "child.py").write_text(
+        f"open({str(marker)!r}, 'a').write('ran')\nVALUE = 42\n"
+    )
+    sys.path.insert(0, str(tmp_path))
+
+
+def test_profiler_times_imports(tmp_path):
+    """Each newly imported module gets self and cumulative times."""
+    _make_package(tmp_path, "profiled_pkg", tmp_path / "marker")
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        import profiled_pkg
+    finally:
+        profiler.uninstall()
+        sys.path.remove(str(tmp_path))
+
+    parent = profiler.imports["profiled_pkg"]
+    child = profiler.imports["profiled_pkg.child"]
+    assert parent["cumulative"] >= child["cumulative"]
+    assert parent["self"] <= parent["cumulative"] - child["cumulative"] + 1e-6
+    # The real loader is restored on the module
+    assert type(profiled_pkg.__loader__).__name__ != "_TimedLoader"
+    assert profiled_pkg.__spec__.loader is profiled_pkg.__loader__
+    assert profiler._finder is None
+
+
+def test_profiler_phases_nest():
+    profiler = StartupProfiler()
+    with profiler.phase("outer"):
+        with profiler.phase("inner"):
+            pass
+    assert [(p["name"], p["depth"]) for p in profiler.phases] == [
+        ("outer", 0),
+        ("inner", 1),
+    ]
+    assert profiler.phases[0]["seconds"] >= profiler.phases[1]["seconds"]
+    report = profiler.format_report()
+    assert "outer" in report and "  inner" in report
+
+
+def test_enable_from_argv_strips_flag(monkeypatch):
+    monkeypatch.delenv("AICODER_PROFILE_STARTUP", raising=False)
+    monkeypatch.setattr(startup_profiler, "_profiler", None)
+    argv = ["aicoder", "--profile-startup=out.json", "other"]
+    profiler = enable_from_argv(argv)
+    try:
+        assert argv == ["aicoder", "other"]
+        assert profiler.output_file == "out.json"
+        assert startup_profiler.get_startup_profiler() is profiler
+    finally:
+        profiler.uninstall()
+
+    monkeypatch.setattr(startup_profiler, "_profiler", None)
+    assert enable_from_argv(["aicoder"]) is None
+    with startup_profiler.startup_phase("ignored"):
+        pass
+    assert startup_profiler.get_startup_profiler() is None
+
+
+def test_lazy_import_defers_execution(tmp_path):
+    marker = tmp_path / "marker"
+    _make_package(tmp_path, "lazy_pkg", marker)
+    try:
+        (tmp_path / "lazy_pkg" / "__init__.py").write_text("")
+        importlib.invalidate_caches()
+        module = lazy_import(".child", "lazy_pkg")
+        assert not marker.exists()
+        assert module.VALUE == 42
+        assert marker.read_text() == "ran"
+        assert sys.modules["lazy_pkg"].child is module
+    finally:
+        sys.path.remove(str(tmp_path))
+
+
+def test_command_table_matches_command_aliases():
+    """The static alias table must agree with each command's own aliases."""
+    for module_name, class_name, aliases in COMMAND_TABLE:
+        module = importlib.import_module(f"aicoder.commands.{module_name}")
+        command = getattr(module, class_name)(None)
+        assert command.aliases == aliases, module_name
+
+
+def test_commands_are_loaded_on_first_use():
+    app = types.SimpleNamespace()
+    commands = CommandRegistry(app).get_all_commands()
+    handler = commands["/quit"]
+    assert isinstance(handler, LazyCommand)
+    assert handler is commands["/q"]
+    assert handler._command is None
+    assert handler([]) == (True, False)
+    assert handler.__doc__ == "Exits the application."
+
+
+def test_app_import_defers_subsystems():
+    """Regression check: importing the app leaves rarely used subsystems unloaded."""
+    code = (
+        "import json, sys, time, types\n"
+        "start = time.perf_counter()\n"
+        "import aicoder.app\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"names = {DEFERRED_MODULES!r}\n"
+        "loaded = [n for n in names if type(sys.modules.get(n)) is types.ModuleType]\n"
+        "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    assert data["loaded"] == []
+    assert data["elapsed"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,123 @@
+"""
+Tests for the versioned tool definitions cache.
+"""
+
+import json
+import os
+import sys
+
+# Ensure YOLO_MODE is set to prevent hanging on approval prompts
+if "YOLO_MODE" not in os.environ:
+    os.environ["YOLO_MODE"] = "1"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder.api_client import APIClient
+from aicoder.planning_mode import PlanningMode
+from aicoder.tool_manager.registry import ToolRegistry
+from aicoder.tool_manager.tool_definitions import ToolDefinitions
+from aicoder.utils import estimate_tokens
+
+EXTRA_TOOL = {
+    "type": "internal",
+    "description": "An extra tool",
+    "parameters": {"type": "object", "properties": {}},
+}
+
+
+def _tool_names(definitions):
+    return [tool["function"]["name"] for tool in definitions]
+
+
+def test_definitions_reused_until_tools_change():
+    """Unchanged tools return the same definitions object."""
+    registry = ToolRegistry()
+    first = registry.get_tool_definitions()
+
+    assert isinstance(first, ToolDefinitions)
+    assert registry.get_tool_definitions() is first
+
+
+def test_adding_and_removing_tools_rebuilds_definitions():
+    """Changes to the tool table bump the version and rebuild the definitions."""
+    registry = ToolRegistry()
+    first = registry.get_tool_definitions()
+    version = registry.tool_version
+
+    registry.mcp_tools["extra_tool"] = EXTRA_TOOL
+    assert registry.tool_version > version
+    second = registry.get_tool_definitions()
+    assert second is not first
+    assert "extra_tool" in _tool_names(second)
+
+    registry.mcp_tools.pop("extra_tool")
+    third = registry.get_tool_definitions()
+    assert "extra_tool" not in _tool_names(third)
+
+
+def test_in_place_edit_needs_explicit_bump():
+    """Editing a tool config in place is picked up after bump_tool_version()."""
+    registry = ToolRegistry()
+    registry.mcp_tools["extra_tool"] = dict(EXTRA_TOOL)
+    registry.get_tool_definitions()
+
+    registry.mcp_tools["extra_tool"]["description"] = "Changed"
+    registry.bump_tool_version()
+
+    definitions = registry.get_tool_definitions()
+    descriptions = {
+        tool["function"]["name"]: tool["function"]["description"] for tool in definitions
+    }
+    assert descriptions["extra_tool"] == "Changed"
+
+
+def test_malformed_parameters_fixed_once():
+    """Parameters that can't be serialized are replaced when definitions are built."""
+    registry = ToolRegistry()
+    registry.mcp_tools["extra_tool"] = dict(
+        EXTRA_TOOL, parameters={"type": "object", "properties": {"x": object()}}
+    )
+
+    definitions = registry.get_tool_definitions()
+    extra = [tool for tool in definitions if tool["function"]["name"] == "extra_tool"][0]
+    assert extra["function"]["parameters"] == {"type": "object", "properties": {}}
+
+
+def test_json_and_token_estimate_memoized():
+    """The serialized form and its token estimate are computed once per version."""
+    registry = ToolRegistry()
+    definitions = registry.get_tool_definitions()
+
+    assert json.loads(definitions.json) == list(definitions)
+    assert definitions.json is definitions.json
+    assert definitions.token_estimate == estimate_tokens(definitions.json)
+
+
+def test_request_body_matches_plain_serialization():
+    """Splicing the cached tools JSON gives the same request as a full dump."""
+    registry = ToolRegistry()
+    definitions = registry.get_tool_definitions()
+    api_data = {
+        "model": "test-model",
+        "messages": [{"role": "user", "content": "hi"}],
+        "tools": definitions,
+        "tool_choice": "auto",
+    }
+
+    body = APIClient()._prepare_and_cache_request(api_data)
+
+    expected = dict(api_data, tools=list(definitions))
+    assert json.loads(body.decode("utf-8")) == expected
+
+
+def test_plan_mode_active_tools_memoized():
+    """The plan mode subset is computed once per definitions version."""
+    registry = ToolRegistry()
+    definitions = registry.get_tool_definitions()
+    planning_mode = PlanningMode()
+    planning_mode.set_plan_mode(True)
+
+    active = planning_mode.get_active_tools(definitions)
+
+    assert "write_file" not in active
+    assert planning_mode.get_active_tools(definitions) is active
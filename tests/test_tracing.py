@@ -0,0 +1,119 @@
+"""
+Tests for the structured trace log and its Chrome trace-event conversion.
+"""
+
+import json
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from aicoder import tracing
+from aicoder.request_timing import RequestTiming
+from aicoder.tracing import Tracer, read_trace_log, to_chrome_trace, traced
+
+
+def _records(tracer):
+    tracer.close()
+    return read_trace_log(tracer.path)
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer(False, str(tmp_path))
+    tracer.begin_turn()
+    with tracer.span("approval_wait") as span:
+        assert span is None
+    assert tracer.start_span("tool_call:x") is None
+    tracer.close()
+    assert tracer.path is None and not os.listdir(tmp_path)
+
+
+def test_turn_with_nested_spans(tmp_path):
+    tracer = Tracer(True, str(tmp_path / "traces"))
+    tracer.begin_turn(prompt_chars=5)
+    tool = tracer.start_span("tool_call:read_file")
+    with tracer.span("approval_wait", tool="read_file"):
+        pass
+    tracer.end_span(tool, success=True)
+    try:
+        with tracer.span("compaction"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    worker = threading.Thread(target=lambda: tracer.end_span(tracer.start_span("tool_call:mcp")))
+    worker.start()
+    worker.join()
+    tracer.end_turn()
+    with tracer.span("plugin_hook", hook="on_before_user_prompt"):
+        pass
+
+    records = {record["name"]: record for record in _records(tracer)}
+    turn = records["turn"]
+    assert turn["parent"] is None and turn["attrs"] == {"prompt_chars": 5}
+    assert records["tool_call:read_file"]["parent"] == turn["id"]
+    assert records["tool_call:read_file"]["attrs"] == {"success": True}
+    assert records["approval_wait"]["parent"] == records["tool_call:read_file"]["id"]
+    assert records["compaction"]["attrs"] == {"error": "ValueError"}
+    # Spans from other threads hang off the turn
+    assert records["tool_call:mcp"]["parent"] == turn["id"]
+    assert records["tool_call:mcp"]["thread"] != turn["thread"]
+    # Outside a turn there is no trace
+    assert records["plugin_hook"]["trace"] is None
+    for name in ("approval_wait", "compaction", "tool_call:read_file"):
+        assert records[name]["trace"] == turn["trace"]
+        assert turn["start"] <= records[name]["start"] <= records[name]["end"] <= turn["end"]
+
+
+def test_request_timing_becomes_request_and_stream_spans(tmp_path):
+    tracer = Tracer(True, str(tmp_path))
+    tracer.begin_turn()
+    timing = RequestTiming(model="gpt-test")
+    timing.mark_serialized()
+    timing.mark_response(timing.start + 0.2)
+    timing.first_token_at = timing.start + 0.3
+    timing.chunks = 4
+    timing.finish(True, completion_tokens=12)
+    timing.end = timing.start + 1.0
+    tracer.record_request(timing)
+    tracer.end_turn()
+
+    records = {record["name"]: record for record in _records(tracer)}
+    request, stream = records["api_request"], records["sse_stream"]
+    assert request["parent"] == records["turn"]["id"] and stream["parent"] == request["id"]
+    assert abs(request["end"] - request["start"] - 1.0) < 1e-6
+    assert abs(stream["start"] - request["start"] - 0.2) < 1e-6
+    assert request["attrs"]["model"] == "gpt-test" and request["attrs"]["success"]
+    assert stream["attrs"] == {"chunks": 4, "ttft": 0.3, "completion_tokens": 12}
+
+
+def test_traced_decorator(tmp_path):
+    tracer = Tracer(True, str(tmp_path))
+
+    @traced("compaction")
+    def compact():
+        return "done"
+
+    with patch.object(tracing, "_tracer", tracer):
+        assert compact() == "done"
+    assert [record["name"] for record in _records(tracer)] == ["compaction"]
+
+
+def test_chrome_trace_conversion(tmp_path):
+    tracer = Tracer(True, str(tmp_path))
+    tracer.begin_turn()
+    with tracer.span("tool_call:grep", pattern="x"):
+        pass
+    tracer.end_turn()
+    tracer.close()
+
+    output = tmp_path / "chrome.json"
+    tracing.main([tracer.path, "-o", str(output)])
+    document = json.loads(output.read_text())
+    events = [event for event in document["traceEvents"] if event["ph"] == "X"]
+    assert [event["name"] for event in events] == ["turn", "tool_call:grep"]
+    assert events[0]["ts"] == 0 and events[0]["dur"] >= events[1]["dur"]
+    assert events[1]["cat"] == "tool_call" and events[1]["args"]["pattern"] == "x"
+    assert any(event["ph"] == "M" and event["args"]["name"] == "MainThread" for event in document["traceEvents"])
+    assert to_chrome_trace([])["traceEvents"] == []